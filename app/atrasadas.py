@@ -0,0 +1,16 @@
+from app.database import SessionLocal
+from app.services.locacao_service import LocacaoService
+
+##VIRADA DO DIA DA TABELA locacao_atrasada (ver app/models/locacao_atrasada.py)
+##Rodar uma vez por dia, logo depois da meia-noite (cron, por exemplo):
+##  5 0 * * * cd /app && python -m app.atrasadas
+##Coloca as locações em aberto que venceram desde a última execução e tira as que não estão mais
+##em atraso. Pode rodar de novo no mesmo dia sem problema: o que já está certo não muda.
+
+def main():
+    with SessionLocal() as db:
+        entraram, sairam = LocacaoService(db).virar_dia_atrasadas()
+    print(f"Locações em atraso atualizadas: {entraram} entraram, {sairam} saíram.")
+
+if __name__ == "__main__":
+    main()
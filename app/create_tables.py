@@ -2,6 +2,7 @@ from app.database import Base, engine
 from app.models.cliente import Cliente
 from app.models.filmes import Filmes
 from app.models.locacao import Locacao
+from app.models.locacao_atrasada import LocacaoAtrasada
 
 
 ##NECESSÁRIO PARA CRIAR AS TABELAS DENTRO DO  BANCO DE DADOS(POSTGRESQL)
@@ -0,0 +1,40 @@
+import argparse
+import sys
+
+from app import config
+from app.database import SessionLocal
+from app.services.importacao_service import ImportacaoService
+from app.utils.importacao import FORMATOS
+
+##IMPORTAÇÃO EM LOTE PELA LINHA DE COMANDO (mesma lógica do POST /importacao/...)
+##  python -m app.importar filmes catalogo.csv
+##  python -m app.importar clientes clientes.ndjson --formato ndjson --lote 5000
+##O formato sai da extensão do arquivo quando --formato não é passado.
+
+def main():
+    parser = argparse.ArgumentParser(description="Importa filmes ou clientes de um arquivo CSV/NDJSON.")
+    parser.add_argument("tipo", choices=("filmes", "clientes"))
+    parser.add_argument("arquivo")
+    parser.add_argument("--formato", choices=FORMATOS)
+    parser.add_argument("--lote", type=int, default=config.IMPORTACAO_TAMANHO_LOTE, help="linhas por transação")
+    args = parser.parse_args()
+    formato = args.formato or ("ndjson" if args.arquivo.endswith((".ndjson", ".jsonl")) else "csv")
+
+    def progresso(resultado):
+        print(f"\rlote {resultado.lotes}: {resultado.lidas} lidas, {resultado.importadas} importadas, "
+              f"{resultado.rejeitadas} rejeitadas", end="", file=sys.stderr, flush=True)
+
+    with SessionLocal() as db, open(args.arquivo, encoding="utf-8-sig", newline="") as arquivo:
+        service = ImportacaoService(db)
+        importar = service.importar_filmes if args.tipo == "filmes" else service.importar_clientes
+        resultado = importar(arquivo, formato, args.lote, ao_fim_do_lote=progresso)
+
+    print(file=sys.stderr)
+    for erro in resultado.erros:
+        print(f"linha {erro.linha}: {erro.erro}")
+    if resultado.rejeitadas > len(resultado.erros):
+        print(f"... e mais {resultado.rejeitadas - len(resultado.erros)} linhas rejeitadas")
+    print(f"Importação concluída: {resultado.importadas} de {resultado.lidas} registros importados.")
+
+if __name__ == "__main__":
+    main()
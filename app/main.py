@@ -1,12 +1,44 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
 from fastapi import FastAPI
-from app.routes import router as routes
+from fastapi.responses import ORJSONResponse
+from app import config
+from app.utils.requisicao import MiddlewareRequisicao
+from app.routes import router as routes, async_router as async_routes, internal_router, importacao_router
+from app.services.disponibilidade import carregar_disponibilidade_na_subida, reconciliar_disponibilidade_periodicamente
 # FastAPI só precisa dos routes aqui, mas ainda não construí nenhum router.
 # Os módulos só são importados se eu precisar deles (ex: repositórios, DTOs etc.).
+
+##LOCADORA_ASYNC=true monta os endpoints async (AsyncEngine), que não ocupam a threadpool esperando o banco.
+ASYNC_MODE = config.ASYNC_MODE
+
+##Subida da app: carrega o índice de disponibilidade (GET /filmes/disponibilidade) e deixa a
+##reconciliação com o banco rodando em segundo plano até a app parar.
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await carregar_disponibilidade_na_subida()
+    reconciliacao = None
+    if config.DISPONIBILIDADE_RECONCILIAR_S > 0:
+        reconciliacao = asyncio.create_task(reconciliar_disponibilidade_periodicamente(config.DISPONIBILIDADE_RECONCILIAR_S))
+    yield
+    if reconciliacao is not None:
+        #Espera a tarefa terminar de fato, senão ela pode ficar pendente no meio de uma recarga.
+        reconciliacao.cancel()
+        with suppress(asyncio.CancelledError):
+            await reconciliacao
+
 app = FastAPI(
     title="FastAPI Locadora",
     description="API para gerenciamento de locadora de filmes e clientes.",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse, #orjson no lugar do json da stdlib pra codificar as respostas.
+    lifespan=lifespan
 )
 
-app.include_router(routes)
+##Request ID, rota, latência e consultas ao banco em todo log do request (JSON).
+app.add_middleware(MiddlewareRequisicao)
 
+app.include_router(async_routes if ASYNC_MODE else routes)
+app.include_router(internal_router)
+app.include_router(importacao_router)
@@ -1,3 +1,4 @@
 from .cliente import Cliente
 from .locacao import Locacao
-from .filmes import Filmes
\ No newline at end of file
+from .filmes import Filmes
+from .locacao_atrasada import LocacaoAtrasada
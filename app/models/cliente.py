@@ -1,17 +1,35 @@
-from sqlalchemy import Column, Integer, String, Date
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Date, Index, text
+from sqlalchemy.orm import relationship, validates
 from app.database import Base
+from app.utils.cpf import normalizar_cpf
 
 class Cliente(Base):
     __tablename__ = "cliente"
+    ##Índice GIN de trigramas (pg_trgm) pra busca por trecho do nome, só no PostgreSQL.
+    __table_args__ = (
+        Index("ix_cliente_nome_trgm", "nome", postgresql_using="gin", postgresql_ops={"nome": "gin_trgm_ops"}).ddl_if(dialect="postgresql"),
+    )
     
     id = Column(Integer, primary_key=True)
     nome = Column(String, nullable=False)
     data_nascimento = Column(Date, nullable=False)
     cpf = Column(String, nullable=False, unique=True) #unique=True garante unicidade.
-    telefone = Column(String, nullable=False)
-    email = Column(String, nullable=False)
+    telefone = Column(String, nullable=False, index=True) #ClienteValidator confere duplicidade a cada alteração.
+    email = Column(String, nullable=False, index=True) #ClienteValidator confere duplicidade a cada alteração.
     endereco = Column(String, nullable=False)
+    ##Versão da linha (ETag), mesmo esquema do Filmes: o ORM soma 1 a cada UPDATE.
+    versao = Column(Integer, nullable=False, server_default=text("1"))
+
+    __mapper_args__ = {"version_id_col": versao}
 
     ##Relação one to many em python
-    locacoes = relationship("Locacao", back_populates="cliente")
\ No newline at end of file
+    ##write_only: cliente.locacoes nunca carrega o histórico inteiro sozinho. Pra ler, usar
+    ##cliente.locacoes.select() (com filtro/limite) ou o locacao_repository, que já pagina.
+    ##passive_deletes: ao deletar o cliente, o SQLAlchemy não carrega a coleção pra mexer nas locações.
+    ##Quem tem locação não pode ser excluído: ClienteValidator.validar_sem_locacoes (409) e a FK RESTRICT.
+    locacoes = relationship("Locacao", back_populates="cliente", lazy="write_only", passive_deletes=True)
+
+    ##Qualquer escrita no cpf (criação, update, setattr do service) grava só os dígitos.
+    @validates("cpf")
+    def _normalizar_cpf(self, chave, cpf):
+        return normalizar_cpf(cpf)
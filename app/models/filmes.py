@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date
+from sqlalchemy import Column, Integer, String, Date, Index, func, text
 from sqlalchemy.orm import relationship
 from app.database import Base
 
@@ -12,5 +12,26 @@ class Filmes(Base):
     genero = Column(String, nullable=False)
     estoque = Column(Integer, nullable=False)
 
+    ##Versão da linha: vira o ETag das respostas. Como version_id_col, todo UPDATE do ORM soma 1
+    ##e só grava se a versão no banco ainda for a que foi lida (senão StaleDataError -> 409).
+    ##Os UPDATEs diretos (baixa de estoque) somam 1 na mão. server_default cobre os INSERTs em lote.
+    versao = Column(Integer, nullable=False, server_default=text("1"))
+
+    ##Índices GIN de trigramas (pg_trgm) pra busca por trecho de nome/diretor/gênero.
+    ##Só existem no PostgreSQL, no SQLite a busca cai no ilike normal (ver busca_repository).
+    __table_args__ = (
+        Index("ix_filmes_nome_trgm", "nome", postgresql_using="gin", postgresql_ops={"nome": "gin_trgm_ops"}).ddl_if(dialect="postgresql"),
+        Index("ix_filmes_diretor_trgm", "diretor", postgresql_using="gin", postgresql_ops={"diretor": "gin_trgm_ops"}).ddl_if(dialect="postgresql"),
+        Index("ix_filmes_genero_trgm", "genero", postgresql_using="gin", postgresql_ops={"genero": "gin_trgm_ops"}).ddl_if(dialect="postgresql"),
+        ##Checagem de duplicidade da importação em lote (lower(nome) IN (...), ver get_nomes_existentes):
+        ##o GIN de trigramas não serve pra igualdade, sem este índice cada lote varreria a tabela inteira.
+        Index("ix_filmes_nome_lower", func.lower(nome)),
+    )
+
+    __mapper_args__ = {"version_id_col": versao}
+
     # Relação one to many
-    locacoes = relationship("Locacao", back_populates="filme")
\ No newline at end of file
+    ##write_only: filme.locacoes não carrega o histórico inteiro (filme popular = milhares de linhas).
+    ##Pra ler, filme.locacoes.select() ou o locacao_repository, que já pagina.
+    ##passive_deletes: mesma regra do Cliente, filme com locação não é excluído (validator + FK RESTRICT).
+    locacoes = relationship("Locacao", back_populates="filme", lazy="write_only", passive_deletes=True)
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Boolean, Date, ForeignKey
+from sqlalchemy import Column, Integer, Boolean, Date, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 
@@ -6,14 +6,36 @@ class Locacao(Base):
     __tablename__ = "locacao"
 
     id_locacao = Column(Integer, primary_key=True)
-    id_cliente = Column(Integer, ForeignKey("cliente.id"), nullable=False)
-    id_filme = Column(Integer, ForeignKey("filmes.id_filme"), nullable=False)
+    ##RESTRICT: locação é histórico (cobrança, multas), o banco não deixa excluir cliente ou filme
+    ##que tenha locação. Os validators já recusam antes com 409 (o SQLite só confere FK com PRAGMA).
+    id_cliente = Column(Integer, ForeignKey("cliente.id", ondelete="RESTRICT"), nullable=False)
+    id_filme = Column(Integer, ForeignKey("filmes.id_filme", ondelete="RESTRICT"), nullable=False)
 
     data_locacao = Column(Date, nullable=False)
     data_devolucao = Column(Date, nullable=False)
     devolvido = Column(Boolean, nullable=False, default=False)
     quantidade = Column(Integer, nullable=False)
 
+    ##Índices das consultas quentes:
+    ##- históricos por cliente/filme filtram pelo id e paginam por id_locacao (keyset), então o índice já entrega ordenado.
+    ##- LocacaoValidator.validar_duplicidade só olha locações em aberto: índice parcial (devolvido = false),
+    ##  bem menor que a tabela inteira, já que a maioria das locações antigas já foi devolvida.
+    ##- a virada do dia da locacao_atrasada procura as em aberto com data_devolucao vencida: mesmo índice parcial.
+    __table_args__ = (
+        Index("ix_locacao_cliente_id_locacao", id_cliente, id_locacao),
+        Index("ix_locacao_filme_id_locacao", id_filme, id_locacao),
+        Index(
+            "ix_locacao_em_aberto_duplicidade", id_cliente, id_filme, data_locacao,
+            postgresql_where=(devolvido == False), sqlite_where=(devolvido == False)
+        ),
+        Index(
+            "ix_locacao_em_aberto_devolucao", data_devolucao,
+            postgresql_where=(devolvido == False), sqlite_where=(devolvido == False)
+        ),
+    )
+
     ##Relacionamentos many to one
-    cliente = relationship("Cliente", back_populates="locacoes")
-    filme = relationship("Filmes", back_populates="locacoes")
\ No newline at end of file
+    ##lazy="raise": ler locacao.cliente/locacao.filme sem ter carregado antes dá erro em vez de
+    ##disparar um SELECT escondido. Quando precisar, carregar junto: options(joinedload(Locacao.filme)).
+    cliente = relationship("Cliente", back_populates="locacoes", lazy="raise")
+    filme = relationship("Filmes", back_populates="locacoes", lazy="raise")
\ No newline at end of file
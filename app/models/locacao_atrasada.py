@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, Date, ForeignKey, Index
+from app.database import Base
+
+class LocacaoAtrasada(Base):
+    ##Cópia mantida das locações em aberto e vencidas (devolvido = false e data_devolucao < hoje),
+    ##pra tela de cobrança ler sem filtrar a tabela locacao inteira. Não é materialized view do
+    ##PostgreSQL (o REFRESH recalcula tudo e não roda no SQLite): é uma tabela atualizada aos poucos.
+    ##- renovação, devolução e exclusão tiram a locação daqui na mesma transação da escrita;
+    ##- a virada do dia (python -m app.atrasadas, uma vez por dia) coloca as que venceram ontem.
+    ##Locação nova nunca entra direto: o validator não aceita data de devolução no passado.
+    __tablename__ = "locacao_atrasada"
+
+    id_locacao = Column(Integer, ForeignKey("locacao.id_locacao", ondelete="CASCADE"), primary_key=True)
+    id_cliente = Column(Integer, nullable=False)
+    id_filme = Column(Integer, nullable=False)
+    data_devolucao = Column(Date, nullable=False)
+    quantidade = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        Index("ix_locacao_atrasada_cliente_id_locacao", id_cliente, id_locacao),
+    )
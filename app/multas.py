@@ -0,0 +1,32 @@
+import argparse
+import sys
+
+from app import config
+from app.database import SessionLocal
+from app.services.locacao_service import LocacaoService
+from app.utils.exportacao import FORMATOS
+
+##MULTAS EM ATRASO POR CLIENTE PELA LINHA DE COMANDO (mesma consulta do GET /locacao/multas/exportar)
+##Pensado pro job noturno de faturamento:
+##  python -m app.multas --saida multas.csv --formato csv
+##  MULTA_POR_DIA=9.50 python -m app.multas > multas.ndjson
+##Sem --saida o resultado vai pro stdout.
+
+def main():
+    parser = argparse.ArgumentParser(description="Calcula as multas das locações em atraso, somadas por cliente.")
+    parser.add_argument("--formato", choices=FORMATOS, default="ndjson")
+    parser.add_argument("--saida", help="arquivo de destino (padrão: stdout)")
+    args = parser.parse_args()
+
+    saida = open(args.saida, "w", encoding="utf-8", newline="") if args.saida else sys.stdout
+    with SessionLocal() as db:
+        try:
+            for bloco in LocacaoService(db).exportar_multas_por_cliente(args.formato):
+                saida.write(bloco)
+        finally:
+            if saida is not sys.stdout:
+                saida.close()
+    print(f"Multas calculadas a R$ {config.MULTA_POR_DIA:.2f} por dia de atraso.", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+from fastapi import HTTPException
+from sqlalchemy import select, func, or_, and_
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.filmes import Filmes
+from app.models.cliente import Cliente
+from app.repositories import filmes_repository, cliente_repository, filmes_repository_async, cliente_repository_async
+from app.utils.paginacao import codificar_cursor, decodificar_cursor, decodificar_cursor_id, LIMITE_PADRAO
+
+## Busca por trecho de texto (caixa de busca do site).
+## No PostgreSQL usa os índices GIN de trigramas (pg_trgm) e ordena por relevância (similarity),
+## paginando por keyset em (relevância, id). Em outros bancos (SQLite dos testes) cai no ilike
+## dos repositórios, paginado só pelo id. As funções recebem e devolvem o cursor opaco.
+
+#campo buscado -> (coluna, nome da função com ilike nos repositórios de filmes)
+CAMPOS_FILME = {
+    "nome": (Filmes.nome, "get_by_nome_contendo"),
+    "diretor": (Filmes.diretor, "get_by_diretor_contendo"),
+    "genero": (Filmes.genero, "get_by_genero_contendo"),
+}
+
+def _usa_trigramas(db) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+def _cursor_ranqueado(after: str | None) -> tuple[float, int] | None:
+    valores = decodificar_cursor(after)
+    if valores is None:
+        return None
+    if len(valores) != 2 or not isinstance(valores[0], (int, float)) or not isinstance(valores[1], int):
+        raise HTTPException(status_code=400, detail="Cursor de paginação inválido.")
+    return float(valores[0]), valores[1]
+
+def _consulta_ranqueada(modelo, coluna, coluna_id, termo: str, limit: int, after: str | None):
+    relevancia = func.similarity(coluna, termo)
+    #ilike e % (similaridade de trigramas) usam o mesmo índice GIN, sem varrer a tabela.
+    consulta = select(modelo, relevancia.label("relevancia")).filter(
+        or_(coluna.ilike(f"%{termo}%"), coluna.op("%")(termo))
+    )
+    cursor = _cursor_ranqueado(after)
+    if cursor is not None:
+        ultima_relevancia, ultimo_id = cursor
+        consulta = consulta.filter(or_(
+            relevancia < ultima_relevancia,
+            and_(relevancia == ultima_relevancia, coluna_id > ultimo_id)
+        ))
+    return consulta.order_by(relevancia.desc(), coluna_id).limit(limit + 1)
+
+def _fatiar_ranqueado(linhas, coluna_id, limit: int) -> tuple[list, str | None]:
+    itens = [linha[0] for linha in linhas[:limit]]
+    if len(linhas) <= limit:
+        return itens, None #última página
+    ultima = linhas[limit - 1]
+    return itens, codificar_cursor(float(ultima.relevancia), getattr(ultima[0], coluna_id.key))
+
+def _cursor_do_id(proximo_id: int | None) -> str | None:
+    return codificar_cursor(proximo_id) if proximo_id is not None else None
+
+def buscar_filmes(db: Session, campo: str, termo: str, limit: int = LIMITE_PADRAO, after: str | None = None):
+    coluna, fallback = CAMPOS_FILME[campo]
+    if not _usa_trigramas(db):
+        filmes, proximo_id = getattr(filmes_repository, fallback)(db, termo, limit, decodificar_cursor_id(after))
+        return filmes, _cursor_do_id(proximo_id)
+    linhas = db.execute(_consulta_ranqueada(Filmes, coluna, Filmes.id_filme, termo, limit, after)).all()
+    return _fatiar_ranqueado(linhas, Filmes.id_filme, limit)
+
+def buscar_clientes_por_nome(db: Session, termo: str, limit: int = LIMITE_PADRAO, after: str | None = None):
+    if not _usa_trigramas(db):
+        clientes, proximo_id = cliente_repository.get_by_nome_ignore_case(db, termo, limit, decodificar_cursor_id(after))
+        return clientes, _cursor_do_id(proximo_id)
+    linhas = db.execute(_consulta_ranqueada(Cliente, Cliente.nome, Cliente.id, termo, limit, after)).all()
+    return _fatiar_ranqueado(linhas, Cliente.id, limit)
+
+async def buscar_filmes_async(db: AsyncSession, campo: str, termo: str, limit: int = LIMITE_PADRAO, after: str | None = None):
+    coluna, fallback = CAMPOS_FILME[campo]
+    if not _usa_trigramas(db):
+        filmes, proximo_id = await getattr(filmes_repository_async, fallback)(db, termo, limit, decodificar_cursor_id(after))
+        return filmes, _cursor_do_id(proximo_id)
+    linhas = (await db.execute(_consulta_ranqueada(Filmes, coluna, Filmes.id_filme, termo, limit, after))).all()
+    return _fatiar_ranqueado(linhas, Filmes.id_filme, limit)
+
+async def buscar_clientes_por_nome_async(db: AsyncSession, termo: str, limit: int = LIMITE_PADRAO, after: str | None = None):
+    if not _usa_trigramas(db):
+        clientes, proximo_id = await cliente_repository_async.get_by_nome_ignore_case(db, termo, limit, decodificar_cursor_id(after))
+        return clientes, _cursor_do_id(proximo_id)
+    linhas = (await db.execute(_consulta_ranqueada(Cliente, Cliente.nome, Cliente.id, termo, limit, after))).all()
+    return _fatiar_ranqueado(linhas, Cliente.id, limit)
@@ -1,20 +1,45 @@
+from sqlalchemy import select, insert
 from sqlalchemy.orm import Session
 from app.models.cliente import Cliente
+from app.utils.paginacao import paginar, LIMITE_PADRAO
+from app.utils.cpf import normalizar_cpf, fim_do_prefixo
 
 
 def get_by_id(db: Session, id: int):
     return db.query(Cliente).filter(Cliente.id == id).first() #first é equivalente ao optional(1 na lista)
 
+def get_versao(db: Session, id: int) -> int | None:
+    #Só a coluna versao (checagem do If-None-Match), sem montar o objeto do ORM.
+    return db.scalar(select(Cliente.versao).filter(Cliente.id == id))
+
 def get_by_telefone(db: Session, telefone: str):
     return db.query(Cliente).filter(Cliente.telefone == telefone).first() #first é equivalente ao optional(1 na lista)
 
 def get_by_email(db:Session, email: str):
     return db.query(Cliente).filter(Cliente.email == email).first() #first é equivalente ao optional(1 na lista)
 
-def get_by_cpf_ignore_case(db: Session, cpf: str):
-    #ilike busca ignorando maiusculas e minusculas
-    return db.query(Cliente).filter(Cliente.cpf.ilike(f"%{cpf}%")).first() #first é equivalente ao optional(1 na lista)
+def get_by_cpf(db: Session, cpf: str):
+    #Igualdade no CPF só com dígitos, usa o índice único da coluna.
+    return db.query(Cliente).filter(Cliente.cpf == normalizar_cpf(cpf)).first() #first é equivalente ao optional(1 na lista)
+
+def get_by_cpf_prefixo(db: Session, prefixo: str, limit: int = LIMITE_PADRAO, after_cpf: str | None = None):
+    # intervalo [prefixo, prefixo + ":") em vez de like, assim o índice único do cpf atende nos dois bancos
+    # paginado por keyset no próprio cpf: retorna (página, cpf pro próximo cursor)
+    prefixo = normalizar_cpf(prefixo)
+    consulta = db.query(Cliente).filter(Cliente.cpf >= prefixo, Cliente.cpf < fim_do_prefixo(prefixo))
+    return paginar(consulta, Cliente.cpf, limit, after_cpf)
 
-def get_by_nome_ignore_case(db: Session, nome: str):
+def get_by_nome_ignore_case(db: Session, nome: str, limit: int = LIMITE_PADRAO, after_id: int | None = None):
     # ilike busca ignorando maiusculas e minusculas
-    return db.query(Cliente).filter(Cliente.nome.ilike(f"%{nome}%")).all() #retorna toda a lista
+    # paginado por keyset no id: retorna (página, id pro próximo cursor)
+    return paginar(db.query(Cliente).filter(Cliente.nome.ilike(f"%{nome}%")), Cliente.id, limit, after_id)
+
+## Importação em lote (ver importacao_service).
+
+def get_cpfs_existentes(db: Session, cpfs: list[str]) -> set[str]:
+    #Igualdade no índice único do cpf, pra vários CPFs numa consulta só.
+    return set(db.scalars(select(Cliente.cpf).filter(Cliente.cpf.in_(cpfs))).all())
+
+def inserir_em_lote(db: Session, linhas: list[dict]):
+    #executemany: o SQLAlchemy junta as linhas em INSERTs de vários VALUES, sem montar objeto Cliente por linha.
+    db.execute(insert(Cliente), linhas)
@@ -0,0 +1,39 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.cliente import Cliente
+from app.utils.paginacao import aplicar_keyset, fatiar_pagina, LIMITE_PADRAO
+from app.utils.cpf import normalizar_cpf, fim_do_prefixo
+
+##Versões assíncronas das funções do cliente_repository, usadas pelo modo async.
+
+async def get_by_id(db: AsyncSession, id: int):
+    result = await db.execute(select(Cliente).filter(Cliente.id == id))
+    return result.scalars().first() #first é equivalente ao optional(1 na lista)
+
+async def get_versao(db: AsyncSession, id: int) -> int | None:
+    return await db.scalar(select(Cliente.versao).filter(Cliente.id == id))
+
+async def get_by_telefone(db: AsyncSession, telefone: str):
+    result = await db.execute(select(Cliente).filter(Cliente.telefone == telefone))
+    return result.scalars().first() #first é equivalente ao optional(1 na lista)
+
+async def get_by_email(db: AsyncSession, email: str):
+    result = await db.execute(select(Cliente).filter(Cliente.email == email))
+    return result.scalars().first() #first é equivalente ao optional(1 na lista)
+
+async def get_by_cpf(db: AsyncSession, cpf: str):
+    #Igualdade no CPF só com dígitos, usa o índice único da coluna.
+    result = await db.execute(select(Cliente).filter(Cliente.cpf == normalizar_cpf(cpf)))
+    return result.scalars().first() #first é equivalente ao optional(1 na lista)
+
+async def get_by_cpf_prefixo(db: AsyncSession, prefixo: str, limit: int = LIMITE_PADRAO, after_cpf: str | None = None):
+    # intervalo [prefixo, prefixo + ":") em vez de like, assim o índice único do cpf atende nos dois bancos
+    prefixo = normalizar_cpf(prefixo)
+    consulta = select(Cliente).filter(Cliente.cpf >= prefixo, Cliente.cpf < fim_do_prefixo(prefixo))
+    consulta = aplicar_keyset(consulta, Cliente.cpf, limit, after_cpf)
+    return fatiar_pagina((await db.execute(consulta)).scalars().all(), Cliente.cpf, limit)
+
+async def get_by_nome_ignore_case(db: AsyncSession, nome: str, limit: int = LIMITE_PADRAO, after_id: int | None = None):
+    # ilike busca ignorando maiusculas e minusculas
+    consulta = aplicar_keyset(select(Cliente).filter(Cliente.nome.ilike(f"%{nome}%")), Cliente.id, limit, after_id)
+    return fatiar_pagina((await db.execute(consulta)).scalars().all(), Cliente.id, limit)
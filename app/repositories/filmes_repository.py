@@ -1,47 +1,117 @@
+from sqlalchemy import update, select, case, insert, func
 from sqlalchemy.orm import Session, load_only
 from app.models.filmes import Filmes
+from app.utils.paginacao import paginar, LIMITE_PADRAO
 from datetime import date
 
+## Colunas do FilmeResponse, na mesma ordem: as listas por data de lançamento e por estoque
+## voltam como linhas (Row) prontas pra resposta, sem montar objetos do ORM.
+COLUNAS_RESPOSTA = (
+    Filmes.id_filme, Filmes.nome, Filmes.data_lancamento, Filmes.diretor,
+    Filmes.genero, Filmes.estoque, Filmes.versao
+)
+
 def get_by_id(db: Session, id_filme: int): #Não chamar o relacionamento com locação,
     return db.query(Filmes).filter(Filmes.id_filme == id_filme).first()
 
+def get_versao(db: Session, id_filme: int) -> int | None:
+    #Só a coluna versao (checagem do If-None-Match), sem montar o objeto do ORM.
+    return db.scalar(select(Filmes.versao).filter(Filmes.id_filme == id_filme))
+
 def get_by_nome_ignore_case(db: Session, nome: str):
     # ilike busca ignorando maiusculas e minusculas
     return db.query(Filmes).filter(Filmes.nome.ilike(nome)).first() #first é equivalente ao optional(1 na lista)
 
-def get_by_nome_contendo(db: Session, nome: str):
+## As buscas de lista são paginadas por keyset no id_filme: retornam (página, id pro próximo cursor).
+
+def get_by_nome_contendo(db: Session, nome: str, limit: int = LIMITE_PADRAO, after_id: int | None = None):
     #ESSE BUSCA TODOS OS FILMES QUE CONTENHAM A PALAVRA BUSCADA
     # ilike busca ignorando maiusculas e minusculas
-    return db.query(Filmes).filter(Filmes.nome.ilike(f"%{nome}%")).all() #retorna toda a lista
+    return paginar(db.query(Filmes).filter(Filmes.nome.ilike(f"%{nome}%")), Filmes.id_filme, limit, after_id)
 
-def get_by_data_lancamento(db: Session, data: date):
-    return db.query(Filmes).filter(Filmes.data_lancamento == data).all() #retorna toda a lista
+def get_by_data_lancamento(db: Session, data: date, limit: int = LIMITE_PADRAO, after_id: int | None = None):
+    return paginar(db.query(*COLUNAS_RESPOSTA).filter(Filmes.data_lancamento == data), Filmes.id_filme, limit, after_id)
 
-def get_by_diretor_contendo(db: Session, diretor: str):
+def get_by_diretor_contendo(db: Session, diretor: str, limit: int = LIMITE_PADRAO, after_id: int | None = None):
     # ilike busca ignorando maiusculas e minusculas
-    return db.query(Filmes).filter(Filmes.diretor.ilike(f"%{diretor}%")).all() #retorna toda a lista
+    return paginar(db.query(Filmes).filter(Filmes.diretor.ilike(f"%{diretor}%")), Filmes.id_filme, limit, after_id)
 
-def get_by_genero_contendo(db: Session, genero: str):
+def get_by_genero_contendo(db: Session, genero: str, limit: int = LIMITE_PADRAO, after_id: int | None = None):
     # ilike busca ignorando maiusculas e minusculas
-    return db.query(Filmes).filter(Filmes.genero.ilike(f"%{genero}%")).all() #retorna toda a lista
+    return paginar(db.query(Filmes).filter(Filmes.genero.ilike(f"%{genero}%")), Filmes.id_filme, limit, after_id)
 
-def get_by_estoque(db: Session, estoque: int):
-    return db.query(Filmes).filter(Filmes.estoque == estoque).all() #retorna toda a lista
+def get_by_estoque(db: Session, estoque: int, limit: int = LIMITE_PADRAO, after_id: int | None = None):
+    return paginar(db.query(*COLUNAS_RESPOSTA).filter(Filmes.estoque == estoque), Filmes.id_filme, limit, after_id)
 
-def save(db: Session, filme: Filmes) -> Filmes:
-    ## Aqui é pra garantir que todas as locações associadas ao filme estão na sessão do SQLAlchemy,
-    ## e garantindo que os relacionamentos estão sendo salvos.
-    ## E poderia futuramente ter dados soltos pq a ligação não foi salva corretamente.
-    ## Se não colocar os ifs de reafirmação, vai ficar dando warning.
-    for locacao in filme.locacoes:
-        if locacao not in db:
-            db.add(locacao)
+def decrementar_estoque(db: Session, id_filme: int, quantidade: int) -> int | None:
+    ## Baixa do estoque num único UPDATE condicional, sem ler o filme antes:
+    ## duas locações da última cópia ao mesmo tempo não passam as duas, o banco só deixa uma.
+    ## Retorna o estoque que sobrou, ou None se o filme não existe ou não tem estoque suficiente.
+    ## Não faz commit: quem chama grava a locação na mesma transação.
+    return db.execute(
+        update(Filmes)
+        .where(Filmes.id_filme == id_filme, Filmes.estoque >= quantidade)
+        .values(estoque=Filmes.estoque - quantidade, versao=Filmes.versao + 1)
+        .returning(Filmes.estoque)
+    ).scalar_one_or_none()
+
+## Versões em lote, usadas pelo /locacao/alugar/lote: uma consulta/um UPDATE pra todos os filmes.
+
+def get_estoques(db: Session, ids_filme: list[int]) -> dict[int, int]:
+    #{id_filme: estoque} só dos filmes que existem.
+    return dict(db.execute(select(Filmes.id_filme, Filmes.estoque).filter(Filmes.id_filme.in_(ids_filme))).all())
+
+def get_todos_estoques(db: Session) -> dict[int, int]:
+    #Catálogo inteiro, só id e estoque: carga e reconciliação do índice de disponibilidade.
+    return dict(db.execute(select(Filmes.id_filme, Filmes.estoque)).all())
+
+def _decrementar_estoques_stmt(quantidades: dict[int, int]):
+    ## UPDATE filmes SET estoque = estoque - CASE id_filme WHEN .. THEN q .. END
+    ## WHERE id_filme IN (..) AND estoque >= CASE .. END RETURNING id_filme, estoque
+    quantidade = case(quantidades, value=Filmes.id_filme)
+    return (
+        update(Filmes)
+        .where(Filmes.id_filme.in_(list(quantidades)), Filmes.estoque >= quantidade)
+        .values(estoque=Filmes.estoque - quantidade, versao=Filmes.versao + 1)
+        .returning(Filmes.id_filme, Filmes.estoque)
+    )
 
+def decrementar_estoques(db: Session, quantidades: dict[int, int]) -> dict[int, int]:
+    ## Mesmo UPDATE condicional do decrementar_estoque, pra vários filmes num comando só.
+    ## Retorna {id_filme: estoque que sobrou} só dos filmes que tinham estoque; os outros ficam de fora.
+    return dict(db.execute(_decrementar_estoques_stmt(quantidades)).all())
+
+def _incrementar_estoques_stmt(quantidades: dict[int, int]):
+    ## Reposição da devolução: o contrário da baixa, sem condição (estoque só sobe).
+    quantidade = case(quantidades, value=Filmes.id_filme)
+    return (
+        update(Filmes)
+        .where(Filmes.id_filme.in_(list(quantidades)))
+        .values(estoque=Filmes.estoque + quantidade, versao=Filmes.versao + 1)
+        .returning(Filmes.id_filme, Filmes.estoque)
+    )
+
+def incrementar_estoques(db: Session, quantidades: dict[int, int]) -> dict[int, int]:
+    #Retorna {id_filme: estoque depois da reposição}.
+    return dict(db.execute(_incrementar_estoques_stmt(quantidades)).all())
+
+## Importação em lote (ver importacao_service).
+
+def get_nomes_existentes(db: Session, nomes: list[str]) -> set[str]:
+    #Mesma regra do get_by_nome_ignore_case (nome igual, sem diferenciar maiúsculas), pra vários nomes numa consulta.
+    #Retorna os nomes já cadastrados em minúsculas.
+    return set(db.scalars(select(func.lower(Filmes.nome)).filter(func.lower(Filmes.nome).in_([nome.lower() for nome in nomes]))).all())
+
+def inserir_em_lote(db: Session, linhas: list[dict]):
+    #executemany: o SQLAlchemy junta as linhas em INSERTs de vários VALUES, sem montar objeto Filmes por linha.
+    db.execute(insert(Filmes), linhas)
+
+## save/delete não fazem commit: só mandam pro banco (flush) dentro da transação aberta pelo service.
+def save(db: Session, filme: Filmes) -> Filmes:
     db.add(filme)
-    db.commit()
-    db.refresh(filme)
+    db.flush() #INSERT/UPDATE agora, id_filme já fica preenchido.
     return filme
 
 def delete(db: Session, filme: Filmes):
     db.delete(filme)
-    db.commit()
\ No newline at end of file
+    db.flush()
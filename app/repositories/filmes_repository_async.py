@@ -0,0 +1,75 @@
+from sqlalchemy import select, update
+from app.repositories.filmes_repository import _decrementar_estoques_stmt, _incrementar_estoques_stmt, COLUNAS_RESPOSTA
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.filmes import Filmes
+from app.utils.paginacao import aplicar_keyset, fatiar_pagina, LIMITE_PADRAO
+from datetime import date
+
+##Versões assíncronas das funções do filmes_repository, usadas pelo modo async.
+##No async não existe lazy load implícito, então aqui nunca se toca em filme.locacoes.
+
+async def get_by_id(db: AsyncSession, id_filme: int):
+    result = await db.execute(select(Filmes).filter(Filmes.id_filme == id_filme))
+    return result.scalars().first()
+
+async def get_versao(db: AsyncSession, id_filme: int) -> int | None:
+    return await db.scalar(select(Filmes.versao).filter(Filmes.id_filme == id_filme))
+
+async def get_by_nome_ignore_case(db: AsyncSession, nome: str):
+    # ilike busca ignorando maiusculas e minusculas
+    result = await db.execute(select(Filmes).filter(Filmes.nome.ilike(nome)))
+    return result.scalars().first() #first é equivalente ao optional(1 na lista)
+
+async def get_by_nome_contendo(db: AsyncSession, nome: str, limit: int = LIMITE_PADRAO, after_id: int | None = None):
+    #ESSE BUSCA TODOS OS FILMES QUE CONTENHAM A PALAVRA BUSCADA
+    consulta = aplicar_keyset(select(Filmes).filter(Filmes.nome.ilike(f"%{nome}%")), Filmes.id_filme, limit, after_id)
+    return fatiar_pagina((await db.execute(consulta)).scalars().all(), Filmes.id_filme, limit)
+
+async def get_by_data_lancamento(db: AsyncSession, data: date, limit: int = LIMITE_PADRAO, after_id: int | None = None):
+    consulta = aplicar_keyset(select(*COLUNAS_RESPOSTA).filter(Filmes.data_lancamento == data), Filmes.id_filme, limit, after_id)
+    return fatiar_pagina((await db.execute(consulta)).all(), Filmes.id_filme, limit)
+
+async def get_by_diretor_contendo(db: AsyncSession, diretor: str, limit: int = LIMITE_PADRAO, after_id: int | None = None):
+    consulta = aplicar_keyset(select(Filmes).filter(Filmes.diretor.ilike(f"%{diretor}%")), Filmes.id_filme, limit, after_id)
+    return fatiar_pagina((await db.execute(consulta)).scalars().all(), Filmes.id_filme, limit)
+
+async def get_by_genero_contendo(db: AsyncSession, genero: str, limit: int = LIMITE_PADRAO, after_id: int | None = None):
+    consulta = aplicar_keyset(select(Filmes).filter(Filmes.genero.ilike(f"%{genero}%")), Filmes.id_filme, limit, after_id)
+    return fatiar_pagina((await db.execute(consulta)).scalars().all(), Filmes.id_filme, limit)
+
+async def get_by_estoque(db: AsyncSession, estoque: int, limit: int = LIMITE_PADRAO, after_id: int | None = None):
+    consulta = aplicar_keyset(select(*COLUNAS_RESPOSTA).filter(Filmes.estoque == estoque), Filmes.id_filme, limit, after_id)
+    return fatiar_pagina((await db.execute(consulta)).all(), Filmes.id_filme, limit)
+
+async def decrementar_estoque(db: AsyncSession, id_filme: int, quantidade: int) -> int | None:
+    ## Mesmo UPDATE condicional do filmes_repository.decrementar_estoque (sem commit).
+    result = await db.execute(
+        update(Filmes)
+        .where(Filmes.id_filme == id_filme, Filmes.estoque >= quantidade)
+        .values(estoque=Filmes.estoque - quantidade, versao=Filmes.versao + 1)
+        .returning(Filmes.estoque)
+    )
+    return result.scalar_one_or_none()
+
+async def get_estoques(db: AsyncSession, ids_filme: list[int]) -> dict[int, int]:
+    result = await db.execute(select(Filmes.id_filme, Filmes.estoque).filter(Filmes.id_filme.in_(ids_filme)))
+    return dict(result.all())
+
+async def get_todos_estoques(db: AsyncSession) -> dict[int, int]:
+    return dict((await db.execute(select(Filmes.id_filme, Filmes.estoque))).all())
+
+async def decrementar_estoques(db: AsyncSession, quantidades: dict[int, int]) -> dict[int, int]:
+    return dict((await db.execute(_decrementar_estoques_stmt(quantidades))).all())
+
+async def incrementar_estoques(db: AsyncSession, quantidades: dict[int, int]) -> dict[int, int]:
+    return dict((await db.execute(_incrementar_estoques_stmt(quantidades))).all())
+
+## save/delete não fazem commit: só flush dentro da transação aberta pelo service.
+async def save(db: AsyncSession, filme: Filmes) -> Filmes:
+    db.add(filme)
+    await db.flush()
+    return filme
+
+async def delete(db: AsyncSession, filme: Filmes):
+    await db.delete(filme)
+    await db.flush()
@@ -0,0 +1,53 @@
+from sqlalchemy import select, insert, delete, exists, literal, Date
+from sqlalchemy.orm import Session
+from app.models.locacao import Locacao
+from app.models.locacao_atrasada import LocacaoAtrasada
+from app.repositories.locacao_repository import _em_atraso
+from app.utils.paginacao import aplicar_keyset, fatiar_pagina, LIMITE_PADRAO
+from app.utils.sql import dias_entre
+from datetime import date
+
+## Tabela locacao_atrasada (ver app/models/locacao_atrasada.py). As consultas são compartilhadas com
+## o repository async; nenhuma faz commit, quem abre a transação é o service.
+
+COLUNAS_COPIADAS = ("id_locacao", "id_cliente", "id_filme", "data_devolucao", "quantidade")
+
+def consulta_atrasadas(hoje: date, id_cliente: int | None = None):
+    #Campos do LocacaoAtrasadaResponse. Os dias de atraso mudam todo dia, então são calculados na leitura.
+    consulta = select(
+        LocacaoAtrasada.id_locacao, LocacaoAtrasada.id_cliente, LocacaoAtrasada.id_filme, LocacaoAtrasada.data_devolucao,
+        LocacaoAtrasada.quantidade, dias_entre(LocacaoAtrasada.data_devolucao, literal(hoje, Date)).label("dias_atraso")
+    )
+    if id_cliente is not None:
+        consulta = consulta.filter(LocacaoAtrasada.id_cliente == id_cliente)
+    return consulta
+
+def _inserir_vencidas_stmt(hoje: date):
+    #Locações que venceram desde a última virada: o índice parcial ix_locacao_em_aberto_devolucao
+    #entrega as em aberto vencidas e o NOT EXISTS (pela chave primária) pula as que já estão aqui.
+    ja_copiada = exists().where(LocacaoAtrasada.id_locacao == Locacao.id_locacao)
+    origem = select(*(getattr(Locacao, coluna) for coluna in COLUNAS_COPIADAS)).filter(*_em_atraso(hoje), ~ja_copiada)
+    return insert(LocacaoAtrasada).from_select(COLUNAS_COPIADAS, origem)
+
+def _remover_regularizadas_stmt(hoje: date):
+    #Conferência: tira o que não está mais em atraso e escapou da manutenção feita nas escritas.
+    ainda_atrasada = exists().where(Locacao.id_locacao == LocacaoAtrasada.id_locacao, *_em_atraso(hoje))
+    return delete(LocacaoAtrasada).where(~ainda_atrasada)
+
+def _remover_stmt(ids_locacao: list[int]):
+    return delete(LocacaoAtrasada).where(LocacaoAtrasada.id_locacao.in_(ids_locacao))
+
+def get_atrasadas(db: Session, hoje: date, id_cliente: int | None = None, limit: int = LIMITE_PADRAO, after_id: int | None = None):
+    consulta = aplicar_keyset(consulta_atrasadas(hoje, id_cliente), LocacaoAtrasada.id_locacao, limit, after_id)
+    return fatiar_pagina(db.execute(consulta).all(), LocacaoAtrasada.id_locacao, limit)
+
+def remover(db: Session, *ids_locacao: int):
+    ## Manutenção incremental: renovação, devolução e exclusão tiram as locações daqui
+    ## (um DELETE pela chave primária, na mesma transação da escrita).
+    db.execute(_remover_stmt(list(ids_locacao)))
+
+def virar_dia(db: Session, hoje: date) -> tuple[int, int]:
+    ## Job diário: retorna (quantas entraram, quantas saíram).
+    saiu = db.execute(_remover_regularizadas_stmt(hoje)).rowcount
+    entrou = db.execute(_inserir_vencidas_stmt(hoje)).rowcount
+    return entrou, saiu
@@ -0,0 +1,21 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.locacao_atrasada import LocacaoAtrasada
+from app.repositories.locacao_atrasada_repository import (
+    consulta_atrasadas, _inserir_vencidas_stmt, _remover_regularizadas_stmt, _remover_stmt
+)
+from app.utils.paginacao import aplicar_keyset, fatiar_pagina, LIMITE_PADRAO
+from datetime import date
+
+##Versões assíncronas das funções do locacao_atrasada_repository, usadas pelo modo async.
+
+async def get_atrasadas(db: AsyncSession, hoje: date, id_cliente: int | None = None, limit: int = LIMITE_PADRAO, after_id: int | None = None):
+    consulta = aplicar_keyset(consulta_atrasadas(hoje, id_cliente), LocacaoAtrasada.id_locacao, limit, after_id)
+    return fatiar_pagina((await db.execute(consulta)).all(), LocacaoAtrasada.id_locacao, limit)
+
+async def remover(db: AsyncSession, *ids_locacao: int):
+    await db.execute(_remover_stmt(list(ids_locacao)))
+
+async def virar_dia(db: AsyncSession, hoje: date) -> tuple[int, int]:
+    saiu = (await db.execute(_remover_regularizadas_stmt(hoje))).rowcount
+    entrou = (await db.execute(_inserir_vencidas_stmt(hoje))).rowcount
+    return entrou, saiu
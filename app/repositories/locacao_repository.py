@@ -1,17 +1,30 @@
+from sqlalchemy import select, insert, update, exists, func, literal, cast, Date, Numeric, Float
 from sqlalchemy.orm import Session
 from app.models.locacao import Locacao
 from app.models.cliente import Cliente
 from app.models.filmes import Filmes
+from app.repositories import filmes_repository
+from app.utils.paginacao import paginar, aplicar_keyset, fatiar_pagina, LIMITE_PADRAO
+from app.utils.sql import dias_entre
 from datetime import date
+from decimal import Decimal
 
 def get_by_id(db: Session, id_locacao: int): ##id da locação
     return db.query(Locacao).filter(Locacao.id_locacao == id_locacao).first() #optional
 
-def get_by_cliente_id(db: Session, cliente_id: int):
-    return db.query(Locacao).filter(Locacao.id_cliente == cliente_id).all() #list
+## Colunas do LocacaoResponse, na mesma ordem. Os históricos (paginados e exportação) buscam só
+## essas colunas: voltam linhas (Row) em vez de objetos do ORM, sem identity map nem model_validate depois.
+COLUNAS_RESPOSTA = (
+    Locacao.id_locacao, Locacao.id_cliente, Locacao.id_filme, Locacao.data_locacao,
+    Locacao.data_devolucao, Locacao.devolvido, Locacao.quantidade
+)
 
-def get_by_filme_id(db: Session, filme_id: int):
-    return db.query(Locacao).filter(Locacao.id_filme == filme_id).all() #list
+## Histórico paginado por keyset no id_locacao: retorna (página, id pro próximo cursor).
+def get_by_cliente_id(db: Session, cliente_id: int, limit: int = LIMITE_PADRAO, after_id: int | None = None):
+    return paginar(db.query(*COLUNAS_RESPOSTA).filter(Locacao.id_cliente == cliente_id), Locacao.id_locacao, limit, after_id)
+
+def get_by_filme_id(db: Session, filme_id: int, limit: int = LIMITE_PADRAO, after_id: int | None = None):
+    return paginar(db.query(*COLUNAS_RESPOSTA).filter(Locacao.id_filme == filme_id), Locacao.id_locacao, limit, after_id)
 
 def get_by_cliente(db: Session, cliente: Cliente):
     return db.query(Locacao).filter(Locacao.cliente == cliente).all() #list
@@ -28,21 +41,160 @@ def get_by_data_devolucao(db: Session, data: date):
 def get_by_quantidade(db: Session, quantidade: int):
     return db.query(Locacao).filter(Locacao.quantidade == quantidade).first() #optional
 
-def save(db: Session, locacao: Locacao):
-    ## Aqui é pra garantir que a locação está vinculada ao cliente e filme na memória,
-    ## pra manter a consistência do relacionamento antes de salvar no banco.
-    ## E poderia futuramente ter dados soltos pq a ligação não foi salva corretamente.
-    ## Se não colocar os ifs de reafirmação, vai ficar dando warning.
-    if locacao.cliente and locacao not in locacao.cliente.locacoes:
-        locacao.cliente.locacoes.append(locacao)
-    if locacao.filme and locacao not in locacao.filme.locacoes:
-        locacao.filme.locacoes.append(locacao)
+## Exportação em streaming (ver app/utils/exportacao.py): só as colunas do LocacaoResponse, em tuplas,
+## buscadas do banco de LOTE_EXPORTACAO em LOTE_EXPORTACAO linhas (no PostgreSQL vira cursor do lado do servidor).
+LOTE_EXPORTACAO = 1000
+
+def consulta_exportacao(filtro):
+    return select(*COLUNAS_RESPOSTA).filter(filtro).order_by(Locacao.id_locacao).execution_options(yield_per=LOTE_EXPORTACAO)
+
+def stream_por_cliente_id(db: Session, cliente_id: int):
+    return db.execute(consulta_exportacao(Locacao.id_cliente == cliente_id))
+
+def stream_por_filme_id(db: Session, filme_id: int):
+    return db.execute(consulta_exportacao(Locacao.id_filme == filme_id))
+
+## Multas das locações em aberto e vencidas, calculadas no banco (dias de atraso x multa por dia)
+## numa consulta só, em vez de carregar locação por locação. Mesma regra do calcular_multa:
+## devolvido = false e data_devolucao < hoje. As consultas são compartilhadas com o repository async.
+
+def _dias_atraso(hoje: date):
+    return dias_entre(Locacao.data_devolucao, literal(hoje, Date))
+
+def _em_atraso(hoje: date):
+    return (Locacao.devolvido == False, Locacao.data_devolucao < hoje)
+
+def _multa(dias, multa_por_dia: float):
+    #A taxa vai como numeric (no PostgreSQL só existe round(numeric, int), não round(double precision, int))
+    #e o resultado volta como float, senão o psycopg2 devolve Decimal, que o orjson e o json.dumps não serializam.
+    taxa = literal(Decimal(str(multa_por_dia)), Numeric(10, 2))
+    return cast(func.round(dias * taxa, 2), Float)
+
+def consulta_multas(hoje: date, multa_por_dia: float, id_cliente: int | None = None):
+    #Uma linha por locação atrasada (campos do MultaResponse).
+    dias = _dias_atraso(hoje)
+    consulta = select(
+        Locacao.id_locacao, Locacao.id_cliente, Locacao.id_filme, Locacao.data_devolucao,
+        dias.label("dias_atraso"), _multa(dias, multa_por_dia).label("multa")
+    ).filter(*_em_atraso(hoje))
+    if id_cliente is not None:
+        consulta = consulta.filter(Locacao.id_cliente == id_cliente)
+    return consulta
+
+def consulta_multas_por_cliente(hoje: date, multa_por_dia: float):
+    #Total por cliente (campos do MultaClienteResponse): o GROUP BY fica no banco.
+    dias = func.sum(_dias_atraso(hoje))
+    return select(
+        Locacao.id_cliente, func.count().label("locacoes_atrasadas"), dias.label("dias_atraso"),
+        _multa(dias, multa_por_dia).label("multa_total")
+    ).filter(*_em_atraso(hoje)).group_by(Locacao.id_cliente)
+
+def get_multas(db: Session, hoje: date, multa_por_dia: float, id_cliente: int | None = None,
+               limit: int = LIMITE_PADRAO, after_id: int | None = None):
+    consulta = aplicar_keyset(consulta_multas(hoje, multa_por_dia, id_cliente), Locacao.id_locacao, limit, after_id)
+    return fatiar_pagina(db.execute(consulta).all(), Locacao.id_locacao, limit)
+
+def get_multas_por_cliente(db: Session, hoje: date, multa_por_dia: float, limit: int = LIMITE_PADRAO, after_id: int | None = None):
+    consulta = aplicar_keyset(consulta_multas_por_cliente(hoje, multa_por_dia), Locacao.id_cliente, limit, after_id)
+    return fatiar_pagina(db.execute(consulta).all(), Locacao.id_cliente, limit)
+
+def stream_multas_por_cliente(db: Session, hoje: date, multa_por_dia: float):
+    #Pro job noturno e pra exportação: todos os clientes, lidos do banco aos poucos.
+    consulta = consulta_multas_por_cliente(hoje, multa_por_dia).order_by(Locacao.id_cliente)
+    return db.execute(consulta.execution_options(yield_per=LOTE_EXPORTACAO))
+
+## Versões em lote, usadas pelo /locacao/alugar/lote.
 
+def get_filmes_em_aberto(db: Session, id_cliente: int, ids_filme: list[int], data_locacao: date) -> set[int]:
+    #Mesma regra do LocacaoValidator.validar_duplicidade, pra todos os filmes numa consulta só.
+    return set(db.scalars(select(Locacao.id_filme).filter(
+        Locacao.id_cliente == id_cliente,
+        Locacao.id_filme.in_(ids_filme),
+        Locacao.data_locacao == data_locacao,
+        Locacao.devolvido == False
+    )).all())
+
+def inserir_em_lote(db: Session, linhas: list[dict]) -> dict[int, int]:
+    ## Um INSERT com várias linhas (RETURNING traz os ids gerados), sem montar objeto Locacao por linha.
+    ## Retorna {id_filme: id_locacao}; dentro de um lote cada filme aparece uma vez só.
+    return dict(db.execute(insert(Locacao).returning(Locacao.id_filme, Locacao.id_locacao), linhas).all())
+
+## Devolução (POST /locacao/{id}/devolver e /locacao/devolver/lote): marca devolvido e repõe o
+## estoque sem ler nada antes. O WHERE devolvido = false é a trava: a segunda devolução da mesma
+## locação não acha a linha, então o estoque não sobe duas vezes. Sem SELECT ... FOR UPDATE:
+## as linhas ficam travadas só durante o próprio UPDATE.
+## No PostgreSQL é um comando só (CTE com UPDATE); nos outros bancos (SQLite dos testes), que não
+## têm UPDATE dentro de CTE, são dois UPDATEs na mesma transação.
+
+COLUNAS_DEVOLUCAO = (Locacao.id_locacao, Locacao.id_filme, Locacao.quantidade, Locacao.data_devolucao)
+
+def _usa_cte_de_escrita(db) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+def _marcar_devolvidas_stmt(ids_locacao: list[int]):
+    return (
+        update(Locacao)
+        .where(Locacao.id_locacao.in_(ids_locacao), Locacao.devolvido == False)
+        .values(devolvido=True)
+        .returning(*COLUNAS_DEVOLUCAO)
+    )
+
+def _devolver_cte_stmt(ids_locacao: list[int]):
+    ## WITH devolvidas AS (UPDATE locacao ... RETURNING ...),
+    ##      repostos AS (UPDATE filmes SET estoque = estoque + soma FROM (soma por filme das devolvidas) ... RETURNING ...)
+    ## SELECT devolvidas.*, repostos.estoque FROM devolvidas JOIN repostos USING (id_filme)
+    devolvidas = _marcar_devolvidas_stmt(ids_locacao).cte("devolvidas")
+    por_filme = select(
+        devolvidas.c.id_filme, func.sum(devolvidas.c.quantidade).label("quantidade")
+    ).group_by(devolvidas.c.id_filme).subquery("por_filme")
+    repostos = (
+        update(Filmes)
+        .where(Filmes.id_filme == por_filme.c.id_filme)
+        .values(estoque=Filmes.estoque + por_filme.c.quantidade, versao=Filmes.versao + 1)
+        .returning(Filmes.id_filme, Filmes.estoque)
+        .cte("repostos")
+    )
+    return select(devolvidas, repostos.c.estoque).join_from(devolvidas, repostos, devolvidas.c.id_filme == repostos.c.id_filme)
+
+def _separar_estoques(linhas) -> tuple[list, dict[int, int]]:
+    #Linhas da CTE -> o mesmo retorno dos dois UPDATEs: (devolvidas, {id_filme: estoque depois da reposição}).
+    return linhas, {linha.id_filme: linha.estoque for linha in linhas}
+
+def _quantidades_por_filme(devolvidas) -> dict[int, int]:
+    quantidades = {}
+    for devolvida in devolvidas:
+        quantidades[devolvida.id_filme] = quantidades.get(devolvida.id_filme, 0) + devolvida.quantidade
+    return quantidades
+
+def devolver(db: Session, ids_locacao: list[int]) -> tuple[list, dict[int, int]]:
+    ## Retorna (locações que estavam em aberto e foram devolvidas agora, {id_filme: estoque atualizado}).
+    ## Id que não existe ou que já estava devolvido simplesmente não volta.
+    if _usa_cte_de_escrita(db):
+        return _separar_estoques(db.execute(_devolver_cte_stmt(ids_locacao)).all())
+    devolvidas = db.execute(_marcar_devolvidas_stmt(ids_locacao)).all()
+    if not devolvidas:
+        return [], {}
+    return devolvidas, filmes_repository.incrementar_estoques(db, _quantidades_por_filme(devolvidas))
+
+def get_ids_existentes(db: Session, ids_locacao: list[int]) -> set[int]:
+    #Pra resposta da devolução em lote separar "não encontrada" de "já devolvida".
+    return set(db.scalars(select(Locacao.id_locacao).filter(Locacao.id_locacao.in_(ids_locacao))).all())
+
+## Pra exclusão de cliente/filme: a FK é RESTRICT, quem tem locação (devolvida ou não) fica.
+def existe_por_cliente(db: Session, id_cliente: int) -> bool:
+    return db.scalar(select(exists().where(Locacao.id_cliente == id_cliente)))
+
+def existe_por_filme(db: Session, id_filme: int) -> bool:
+    return db.scalar(select(exists().where(Locacao.id_filme == id_filme)))
+
+## save/delete não fazem commit: só mandam pro banco (flush) dentro da transação aberta pelo service.
+## A locação vai só com id_cliente/id_filme, sem tocar em cliente.locacoes/filme.locacoes,
+## que carregariam o histórico inteiro do cliente e do filme só pra conferir a lista.
+def save(db: Session, locacao: Locacao):
     db.add(locacao)
-    db.commit()
-    db.refresh(locacao)
+    db.flush() #INSERT agora, id_locacao já fica preenchido.
     return locacao
 
 def delete(db: Session, locacao: Locacao):
     db.delete(locacao)
-    db.commit()
+    db.flush()
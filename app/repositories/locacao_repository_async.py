@@ -0,0 +1,88 @@
+from sqlalchemy import select, insert, exists
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.locacao import Locacao
+from app.utils.paginacao import aplicar_keyset, fatiar_pagina, LIMITE_PADRAO
+from app.repositories import filmes_repository_async
+from app.repositories.locacao_repository import (
+    consulta_exportacao, consulta_multas, consulta_multas_por_cliente, COLUNAS_RESPOSTA, LOTE_EXPORTACAO,
+    _usa_cte_de_escrita, _marcar_devolvidas_stmt, _devolver_cte_stmt, _separar_estoques, _quantidades_por_filme
+)
+from datetime import date
+
+##Versões assíncronas das funções do locacao_repository, usadas pelo modo async.
+##A locação é montada só com id_cliente/id_filme, sem mexer nas listas de locações
+##do cliente e do filme (no async isso dispararia lazy load fora do await).
+
+async def get_by_id(db: AsyncSession, id_locacao: int): ##id da locação
+    result = await db.execute(select(Locacao).filter(Locacao.id_locacao == id_locacao))
+    return result.scalars().first() #optional
+
+async def get_by_cliente_id(db: AsyncSession, cliente_id: int, limit: int = LIMITE_PADRAO, after_id: int | None = None):
+    consulta = aplicar_keyset(select(*COLUNAS_RESPOSTA).filter(Locacao.id_cliente == cliente_id), Locacao.id_locacao, limit, after_id)
+    return fatiar_pagina((await db.execute(consulta)).all(), Locacao.id_locacao, limit)
+
+async def get_by_filme_id(db: AsyncSession, filme_id: int, limit: int = LIMITE_PADRAO, after_id: int | None = None):
+    consulta = aplicar_keyset(select(*COLUNAS_RESPOSTA).filter(Locacao.id_filme == filme_id), Locacao.id_locacao, limit, after_id)
+    return fatiar_pagina((await db.execute(consulta)).all(), Locacao.id_locacao, limit)
+
+async def stream_por_cliente_id(db: AsyncSession, cliente_id: int):
+    #db.stream devolve um AsyncResult que vai buscando as linhas aos poucos (yield_per da consulta).
+    return await db.stream(consulta_exportacao(Locacao.id_cliente == cliente_id))
+
+async def stream_por_filme_id(db: AsyncSession, filme_id: int):
+    return await db.stream(consulta_exportacao(Locacao.id_filme == filme_id))
+
+async def get_multas(db: AsyncSession, hoje: date, multa_por_dia: float, id_cliente: int | None = None,
+                     limit: int = LIMITE_PADRAO, after_id: int | None = None):
+    consulta = aplicar_keyset(consulta_multas(hoje, multa_por_dia, id_cliente), Locacao.id_locacao, limit, after_id)
+    return fatiar_pagina((await db.execute(consulta)).all(), Locacao.id_locacao, limit)
+
+async def get_multas_por_cliente(db: AsyncSession, hoje: date, multa_por_dia: float, limit: int = LIMITE_PADRAO, after_id: int | None = None):
+    consulta = aplicar_keyset(consulta_multas_por_cliente(hoje, multa_por_dia), Locacao.id_cliente, limit, after_id)
+    return fatiar_pagina((await db.execute(consulta)).all(), Locacao.id_cliente, limit)
+
+async def stream_multas_por_cliente(db: AsyncSession, hoje: date, multa_por_dia: float):
+    consulta = consulta_multas_por_cliente(hoje, multa_por_dia).order_by(Locacao.id_cliente)
+    return await db.stream(consulta.execution_options(yield_per=LOTE_EXPORTACAO))
+
+async def get_filmes_em_aberto(db: AsyncSession, id_cliente: int, ids_filme: list[int], data_locacao: date) -> set[int]:
+    result = await db.execute(select(Locacao.id_filme).filter(
+        Locacao.id_cliente == id_cliente,
+        Locacao.id_filme.in_(ids_filme),
+        Locacao.data_locacao == data_locacao,
+        Locacao.devolvido == False
+    ))
+    return set(result.scalars().all())
+
+async def inserir_em_lote(db: AsyncSession, linhas: list[dict]) -> dict[int, int]:
+    result = await db.execute(insert(Locacao).returning(Locacao.id_filme, Locacao.id_locacao), linhas)
+    return dict(result.all())
+
+async def devolver(db: AsyncSession, ids_locacao: list[int]) -> tuple[list, dict[int, int]]:
+    ## Mesmo UPDATE condicional do locacao_repository.devolver (CTE no PostgreSQL, dois UPDATEs nos outros).
+    if _usa_cte_de_escrita(db):
+        return _separar_estoques((await db.execute(_devolver_cte_stmt(ids_locacao))).all())
+    devolvidas = (await db.execute(_marcar_devolvidas_stmt(ids_locacao))).all()
+    if not devolvidas:
+        return [], {}
+    return devolvidas, await filmes_repository_async.incrementar_estoques(db, _quantidades_por_filme(devolvidas))
+
+async def get_ids_existentes(db: AsyncSession, ids_locacao: list[int]) -> set[int]:
+    result = await db.execute(select(Locacao.id_locacao).filter(Locacao.id_locacao.in_(ids_locacao)))
+    return set(result.scalars().all())
+
+async def existe_por_cliente(db: AsyncSession, id_cliente: int) -> bool:
+    return await db.scalar(select(exists().where(Locacao.id_cliente == id_cliente)))
+
+async def existe_por_filme(db: AsyncSession, id_filme: int) -> bool:
+    return await db.scalar(select(exists().where(Locacao.id_filme == id_filme)))
+
+## save/delete não fazem commit: só flush dentro da transação aberta pelo service.
+async def save(db: AsyncSession, locacao: Locacao):
+    db.add(locacao)
+    await db.flush()
+    return locacao
+
+async def delete(db: AsyncSession, locacao: Locacao):
+    await db.delete(locacao)
+    await db.flush()
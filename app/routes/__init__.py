@@ -2,9 +2,30 @@ from fastapi import APIRouter
 from .cliente_routes import router as cliente_router
 from .filmes_routes import router as filmes_router
 from .locacao_routes import router as locacao_router
+from .cliente_routes_async import router as cliente_router_async
+from .filmes_routes_async import router as filmes_router_async
+from .locacao_routes_async import router as locacao_router_async
+from .internal_routes import router as internal_routes
+from .importacao_routes import router as importacao_routes
+from .metricas_routes import router as metricas_routes
 
 router = APIRouter()
 #Aqui devo incluir todas as routes(controllers) que a API terá.
 router.include_router(cliente_router, prefix="/clientes", tags=["Clientes"])
 router.include_router(filmes_router, prefix="/filmes", tags=["Filmes"])
 router.include_router(locacao_router, prefix="/locacao", tags=["Locação"])
+
+##Mesmos caminhos, mas com os endpoints async (AsyncSession). O main escolhe qual dos dois montar.
+async_router = APIRouter()
+async_router.include_router(cliente_router_async, prefix="/clientes", tags=["Clientes"])
+async_router.include_router(filmes_router_async, prefix="/filmes", tags=["Filmes"])
+async_router.include_router(locacao_router_async, prefix="/locacao", tags=["Locação"])
+
+##Rotas internas (observabilidade), montadas nos dois modos.
+internal_router = APIRouter()
+internal_router.include_router(internal_routes, prefix="/internal", tags=["Interno"])
+internal_router.include_router(metricas_routes, prefix="/metrics", tags=["Interno"])
+
+##Importação em lote (CSV/NDJSON), também montada nos dois modos.
+importacao_router = APIRouter()
+importacao_router.include_router(importacao_routes, prefix="/importacao", tags=["Importação"])
@@ -1,12 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Path, Response, Header
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Optional
 
 from app.database import get_db
 from app.schemas.cliente_create import ClienteCreate
-from app.schemas.cliente_response import ClienteResponse
+from app.schemas.cliente_response import ClienteResponse, ClientePagina
 from app.schemas.cliente_update import ClienteUpdate, NovoEmail, NovoEndereco, NovoTelefone
 from app.services.cliente_service import ClienteService
+from app.utils.paginacao import LIMITE_PADRAO, LIMITE_MAXIMO
+from app.utils.etag import etag_confere, definir_etag, nao_modificado
 
 router = APIRouter() #caminho está no init
 
@@ -17,16 +19,35 @@ def salvar(cliente_create: ClienteCreate, db: Session = Depends(get_db)):
     return {"id": cliente.id}
 
 
-@router.get("/{id}", response_model=ClienteResponse)
-def buscar_por_id(id: int, db: Session = Depends(get_db)):
+@router.get("/{id}", response_model=ClienteResponse, responses={304: {"description": "O ETag do If-None-Match ainda é o atual"}})
+def buscar_por_id(id: int, response: Response, if_none_match: Optional[str] = Header(None), db: Session = Depends(get_db)):
     service = ClienteService(db)
-    return service.buscar_por_id(id)
+    #Com If-None-Match, consulta só a versão: se quem pediu já tem a atual, volta 304 sem corpo.
+    if if_none_match:
+        versao = service.buscar_versao(id)
+        if etag_confere(if_none_match, versao):
+            return nao_modificado(versao)
+    cliente = service.buscar_por_id(id)
+    definir_etag(response, cliente.versao)
+    return cliente
 
-@router.get("/nome/{nome}", response_model=List[ClienteResponse])
-def buscar_por_nome(nome: str, db: Session = Depends(get_db)):
+@router.get("/nome/{nome}", response_model=ClientePagina)
+def buscar_por_nome(nome: str, limit: int = Query(LIMITE_PADRAO, ge=1, le=LIMITE_MAXIMO), after: Optional[str] = None,
+                    db: Session = Depends(get_db)):
     service = ClienteService(db)
-    clientes = service.buscar_por_nome(nome)
-    if not clientes:
+    clientes = service.buscar_por_nome(nome, limit, after)
+    if not clientes.itens:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Nenhum cliente encontrado.")
+    return clientes
+
+##Busca por começo do CPF (só dígitos), paginada. A busca exata continua em /cpf/{cpf}.
+@router.get("/cpf/prefixo/{prefixo}", response_model=ClientePagina)
+def buscar_por_cpf_prefixo(prefixo: str = Path(..., pattern=r"^\d{1,11}$"),
+                           limit: int = Query(LIMITE_PADRAO, ge=1, le=LIMITE_MAXIMO), after: Optional[str] = None,
+                           db: Session = Depends(get_db)):
+    service = ClienteService(db)
+    clientes = service.buscar_por_cpf_prefixo(prefixo, limit, after)
+    if not clientes.itens:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Nenhum cliente encontrado.")
     return clientes
 
@@ -37,24 +58,32 @@ def buscar_por_cpf(cpf: str, db: Session = Depends(get_db)):
 
 @router.put("/{id}", response_model=ClienteResponse)
 #Esse é genérico, atualiza qualquer conjunto de campos enviados, sem precisar de endpoint pra cada campo.
-def atualizar_cliente(id: int, cliente_update: ClienteUpdate, db: Session = Depends(get_db)):
+def atualizar_cliente(id: int, cliente_update: ClienteUpdate, response: Response, if_match: Optional[str] = Header(None), db: Session = Depends(get_db)):
     service = ClienteService(db)
-    return service.atualizar(id, cliente_update)
+    cliente = service.atualizar(id, cliente_update, if_match)
+    definir_etag(response, cliente.versao)
+    return cliente
 
 @router.put("/{id}/novoTelefone", response_model=ClienteResponse)
-def alterar_telefone(id: int, novo_telefone: NovoTelefone, db: Session = Depends(get_db)):
+def alterar_telefone(id: int, novo_telefone: NovoTelefone, response: Response, if_match: Optional[str] = Header(None), db: Session = Depends(get_db)):
     service = ClienteService(db)
-    return service.alterar_telefone(id, novo_telefone.telefone)
+    cliente = service.alterar_telefone(id, novo_telefone.telefone, if_match)
+    definir_etag(response, cliente.versao)
+    return cliente
 
 @router.put("/{id}/novoEmail", response_model=ClienteResponse)
-def alterar_email(id: int, novo_email: NovoEmail, db: Session = Depends(get_db)):
+def alterar_email(id: int, novo_email: NovoEmail, response: Response, if_match: Optional[str] = Header(None), db: Session = Depends(get_db)):
     service = ClienteService(db)
-    return service.alterar_email(id, novo_email.email)
+    cliente = service.alterar_email(id, novo_email.email, if_match)
+    definir_etag(response, cliente.versao)
+    return cliente
 
 @router.put("/{id}/novoEndereco", response_model=ClienteResponse)
-def alterar_endereco(id: int, novo_endereco: NovoEndereco, db: Session = Depends(get_db)):
+def alterar_endereco(id: int, novo_endereco: NovoEndereco, response: Response, if_match: Optional[str] = Header(None), db: Session = Depends(get_db)):
     service = ClienteService(db)
-    return service.alterar_endereco(id, novo_endereco.endereco)
+    cliente = service.alterar_endereco(id, novo_endereco.endereco, if_match)
+    definir_etag(response, cliente.versao)
+    return cliente
 
 @router.delete("/{id}/deletar", status_code=status.HTTP_204_NO_CONTENT)
 def deletar_cliente(id: int, db: Session = Depends(get_db)):
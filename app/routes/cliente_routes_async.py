@@ -0,0 +1,90 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Path, Response, Header
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+
+from app.database import get_async_db
+from app.schemas.cliente_create import ClienteCreate
+from app.schemas.cliente_response import ClienteResponse, ClientePagina
+from app.schemas.cliente_update import ClienteUpdate, NovoEmail, NovoEndereco, NovoTelefone
+from app.services.cliente_service_async import ClienteServiceAsync
+from app.utils.paginacao import LIMITE_PADRAO, LIMITE_MAXIMO
+from app.utils.etag import etag_confere, definir_etag, nao_modificado
+
+router = APIRouter() #caminho está no init (mesmos caminhos das rotas síncronas)
+
+@router.post("/salvar", status_code=status.HTTP_201_CREATED)
+async def salvar(cliente_create: ClienteCreate, db: AsyncSession = Depends(get_async_db)):
+    service = ClienteServiceAsync(db)
+    cliente = await service.salvar(cliente_create)
+    return {"id": cliente.id}
+
+
+@router.get("/{id}", response_model=ClienteResponse, responses={304: {"description": "O ETag do If-None-Match ainda é o atual"}})
+async def buscar_por_id(id: int, response: Response, if_none_match: Optional[str] = Header(None), db: AsyncSession = Depends(get_async_db)):
+    service = ClienteServiceAsync(db)
+    #Com If-None-Match, consulta só a versão: se quem pediu já tem a atual, volta 304 sem corpo.
+    if if_none_match:
+        versao = await service.buscar_versao(id)
+        if etag_confere(if_none_match, versao):
+            return nao_modificado(versao)
+    cliente = await service.buscar_por_id(id)
+    definir_etag(response, cliente.versao)
+    return cliente
+
+@router.get("/nome/{nome}", response_model=ClientePagina)
+async def buscar_por_nome(nome: str, limit: int = Query(LIMITE_PADRAO, ge=1, le=LIMITE_MAXIMO), after: Optional[str] = None,
+                          db: AsyncSession = Depends(get_async_db)):
+    service = ClienteServiceAsync(db)
+    clientes = await service.buscar_por_nome(nome, limit, after)
+    if not clientes.itens:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Nenhum cliente encontrado.")
+    return clientes
+
+##Busca por começo do CPF (só dígitos), paginada. A busca exata continua em /cpf/{cpf}.
+@router.get("/cpf/prefixo/{prefixo}", response_model=ClientePagina)
+async def buscar_por_cpf_prefixo(prefixo: str = Path(..., pattern=r"^\d{1,11}$"),
+                                 limit: int = Query(LIMITE_PADRAO, ge=1, le=LIMITE_MAXIMO), after: Optional[str] = None,
+                                 db: AsyncSession = Depends(get_async_db)):
+    service = ClienteServiceAsync(db)
+    clientes = await service.buscar_por_cpf_prefixo(prefixo, limit, after)
+    if not clientes.itens:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Nenhum cliente encontrado.")
+    return clientes
+
+@router.get("/cpf/{cpf}", response_model=ClienteResponse)
+async def buscar_por_cpf(cpf: str, db: AsyncSession = Depends(get_async_db)):
+    service = ClienteServiceAsync(db)
+    return await service.buscar_por_cpf(cpf)
+
+@router.put("/{id}", response_model=ClienteResponse)
+async def atualizar_cliente(id: int, cliente_update: ClienteUpdate, response: Response, if_match: Optional[str] = Header(None), db: AsyncSession = Depends(get_async_db)):
+    service = ClienteServiceAsync(db)
+    cliente = await service.atualizar(id, cliente_update, if_match)
+    definir_etag(response, cliente.versao)
+    return cliente
+
+@router.put("/{id}/novoTelefone", response_model=ClienteResponse)
+async def alterar_telefone(id: int, novo_telefone: NovoTelefone, response: Response, if_match: Optional[str] = Header(None), db: AsyncSession = Depends(get_async_db)):
+    service = ClienteServiceAsync(db)
+    cliente = await service.alterar_telefone(id, novo_telefone.telefone, if_match)
+    definir_etag(response, cliente.versao)
+    return cliente
+
+@router.put("/{id}/novoEmail", response_model=ClienteResponse)
+async def alterar_email(id: int, novo_email: NovoEmail, response: Response, if_match: Optional[str] = Header(None), db: AsyncSession = Depends(get_async_db)):
+    service = ClienteServiceAsync(db)
+    cliente = await service.alterar_email(id, novo_email.email, if_match)
+    definir_etag(response, cliente.versao)
+    return cliente
+
+@router.put("/{id}/novoEndereco", response_model=ClienteResponse)
+async def alterar_endereco(id: int, novo_endereco: NovoEndereco, response: Response, if_match: Optional[str] = Header(None), db: AsyncSession = Depends(get_async_db)):
+    service = ClienteServiceAsync(db)
+    cliente = await service.alterar_endereco(id, novo_endereco.endereco, if_match)
+    definir_etag(response, cliente.versao)
+    return cliente
+
+@router.delete("/{id}/deletar", status_code=status.HTTP_204_NO_CONTENT)
+async def deletar_cliente(id: int, db: AsyncSession = Depends(get_async_db)):
+    service = ClienteServiceAsync(db)
+    await service.deletar(id)
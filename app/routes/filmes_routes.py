@@ -1,15 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Response
+from fastapi import APIRouter, Depends, HTTPException, status, Response, Query, Header
 
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Optional
 from datetime import date
 
 from app.database import get_db
 from app.schemas.filmes_create import FilmeCreate
-from app.schemas.filmes_response import FilmeResponse
+from app.schemas.filmes_response import FilmeResponse, FilmePagina
+from app.schemas.disponibilidade_response import DisponibilidadeResponse
 from app.schemas.filmes_update import FilmeUpdate, NovoEstoque, NovaDataLancamento, NovoNomeFilme
 from app.models.filmes import Filmes
 from app.services.filmes_service import FilmeService
+from app.utils.paginacao import LIMITE_PADRAO, LIMITE_MAXIMO, resposta_pagina
+from app.utils.etag import etag_confere, definir_etag, nao_modificado
 
 router = APIRouter() #caminho está no init
 
@@ -19,57 +22,80 @@ def salvar(filme_create: FilmeCreate, db: Session = Depends(get_db)):
     filme = service.salvar(filme_create)
     return {"id": filme.id_filme}
 
-@router.get("/{id_filme}", response_model=FilmeResponse)
-def buscar_por_id(id_filme: int, db: Session = Depends(get_db)):
+#Estoque de vários filmes de uma vez (ids=1,2,3), lido do índice em memória, sem consulta ao banco.
+@router.get("/disponibilidade", response_model=DisponibilidadeResponse)
+def buscar_disponibilidade(ids: str = Query(..., pattern=r"^\d+(,\d+)*$"), db: Session = Depends(get_db)):
     service = FilmeService(db)
-    return service.buscar_por_id(id_filme)
+    return service.buscar_disponibilidade([int(id_filme) for id_filme in ids.split(",")])
 
-@router.get("/nome/{nome}", response_model=List[FilmeResponse])
-def buscar_por_nome(nome: str, db: Session = Depends(get_db)):
+@router.get("/{id_filme}", response_model=FilmeResponse, responses={304: {"description": "O ETag do If-None-Match ainda é o atual"}})
+def buscar_por_id(id_filme: int, response: Response, if_none_match: Optional[str] = Header(None), db: Session = Depends(get_db)):
     service = FilmeService(db)
-    filmes = service.buscar_por_nome(nome)
-    if not filmes:
+    #Com If-None-Match, consulta só a versão: se quem pediu já tem a atual, volta 304 sem corpo.
+    if if_none_match:
+        versao = service.buscar_versao(id_filme)
+        if etag_confere(if_none_match, versao):
+            return nao_modificado(versao)
+    filme = service.buscar_por_id(id_filme)
+    definir_etag(response, filme.versao)
+    return filme
+
+@router.get("/nome/{nome}", response_model=FilmePagina)
+def buscar_por_nome(nome: str, limit: int = Query(LIMITE_PADRAO, ge=1, le=LIMITE_MAXIMO), after: Optional[str] = None,
+                    db: Session = Depends(get_db)):
+    service = FilmeService(db)
+    filmes = service.buscar_por_nome(nome, limit, after)
+    if not filmes.itens:
         raise HTTPException(status_code=404, detail="Filme(s) não encontrado(s)")
     return filmes
 
-@router.get("/dataLancamento/{data_lancamento}", response_model=List[FilmeResponse])
-def buscar_por_data_lancamento(data_lancamento: date, db: Session = Depends(get_db)):
+@router.get("/dataLancamento/{data_lancamento}", response_model=FilmePagina)
+def buscar_por_data_lancamento(data_lancamento: date, limit: int = Query(LIMITE_PADRAO, ge=1, le=LIMITE_MAXIMO), after: Optional[str] = None,
+                               db: Session = Depends(get_db)):
     service = FilmeService(db)
-    filmes = service.buscar_por_data_lancamento(data_lancamento)
-    if not filmes:
+    filmes = service.buscar_por_data_lancamento(data_lancamento, limit, after)
+    if not filmes.itens:
         raise HTTPException(status_code=404, detail="Filme(s) não encontrado(s)")
-    return filmes
+    return resposta_pagina(filmes) #Linhas direto pro orjson, sem revalidar no response_model.
 
-@router.get("/diretor/{diretor}", response_model=List[FilmeResponse])
-def buscar_por_diretor(diretor: str, db: Session = Depends(get_db)):
+@router.get("/diretor/{diretor}", response_model=FilmePagina)
+def buscar_por_diretor(diretor: str, limit: int = Query(LIMITE_PADRAO, ge=1, le=LIMITE_MAXIMO), after: Optional[str] = None,
+                       db: Session = Depends(get_db)):
     service = FilmeService(db)
-    filmes = service.buscar_por_diretor(diretor)
-    if not filmes:
+    filmes = service.buscar_por_diretor(diretor, limit, after)
+    if not filmes.itens:
         raise HTTPException(status_code=404, detail="Filme(s) não encontrado(s)")
     return filmes
 
-@router.get("/genero/{genero}", response_model=List[FilmeResponse])
-def buscar_por_genero(genero: str, db: Session = Depends(get_db)):
+@router.get("/genero/{genero}", response_model=FilmePagina)
+def buscar_por_genero(genero: str, limit: int = Query(LIMITE_PADRAO, ge=1, le=LIMITE_MAXIMO), after: Optional[str] = None,
+                      db: Session = Depends(get_db)):
     service = FilmeService(db)
-    filmes = service.buscar_por_genero(genero)
-    if not filmes:
+    filmes = service.buscar_por_genero(genero, limit, after)
+    if not filmes.itens:
         raise HTTPException(status_code=404, detail="Filme(s) não encontrado(s)")
     return filmes
 
 @router.put("/{id_filme}/novoEstoque", response_model=FilmeResponse)
-def alterar_estoque(id_filme: int, novo_estoque: NovoEstoque, db: Session = Depends(get_db)):
+def alterar_estoque(id_filme: int, novo_estoque: NovoEstoque, response: Response, if_match: Optional[str] = Header(None), db: Session = Depends(get_db)):
     service = FilmeService(db)
-    return service.alterar_estoque(id_filme, novo_estoque.estoque)
+    filme = service.alterar_estoque(id_filme, novo_estoque.estoque, if_match)
+    definir_etag(response, filme.versao)
+    return filme
 
 @router.put("/{id_filme}/novaDataLancamento", response_model=FilmeResponse)
-def alterar_data_lancamento(id_filme: int, nova_data: NovaDataLancamento, db: Session = Depends(get_db)):
+def alterar_data_lancamento(id_filme: int, nova_data: NovaDataLancamento, response: Response, if_match: Optional[str] = Header(None), db: Session = Depends(get_db)):
     service = FilmeService(db)
-    return service.alterar_data_lancamento(id_filme, nova_data.data_lancamento)
+    filme = service.alterar_data_lancamento(id_filme, nova_data.data_lancamento, if_match)
+    definir_etag(response, filme.versao)
+    return filme
 
 @router.put("/{id_filme}/novoNomeFilme", response_model=FilmeResponse)
-def alterar_nome_filme(id_filme: int, novo_nome: NovoNomeFilme, db: Session = Depends(get_db)):
+def alterar_nome_filme(id_filme: int, novo_nome: NovoNomeFilme, response: Response, if_match: Optional[str] = Header(None), db: Session = Depends(get_db)):
     service = FilmeService(db)
-    return service.alterar_nome(id_filme, novo_nome.nome)
+    filme = service.alterar_nome(id_filme, novo_nome.nome, if_match)
+    definir_etag(response, filme.versao)
+    return filme
 
 @router.delete("/{id_filme}/deletar", status_code=status.HTTP_204_NO_CONTENT)
 def deletar_filme(id_filme: int, db: Session = Depends(get_db)):
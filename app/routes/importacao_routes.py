@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.database import get_db
+from app.schemas.importacao import ResultadoImportacao
+from app.services.importacao_service import ImportacaoService
+from app.utils.importacao import iterar_no_worker, linhas_de_pedacos
+
+router = APIRouter() #caminho está no init
+
+##O arquivo vai direto no corpo da requisição (não é multipart), ex:
+##  curl -X POST "localhost:8000/importacao/filmes?formato=csv" --data-binary @catalogo.csv
+##O corpo é lido aos poucos enquanto os lotes são gravados, sem juntar o arquivo inteiro na memória.
+##A importação usa a Session síncrona numa thread da threadpool, nos dois modos (sync e async).
+
+FORMATO = Query("csv", pattern="^(csv|ndjson)$", description="csv (com cabeçalho) ou ndjson (um objeto JSON por linha)")
+
+@router.post("/filmes", response_model=ResultadoImportacao)
+async def importar_filmes(request: Request, formato: str = FORMATO, db: Session = Depends(get_db)):
+    service = ImportacaoService(db)
+    linhas = linhas_de_pedacos(iterar_no_worker(request.stream()))
+    return await run_in_threadpool(service.importar_filmes, linhas, formato)
+
+@router.post("/clientes", response_model=ResultadoImportacao)
+async def importar_clientes(request: Request, formato: str = FORMATO, db: Session = Depends(get_db)):
+    service = ImportacaoService(db)
+    linhas = linhas_de_pedacos(iterar_no_worker(request.stream()))
+    return await run_in_threadpool(service.importar_clientes, linhas, formato)
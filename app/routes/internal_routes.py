@@ -0,0 +1,26 @@
+from fastapi import APIRouter
+
+from app.database import engine, async_engine
+from app.schemas.pool_status import PoolsStatus
+from app.schemas.cache_status import CacheStatus
+from app.schemas.disponibilidade_response import DisponibilidadeStatus
+from app.utils.cache import cache
+from app.utils.disponibilidade import indice_disponibilidade
+from app.utils.pool_metrics import status_pool
+
+router = APIRouter() #caminho está no init
+
+##Endpoints de observabilidade, não fazem parte da API pública da locadora.
+@router.get("/pool", response_model=PoolsStatus, response_model_by_alias=True)
+def status_pools():
+    return PoolsStatus(sync=status_pool(engine.pool), async_=status_pool(async_engine.pool))
+
+
+@router.get("/cache", response_model=CacheStatus)
+def status_cache():
+    return CacheStatus(**cache.resumo())
+
+
+@router.get("/disponibilidade", response_model=DisponibilidadeStatus)
+def status_disponibilidade():
+    return DisponibilidadeStatus(**indice_disponibilidade.resumo())
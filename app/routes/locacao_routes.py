@@ -1,31 +1,50 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Optional
 
 from app.repositories import filmes_repository
 from app.database import get_db
 from app.schemas.locacao_create import LocacaoCreate
-from app.schemas.locacao_update import LocacaoUpdate, RenovarLocacao, AluguelRequest, LocacaoOnlyId
-from app.schemas.locacao_response import LocacaoResponse
+from app.schemas.locacao_update import LocacaoUpdate, RenovarLocacao, AluguelRequest, AluguelLoteRequest, DevolucaoLoteRequest, LocacaoOnlyId
+from app.schemas.locacao_response import LocacaoResponse, LocacaoPagina, AluguelLoteResponse, DevolucaoResponse, DevolucaoLoteResponse
+from app.schemas.multa_response import MultaPagina, MultaClientePagina
+from app.schemas.locacao_atrasada_response import LocacaoAtrasadaPagina
 from app.services.locacao_service import LocacaoService
+from app.utils.paginacao import LIMITE_PADRAO, LIMITE_MAXIMO, resposta_pagina
+from app.utils.exportacao import resposta_exportacao
 
 router = APIRouter()
 
+FORMATO_EXPORTACAO = Query("ndjson", pattern="^(ndjson|csv)$", description="ndjson (um objeto JSON por linha) ou csv")
+
 @router.post("/salvar", status_code=status.HTTP_201_CREATED)
 def salvar_locacao(locacao_create: LocacaoCreate, db: Session = Depends(get_db)):
     service = LocacaoService(db)
     locacao = service.salvar(locacao_create)
     return {"id": locacao.id_locacao}
 
-@router.get("/{id}/locacoes", response_model=List[LocacaoResponse])
-def buscar_por_cliente(id: int, db: Session = Depends(get_db)):
+@router.get("/{id}/locacoes", response_model=LocacaoPagina)
+def buscar_por_cliente(id: int, limit: int = Query(LIMITE_PADRAO, ge=1, le=LIMITE_MAXIMO), after: Optional[str] = None,
+                       db: Session = Depends(get_db)):
+    service = LocacaoService(db)
+    return resposta_pagina(service.buscar_por_cliente_id(id, limit, after)) #Linhas direto pro orjson, sem revalidar no response_model.
+
+@router.get("/{idFilme}/historico", response_model=LocacaoPagina)
+def buscar_historico_filme(idFilme: int, limit: int = Query(LIMITE_PADRAO, ge=1, le=LIMITE_MAXIMO), after: Optional[str] = None,
+                           db: Session = Depends(get_db)):
+    service = LocacaoService(db)
+    return resposta_pagina(service.buscar_por_filme_id(idFilme, limit, after)) #Linhas direto pro orjson, sem revalidar no response_model.
+
+##Exportação completa em streaming, sem paginação: ?formato=ndjson (padrão) ou csv.
+@router.get("/{id}/locacoes/exportar")
+def exportar_por_cliente(id: int, formato: str = FORMATO_EXPORTACAO, db: Session = Depends(get_db)):
     service = LocacaoService(db)
-    return service.buscar_por_cliente_id(id)
+    return resposta_exportacao(service.exportar_por_cliente_id(id, formato), formato, f"locacoes_cliente_{id}")
 
-@router.get("/{idFilme}/historico", response_model=List[LocacaoResponse])
-def buscar_historico_filme(idFilme: int, db: Session = Depends(get_db)):
+@router.get("/{idFilme}/historico/exportar")
+def exportar_historico_filme(idFilme: int, formato: str = FORMATO_EXPORTACAO, db: Session = Depends(get_db)):
     service = LocacaoService(db)
-    return service.buscar_por_filme_id(idFilme)
+    return resposta_exportacao(service.exportar_por_filme_id(idFilme, formato), formato, f"historico_filme_{idFilme}")
 
 @router.put("/{idLocacao}/renovarLocacao", response_model=LocacaoResponse)
 def renovar_locacao(idLocacao: int, renovacao: RenovarLocacao, db: Session = Depends(get_db)):
@@ -37,6 +56,31 @@ def calcular_multar(idLocacao: int, db: Session = Depends(get_db)):
     service = LocacaoService(db)
     return service.calcular_multa(idLocacao)
 
+##Tela de cobrança: lê da tabela locacao_atrasada, atualizada nas escritas e na virada do dia.
+@router.get("/atrasadas", response_model=LocacaoAtrasadaPagina)
+def buscar_atrasadas(id_cliente: Optional[int] = None, limit: int = Query(LIMITE_PADRAO, ge=1, le=LIMITE_MAXIMO),
+                     after: Optional[str] = None, db: Session = Depends(get_db)):
+    service = LocacaoService(db)
+    return resposta_pagina(service.buscar_atrasadas(id_cliente, limit, after))
+
+##Multas de todas as locações vencidas e não devolvidas, calculadas em lote pelo banco.
+@router.get("/multas", response_model=MultaPagina)
+def buscar_multas(id_cliente: Optional[int] = None, limit: int = Query(LIMITE_PADRAO, ge=1, le=LIMITE_MAXIMO),
+                  after: Optional[str] = None, db: Session = Depends(get_db)):
+    service = LocacaoService(db)
+    return resposta_pagina(service.multas_em_atraso(id_cliente, limit, after))
+
+@router.get("/multas/clientes", response_model=MultaClientePagina)
+def buscar_multas_por_cliente(limit: int = Query(LIMITE_PADRAO, ge=1, le=LIMITE_MAXIMO), after: Optional[str] = None,
+                              db: Session = Depends(get_db)):
+    service = LocacaoService(db)
+    return resposta_pagina(service.multas_por_cliente(limit, after))
+
+@router.get("/multas/exportar")
+def exportar_multas_por_cliente(formato: str = FORMATO_EXPORTACAO, db: Session = Depends(get_db)):
+    service = LocacaoService(db)
+    return resposta_exportacao(service.exportar_multas_por_cliente(formato), formato, "multas_por_cliente")
+
 @router.post("/alugar", response_model=LocacaoResponse)
 def alugar_filme(dados: AluguelRequest, db: Session = Depends(get_db)):
     service = LocacaoService(db)
@@ -47,6 +91,23 @@ def alugar_filme(dados: AluguelRequest, db: Session = Depends(get_db)):
         data_devolucao=dados.data_devolucao
     )
 
+@router.post("/alugar/lote", response_model=AluguelLoteResponse)
+def alugar_lote(dados: AluguelLoteRequest, db: Session = Depends(get_db)):
+    #Vários filmes pro mesmo cliente numa transação só; a resposta traz o resultado de cada item.
+    service = LocacaoService(db)
+    return service.alugar_lote(dados.id_cliente, dados.data_devolucao, dados.itens)
+
+##Devolução: marca devolvido e repõe o estoque do filme num UPDATE condicional (sem PUT /novoEstoque na mão).
+@router.post("/{idLocacao}/devolver", response_model=DevolucaoResponse)
+def devolver_locacao(idLocacao: int, db: Session = Depends(get_db)):
+    service = LocacaoService(db)
+    return service.devolver(idLocacao)
+
+@router.post("/devolver/lote", response_model=DevolucaoLoteResponse)
+def devolver_lote(dados: DevolucaoLoteRequest, db: Session = Depends(get_db)):
+    service = LocacaoService(db)
+    return service.devolver_lote(dados.ids_locacao)
+
 @router.delete("/{idLocacao}/deletar", status_code=status.HTTP_204_NO_CONTENT)
 def deletar_locacao(idLocacao: int, db: Session = Depends(get_db)):
     service = LocacaoService(db)
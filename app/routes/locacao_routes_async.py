@@ -0,0 +1,113 @@
+from fastapi import APIRouter, Depends, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+
+from app.database import get_async_db
+from app.schemas.locacao_create import LocacaoCreate
+from app.schemas.locacao_update import RenovarLocacao, AluguelRequest, AluguelLoteRequest, DevolucaoLoteRequest
+from app.schemas.locacao_response import LocacaoResponse, LocacaoPagina, AluguelLoteResponse, DevolucaoResponse, DevolucaoLoteResponse
+from app.schemas.multa_response import MultaPagina, MultaClientePagina
+from app.schemas.locacao_atrasada_response import LocacaoAtrasadaPagina
+from app.services.locacao_service_async import LocacaoServiceAsync
+from app.utils.paginacao import LIMITE_PADRAO, LIMITE_MAXIMO, resposta_pagina
+from app.utils.exportacao import resposta_exportacao
+
+router = APIRouter() #caminho está no init (mesmos caminhos das rotas síncronas)
+
+FORMATO_EXPORTACAO = Query("ndjson", pattern="^(ndjson|csv)$", description="ndjson (um objeto JSON por linha) ou csv")
+
+@router.post("/salvar", status_code=status.HTTP_201_CREATED)
+async def salvar_locacao(locacao_create: LocacaoCreate, db: AsyncSession = Depends(get_async_db)):
+    service = LocacaoServiceAsync(db)
+    locacao = await service.salvar(locacao_create)
+    return {"id": locacao.id_locacao}
+
+@router.get("/{id}/locacoes", response_model=LocacaoPagina)
+async def buscar_por_cliente(id: int, limit: int = Query(LIMITE_PADRAO, ge=1, le=LIMITE_MAXIMO), after: Optional[str] = None,
+                             db: AsyncSession = Depends(get_async_db)):
+    service = LocacaoServiceAsync(db)
+    return resposta_pagina(await service.buscar_por_cliente_id(id, limit, after)) #Linhas direto pro orjson, sem revalidar no response_model.
+
+@router.get("/{idFilme}/historico", response_model=LocacaoPagina)
+async def buscar_historico_filme(idFilme: int, limit: int = Query(LIMITE_PADRAO, ge=1, le=LIMITE_MAXIMO), after: Optional[str] = None,
+                                 db: AsyncSession = Depends(get_async_db)):
+    service = LocacaoServiceAsync(db)
+    return resposta_pagina(await service.buscar_por_filme_id(idFilme, limit, after)) #Linhas direto pro orjson, sem revalidar no response_model.
+
+##Exportação completa em streaming, sem paginação: ?formato=ndjson (padrão) ou csv.
+@router.get("/{id}/locacoes/exportar")
+async def exportar_por_cliente(id: int, formato: str = FORMATO_EXPORTACAO, db: AsyncSession = Depends(get_async_db)):
+    service = LocacaoServiceAsync(db)
+    return resposta_exportacao(await service.exportar_por_cliente_id(id, formato), formato, f"locacoes_cliente_{id}")
+
+@router.get("/{idFilme}/historico/exportar")
+async def exportar_historico_filme(idFilme: int, formato: str = FORMATO_EXPORTACAO, db: AsyncSession = Depends(get_async_db)):
+    service = LocacaoServiceAsync(db)
+    return resposta_exportacao(await service.exportar_por_filme_id(idFilme, formato), formato, f"historico_filme_{idFilme}")
+
+@router.put("/{idLocacao}/renovarLocacao", response_model=LocacaoResponse)
+async def renovar_locacao(idLocacao: int, renovacao: RenovarLocacao, db: AsyncSession = Depends(get_async_db)):
+    service = LocacaoServiceAsync(db)
+    return await service.renovar_data_devolucao(idLocacao, renovacao.data_devolucao)
+
+@router.post("/{idLocacao}/multa", response_model=float)
+async def calcular_multar(idLocacao: int, db: AsyncSession = Depends(get_async_db)):
+    service = LocacaoServiceAsync(db)
+    return await service.calcular_multa(idLocacao)
+
+##Tela de cobrança: lê da tabela locacao_atrasada, atualizada nas escritas e na virada do dia.
+@router.get("/atrasadas", response_model=LocacaoAtrasadaPagina)
+async def buscar_atrasadas(id_cliente: Optional[int] = None, limit: int = Query(LIMITE_PADRAO, ge=1, le=LIMITE_MAXIMO),
+                           after: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
+    service = LocacaoServiceAsync(db)
+    return resposta_pagina(await service.buscar_atrasadas(id_cliente, limit, after))
+
+##Multas de todas as locações vencidas e não devolvidas, calculadas em lote pelo banco.
+@router.get("/multas", response_model=MultaPagina)
+async def buscar_multas(id_cliente: Optional[int] = None, limit: int = Query(LIMITE_PADRAO, ge=1, le=LIMITE_MAXIMO),
+                        after: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
+    service = LocacaoServiceAsync(db)
+    return resposta_pagina(await service.multas_em_atraso(id_cliente, limit, after))
+
+@router.get("/multas/clientes", response_model=MultaClientePagina)
+async def buscar_multas_por_cliente(limit: int = Query(LIMITE_PADRAO, ge=1, le=LIMITE_MAXIMO), after: Optional[str] = None,
+                                    db: AsyncSession = Depends(get_async_db)):
+    service = LocacaoServiceAsync(db)
+    return resposta_pagina(await service.multas_por_cliente(limit, after))
+
+@router.get("/multas/exportar")
+async def exportar_multas_por_cliente(formato: str = FORMATO_EXPORTACAO, db: AsyncSession = Depends(get_async_db)):
+    service = LocacaoServiceAsync(db)
+    return resposta_exportacao(await service.exportar_multas_por_cliente(formato), formato, "multas_por_cliente")
+
+@router.post("/alugar", response_model=LocacaoResponse)
+async def alugar_filme(dados: AluguelRequest, db: AsyncSession = Depends(get_async_db)):
+    service = LocacaoServiceAsync(db)
+    return await service.alugar_filme(
+        id_cliente=dados.id_cliente,
+        id_filme=dados.id_filme,
+        quantidade = dados.quantidade,
+        data_devolucao=dados.data_devolucao
+    )
+
+@router.post("/alugar/lote", response_model=AluguelLoteResponse)
+async def alugar_lote(dados: AluguelLoteRequest, db: AsyncSession = Depends(get_async_db)):
+    #Vários filmes pro mesmo cliente numa transação só; a resposta traz o resultado de cada item.
+    service = LocacaoServiceAsync(db)
+    return await service.alugar_lote(dados.id_cliente, dados.data_devolucao, dados.itens)
+
+##Devolução: marca devolvido e repõe o estoque do filme num UPDATE condicional (sem PUT /novoEstoque na mão).
+@router.post("/{idLocacao}/devolver", response_model=DevolucaoResponse)
+async def devolver_locacao(idLocacao: int, db: AsyncSession = Depends(get_async_db)):
+    service = LocacaoServiceAsync(db)
+    return await service.devolver(idLocacao)
+
+@router.post("/devolver/lote", response_model=DevolucaoLoteResponse)
+async def devolver_lote(dados: DevolucaoLoteRequest, db: AsyncSession = Depends(get_async_db)):
+    service = LocacaoServiceAsync(db)
+    return await service.devolver_lote(dados.ids_locacao)
+
+@router.delete("/{idLocacao}/deletar", status_code=status.HTTP_204_NO_CONTENT)
+async def deletar_locacao(idLocacao: int, db: AsyncSession = Depends(get_async_db)):
+    service = LocacaoServiceAsync(db)
+    await service.deletar(idLocacao)
@@ -0,0 +1,10 @@
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+router = APIRouter() #caminho está no init
+
+##Endpoint que o Prometheus raspa. Fica fora do /internal porque /metrics é o caminho padrão.
+@router.get("", include_in_schema=False)
+def metricas():
+    #Content-Type direto no cabeçalho: com media_type o Starlette repetiria o charset.
+    return Response(generate_latest(), headers={"Content-Type": CONTENT_TYPE_LATEST})
@@ -0,0 +1,11 @@
+from pydantic import BaseModel, Field
+
+class CacheStatus(BaseModel):
+    ##UTILIZADO PARA RESPONDER (GET /internal/cache)
+    backend: str = Field(..., description="Backend do cache de leitura (memoria, redis ou desligado)")
+    ttl: int = Field(..., description="Segundos que uma entrada vale antes de ir de novo pro banco")
+    acertos: int = Field(..., description="Buscas por ID respondidas pelo cache")
+    faltas: int = Field(..., description="Buscas por ID que foram no banco")
+    invalidacoes: int = Field(..., description="Entradas descartadas pelas escritas")
+    erros: int = Field(..., description="Falhas de acesso ao backend (a busca segue pro banco)")
+    taxa_acerto: float = Field(..., description="acertos / (acertos + faltas)")
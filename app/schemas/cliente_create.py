@@ -1,9 +1,11 @@
-from pydantic import BaseModel, Field, EmailStr, constr
+from pydantic import BaseModel, Field, EmailStr, field_validator
 from datetime import date
+from app.schemas.tipos import NomeCliente, Cpf, Telefone, Endereco
+from app.utils.cpf import normalizar_cpf
 
 class ClienteCreate(BaseModel):
     ##UTILIZADO PARA CRIAR (POST)
-    nome: constr(min_length=3, max_length=100) = Field(
+    nome: NomeCliente = Field(
         ..., # 3 pontinhos = obrigatório.
         description="Nome completo do cliente"
     )
@@ -13,12 +15,12 @@ class ClienteCreate(BaseModel):
         description="Data de nascimento no formato AAAA-MM-DD"
     )
 
-    cpf: constr(regex=r'^\d{11}$') = Field(
+    cpf: Cpf = Field(
         ..., # 3 pontinhos = obrigatório.
-        description="CPF com 11 dígitos numéricos"
+        description="CPF com 11 dígitos numéricos (pontos e traço são removidos)"
     )
 
-    telefone: constr(min_length=8, max_length=15) = Field(
+    telefone: Telefone = Field(
         ...,
         description="Número de telefone")
 
@@ -27,7 +29,13 @@ class ClienteCreate(BaseModel):
         description="Endereço de e-mail válido"
     )
 
-    endereco: constr(min_length=5, max_length=100) = Field(
+    endereco: Endereco = Field(
         ..., # 3 pontinhos = obrigatório.
         description="Endereço residencial do cliente"
-    )
\ No newline at end of file
+    )
+
+    ##Aceita "123.456.789-00" e guarda "12345678900", antes de checar o regex.
+    @field_validator("cpf", mode="before")
+    @classmethod
+    def cpf_so_digitos(cls, cpf):
+        return normalizar_cpf(cpf)
\ No newline at end of file
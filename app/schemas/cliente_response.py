@@ -1,17 +1,31 @@
-from pydantic import BaseModel, EmailStr, constr, Field
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 from datetime import date
+from typing import List, Optional
+
+from app.schemas.tipos import NomeCliente, Cpf, Telefone, Endereco
 
 class ClienteResponse(BaseModel):
     ##UTILIZADO PARA RESPONDER (GET)
     id: int
-    nome: constr(min_length=3, max_length=100)
+    nome: NomeCliente
     data_nascimento: date
-    cpf: constr(regex=r'^\d{11}$')
-    telefone: constr(min_length=8, max_length=15) = Field(
+    cpf: Cpf
+    telefone: Telefone = Field(
         ...,
         description="Número de telefone")
     email: EmailStr
-    endereco: constr(min_length=5, max_length=100)
+    endereco: Endereco
+    versao: Optional[int] = Field(
+        None,
+        description="Versão do registro, a mesma do cabeçalho ETag (usar no If-Match dos PUT)")
+
+    model_config = ConfigDict(from_attributes=True) # Permite retornar objects direto
+
 
-    class Config:
-        orm_mode = True # Permite retornar objects direto
\ No newline at end of file
+class ClientePagina(BaseModel):
+    ##UTILIZADO PARA RESPONDER LISTAS PAGINADAS (GET)
+    itens: List[ClienteResponse]
+    next_cursor: Optional[str] = Field(
+        None,
+        description="Cursor da próxima página (mandar no parâmetro after). Nulo na última página"
+    )
\ No newline at end of file
@@ -1,10 +1,12 @@
-from pydantic import BaseModel, Field, EmailStr, constr
+from pydantic import BaseModel, Field, EmailStr, StringConstraints, field_validator
 from datetime import date
-from typing import Optional
+from typing import Annotated, Optional
+from app.schemas.tipos import NomeCliente, Cpf, Telefone, Endereco
+from app.utils.cpf import normalizar_cpf
 
 class ClienteUpdate(BaseModel):
     #UTILIZADO PARA ATUALIZAR PARCIALMENTE(PATCH/PUT)
-    nome: Optional[constr(min_length=3, max_length=100)] = Field(
+    nome: Optional[NomeCliente] = Field(
         None,
         description="Nome completo do cliente"
     )
@@ -14,12 +16,12 @@ class ClienteUpdate(BaseModel):
         description="Data de nascimento no formato AAAA-MM-DD"
     )
 
-    cpf: Optional[constr(regex=r'^\d{11}$')] = Field(
+    cpf: Optional[Cpf] = Field(
         None,
-        description="CPF com 11 dígitos numéricos"
+        description="CPF com 11 dígitos numéricos (pontos e traço são removidos)"
     )
 
-    telefone: Optional[constr(min_length=8, max_length=15)] = Field(
+    telefone: Optional[Telefone] = Field(
         None,
         description="Número de telefone")
 
@@ -28,19 +30,25 @@ class ClienteUpdate(BaseModel):
         description="Endereço de e-mail válido"
     )
 
-    endereco: Optional[constr(min_length=5, max_length=100)] = Field(
+    endereco: Optional[Endereco] = Field(
         None,
         description="Endereço residencial do cliente"
     )
 
+    ##Aceita "123.456.789-00" e guarda "12345678900", antes de checar o regex.
+    @field_validator("cpf", mode="before")
+    @classmethod
+    def cpf_so_digitos(cls, cpf):
+        return normalizar_cpf(cpf)
+
 class NovoEmail(BaseModel):
     email: EmailStr = Field(..., description="Novo e-mail do cliente")
 
 
 class NovoEndereco(BaseModel):
-    endereco: constr(min_length=5, max_length=100) = Field(..., description="Novo endereço do cliente")
+    endereco: Endereco = Field(..., description="Novo endereço do cliente")
 
 
 class NovoTelefone(BaseModel):
-    telefone: constr(min_length=8, max_length=20) = Field(..., description="Novo telefone do cliente")
+    telefone: Annotated[str, StringConstraints(min_length=8, max_length=20)] = Field(..., description="Novo telefone do cliente")
 
@@ -0,0 +1,22 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+class DisponibilidadeFilme(BaseModel):
+    ##UTILIZADO PARA RESPONDER CADA FILME DO GET /filmes/disponibilidade
+    id_filme: int
+    estoque: int
+    disponivel: bool = Field(..., description="Tem pelo menos uma unidade pra alugar")
+
+
+class DisponibilidadeResponse(BaseModel):
+    ##UTILIZADO PARA RESPONDER O GET /filmes/disponibilidade, na ordem dos ids pedidos
+    itens: List[DisponibilidadeFilme]
+    nao_encontrados: List[int] = Field(..., description="IDs pedidos que não correspondem a nenhum filme")
+
+
+class DisponibilidadeStatus(BaseModel):
+    ##UTILIZADO PARA RESPONDER (GET /internal/disponibilidade)
+    filmes: int = Field(..., description="Filmes no índice em memória deste worker")
+    carregado_em: Optional[float] = Field(..., description="Epoch da última carga/reconciliação (nulo se ainda não carregou)")
+    recargas: int = Field(..., description="Cargas feitas desde a subida (a inicial e as reconciliações)")
+    divergencias: int = Field(..., description="Filmes que a última reconciliação corrigiu")
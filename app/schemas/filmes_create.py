@@ -1,9 +1,11 @@
-from pydantic import BaseModel, Field, constr
+from pydantic import BaseModel, Field
 from datetime import date
 
+from app.schemas.tipos import NomeFilme, Diretor, Genero
+
 class FilmeCreate(BaseModel):
     ##UTILIZADO PARA CRIAR (POST)
-    nome: constr(min_length=1, max_length=100) = Field(
+    nome: NomeFilme = Field(
         ..., #3 pontos, obrigatoriedade
         description="Nome completo do filme"
     )
@@ -13,12 +15,12 @@ class FilmeCreate(BaseModel):
         description="Data de lançamento no formato AAAA-MM-DD"
     )
 
-    diretor: constr(min_length=3, max_length=100) = Field(
+    diretor: Diretor = Field(
         ..., #3 pontos, obrigatoriedade
         description="Nome do diretor"
     )
 
-    genero: constr(min_length=3, max_length=50) = Field(
+    genero: Genero = Field(
         ..., #3 pontos, obrigatoriedade
         description="Gênero do filme"
     )
@@ -1,5 +1,8 @@
-from pydantic import BaseModel, Field, constr
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import date
+from typing import List, Optional
+
+from app.schemas.tipos import NomeFilme, Diretor, Genero
 
 class FilmeResponse(BaseModel):
     ##UTILIZADO PARA RESPONDER (GET)
@@ -8,7 +11,7 @@ class FilmeResponse(BaseModel):
         description="Identificador único do filme"
     )
 
-    nome: constr(min_length=1, max_length=100) = Field(
+    nome: NomeFilme = Field(
         ..., #3 pontos, obrigatoriedade
         description="Nome completo do filme"
     )
@@ -18,12 +21,12 @@ class FilmeResponse(BaseModel):
         description="Data de lançamento no formato AAAA-MM-DD"
     )
 
-    diretor: constr(min_length=3, max_length=100) = Field(
+    diretor: Diretor = Field(
         ..., #3 pontos, obrigatoriedade
         description="Nome do diretor"
     )
 
-    genero: constr(min_length=3, max_length=50) = Field(
+    genero: Genero = Field(
         ..., #3 pontos, obrigatoriedade
         description="Gênero do filme"
     )
@@ -33,5 +36,18 @@ class FilmeResponse(BaseModel):
         description="Estoque do filme em número"
     )
 
-    class Config:
-        orm_mode = True
\ No newline at end of file
+    versao: Optional[int] = Field(
+        None,
+        description="Versão do registro, a mesma do cabeçalho ETag (usar no If-Match dos PUT)"
+    )
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class FilmePagina(BaseModel):
+    ##UTILIZADO PARA RESPONDER LISTAS PAGINADAS (GET)
+    itens: List[FilmeResponse]
+    next_cursor: Optional[str] = Field(
+        None,
+        description="Cursor da próxima página (mandar no parâmetro after). Nulo na última página"
+    )
\ No newline at end of file
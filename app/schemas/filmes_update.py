@@ -1,10 +1,12 @@
-from pydantic import BaseModel, Field, constr
+from pydantic import BaseModel, Field
 from datetime import date
 from typing import Optional
 
+from app.schemas.tipos import NomeFilme, Diretor, Genero
+
 class FilmeUpdate(BaseModel):
     # UTILIZADO PARA ATUALIZAR PARCIALMENTE(PATCH/PUT)
-    nome: Optional[constr(min_length=1, max_length=100)] = Field(
+    nome: Optional[NomeFilme] = Field(
         None,
         description="Nome completo do filme"
     )
@@ -14,12 +16,12 @@ class FilmeUpdate(BaseModel):
         description="Data de lançamento no formato AAAA-MM-DD"
     )
 
-    diretor: Optional[constr(min_length=3, max_length=100)] = Field(
+    diretor: Optional[Diretor] = Field(
         None,
         description="Nome do diretor"
     )
 
-    genero: Optional[constr(min_length=3, max_length=50)] = Field(
+    genero: Optional[Genero] = Field(
         None,
         description="Gênero do filme"
     )
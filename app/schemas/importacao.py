@@ -0,0 +1,18 @@
+from pydantic import BaseModel, Field
+from typing import List
+
+class ErroImportacao(BaseModel):
+    linha: int = Field(..., description="Linha do arquivo (no CSV o cabeçalho é a linha 1)")
+    erro: str = Field(..., description="Motivo da linha ter sido recusada")
+
+
+class ResultadoImportacao(BaseModel):
+    ##UTILIZADO PARA RESPONDER AS IMPORTAÇÕES EM LOTE
+    lidas: int = Field(0, description="Registros lidos do arquivo")
+    importadas: int = Field(0, description="Registros gravados no banco")
+    rejeitadas: int = Field(0, description="Registros recusados")
+    lotes: int = Field(0, description="Lotes (transações) processados")
+    erros: List[ErroImportacao] = Field(
+        default_factory=list,
+        description="Erros por linha (no máximo os primeiros MAXIMO_ERROS_LISTADOS)"
+    )
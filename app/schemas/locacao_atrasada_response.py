@@ -0,0 +1,20 @@
+from pydantic import BaseModel, Field
+from datetime import date
+from typing import List, Optional
+
+class LocacaoAtrasadaResponse(BaseModel):
+    ##UTILIZADO PARA RESPONDER AS LOCAÇÕES EM ATRASO (GET /locacao/atrasadas)
+    id_locacao: int
+    id_cliente: int
+    id_filme: int
+    data_devolucao: date = Field(..., description="Data em que a locação deveria ter sido devolvida")
+    quantidade: int
+    dias_atraso: int
+
+
+class LocacaoAtrasadaPagina(BaseModel):
+    itens: List[LocacaoAtrasadaResponse]
+    next_cursor: Optional[str] = Field(
+        None,
+        description="Cursor da próxima página (mandar no parâmetro after). Nulo na última página"
+    )
@@ -1,5 +1,6 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import date
+from typing import List, Optional
 
 class LocacaoResponse(BaseModel):
     ##UTILIZADO PARA RESPONDER (GET)
@@ -38,5 +39,62 @@ class LocacaoResponse(BaseModel):
         description="Quantas unidades foram alugadas"
     )
 
-    class Config:
-        orm_mode = True ##SEM ISSO O RETORNO DO SQLALCHEMY NAO FUNCIONA!!!!
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True) ##SEM ISSO O RETORNO DO SQLALCHEMY NAO FUNCIONA!!!!
+
+
+class LocacaoPagina(BaseModel):
+    ##UTILIZADO PARA RESPONDER LISTAS PAGINADAS (GET)
+    itens: List[LocacaoResponse]
+    next_cursor: Optional[str] = Field(
+        None,
+        description="Cursor da próxima página (mandar no parâmetro after). Nulo na última página"
+    )
+
+
+class AluguelLoteItemResultado(BaseModel):
+    ##UTILIZADO PARA RESPONDER CADA ITEM DO /alugar/lote
+    id_filme: int
+    quantidade: int
+    sucesso: bool
+    id_locacao: Optional[int] = Field(
+        None,
+        description="ID da locação criada (nulo quando o item foi recusado)"
+    )
+    erro: Optional[str] = Field(
+        None,
+        description="Motivo da recusa do item (nulo quando deu certo)"
+    )
+
+
+class AluguelLoteResponse(BaseModel):
+    ##UTILIZADO PARA RESPONDER O /alugar/lote, um resultado por item na mesma ordem do pedido
+    id_cliente: int
+    itens: List[AluguelLoteItemResultado]
+
+
+class DevolucaoResponse(BaseModel):
+    ##UTILIZADO PARA RESPONDER O POST /{id}/devolver
+    id_locacao: int
+    id_filme: int
+    quantidade: int
+    estoque: int = Field(..., description="Estoque do filme depois da devolução")
+    multa: float = Field(..., description="Multa por atraso (0 quando devolvida no prazo)")
+
+
+class DevolucaoLoteItemResultado(BaseModel):
+    ##UTILIZADO PARA RESPONDER CADA LOCAÇÃO DO /devolver/lote
+    id_locacao: int
+    sucesso: bool
+    multa: Optional[float] = Field(
+        None,
+        description="Multa por atraso (nula quando a devolução foi recusada)"
+    )
+    erro: Optional[str] = Field(
+        None,
+        description="Motivo da recusa (nulo quando deu certo)"
+    )
+
+
+class DevolucaoLoteResponse(BaseModel):
+    ##UTILIZADO PARA RESPONDER O /devolver/lote, um resultado por locação na mesma ordem do pedido
+    itens: List[DevolucaoLoteItemResultado]
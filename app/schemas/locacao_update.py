@@ -1,6 +1,9 @@
 from pydantic import BaseModel, Field
 from datetime import date
-from typing import Optional
+from typing import List, Optional
+
+##Máximo de filmes num lote do /alugar/lote (um balcão aluga de 5 a 10 de uma vez).
+MAXIMO_ITENS_LOTE = 50
 
 class LocacaoUpdate(BaseModel):
     # UTILIZADO PARA ATUALIZAR PARCIALMENTE(PATCH/PUT)
@@ -12,6 +15,7 @@ class LocacaoUpdate(BaseModel):
     )
 
     id_filme: Optional[int] = Field(
+        None,
         ge=1,
         le=999999,
         description="ID do filme"
@@ -49,5 +53,30 @@ class AluguelRequest(BaseModel):
     data_devolucao: date = Field(..., description="Data prevista para devolução no formato AAAA-MM-DD")
 
 
+class AluguelLoteItem(BaseModel):
+    id_filme: int = Field(..., ge=1, description="ID do filme")
+    quantidade: int = Field(..., ge=1, description="Quantidade de unidades para alugar")
+
+
+class AluguelLoteRequest(BaseModel):
+    id_cliente: int = Field(..., ge=1, description="ID do cliente")
+    data_devolucao: date = Field(..., description="Data prevista para devolução de todos os itens, no formato AAAA-MM-DD")
+    itens: List[AluguelLoteItem] = Field(
+        ...,
+        min_length=1,
+        max_length=MAXIMO_ITENS_LOTE,
+        description="Filmes alugados de uma vez pelo mesmo cliente"
+    )
+
+
+class DevolucaoLoteRequest(BaseModel):
+    ids_locacao: List[int] = Field(
+        ...,
+        min_length=1,
+        max_length=MAXIMO_ITENS_LOTE,
+        description="Locações devolvidas de uma vez no balcão"
+    )
+
+
 class LocacaoOnlyId(BaseModel):
     id: int = Field(..., ge=1, description="ID da locação")
\ No newline at end of file
@@ -0,0 +1,36 @@
+from pydantic import BaseModel, Field
+from datetime import date
+from typing import List, Optional
+
+class MultaResponse(BaseModel):
+    ##UTILIZADO PARA RESPONDER A MULTA DE CADA LOCAÇÃO ATRASADA (GET /locacao/multas)
+    id_locacao: int
+    id_cliente: int
+    id_filme: int
+    data_devolucao: date = Field(..., description="Data em que a locação deveria ter sido devolvida")
+    dias_atraso: int
+    multa: float = Field(..., description="dias_atraso x MULTA_POR_DIA")
+
+
+class MultaPagina(BaseModel):
+    itens: List[MultaResponse]
+    next_cursor: Optional[str] = Field(
+        None,
+        description="Cursor da próxima página (mandar no parâmetro after). Nulo na última página"
+    )
+
+
+class MultaClienteResponse(BaseModel):
+    ##UTILIZADO PARA RESPONDER O TOTAL DE MULTAS DE CADA CLIENTE (GET /locacao/multas/clientes)
+    id_cliente: int
+    locacoes_atrasadas: int
+    dias_atraso: int = Field(..., description="Soma dos dias de atraso das locações do cliente")
+    multa_total: float
+
+
+class MultaClientePagina(BaseModel):
+    itens: List[MultaClienteResponse]
+    next_cursor: Optional[str] = Field(
+        None,
+        description="Cursor da próxima página (mandar no parâmetro after). Nulo na última página"
+    )
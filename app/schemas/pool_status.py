@@ -0,0 +1,22 @@
+from pydantic import BaseModel, ConfigDict, Field
+
+class PoolStatus(BaseModel):
+    ##UTILIZADO PARA RESPONDER (GET /internal/pool)
+    tamanho: int = Field(..., description="Conexões fixas do pool (pool_size)")
+    em_uso: int = Field(..., description="Conexões emprestadas a requests agora")
+    ociosas: int = Field(..., description="Conexões abertas esperando no pool")
+    overflow: int = Field(..., description="Conexões extras abertas além do pool_size")
+    max_overflow: int = Field(..., description="Limite de conexões extras")
+    timeout: float = Field(..., description="Segundos que um request espera antes de desistir")
+    checkouts: int = Field(0, description="Conexões entregues desde que o processo subiu")
+    timeouts: int = Field(0, description="Requests que desistiram esperando conexão")
+    espera_total_ms: float = Field(0.0, description="Tempo total esperando conexão")
+    espera_media_ms: float = Field(0.0, description="Tempo médio esperando conexão")
+    espera_maxima_ms: float = Field(0.0, description="Maior espera por uma conexão")
+
+
+class PoolsStatus(BaseModel):
+    sync: PoolStatus
+    async_: PoolStatus = Field(..., alias="async")
+
+    model_config = ConfigDict(populate_by_name=True)
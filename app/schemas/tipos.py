@@ -0,0 +1,18 @@
+from typing import Annotated
+
+from pydantic import StringConstraints
+
+##Tipos com as restrições que se repetem entre os schemas de criação, atualização e resposta.
+##No Pydantic v2 a restrição fica no Annotated (no lugar do constr), e o pydantic-core valida
+##tudo em Rust, sem passar pelos validators em Python da v1.
+
+#Cliente
+NomeCliente = Annotated[str, StringConstraints(min_length=3, max_length=100)]
+Cpf = Annotated[str, StringConstraints(pattern=r'^\d{11}$')]
+Telefone = Annotated[str, StringConstraints(min_length=8, max_length=15)]
+Endereco = Annotated[str, StringConstraints(min_length=5, max_length=100)]
+
+#Filme
+NomeFilme = Annotated[str, StringConstraints(min_length=1, max_length=100)]
+Diretor = Annotated[str, StringConstraints(min_length=3, max_length=100)]
+Genero = Annotated[str, StringConstraints(min_length=3, max_length=50)]
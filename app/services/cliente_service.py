@@ -6,15 +6,21 @@ from app.models.cliente import Cliente
 from app.utils.logger import logger
 from app.schemas.cliente_create import ClienteCreate
 from app.schemas.cliente_update import ClienteUpdate
-from app.schemas.cliente_response import ClienteResponse
+from app.schemas.cliente_response import ClienteResponse, ClientePagina
+from app.utils.etag import exigir_versao
+from app.utils.transacao import transacao
+from app.utils.paginacao import LIMITE_PADRAO, decodificar_cursor_id, montar_pagina
 from app.validators.cliente_validator import ClienteValidator
 from app.repositories.cliente_repository import (
     get_by_id,
+    get_versao,
     get_by_telefone,
     get_by_email,
-    get_by_cpf_ignore_case,
-    get_by_nome_ignore_case,
+    get_by_cpf,
+    get_by_cpf_prefixo,
 )
+from app.repositories import busca_repository
+from app.services.consultas_cache import buscar_cliente, invalidar_clientes
 
 class ClienteService:
     def __init__(self, db: Session):
@@ -29,81 +35,100 @@ class ClienteService:
                 detail="CPF é obrigatório"
             )
 
-        logger.info(f"Salvando cliente com CPF: {cliente_create.cpf}")
-        cliente = Cliente(**cliente_create.dict())
-        self.db.add(cliente)
-        self.db.commit()
-        self.db.refresh(cliente)
-        return ClienteResponse.from_orm(cliente) #ClienteResponse define o formato da resposta, porém os dados vem da entidade Cliente.
+        logger.info("Salvando cliente com CPF: %s", cliente_create.cpf)
+        cliente = Cliente(**cliente_create.model_dump())
+        with transacao(self.db):
+            self.db.add(cliente)
+            self.db.flush() #INSERT agora, o id já volta preenchido.
+        return ClienteResponse.model_validate(cliente) #ClienteResponse define o formato da resposta, porém os dados vem da entidade Cliente.
+
+    def buscar_versao(self, id: int) -> int:
+        #Consulta só a versão, pro If-None-Match decidir o 304 sem buscar o cliente inteiro.
+        versao = get_versao(self.db, id)
+        if versao is None:
+            logger.warning("Cliente com ID %s não encontrado.", id)
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cliente não encontrado")
+        return versao
 
     def buscar_por_id(self, id: int) -> ClienteResponse:
-        logger.info(f"Buscando cliente por ID: {id}")
-        cliente = get_by_id(self.db, id)
+        logger.info("Buscando cliente por ID: %s", id)
+        cliente = buscar_cliente(self.db, id) #Passa pelo cache de leitura, já volta como ClienteResponse.
         if not cliente:
-            logger.warning(f"Cliente com ID {id} não encontrado.")
+            logger.warning("Cliente com ID %s não encontrado.", id)
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Cliente não encontrado"
             )
-        return ClienteResponse.from_orm(cliente) #ClienteResponse define o formato da resposta, porém os dados vem da entidade Cliente.
+        return cliente
 
-    def buscar_por_nome(self, nome: str) -> list[ClienteResponse]:
-        logger.info(f"Buscando clientes por nome: {nome}")
-        clientes = get_by_nome_ignore_case(self.db, nome)
-        return [ClienteResponse.from_orm(cliente) for cliente in clientes] #ClienteResponse define o formato da resposta, porém os dados vem da entidade Cliente.
+    def buscar_por_nome(self, nome: str, limit: int = LIMITE_PADRAO, after: str | None = None) -> ClientePagina:
+        #Paginado: after é o cursor opaco devolvido na página anterior.
+        logger.info("Buscando clientes por nome: %s", nome)
+        clientes, next_cursor = busca_repository.buscar_clientes_por_nome(self.db, nome, limit, after)
+        itens = [ClienteResponse.model_validate(cliente) for cliente in clientes] #ClienteResponse define o formato da resposta, porém os dados vem da entidade Cliente.
+        return ClientePagina(itens=itens, next_cursor=next_cursor)
 
     def buscar_por_cpf(self, cpf: str) -> ClienteResponse:
-        logger.info(f"Buscando cliente por CPF: {cpf}")
-        cliente = get_by_cpf_ignore_case(self.db, cpf)
+        logger.info("Buscando cliente por CPF: %s", cpf)
+        cliente = get_by_cpf(self.db, cpf)
         if not cliente:
-            logger.warning(f"Cliente com CPF {cpf} não encontrado.")
+            logger.warning("Cliente com CPF %s não encontrado.", cpf)
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Cliente não encontrado pelo CPF"
             )
-        return ClienteResponse.from_orm(cliente) #ClienteResponse define o formato da resposta, porém os dados vem da entidade Cliente.
+        return ClienteResponse.model_validate(cliente) #ClienteResponse define o formato da resposta, porém os dados vem da entidade Cliente.
+
+    def buscar_por_cpf_prefixo(self, prefixo: str, limit: int = LIMITE_PADRAO, after: str | None = None) -> ClientePagina:
+        #Paginado e ordenado pelo cpf: after é o cursor opaco devolvido na página anterior.
+        logger.info("Buscando clientes por prefixo de CPF: %s", prefixo)
+        clientes, proximo_cpf = get_by_cpf_prefixo(self.db, prefixo, limit, decodificar_cursor_id(after, str))
+        itens = [ClienteResponse.model_validate(cliente) for cliente in clientes] #ClienteResponse define o formato da resposta, porém os dados vem da entidade Cliente.
+        return montar_pagina(ClientePagina, itens, proximo_cpf)
 
     def buscar_por_email(self, email: str) -> ClienteResponse:
-        logger.info(f"Buscando cliente por email: {email}")
+        logger.info("Buscando cliente por email: %s", email)
         cliente = get_by_email(self.db, email)
         if not cliente:
-            logger.warning(f"Cliente com email {email} não encontrado.")
+            logger.warning("Cliente com email %s não encontrado.", email)
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Cliente não encontrado pelo email"
             )
-        return ClienteResponse.from_orm(cliente) #ClienteResponse define o formato da resposta, porém os dados vem da entidade Cliente.
+        return ClienteResponse.model_validate(cliente) #ClienteResponse define o formato da resposta, porém os dados vem da entidade Cliente.
 
     def buscar_por_telefone(self, telefone: str) -> ClienteResponse:
-        logger.info(f"Buscando cliente por telefone: {telefone}")
+        logger.info("Buscando cliente por telefone: %s", telefone)
         cliente = get_by_telefone(self.db, telefone)
         if not cliente:
-            logger.warning(f"Cliente com telefone {telefone} não encontrado.")
+            logger.warning("Cliente com telefone %s não encontrado.", telefone)
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Cliente não encontrado pelo telefone"
             )
-        return ClienteResponse.from_orm(cliente) #ClienteResponse define o formato da resposta, porém os dados vem da entidade Cliente.
+        return ClienteResponse.model_validate(cliente) #ClienteResponse define o formato da resposta, porém os dados vem da entidade Cliente.
 
-    def atualizar(self, id: int, cliente_update: ClienteUpdate) -> ClienteResponse:
+    def atualizar(self, id: int, cliente_update: ClienteUpdate, if_match: str | None = None) -> ClienteResponse:
         # Esse é genérico, atualiza qualquer conjunto de campos enviados, sem precisar de endpoint pra cada campo.
-        logger.info(f"Atualizando cliente ID: {id}")
+        logger.info("Atualizando cliente ID: %s", id)
         cliente = get_by_id(self.db, id)
         if not cliente:
-            logger.warning(f"Cliente com ID {id} não encontrado para atualização.")
+            logger.warning("Cliente com ID %s não encontrado para atualização.", id)
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Cliente não encontrado"
             )
+        exigir_versao(if_match, cliente.versao)
 
-        for campo, valor in cliente_update.dict(exclude_unset=True).items():
+        for campo, valor in cliente_update.model_dump(exclude_unset=True).items():
             setattr(cliente, campo, valor)
 
-        self.db.commit()
-        self.db.refresh(cliente)
-        return ClienteResponse.from_orm(cliente) #ClienteResponse define o formato da resposta, porém os dados vem da entidade Cliente.
+        with transacao(self.db):
+            self.db.flush()
+        invalidar_clientes(id)
+        return ClienteResponse.model_validate(cliente) #ClienteResponse define o formato da resposta, porém os dados vem da entidade Cliente.
 
-    def alterar_telefone(self, id: int, telefone_novo: str) -> ClienteResponse:
+    def alterar_telefone(self, id: int, telefone_novo: str, if_match: str | None = None) -> ClienteResponse:
         if not telefone_novo:
             logger.warning("Tentativa de alterar telefone com valor nulo ou vazio.")
             raise HTTPException(
@@ -111,19 +136,21 @@ class ClienteService:
                 detail="O novo telefone não deve ser nulo ou vazio."
             )
 
-        logger.info(f"Alterando telefone do cliente ID {id} para: {telefone_novo}")
+        logger.info("Alterando telefone do cliente ID %s para: %s", id, telefone_novo)
         cliente = get_by_id(self.db, id)
         if not cliente:
-            logger.warning(f"Cliente com ID {id} não encontrado para alterar telefone.")
+            logger.warning("Cliente com ID %s não encontrado para alterar telefone.", id)
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cliente não encontrado.")
+        exigir_versao(if_match, cliente.versao)
 
         cliente.telefone = telefone_novo
         self.validator.validar_telefone(cliente)
-        self.db.commit()
-        self.db.refresh(cliente)
-        return ClienteResponse.from_orm(cliente) #ClienteResponse define o formato da resposta, porém os dados vem da entidade Cliente.
+        with transacao(self.db):
+            self.db.flush()
+        invalidar_clientes(id)
+        return ClienteResponse.model_validate(cliente) #ClienteResponse define o formato da resposta, porém os dados vem da entidade Cliente.
 
-    def alterar_email(self, id: int, email_novo: str) -> ClienteResponse:
+    def alterar_email(self, id: int, email_novo: str, if_match: str | None = None) -> ClienteResponse:
         if not email_novo:
             logger.warning("Tentativa de alterar email com valor nulo ou vazio.")
             raise HTTPException(
@@ -131,19 +158,21 @@ class ClienteService:
                 detail="O novo email não deve ser nulo ou vazio."
             )
 
-        logger.info(f"Alterando email do cliente ID {id} para: {email_novo}")
+        logger.info("Alterando email do cliente ID %s para: %s", id, email_novo)
         cliente = get_by_id(self.db, id)
         if not cliente:
-            logger.warning(f"Cliente com ID {id} não encontrado para alterar email.")
+            logger.warning("Cliente com ID %s não encontrado para alterar email.", id)
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cliente não encontrado.")
+        exigir_versao(if_match, cliente.versao)
 
         cliente.email = email_novo
         self.validator.validar_email(cliente)
-        self.db.commit()
-        self.db.refresh(cliente)
-        return ClienteResponse.from_orm(cliente) #ClienteResponse define o formato da resposta, porém os dados vem da entidade Cliente.
+        with transacao(self.db):
+            self.db.flush()
+        invalidar_clientes(id)
+        return ClienteResponse.model_validate(cliente) #ClienteResponse define o formato da resposta, porém os dados vem da entidade Cliente.
 
-    def alterar_endereco(self, id: int, endereco_novo: str) -> ClienteResponse:
+    def alterar_endereco(self, id: int, endereco_novo: str, if_match: str | None = None) -> ClienteResponse:
         if not endereco_novo:
             logger.warning("Tentativa de alterar endereço com valor nulo ou vazio.")
             raise HTTPException(
@@ -151,26 +180,30 @@ class ClienteService:
                 detail="O novo endereço não deve ser nulo ou vazio."
             )
 
-        logger.info(f"Alterando endereço do cliente ID {id} para: {endereco_novo}")
+        logger.info("Alterando endereço do cliente ID %s para: %s", id, endereco_novo)
         cliente = get_by_id(self.db, id)
         if not cliente:
-            logger.warning(f"Cliente com ID {id} não encontrado para alterar endereço.")
+            logger.warning("Cliente com ID %s não encontrado para alterar endereço.", id)
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cliente não encontrado.")
+        exigir_versao(if_match, cliente.versao)
 
         cliente.endereco = endereco_novo
-        self.db.commit()
-        self.db.refresh(cliente)
-        return ClienteResponse.from_orm(cliente) #ClienteResponse define o formato da resposta, porém os dados vem da entidade Cliente.
+        with transacao(self.db):
+            self.db.flush()
+        invalidar_clientes(id)
+        return ClienteResponse.model_validate(cliente) #ClienteResponse define o formato da resposta, porém os dados vem da entidade Cliente.
 
     def deletar(self, id: int):
-        logger.info(f"Deletando cliente ID: {id}")
+        logger.info("Deletando cliente ID: %s", id)
         cliente = get_by_id(self.db, id)
         if not cliente:
-            logger.warning(f"Cliente com ID {id} não encontrado para exclusão.")
+            logger.warning("Cliente com ID %s não encontrado para exclusão.", id)
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Cliente não encontrado."
             )
+        self.validator.validar_sem_locacoes(id)
 
-        self.db.delete(cliente)
-        self.db.commit()
+        with transacao(self.db):
+            self.db.delete(cliente)
+        invalidar_clientes(id)
@@ -0,0 +1,156 @@
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.cliente import Cliente
+from app.utils.logger import logger
+from app.schemas.cliente_create import ClienteCreate
+from app.schemas.cliente_update import ClienteUpdate
+from app.schemas.cliente_response import ClienteResponse, ClientePagina
+from app.utils.etag import exigir_versao
+from app.utils.transacao import transacao_async
+from app.utils.paginacao import LIMITE_PADRAO, decodificar_cursor_id, montar_pagina
+from app.validators.cliente_validator_async import ClienteValidatorAsync
+from app.repositories import cliente_repository_async, busca_repository
+from app.services.consultas_cache import buscar_cliente_async, invalidar_clientes_async
+
+##Mesma regra de negócio do ClienteService, mas com I/O assíncrono (modo async).
+class ClienteServiceAsync:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.validator = ClienteValidatorAsync(db)
+
+    async def salvar(self, cliente_create: ClienteCreate) -> ClienteResponse:
+        if not cliente_create.cpf:
+            logger.warning("Tentativa de salvar cliente sem CPF.")
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="CPF é obrigatório"
+            )
+
+        logger.info("Salvando cliente com CPF: %s", cliente_create.cpf)
+        cliente = Cliente(**cliente_create.model_dump())
+        async with transacao_async(self.db):
+            self.db.add(cliente)
+            await self.db.flush() #INSERT agora, o id já volta preenchido.
+        return ClienteResponse.model_validate(cliente)
+
+    async def _buscar_ou_404(self, id: int, detail: str = "Cliente não encontrado") -> Cliente:
+        cliente = await cliente_repository_async.get_by_id(self.db, id)
+        if not cliente:
+            logger.warning("Cliente com ID %s não encontrado.", id)
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=detail)
+        return cliente
+
+    async def buscar_versao(self, id: int) -> int:
+        #Consulta só a versão, pro If-None-Match decidir o 304 sem buscar o cliente inteiro.
+        versao = await cliente_repository_async.get_versao(self.db, id)
+        if versao is None:
+            logger.warning("Cliente com ID %s não encontrado.", id)
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cliente não encontrado")
+        return versao
+
+    async def buscar_por_id(self, id: int) -> ClienteResponse:
+        logger.info("Buscando cliente por ID: %s", id)
+        cliente = await buscar_cliente_async(self.db, id) #Passa pelo cache de leitura, já volta como ClienteResponse.
+        if not cliente:
+            logger.warning("Cliente com ID %s não encontrado.", id)
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cliente não encontrado")
+        return cliente
+
+    async def buscar_por_nome(self, nome: str, limit: int = LIMITE_PADRAO, after: str | None = None) -> ClientePagina:
+        logger.info("Buscando clientes por nome: %s", nome)
+        clientes, next_cursor = await busca_repository.buscar_clientes_por_nome_async(self.db, nome, limit, after)
+        itens = [ClienteResponse.model_validate(cliente) for cliente in clientes]
+        return ClientePagina(itens=itens, next_cursor=next_cursor)
+
+    async def buscar_por_cpf(self, cpf: str) -> ClienteResponse:
+        logger.info("Buscando cliente por CPF: %s", cpf)
+        cliente = await cliente_repository_async.get_by_cpf(self.db, cpf)
+        if not cliente:
+            logger.warning("Cliente com CPF %s não encontrado.", cpf)
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Cliente não encontrado pelo CPF"
+            )
+        return ClienteResponse.model_validate(cliente)
+
+    async def buscar_por_cpf_prefixo(self, prefixo: str, limit: int = LIMITE_PADRAO, after: str | None = None) -> ClientePagina:
+        logger.info("Buscando clientes por prefixo de CPF: %s", prefixo)
+        clientes, proximo_cpf = await cliente_repository_async.get_by_cpf_prefixo(self.db, prefixo, limit, decodificar_cursor_id(after, str))
+        itens = [ClienteResponse.model_validate(cliente) for cliente in clientes]
+        return montar_pagina(ClientePagina, itens, proximo_cpf)
+
+    async def atualizar(self, id: int, cliente_update: ClienteUpdate, if_match: str | None = None) -> ClienteResponse:
+        # Esse é genérico, atualiza qualquer conjunto de campos enviados, sem precisar de endpoint pra cada campo.
+        logger.info("Atualizando cliente ID: %s", id)
+        cliente = await self._buscar_ou_404(id)
+        exigir_versao(if_match, cliente.versao)
+
+        for campo, valor in cliente_update.model_dump(exclude_unset=True).items():
+            setattr(cliente, campo, valor)
+
+        async with transacao_async(self.db):
+            await self.db.flush()
+        await invalidar_clientes_async(id)
+        return ClienteResponse.model_validate(cliente)
+
+    async def alterar_telefone(self, id: int, telefone_novo: str, if_match: str | None = None) -> ClienteResponse:
+        if not telefone_novo:
+            logger.warning("Tentativa de alterar telefone com valor nulo ou vazio.")
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="O novo telefone não deve ser nulo ou vazio."
+            )
+
+        logger.info("Alterando telefone do cliente ID %s para: %s", id, telefone_novo)
+        cliente = await self._buscar_ou_404(id, "Cliente não encontrado.")
+        exigir_versao(if_match, cliente.versao)
+        cliente.telefone = telefone_novo
+        await self.validator.validar_telefone(cliente)
+        async with transacao_async(self.db):
+            await self.db.flush()
+        await invalidar_clientes_async(id)
+        return ClienteResponse.model_validate(cliente)
+
+    async def alterar_email(self, id: int, email_novo: str, if_match: str | None = None) -> ClienteResponse:
+        if not email_novo:
+            logger.warning("Tentativa de alterar email com valor nulo ou vazio.")
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="O novo email não deve ser nulo ou vazio."
+            )
+
+        logger.info("Alterando email do cliente ID %s para: %s", id, email_novo)
+        cliente = await self._buscar_ou_404(id, "Cliente não encontrado.")
+        exigir_versao(if_match, cliente.versao)
+        cliente.email = email_novo
+        await self.validator.validar_email(cliente)
+        async with transacao_async(self.db):
+            await self.db.flush()
+        await invalidar_clientes_async(id)
+        return ClienteResponse.model_validate(cliente)
+
+    async def alterar_endereco(self, id: int, endereco_novo: str, if_match: str | None = None) -> ClienteResponse:
+        if not endereco_novo:
+            logger.warning("Tentativa de alterar endereço com valor nulo ou vazio.")
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="O novo endereço não deve ser nulo ou vazio."
+            )
+
+        logger.info("Alterando endereço do cliente ID %s para: %s", id, endereco_novo)
+        cliente = await self._buscar_ou_404(id, "Cliente não encontrado.")
+        exigir_versao(if_match, cliente.versao)
+        cliente.endereco = endereco_novo
+        async with transacao_async(self.db):
+            await self.db.flush()
+        await invalidar_clientes_async(id)
+        return ClienteResponse.model_validate(cliente)
+
+    async def deletar(self, id: int):
+        logger.info("Deletando cliente ID: %s", id)
+        cliente = await self._buscar_ou_404(id, "Cliente não encontrado.")
+        await self.validator.validar_sem_locacoes(id)
+        async with transacao_async(self.db):
+            await self.db.delete(cliente)
+        await invalidar_clientes_async(id)
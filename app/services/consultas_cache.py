@@ -0,0 +1,57 @@
+from typing import Optional
+
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.schemas.filmes_response import FilmeResponse
+from app.schemas.cliente_response import ClienteResponse
+from app.utils.cache import cache, chave_filme, chave_cliente
+from app.repositories import filmes_repository, filmes_repository_async, cliente_repository, cliente_repository_async
+
+##Buscas por ID que passam pelo cache de leitura (ver app/utils/cache.py). Devolvem o schema de
+##resposta ou None; o 404 fica com quem chama, cada service tem a sua mensagem.
+##Quem precisa alterar a entidade (alterar_*, atualizar, deletar) continua buscando o objeto
+##do ORM direto no repository e chama invalidar_* depois do commit.
+
+def buscar_filme(db: Session, id_filme: int) -> Optional[FilmeResponse]:
+    def carregar():
+        filme = filmes_repository.get_by_id(db, id_filme)
+        return FilmeResponse.model_validate(filme) if filme else None
+    return cache.buscar(chave_filme(id_filme), FilmeResponse, carregar)
+
+
+def buscar_cliente(db: Session, id_cliente: int) -> Optional[ClienteResponse]:
+    def carregar():
+        cliente = cliente_repository.get_by_id(db, id_cliente)
+        return ClienteResponse.model_validate(cliente) if cliente else None
+    return cache.buscar(chave_cliente(id_cliente), ClienteResponse, carregar)
+
+
+async def buscar_filme_async(db: AsyncSession, id_filme: int) -> Optional[FilmeResponse]:
+    async def carregar():
+        filme = await filmes_repository_async.get_by_id(db, id_filme)
+        return FilmeResponse.model_validate(filme) if filme else None
+    return await cache.buscar_async(chave_filme(id_filme), FilmeResponse, carregar)
+
+
+async def buscar_cliente_async(db: AsyncSession, id_cliente: int) -> Optional[ClienteResponse]:
+    async def carregar():
+        cliente = await cliente_repository_async.get_by_id(db, id_cliente)
+        return ClienteResponse.model_validate(cliente) if cliente else None
+    return await cache.buscar_async(chave_cliente(id_cliente), ClienteResponse, carregar)
+
+
+def invalidar_filmes(*ids_filme: int):
+    cache.invalidar(*(chave_filme(id_filme) for id_filme in ids_filme))
+
+
+def invalidar_clientes(*ids_cliente: int):
+    cache.invalidar(*(chave_cliente(id_cliente) for id_cliente in ids_cliente))
+
+
+async def invalidar_filmes_async(*ids_filme: int):
+    await cache.invalidar_async(*(chave_filme(id_filme) for id_filme in ids_filme))
+
+
+async def invalidar_clientes_async(*ids_cliente: int):
+    await cache.invalidar_async(*(chave_cliente(id_cliente) for id_cliente in ids_cliente))
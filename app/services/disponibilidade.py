@@ -0,0 +1,88 @@
+import asyncio
+
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app import config
+from app.database import SessionLocal, AsyncSessionLocal
+from app.utils.logger import logger
+from app.utils.disponibilidade import indice_disponibilidade
+from app.repositories import filmes_repository, filmes_repository_async
+
+##Carga, reconciliação e atualização do índice de disponibilidade (ver app/utils/disponibilidade.py).
+##As escritas de estoque chamam atualizar_disponibilidade/remover_disponibilidade depois do commit,
+##no mesmo lugar em que invalidam o cache de leitura.
+
+def recarregar_disponibilidade(db: Session):
+    indice_disponibilidade.iniciar_recarga()
+    try:
+        estoques = filmes_repository.get_todos_estoques(db)
+    except Exception:
+        indice_disponibilidade.cancelar_recarga()
+        raise
+    indice_disponibilidade.concluir_recarga(estoques)
+    logger.info("Índice de disponibilidade carregado: %s filmes, %s divergências",
+                len(estoques), indice_disponibilidade.divergencias)
+
+
+async def recarregar_disponibilidade_async(db: AsyncSession):
+    indice_disponibilidade.iniciar_recarga()
+    try:
+        estoques = await filmes_repository_async.get_todos_estoques(db)
+    except Exception:
+        indice_disponibilidade.cancelar_recarga()
+        raise
+    indice_disponibilidade.concluir_recarga(estoques)
+    logger.info("Índice de disponibilidade carregado: %s filmes, %s divergências",
+                len(estoques), indice_disponibilidade.divergencias)
+
+
+def garantir_disponibilidade(db: Session):
+    #Sem lifespan (TestClient fora do with, httpx.ASGITransport do benchmark) a carga fica pro primeiro uso.
+    if not indice_disponibilidade.carregado:
+        recarregar_disponibilidade(db)
+
+
+async def garantir_disponibilidade_async(db: AsyncSession):
+    if not indice_disponibilidade.carregado:
+        await recarregar_disponibilidade_async(db)
+
+
+def atualizar_disponibilidade(estoques: dict[int, int]):
+    indice_disponibilidade.atualizar(estoques)
+
+
+def remover_disponibilidade(*ids_filme: int):
+    indice_disponibilidade.remover(*ids_filme)
+
+
+async def _recarregar_pela_app():
+    #Fora de request não tem Depends: abre a própria sessão, do modo que a app estiver rodando.
+    if config.ASYNC_MODE:
+        async with AsyncSessionLocal() as db:
+            await recarregar_disponibilidade_async(db)
+    else:
+        def recarregar():
+            with SessionLocal() as db:
+                recarregar_disponibilidade(db)
+        await run_in_threadpool(recarregar)
+
+
+async def carregar_disponibilidade_na_subida():
+    #Banco fora do ar na subida não impede a app de subir: o índice carrega no primeiro uso.
+    try:
+        await _recarregar_pela_app()
+    except Exception as erro:
+        logger.warning("Não foi possível carregar o índice de disponibilidade na subida: %s", erro)
+
+
+async def reconciliar_disponibilidade_periodicamente(intervalo: float):
+    ##Tarefa de fundo do lifespan: a cada intervalo troca o índice por uma foto nova do banco.
+    ##Corrige o que as escritas não cobrem (outros workers, importação em lote, SQL na mão).
+    while True:
+        await asyncio.sleep(intervalo)
+        try:
+            await _recarregar_pela_app()
+        except Exception as erro:
+            logger.warning("Falha na reconciliação do índice de disponibilidade: %s", erro)
@@ -8,16 +8,24 @@ from app.models.filmes import Filmes
 from app.utils.logger import logger
 from app.schemas.filmes_create import  FilmeCreate
 from app.schemas.filmes_update import FilmeUpdate
+from app.schemas.filmes_response import FilmeResponse, FilmePagina
+from app.schemas.disponibilidade_response import DisponibilidadeResponse, DisponibilidadeFilme
+from app.utils.paginacao import LIMITE_PADRAO, decodificar_cursor_id, montar_pagina_linhas
+from app.utils.etag import exigir_versao
+from app.utils.transacao import transacao
 from app.repositories.filmes_repository import (
     get_by_id,
+    get_versao,
     get_by_nome_ignore_case,
     get_by_data_lancamento,
-    get_by_genero_contendo,
-    get_by_diretor_contendo,
     get_by_estoque,
     save,
-    delete, get_by_nome_contendo,
+    delete,
 )
+from app.repositories import busca_repository
+from app.services.consultas_cache import buscar_filme, invalidar_filmes
+from app.services.disponibilidade import garantir_disponibilidade, atualizar_disponibilidade, remover_disponibilidade
+from app.utils.disponibilidade import indice_disponibilidade, MAXIMO_IDS
 from app.validators.filmes_validator import FilmeValidator
 
 class FilmeService:
@@ -31,71 +39,129 @@ class FilmeService:
             logger.warning("Tentativa de salvar filme com nome vazio.")
             raise HTTPException(status_code=400, detail="O nome do filme não pode ser vazio ou nulo.")
 
-        logger.info(f"Salvando filme: {nome_ajustado}")
-        filme = Filmes(**filme_create.dict())
+        logger.info("Salvando filme: %s", nome_ajustado)
+        filme = Filmes(**filme_create.model_dump())
         filme.nome = nome_ajustado
 
         self.validator.validar_tudo(filme)
-        return save(self.db, filme)
+        with transacao(self.db):
+            filme = save(self.db, filme)
+        atualizar_disponibilidade({filme.id_filme: filme.estoque})
+        return filme
 
-    def buscar_por_id(self, id_filme: int) -> Filmes:
-        logger.info(f"Buscando filme por ID: {id_filme}")
+    def _buscar_ou_404(self, id_filme: int) -> Filmes:
+        #Objeto do ORM, direto do banco: usado por quem vai alterar o filme (o cache só guarda a resposta).
         filme = get_by_id(self.db, id_filme)
         if not filme:
-            logger.warning(f"Filme com ID {id_filme} não encontrado.")
+            logger.warning("Filme com ID %s não encontrado.", id_filme)
             raise HTTPException(status_code=404, detail="Filme não encontrado.")
         return filme
 
-    def buscar_por_nome(self, nome: str) -> List[Filmes]:
-        logger.info(f"Buscando filmes contendo no nome: {nome}")
-        return get_by_nome_contendo(self.db, nome)
-
-    def buscar_por_data_lancamento(self, data: date) -> List[Filmes]:
-        logger.info(f"Buscando filmes por data de lançamento: {data}")
-        return get_by_data_lancamento(self.db, data)
-
-    def buscar_por_diretor(self, diretor: str) -> List[Filmes]:
-        logger.info(f"Buscando filmes por diretor contendo: {diretor}")
-        return get_by_diretor_contendo(self.db, diretor)
-
-    def buscar_por_genero(self, genero: str) -> List[Filmes]:
-        logger.info(f"Buscando filmes por gênero contendo: {genero}")
-        return get_by_genero_contendo(self.db, genero)
+    def buscar_versao(self, id_filme: int) -> int:
+        #Consulta só a versão, pro If-None-Match decidir o 304 sem buscar o filme inteiro.
+        versao = get_versao(self.db, id_filme)
+        if versao is None:
+            logger.warning("Filme com ID %s não encontrado.", id_filme)
+            raise HTTPException(status_code=404, detail="Filme não encontrado.")
+        return versao
 
-    def buscar_por_estoque(self, estoque: int) -> List[Filmes]:
-        logger.info(f"Buscando filmes com estoque igual a: {estoque}")
-        return get_by_estoque(self.db, estoque)
+    def buscar_por_id(self, id_filme: int) -> FilmeResponse:
+        logger.info("Buscando filme por ID: %s", id_filme)
+        filme = buscar_filme(self.db, id_filme) #Passa pelo cache de leitura, já volta como FilmeResponse.
+        if not filme:
+            logger.warning("Filme com ID %s não encontrado.", id_filme)
+            raise HTTPException(status_code=404, detail="Filme não encontrado.")
+        return filme
 
-    def alterar_estoque(self, id_filme: int, novo_estoque: int) -> Filmes:
-        logger.info(f"Alterando estoque do filme ID {id_filme} para: {novo_estoque}")
-        filme = self.buscar_por_id(id_filme)
+    ##Estoque de vários filmes numa chamada, direto do índice em memória (ver app/utils/disponibilidade.py):
+    ##a vitrine mostra a disponibilidade da página inteira sem um GET /filmes/{id} por filme.
+    def buscar_disponibilidade(self, ids_filme: list[int]) -> DisponibilidadeResponse:
+        logger.info("Buscando disponibilidade de %s filmes", len(ids_filme))
+        ids_filme = list(dict.fromkeys(ids_filme))
+        if len(ids_filme) > MAXIMO_IDS:
+            logger.warning("Disponibilidade pedida para %s filmes, máximo %s.", len(ids_filme), MAXIMO_IDS)
+            raise HTTPException(status_code=400, detail=f"No máximo {MAXIMO_IDS} filmes por consulta.")
+        garantir_disponibilidade(self.db)
+        estoques = indice_disponibilidade.consultar(ids_filme)
+        return DisponibilidadeResponse(
+            itens=[DisponibilidadeFilme(id_filme=id_filme, estoque=estoque, disponivel=estoque > 0)
+                   for id_filme, estoque in estoques.items() if estoque is not None],
+            nao_encontrados=[id_filme for id_filme, estoque in estoques.items() if estoque is None]
+        )
+
+    #As buscas de lista são paginadas: after é o cursor opaco devolvido na página anterior.
+    def buscar_por_nome(self, nome: str, limit: int = LIMITE_PADRAO, after: str | None = None) -> FilmePagina:
+        logger.info("Buscando filmes contendo no nome: %s", nome)
+        filmes, next_cursor = busca_repository.buscar_filmes(self.db, "nome", nome, limit, after)
+        return FilmePagina(itens=filmes, next_cursor=next_cursor)
+
+    def buscar_por_data_lancamento(self, data: date, limit: int = LIMITE_PADRAO, after: str | None = None) -> FilmePagina:
+        logger.info("Buscando filmes por data de lançamento: %s", data)
+        filmes, proximo_id = get_by_data_lancamento(self.db, data, limit, decodificar_cursor_id(after))
+        return montar_pagina_linhas(FilmePagina, filmes, proximo_id)
+
+    def buscar_por_diretor(self, diretor: str, limit: int = LIMITE_PADRAO, after: str | None = None) -> FilmePagina:
+        logger.info("Buscando filmes por diretor contendo: %s", diretor)
+        filmes, next_cursor = busca_repository.buscar_filmes(self.db, "diretor", diretor, limit, after)
+        return FilmePagina(itens=filmes, next_cursor=next_cursor)
+
+    def buscar_por_genero(self, genero: str, limit: int = LIMITE_PADRAO, after: str | None = None) -> FilmePagina:
+        logger.info("Buscando filmes por gênero contendo: %s", genero)
+        filmes, next_cursor = busca_repository.buscar_filmes(self.db, "genero", genero, limit, after)
+        return FilmePagina(itens=filmes, next_cursor=next_cursor)
+
+    def buscar_por_estoque(self, estoque: int, limit: int = LIMITE_PADRAO, after: str | None = None) -> FilmePagina:
+        logger.info("Buscando filmes com estoque igual a: %s", estoque)
+        filmes, proximo_id = get_by_estoque(self.db, estoque, limit, decodificar_cursor_id(after))
+        return montar_pagina_linhas(FilmePagina, filmes, proximo_id)
+
+    def alterar_estoque(self, id_filme: int, novo_estoque: int, if_match: str | None = None) -> Filmes:
+        logger.info("Alterando estoque do filme ID %s para: %s", id_filme, novo_estoque)
+        filme = self._buscar_ou_404(id_filme)
+        exigir_versao(if_match, filme.versao)
         filme.estoque = novo_estoque
         self.validator.validar_estoque(novo_estoque)
-        return save(self.db, filme)
+        with transacao(self.db):
+            filme = save(self.db, filme)
+        invalidar_filmes(id_filme)
+        atualizar_disponibilidade({id_filme: filme.estoque})
+        return filme
 
-    def alterar_data_lancamento(self, id_filme: int, nova_data: date) -> Filmes:
+    def alterar_data_lancamento(self, id_filme: int, nova_data: date, if_match: str | None = None) -> Filmes:
         if not nova_data:
             logger.warning("Tentativa de alterar data de lançamento com valor nulo.")
             raise HTTPException(status_code=400, detail="A nova data não pode ser nula.")
 
-        logger.info(f"Alterando data de lançamento do filme ID {id_filme} para: {nova_data}")
+        logger.info("Alterando data de lançamento do filme ID %s para: %s", id_filme, nova_data)
         self.validator.validar_data_lancamento(nova_data)
-        filme = self.buscar_por_id(id_filme)
+        filme = self._buscar_ou_404(id_filme)
+        exigir_versao(if_match, filme.versao)
         filme.data_lancamento = nova_data
-        return save(self.db, filme)
+        with transacao(self.db):
+            filme = save(self.db, filme)
+        invalidar_filmes(id_filme)
+        return filme
 
-    def alterar_nome(self, id_filme: int, novo_nome: str) -> Filmes:
+    def alterar_nome(self, id_filme: int, novo_nome: str, if_match: str | None = None) -> Filmes:
         if not novo_nome.strip():
             logger.warning("Tentativa de alterar nome para valor vazio.")
             raise HTTPException(status_code=400, detail="O nome não pode ser vazio.")
 
-        logger.info(f"Alterando nome do filme ID {id_filme} para: {novo_nome.strip()}")
+        logger.info("Alterando nome do filme ID %s para: %s", id_filme, novo_nome.strip())
         self.validator.validar_duplicidade_nome(novo_nome, id_filme)
-        filme = self.buscar_por_id(id_filme)
+        filme = self._buscar_ou_404(id_filme)
+        exigir_versao(if_match, filme.versao)
         filme.nome = novo_nome.strip() # Evita problema com espaços em branco
-        return save(self.db, filme)
+        with transacao(self.db):
+            filme = save(self.db, filme)
+        invalidar_filmes(id_filme)
+        return filme
 
     def deletar(self, id_filme: int):
-        logger.info(f"Deletando filme ID: {id_filme}")
-        filme = self.buscar_por_id(id_filme)
-        delete(self.db, filme)
\ No newline at end of file
+        logger.info("Deletando filme ID: %s", id_filme)
+        filme = self._buscar_ou_404(id_filme)
+        self.validator.validar_sem_locacoes(id_filme)
+        with transacao(self.db):
+            delete(self.db, filme)
+        invalidar_filmes(id_filme)
+        remover_disponibilidade(id_filme)
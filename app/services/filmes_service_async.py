@@ -0,0 +1,150 @@
+from datetime import date
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.filmes import Filmes
+from app.utils.logger import logger
+from app.schemas.filmes_create import FilmeCreate
+from app.schemas.filmes_response import FilmeResponse, FilmePagina
+from app.schemas.disponibilidade_response import DisponibilidadeResponse, DisponibilidadeFilme
+from app.utils.paginacao import LIMITE_PADRAO, decodificar_cursor_id, montar_pagina_linhas
+from app.utils.etag import exigir_versao
+from app.utils.transacao import transacao_async
+from app.repositories import filmes_repository_async, busca_repository
+from app.services.consultas_cache import buscar_filme_async, invalidar_filmes_async
+from app.services.disponibilidade import garantir_disponibilidade_async, atualizar_disponibilidade, remover_disponibilidade
+from app.utils.disponibilidade import indice_disponibilidade, MAXIMO_IDS
+from app.validators.filmes_validator_async import FilmeValidatorAsync
+
+##Mesma regra de negócio do FilmeService, mas com I/O assíncrono (modo async).
+class FilmeServiceAsync:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.validator = FilmeValidatorAsync(db)
+
+    async def salvar(self, filme_create: FilmeCreate) -> Filmes:
+        nome_ajustado = filme_create.nome.strip()
+        if not nome_ajustado:
+            logger.warning("Tentativa de salvar filme com nome vazio.")
+            raise HTTPException(status_code=400, detail="O nome do filme não pode ser vazio ou nulo.")
+
+        logger.info("Salvando filme: %s", nome_ajustado)
+        filme = Filmes(**filme_create.model_dump())
+        filme.nome = nome_ajustado
+
+        await self.validator.validar_tudo(filme)
+        async with transacao_async(self.db):
+            filme = await filmes_repository_async.save(self.db, filme)
+        atualizar_disponibilidade({filme.id_filme: filme.estoque})
+        return filme
+
+    async def _buscar_ou_404(self, id_filme: int) -> Filmes:
+        #Objeto do ORM, direto do banco: usado por quem vai alterar o filme (o cache só guarda a resposta).
+        filme = await filmes_repository_async.get_by_id(self.db, id_filme)
+        if not filme:
+            logger.warning("Filme com ID %s não encontrado.", id_filme)
+            raise HTTPException(status_code=404, detail="Filme não encontrado.")
+        return filme
+
+    async def buscar_versao(self, id_filme: int) -> int:
+        #Consulta só a versão, pro If-None-Match decidir o 304 sem buscar o filme inteiro.
+        versao = await filmes_repository_async.get_versao(self.db, id_filme)
+        if versao is None:
+            logger.warning("Filme com ID %s não encontrado.", id_filme)
+            raise HTTPException(status_code=404, detail="Filme não encontrado.")
+        return versao
+
+    async def buscar_por_id(self, id_filme: int) -> FilmeResponse:
+        logger.info("Buscando filme por ID: %s", id_filme)
+        filme = await buscar_filme_async(self.db, id_filme) #Passa pelo cache de leitura, já volta como FilmeResponse.
+        if not filme:
+            logger.warning("Filme com ID %s não encontrado.", id_filme)
+            raise HTTPException(status_code=404, detail="Filme não encontrado.")
+        return filme
+
+    ##Estoque de vários filmes numa chamada, direto do índice em memória (ver app/utils/disponibilidade.py):
+    ##a vitrine mostra a disponibilidade da página inteira sem um GET /filmes/{id} por filme.
+    async def buscar_disponibilidade(self, ids_filme: list[int]) -> DisponibilidadeResponse:
+        logger.info("Buscando disponibilidade de %s filmes", len(ids_filme))
+        ids_filme = list(dict.fromkeys(ids_filme))
+        if len(ids_filme) > MAXIMO_IDS:
+            logger.warning("Disponibilidade pedida para %s filmes, máximo %s.", len(ids_filme), MAXIMO_IDS)
+            raise HTTPException(status_code=400, detail=f"No máximo {MAXIMO_IDS} filmes por consulta.")
+        await garantir_disponibilidade_async(self.db)
+        estoques = indice_disponibilidade.consultar(ids_filme)
+        return DisponibilidadeResponse(
+            itens=[DisponibilidadeFilme(id_filme=id_filme, estoque=estoque, disponivel=estoque > 0)
+                   for id_filme, estoque in estoques.items() if estoque is not None],
+            nao_encontrados=[id_filme for id_filme, estoque in estoques.items() if estoque is None]
+        )
+
+    async def buscar_por_nome(self, nome: str, limit: int = LIMITE_PADRAO, after: str | None = None) -> FilmePagina:
+        logger.info("Buscando filmes contendo no nome: %s", nome)
+        filmes, next_cursor = await busca_repository.buscar_filmes_async(self.db, "nome", nome, limit, after)
+        return FilmePagina(itens=filmes, next_cursor=next_cursor)
+
+    async def buscar_por_data_lancamento(self, data: date, limit: int = LIMITE_PADRAO, after: str | None = None) -> FilmePagina:
+        logger.info("Buscando filmes por data de lançamento: %s", data)
+        filmes, proximo_id = await filmes_repository_async.get_by_data_lancamento(self.db, data, limit, decodificar_cursor_id(after))
+        return montar_pagina_linhas(FilmePagina, filmes, proximo_id)
+
+    async def buscar_por_diretor(self, diretor: str, limit: int = LIMITE_PADRAO, after: str | None = None) -> FilmePagina:
+        logger.info("Buscando filmes por diretor contendo: %s", diretor)
+        filmes, next_cursor = await busca_repository.buscar_filmes_async(self.db, "diretor", diretor, limit, after)
+        return FilmePagina(itens=filmes, next_cursor=next_cursor)
+
+    async def buscar_por_genero(self, genero: str, limit: int = LIMITE_PADRAO, after: str | None = None) -> FilmePagina:
+        logger.info("Buscando filmes por gênero contendo: %s", genero)
+        filmes, next_cursor = await busca_repository.buscar_filmes_async(self.db, "genero", genero, limit, after)
+        return FilmePagina(itens=filmes, next_cursor=next_cursor)
+
+    async def alterar_estoque(self, id_filme: int, novo_estoque: int, if_match: str | None = None) -> Filmes:
+        logger.info("Alterando estoque do filme ID %s para: %s", id_filme, novo_estoque)
+        filme = await self._buscar_ou_404(id_filme)
+        exigir_versao(if_match, filme.versao)
+        filme.estoque = novo_estoque
+        self.validator.validar_estoque(novo_estoque)
+        async with transacao_async(self.db):
+            filme = await filmes_repository_async.save(self.db, filme)
+        await invalidar_filmes_async(id_filme)
+        atualizar_disponibilidade({id_filme: filme.estoque})
+        return filme
+
+    async def alterar_data_lancamento(self, id_filme: int, nova_data: date, if_match: str | None = None) -> Filmes:
+        if not nova_data:
+            logger.warning("Tentativa de alterar data de lançamento com valor nulo.")
+            raise HTTPException(status_code=400, detail="A nova data não pode ser nula.")
+
+        logger.info("Alterando data de lançamento do filme ID %s para: %s", id_filme, nova_data)
+        self.validator.validar_data_lancamento(nova_data)
+        filme = await self._buscar_ou_404(id_filme)
+        exigir_versao(if_match, filme.versao)
+        filme.data_lancamento = nova_data
+        async with transacao_async(self.db):
+            filme = await filmes_repository_async.save(self.db, filme)
+        await invalidar_filmes_async(id_filme)
+        return filme
+
+    async def alterar_nome(self, id_filme: int, novo_nome: str, if_match: str | None = None) -> Filmes:
+        if not novo_nome.strip():
+            logger.warning("Tentativa de alterar nome para valor vazio.")
+            raise HTTPException(status_code=400, detail="O nome não pode ser vazio.")
+
+        logger.info("Alterando nome do filme ID %s para: %s", id_filme, novo_nome.strip())
+        await self.validator.validar_duplicidade_nome(novo_nome, id_filme)
+        filme = await self._buscar_ou_404(id_filme)
+        exigir_versao(if_match, filme.versao)
+        filme.nome = novo_nome.strip() # Evita problema com espaços em branco
+        async with transacao_async(self.db):
+            filme = await filmes_repository_async.save(self.db, filme)
+        await invalidar_filmes_async(id_filme)
+        return filme
+
+    async def deletar(self, id_filme: int):
+        logger.info("Deletando filme ID: %s", id_filme)
+        filme = await self._buscar_ou_404(id_filme)
+        await self.validator.validar_sem_locacoes(id_filme)
+        async with transacao_async(self.db):
+            await filmes_repository_async.delete(self.db, filme)
+        await invalidar_filmes_async(id_filme)
+        remover_disponibilidade(id_filme)
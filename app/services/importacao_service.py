@@ -0,0 +1,120 @@
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app import config
+from app.utils.logger import logger
+from app.schemas.cliente_create import ClienteCreate
+from app.schemas.filmes_create import FilmeCreate
+from app.schemas.importacao import ResultadoImportacao, ErroImportacao
+from app.repositories import cliente_repository, filmes_repository
+from app.utils.importacao import ler_registros, em_lotes
+from app.utils.transacao import transacao
+from app.validators.filmes_validator import FilmeValidator
+
+##Acima disso a resposta só conta as linhas recusadas, sem listar (arquivo de 200 mil linhas todo errado
+##não pode virar uma resposta de 200 mil erros).
+MAXIMO_ERROS_LISTADOS = 1000
+
+def _mensagem_validacao(erro: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(campo) for campo in e['loc'])}: {e['msg']}" for e in erro.errors())
+
+class ImportacaoService:
+    ## Importação de filmes/clientes em lotes: o arquivo é lido linha a linha (nunca inteiro na memória),
+    ## e cada lote de IMPORTACAO_TAMANHO_LOTE linhas é validado com uma consulta só de duplicidade
+    ## e gravado com um INSERT executemany numa transação. Linhas com erro não derrubam o lote,
+    ## voltam no resultado com o número da linha.
+    def __init__(self, db: Session):
+        self.db = db
+        self.filme_validator = FilmeValidator(db)
+
+    def importar_filmes(self, linhas, formato: str, tamanho_lote: int = config.IMPORTACAO_TAMANHO_LOTE, ao_fim_do_lote=None) -> ResultadoImportacao:
+        logger.info("Importando filmes (%s), lotes de %s", formato, tamanho_lote)
+        return self._importar(linhas, formato, tamanho_lote, self._preparar_filmes, filmes_repository.inserir_em_lote, ao_fim_do_lote)
+
+    def importar_clientes(self, linhas, formato: str, tamanho_lote: int = config.IMPORTACAO_TAMANHO_LOTE, ao_fim_do_lote=None) -> ResultadoImportacao:
+        logger.info("Importando clientes (%s), lotes de %s", formato, tamanho_lote)
+        return self._importar(linhas, formato, tamanho_lote, self._preparar_clientes, cliente_repository.inserir_em_lote, ao_fim_do_lote)
+
+    def _importar(self, linhas, formato: str, tamanho_lote: int, preparar, inserir, ao_fim_do_lote) -> ResultadoImportacao:
+        #ao_fim_do_lote(resultado) é chamado depois de cada lote gravado (a CLI usa pra mostrar o progresso).
+        resultado = ResultadoImportacao()
+        for lote in em_lotes(ler_registros(linhas, formato), tamanho_lote):
+            validos, erros = preparar(lote)
+            if validos:
+                try:
+                    with transacao(self.db):
+                        inserir(self.db, [registro for _, registro in validos])
+                except IntegrityError:
+                    #Alguém gravou o mesmo nome/CPF entre a checagem e o INSERT: o lote volta inteiro.
+                    logger.warning("Conflito ao gravar o lote %s, %s linhas recusadas.", resultado.lotes + 1, len(validos))
+                    erros += [(linha, "Conflito ao gravar o lote (registro já cadastrado).") for linha, _ in validos]
+                    validos = []
+
+            resultado.lotes += 1
+            resultado.lidas += len(lote)
+            resultado.importadas += len(validos)
+            resultado.rejeitadas += len(erros)
+            espaco = MAXIMO_ERROS_LISTADOS - len(resultado.erros)
+            resultado.erros += [ErroImportacao(linha=linha, erro=erro) for linha, erro in sorted(erros)[:max(espaco, 0)]]
+            logger.info("Lote %s: %s lidas, %s importadas, %s rejeitadas", resultado.lotes, resultado.lidas, resultado.importadas, resultado.rejeitadas)
+            if ao_fim_do_lote:
+                ao_fim_do_lote(resultado)
+        return resultado
+
+    def _preparar_filmes(self, lote: list) -> tuple[list, list]:
+        ## Valida o lote com as mesmas regras do FilmeService.salvar, mas a duplicidade de nome
+        ## é uma consulta só pro lote inteiro em vez de um ilike por linha.
+        candidatos, erros = [], []
+        for linha, registro, erro in lote:
+            if erro:
+                erros.append((linha, erro))
+                continue
+            try:
+                filme = FilmeCreate(**registro)
+                filme.nome = filme.nome.strip()
+                if not filme.nome:
+                    raise HTTPException(status_code=400, detail="O nome do filme não pode ser vazio ou nulo.")
+                self.filme_validator.validar_estoque(filme.estoque)
+                self.filme_validator.validar_data_lancamento(filme.data_lancamento)
+            except ValidationError as e:
+                erros.append((linha, _mensagem_validacao(e)))
+                continue
+            except HTTPException as e:
+                erros.append((linha, e.detail))
+                continue
+            candidatos.append((linha, filme.model_dump()))
+
+        existentes = filmes_repository.get_nomes_existentes(self.db, [f["nome"] for _, f in candidatos]) if candidatos else set()
+        validos = []
+        for linha, filme in candidatos:
+            nome = filme["nome"].lower()
+            if nome in existentes:
+                erros.append((linha, "Já existe um filme cadastrado com esse nome."))
+                continue
+            existentes.add(nome) #repetido mais pra frente no mesmo arquivo também é duplicidade
+            validos.append((linha, filme))
+        return validos, erros
+
+    def _preparar_clientes(self, lote: list) -> tuple[list, list]:
+        ## ClienteCreate já normaliza o CPF pra só dígitos; a duplicidade é uma consulta só no índice único.
+        candidatos, erros = [], []
+        for linha, registro, erro in lote:
+            if erro:
+                erros.append((linha, erro))
+                continue
+            try:
+                candidatos.append((linha, ClienteCreate(**registro).model_dump()))
+            except ValidationError as e:
+                erros.append((linha, _mensagem_validacao(e)))
+
+        existentes = cliente_repository.get_cpfs_existentes(self.db, [c["cpf"] for _, c in candidatos]) if candidatos else set()
+        validos = []
+        for linha, cliente in candidatos:
+            if cliente["cpf"] in existentes:
+                erros.append((linha, "CPF já cadsatrado, cliente existe no sistema."))
+                continue
+            existentes.add(cliente["cpf"])
+            validos.append((linha, cliente))
+        return validos, erros
@@ -4,73 +4,101 @@ from fastapi import HTTPException
 from sqlalchemy.orm import Session
 
 from app.models.locacao import Locacao
+from app import config
 from app.utils.logger import logger
+from app.utils import metricas
 from app.models.cliente import Cliente
 from app.models.filmes import Filmes
 from app.schemas.locacao_create import LocacaoCreate
 from app.schemas.locacao_update import LocacaoUpdate
-from app.repositories import locacao_repository, cliente_repository, filmes_repository
+from app.schemas.locacao_response import (
+    LocacaoPagina, AluguelLoteResponse, AluguelLoteItemResultado, DevolucaoResponse, DevolucaoLoteResponse,
+    DevolucaoLoteItemResultado
+)
+from app.schemas.multa_response import MultaPagina, MultaClientePagina
+from app.schemas.locacao_atrasada_response import LocacaoAtrasadaPagina
+from app.utils.paginacao import LIMITE_PADRAO, decodificar_cursor_id, montar_pagina_linhas
+from app.utils.transacao import transacao
+from app.utils.exportacao import serializar
+from app.repositories import locacao_repository, filmes_repository, locacao_atrasada_repository
 from app.validators.locacao_validator import LocacaoValidator
+from app.services.consultas_cache import buscar_cliente, invalidar_filmes
+from app.services.disponibilidade import atualizar_disponibilidade
 
 class LocacaoService:
     def __init__(self, db: Session):
         self.db =db
         self.validator = LocacaoValidator(db)
 
-    def salvar(self, locacao_create: LocacaoCreate) -> Locacao:
-        logger.info(f"Tentando salvar locação: cliente={locacao_create.id_cliente}, filme={locacao_create.id_filme}")
-
-        cliente = cliente_repository.get_by_id(self.db, locacao_create.id_cliente)
-        if not cliente:
-            logger.warning(f"Cliente {locacao_create.id_cliente} não encontrado.")
-            raise HTTPException(status_code=404, detail="Cliente não encontrado.")
-
-        filme = filmes_repository.get_by_id(self.db, locacao_create.id_filme)
-        if not filme:
-            logger.warning(f"Filme {locacao_create.id_filme} não encontrado.")
-            raise HTTPException(status_code=404, detail="Filme não encontrado.")
-
-        locacao = Locacao(
-            cliente = cliente,
-            filme = filme,
-            id_cliente = cliente.id, #Se não expor vai ficar comparando com NONE e a duplicidade vai passar.
-            id_filme = filme.id_filme, #Se não expor vai ficar comparando com NONE e a duplicidade vai passar.
-            data_locacao = locacao_create.data_locacao,
-            data_devolucao = locacao_create.data_devolucao,
-            devolvido = locacao_create.devolvido,
-            quantidade = locacao_create.quantidade
-        )
+    def _registrar_locacao(self, locacao: Locacao) -> Locacao:
+        ## Fluxo comum do salvar e do alugar_filme. O filme não é carregado: a baixa do estoque
+        ## é um UPDATE condicional (estoque >= quantidade) e a locação entra na mesma transação,
+        ## com um commit só no final. Se o INSERT falhar, o rollback devolve o estoque junto.
+        with transacao(self.db):
+            cliente = buscar_cliente(self.db, locacao.id_cliente) #Só confere se existe, serve a versão do cache.
+            if not cliente:
+                logger.warning("Cliente %s não encontrado.", locacao.id_cliente)
+                raise HTTPException(status_code=404, detail="Cliente não encontrado.")
 
-        self.validator.validar_tudo(locacao)
-        filme.estoque -= locacao.quantidade #Diminui a quantidade do estoque
-        filmes_repository.save(self.db, filme)
+            self.validator.validar_tudo(locacao)
+            estoque_restante = filmes_repository.decrementar_estoque(self.db, locacao.id_filme, locacao.quantidade)
+            if estoque_restante is None:
+                logger.warning("Baixa de estoque recusada: filme=%s, quantidade=%s", locacao.id_filme, locacao.quantidade)
+            self.validator.validar_reserva_estoque(locacao.id_filme, estoque_restante)
+            locacao = locacao_repository.save(self.db, locacao)
+        invalidar_filmes(locacao.id_filme) #O estoque mudou, a resposta em cache do filme ficou velha.
+        atualizar_disponibilidade({locacao.id_filme: estoque_restante})
+        metricas.LOCACOES_CRIADAS.inc()
+        return locacao
 
-        logger.info(f"Locação criada para cliente {cliente.id} do filme {filme.id_filme}")
-        return locacao_repository.save(self.db, locacao)
+    def salvar(self, locacao_create: LocacaoCreate) -> Locacao:
+        logger.info("Tentando salvar locação: cliente=%s, filme=%s", locacao_create.id_cliente, locacao_create.id_filme)
+        locacao = Locacao(**locacao_create.model_dump())
+        locacao = self._registrar_locacao(locacao)
+        logger.info("Locação criada para cliente %s do filme %s", locacao.id_cliente, locacao.id_filme)
+        return locacao
 
     def buscar_por_id(self, id_locacao: int) -> Locacao:
-        logger.info(f"Buscando locação por ID: {id_locacao}")
+        logger.info("Buscando locação por ID: %s", id_locacao)
         locacao = locacao_repository.get_by_id(self.db, id_locacao)
         if not locacao:
-            logger.warning(f"Locação {id_locacao} não encontrada.")
+            logger.warning("Locação %s não encontrada.", id_locacao)
             raise HTTPException(status_code=404, detail="Locação não encontrada.")
         return locacao
 
-    def buscar_por_cliente_id(self, cliente_id: int) -> List[Locacao]:
-        logger.info(f"Buscando locações por cliente ID: {cliente_id}")
-        locacao = locacao_repository.get_by_cliente_id(self.db, cliente_id)
+    #Históricos paginados: after é o cursor opaco devolvido na página anterior.
+    def buscar_por_cliente_id(self, cliente_id: int, limit: int = LIMITE_PADRAO, after: str | None = None) -> LocacaoPagina:
+        logger.info("Buscando locações por cliente ID: %s", cliente_id)
+        locacao, proximo_id = locacao_repository.get_by_cliente_id(self.db, cliente_id, limit, decodificar_cursor_id(after))
         if not locacao:
-            logger.warning(f"Cliente de ID {cliente_id} não possui locações.")
+            logger.warning("Cliente de ID %s não possui locações.", cliente_id)
             raise HTTPException(status_code=404, detail="Locações não encontradas.")
-        return locacao
+        return montar_pagina_linhas(LocacaoPagina, locacao, proximo_id)
 
-    def buscar_por_filme_id(self, filme_id: int) -> List[Locacao]:
-        logger.info(f"Buscando locações por filme ID: {filme_id}")
-        locacao = locacao_repository.get_by_filme_id(self.db, filme_id)
+    def buscar_por_filme_id(self, filme_id: int, limit: int = LIMITE_PADRAO, after: str | None = None) -> LocacaoPagina:
+        logger.info("Buscando locações por filme ID: %s", filme_id)
+        locacao, proximo_id = locacao_repository.get_by_filme_id(self.db, filme_id, limit, decodificar_cursor_id(after))
         if not locacao:
-            logger.warning(f"Filme de ID {filme_id} não possui locações.")
+            logger.warning("Filme de ID %s não possui locações.", filme_id)
             raise HTTPException(status_code=404, detail ="Locações não encontradas.")
-        return locacao
+        return montar_pagina_linhas(LocacaoPagina, locacao, proximo_id)
+
+    #Exportação do histórico inteiro em streaming (ndjson ou csv): devolve os blocos de texto
+    #conforme as linhas chegam do banco, sem montar a lista de locações na memória.
+    def exportar_por_cliente_id(self, cliente_id: int, formato: str):
+        logger.info("Exportando locações do cliente ID %s em %s", cliente_id, formato)
+        linhas = locacao_repository.stream_por_cliente_id(self.db, cliente_id)
+        return serializar(linhas, list(linhas.keys()), formato)
+
+    def exportar_por_filme_id(self, filme_id: int, formato: str):
+        logger.info("Exportando histórico do filme ID %s em %s", filme_id, formato)
+        linhas = locacao_repository.stream_por_filme_id(self.db, filme_id)
+        return serializar(linhas, list(linhas.keys()), formato)
+
+    @staticmethod
+    def _esta_atrasada(locacao: Locacao) -> bool:
+        #Mesma regra da tabela locacao_atrasada: em aberto e com a devolução vencida.
+        return not locacao.devolvido and locacao.data_devolucao < datetime.today().date()
 
     def renovar_data_devolucao(self, id_locacao: int, nova_data: date) -> Locacao:
         if not nova_data:
@@ -78,64 +106,209 @@ class LocacaoService:
             raise HTTPException(status_code=400, detail="A nova data de devolução não pode ser nula.")
 
         self.validator.validar_data_devolucao(nova_data)
-        locacao = self.buscar_por_id(id_locacao)
-        logger.info(f"Renovando data de devolução da locação {id_locacao} para {nova_data}")
-        locacao.data_devolucao = nova_data
-        return locacao_repository.save(self.db, locacao)
+        with transacao(self.db):
+            locacao = self.buscar_por_id(id_locacao)
+            logger.info("Renovando data de devolução da locação %s para %s", id_locacao, nova_data)
+            if self._esta_atrasada(locacao):
+                locacao_atrasada_repository.remover(self.db, id_locacao) #A nova data já foi validada: deixou de estar em atraso.
+            locacao.data_devolucao = nova_data
+            locacao = locacao_repository.save(self.db, locacao)
+        return locacao
 
     def calcular_multa(self, id_locacao: int) -> float:
-        logger.info(f"Calculando multa da locação {id_locacao}")
+        logger.info("Calculando multa da locação %s", id_locacao)
         locacao = self.buscar_por_id(id_locacao)
 
         if locacao.devolvido:
-            logger.info(f"Locação {id_locacao} já devolvida. Multa = 0")
+            logger.info("Locação %s já devolvida. Multa = 0", id_locacao)
+            metricas.registrar_multa("devolvida")
             return 0.0
 
         hoje = datetime.today().date()
         if locacao.data_devolucao >= hoje:
-            logger.info(f"Locação {id_locacao} ainda dentro do prazo. Sem multa.")
+            logger.info("Locação %s ainda dentro do prazo. Sem multa.", id_locacao)
+            metricas.registrar_multa("no_prazo")
             return 0.0
 
         dias_atraso = (hoje - locacao.data_devolucao).days
-        multa_por_dia = 7.00
-        logger.warning(f"Locação {id_locacao} em atraso ({dias_atraso} dias). Multa: R$ {multa_por_dia:.2f}")
-        return dias_atraso * multa_por_dia
+        multa_por_dia = config.MULTA_POR_DIA
+        logger.warning("Locação %s em atraso (%s dias). Multa: R$ %.2f", id_locacao, dias_atraso, multa_por_dia)
+        multa = dias_atraso * multa_por_dia
+        metricas.registrar_multa("atrasada", multa)
+        return multa
 
-    def alugar_filme(self, id_cliente: int, id_filme: int, quantidade: int, data_devolucao: date) -> Locacao:
-        logger.info(f"Processando aluguel: cliente={id_cliente}, filme={id_filme}, quantidade={quantidade}")
-        cliente = cliente_repository.get_by_id(self.db, id_cliente)
-        if not cliente:
-            logger.warning(f"Cliente {id_cliente} não encontrado.")
-            raise HTTPException(status_code=404, detail="Cliente não encontrado.")
+    ##Multas de todas as locações em aberto e vencidas (a mesma conta do calcular_multa), calculadas
+    ##pelo banco numa consulta só: o faturamento não precisa chamar o /multa locação por locação.
+    def multas_em_atraso(self, id_cliente: int | None = None, limit: int = LIMITE_PADRAO, after: str | None = None) -> MultaPagina:
+        logger.info("Calculando multas em atraso: cliente=%s", id_cliente)
+        hoje = datetime.today().date()
+        multas, proximo_id = locacao_repository.get_multas(
+            self.db, hoje, config.MULTA_POR_DIA, id_cliente, limit, decodificar_cursor_id(after)
+        )
+        return montar_pagina_linhas(MultaPagina, multas, proximo_id)
+
+    def multas_por_cliente(self, limit: int = LIMITE_PADRAO, after: str | None = None) -> MultaClientePagina:
+        logger.info("Calculando multas em atraso por cliente")
+        hoje = datetime.today().date()
+        totais, proximo_id = locacao_repository.get_multas_por_cliente(
+            self.db, hoje, config.MULTA_POR_DIA, limit, decodificar_cursor_id(after)
+        )
+        return montar_pagina_linhas(MultaClientePagina, totais, proximo_id)
 
-        filme = filmes_repository.get_by_id(self.db, id_filme)
-        if not filme:
-            logger.warning(f"Filme {id_filme} não encontrado.")
-            raise HTTPException(status_code=404, detail="Filme não encontrado.")
+    def exportar_multas_por_cliente(self, formato: str):
+        logger.info("Exportando multas em atraso por cliente em %s", formato)
+        hoje = datetime.today().date()
+        linhas = locacao_repository.stream_multas_por_cliente(self.db, hoje, config.MULTA_POR_DIA)
+        return serializar(linhas, list(linhas.keys()), formato)
 
+    ##Locações em atraso lidas da tabela locacao_atrasada (ver app/models/locacao_atrasada.py),
+    ##que só tem as atrasadas: a página custa o mesmo com 1 mil ou 10 milhões de locações.
+    def buscar_atrasadas(self, id_cliente: int | None = None, limit: int = LIMITE_PADRAO, after: str | None = None) -> LocacaoAtrasadaPagina:
+        logger.info("Buscando locações em atraso: cliente=%s", id_cliente)
+        hoje = datetime.today().date()
+        atrasadas, proximo_id = locacao_atrasada_repository.get_atrasadas(
+            self.db, hoje, id_cliente, limit, decodificar_cursor_id(after)
+        )
+        return montar_pagina_linhas(LocacaoAtrasadaPagina, atrasadas, proximo_id)
+
+    def virar_dia_atrasadas(self) -> tuple[int, int]:
+        #Job diário (python -m app.atrasadas): entram as que venceram, saem as que se regularizaram.
+        hoje = datetime.today().date()
+        with transacao(self.db):
+            entraram, sairam = locacao_atrasada_repository.virar_dia(self.db, hoje)
+        logger.info("Virada do dia %s das locações em atraso: %s entraram, %s saíram", hoje, entraram, sairam)
+        return entraram, sairam
+
+    def alugar_filme(self, id_cliente: int, id_filme: int, quantidade: int, data_devolucao: date) -> Locacao:
+        logger.info("Processando aluguel: cliente=%s, filme=%s, quantidade=%s", id_cliente, id_filme, quantidade)
         if quantidade <= 0:
             logger.warning("Quantidade inválida para locação.")
             raise HTTPException(status_code=400, detail="Estoque insuficiente.")
 
-        locacao_temp = Locacao(
-            cliente = cliente,
-            filme = filme,
-            id_cliente = cliente.id, #Se não expor vai ficar comparando com NONE e a duplicidade vai passar.
-            id_filme = filme.id_filme, #Se não expor vai ficar comparando com NONE e a duplicidade vai passar.
+        locacao = Locacao(
+            id_cliente = id_cliente,
+            id_filme = id_filme,
             quantidade = quantidade,
             data_locacao = datetime.today().date(),
             data_devolucao = data_devolucao,
             devolvido = False
         )
+        locacao = self._registrar_locacao(locacao)
+        logger.info("Locação realizada: cliente=%s, filme=%s, quantidade=%s", id_cliente, id_filme, quantidade)
+        return locacao
+
+    def alugar_lote(self, id_cliente: int, data_devolucao: date, itens: list) -> AluguelLoteResponse:
+        ## Checkout de vários filmes de uma vez pro mesmo cliente. Em vez de repetir o alugar_filme
+        ## por item, cada etapa é uma consulta só pro lote inteiro: filmes, duplicidade, baixa de
+        ## estoque (um UPDATE com CASE) e INSERT das locações, tudo numa transação.
+        ## Itens recusados não derrubam os outros: cada um volta com sucesso/erro na resposta.
+        logger.info("Processando aluguel em lote: cliente=%s, itens=%s", id_cliente, len(itens))
+        self.validator.validar_data_devolucao(data_devolucao)
+        hoje = datetime.today().date()
+        ids_filme = [item.id_filme for item in itens]
+
+        with transacao(self.db):
+            cliente = buscar_cliente(self.db, id_cliente) #Só confere se existe, serve a versão do cache.
+            if not cliente:
+                logger.warning("Cliente %s não encontrado.", id_cliente)
+                raise HTTPException(status_code=404, detail="Cliente não encontrado.")
+
+            estoques = filmes_repository.get_estoques(self.db, ids_filme)
+            em_aberto = locacao_repository.get_filmes_em_aberto(self.db, id_cliente, ids_filme, hoje)
+            erros = self.validator.validar_lote(itens, estoques, em_aberto)
+
+            quantidades = {item.id_filme: item.quantidade for posicao, item in enumerate(itens) if posicao not in erros}
+            restantes = filmes_repository.decrementar_estoques(self.db, quantidades) if quantidades else {}
+            for posicao, item in enumerate(itens):
+                #Passou na checagem mas o UPDATE não pegou a linha: outra locação levou o estoque no meio tempo.
+                if posicao not in erros and item.id_filme not in restantes:
+                    erros[posicao] = "Estoque insuficiente para essa locação."
+                    metricas.ESTOQUE_INSUFICIENTE.labels("lote").inc()
 
-        self.validator.validar_tudo(locacao_temp)
-        filme.estoque -= quantidade #Diminui a quantidade do estoque
-        filmes_repository.save(self.db, filme)
+            linhas = [{
+                "id_cliente": id_cliente, "id_filme": item.id_filme, "quantidade": item.quantidade,
+                "data_locacao": hoje, "data_devolucao": data_devolucao, "devolvido": False
+            } for posicao, item in enumerate(itens) if posicao not in erros]
+            ids_locacao = locacao_repository.inserir_em_lote(self.db, linhas) if linhas else {}
 
-        logger.info(f"Locação realizada: cliente={cliente.id}, filme={filme.id_filme}, quantidade={quantidade}")
-        return locacao_repository.save(self.db, locacao_temp)
+        logger.info("Aluguel em lote do cliente %s: %s de %s itens alugados", id_cliente, len(linhas), len(itens))
+        invalidar_filmes(*(linha["id_filme"] for linha in linhas))
+        atualizar_disponibilidade(restantes)
+        metricas.LOCACOES_CRIADAS.inc(len(linhas))
+        return self._resultado_lote(id_cliente, itens, erros, ids_locacao)
+
+    @staticmethod
+    def _resultado_lote(id_cliente: int, itens: list, erros: dict[int, str], ids_locacao: dict[int, int]) -> AluguelLoteResponse:
+        return AluguelLoteResponse(id_cliente=id_cliente, itens=[AluguelLoteItemResultado(
+            id_filme=item.id_filme,
+            quantidade=item.quantidade,
+            sucesso=posicao not in erros,
+            id_locacao=None if posicao in erros else ids_locacao[item.id_filme],
+            erro=erros.get(posicao)
+        ) for posicao, item in enumerate(itens)])
+
+    ##Devolução: um UPDATE condicional marca devolvido e repõe o estoque (ver locacao_repository.devolver).
+    ##Devolver duas vezes não repõe duas vezes: a segunda não acha a locação em aberto.
+    def devolver(self, id_locacao: int) -> DevolucaoResponse:
+        logger.info("Processando devolução da locação %s", id_locacao)
+        hoje = datetime.today().date()
+        with transacao(self.db):
+            devolvidas, estoques = locacao_repository.devolver(self.db, [id_locacao])
+            if not devolvidas:
+                self.buscar_por_id(id_locacao) #404 se não existe.
+                logger.warning("Locação %s já devolvida.", id_locacao)
+                raise HTTPException(status_code=400, detail="Locação já devolvida.")
+            self._tirar_das_atrasadas(devolvidas, hoje)
+        devolvida = devolvidas[0]
+        invalidar_filmes(devolvida.id_filme)
+        atualizar_disponibilidade(estoques)
+        logger.info("Locação %s devolvida: filme=%s, estoque=%s", id_locacao, devolvida.id_filme, estoques[devolvida.id_filme])
+        return DevolucaoResponse(
+            id_locacao=id_locacao, id_filme=devolvida.id_filme, quantidade=devolvida.quantidade,
+            estoque=estoques[devolvida.id_filme], multa=self._multa(devolvida.data_devolucao, hoje)
+        )
+
+    def devolver_lote(self, ids_locacao: list[int]) -> DevolucaoLoteResponse:
+        ## Várias locações no mesmo UPDATE (e uma reposição por filme). As recusadas não derrubam as
+        ## outras: cada locação volta com sucesso/erro, como no /alugar/lote.
+        logger.info("Processando devolução em lote: %s locações", len(ids_locacao))
+        hoje = datetime.today().date()
+        with transacao(self.db):
+            devolvidas, estoques = locacao_repository.devolver(self.db, list(dict.fromkeys(ids_locacao)))
+            por_id = {devolvida.id_locacao: devolvida for devolvida in devolvidas}
+            recusadas = [id_locacao for id_locacao in ids_locacao if id_locacao not in por_id]
+            existentes = locacao_repository.get_ids_existentes(self.db, recusadas) if recusadas else set()
+            erros = self.validator.validar_devolucao_lote(ids_locacao, set(por_id), existentes)
+            self._tirar_das_atrasadas(devolvidas, hoje)
+
+        logger.info("Devolução em lote: %s de %s locações devolvidas", len(devolvidas), len(ids_locacao))
+        invalidar_filmes(*estoques)
+        atualizar_disponibilidade(estoques)
+        return self._resultado_devolucao_lote(ids_locacao, erros, por_id, hoje)
+
+    @staticmethod
+    def _resultado_devolucao_lote(ids_locacao: list[int], erros: dict[int, str], por_id: dict, hoje: date) -> DevolucaoLoteResponse:
+        return DevolucaoLoteResponse(itens=[DevolucaoLoteItemResultado(
+            id_locacao=id_locacao,
+            sucesso=posicao not in erros,
+            multa=None if posicao in erros else LocacaoService._multa(por_id[id_locacao].data_devolucao, hoje),
+            erro=erros.get(posicao)
+        ) for posicao, id_locacao in enumerate(ids_locacao)])
+
+    @staticmethod
+    def _multa(data_devolucao: date, hoje: date) -> float:
+        #Mesma conta do calcular_multa: dias de atraso x MULTA_POR_DIA.
+        return max((hoje - data_devolucao).days, 0) * config.MULTA_POR_DIA
+
+    def _tirar_das_atrasadas(self, devolvidas: list, hoje: date):
+        atrasadas = [devolvida.id_locacao for devolvida in devolvidas if devolvida.data_devolucao < hoje]
+        if atrasadas:
+            locacao_atrasada_repository.remover(self.db, *atrasadas)
 
     def deletar(self, id_locacao: int):
-        logger.info(f"Deletando locação ID: {id_locacao}")
-        locacao = self.buscar_por_id(id_locacao)
-        locacao_repository.delete(self.db, locacao)
\ No newline at end of file
+        logger.info("Deletando locação ID: %s", id_locacao)
+        with transacao(self.db):
+            locacao = self.buscar_por_id(id_locacao)
+            if self._esta_atrasada(locacao):
+                locacao_atrasada_repository.remover(self.db, id_locacao) #O ON DELETE CASCADE não vale no SQLite sem PRAGMA.
+            locacao_repository.delete(self.db, locacao)
\ No newline at end of file
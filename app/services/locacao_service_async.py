@@ -0,0 +1,271 @@
+from datetime import date, datetime
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.locacao import Locacao
+from app import config
+from app.utils.logger import logger
+from app.utils import metricas
+from app.schemas.locacao_create import LocacaoCreate
+from app.schemas.locacao_response import LocacaoPagina, AluguelLoteResponse, DevolucaoResponse, DevolucaoLoteResponse
+from app.schemas.multa_response import MultaPagina, MultaClientePagina
+from app.schemas.locacao_atrasada_response import LocacaoAtrasadaPagina
+from app.utils.paginacao import LIMITE_PADRAO, decodificar_cursor_id, montar_pagina_linhas
+from app.utils.transacao import transacao_async
+from app.utils.exportacao import serializar_async
+from app.repositories import locacao_repository_async, filmes_repository_async, locacao_atrasada_repository_async
+from app.validators.locacao_validator_async import LocacaoValidatorAsync
+from app.services.locacao_service import LocacaoService
+from app.services.consultas_cache import buscar_cliente_async, invalidar_filmes_async
+from app.services.disponibilidade import atualizar_disponibilidade
+
+##Mesma regra de negócio do LocacaoService, mas com I/O assíncrono (modo async).
+class LocacaoServiceAsync:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.validator = LocacaoValidatorAsync(db)
+
+    async def _registrar_locacao(self, locacao: Locacao) -> Locacao:
+        ## Baixa atômica do estoque + INSERT da locação na mesma transação (ver LocacaoService).
+        async with transacao_async(self.db):
+            cliente = await buscar_cliente_async(self.db, locacao.id_cliente) #Só confere se existe, serve a versão do cache.
+            if not cliente:
+                logger.warning("Cliente %s não encontrado.", locacao.id_cliente)
+                raise HTTPException(status_code=404, detail="Cliente não encontrado.")
+
+            await self.validator.validar_tudo(locacao)
+            estoque_restante = await filmes_repository_async.decrementar_estoque(self.db, locacao.id_filme, locacao.quantidade)
+            if estoque_restante is None:
+                logger.warning("Baixa de estoque recusada: filme=%s, quantidade=%s", locacao.id_filme, locacao.quantidade)
+            await self.validator.validar_reserva_estoque(locacao.id_filme, estoque_restante)
+            locacao = await locacao_repository_async.save(self.db, locacao)
+        await invalidar_filmes_async(locacao.id_filme) #O estoque mudou, a resposta em cache do filme ficou velha.
+        atualizar_disponibilidade({locacao.id_filme: estoque_restante})
+        metricas.LOCACOES_CRIADAS.inc()
+        return locacao
+
+    async def salvar(self, locacao_create: LocacaoCreate) -> Locacao:
+        logger.info("Tentando salvar locação: cliente=%s, filme=%s", locacao_create.id_cliente, locacao_create.id_filme)
+        locacao = Locacao(**locacao_create.model_dump())
+        locacao = await self._registrar_locacao(locacao)
+        logger.info("Locação criada para cliente %s do filme %s", locacao.id_cliente, locacao.id_filme)
+        return locacao
+
+    async def buscar_por_id(self, id_locacao: int) -> Locacao:
+        logger.info("Buscando locação por ID: %s", id_locacao)
+        locacao = await locacao_repository_async.get_by_id(self.db, id_locacao)
+        if not locacao:
+            logger.warning("Locação %s não encontrada.", id_locacao)
+            raise HTTPException(status_code=404, detail="Locação não encontrada.")
+        return locacao
+
+    async def buscar_por_cliente_id(self, cliente_id: int, limit: int = LIMITE_PADRAO, after: str | None = None) -> LocacaoPagina:
+        logger.info("Buscando locações por cliente ID: %s", cliente_id)
+        locacao, proximo_id = await locacao_repository_async.get_by_cliente_id(self.db, cliente_id, limit, decodificar_cursor_id(after))
+        if not locacao:
+            logger.warning("Cliente de ID %s não possui locações.", cliente_id)
+            raise HTTPException(status_code=404, detail="Locações não encontradas.")
+        return montar_pagina_linhas(LocacaoPagina, locacao, proximo_id)
+
+    async def buscar_por_filme_id(self, filme_id: int, limit: int = LIMITE_PADRAO, after: str | None = None) -> LocacaoPagina:
+        logger.info("Buscando locações por filme ID: %s", filme_id)
+        locacao, proximo_id = await locacao_repository_async.get_by_filme_id(self.db, filme_id, limit, decodificar_cursor_id(after))
+        if not locacao:
+            logger.warning("Filme de ID %s não possui locações.", filme_id)
+            raise HTTPException(status_code=404, detail ="Locações não encontradas.")
+        return montar_pagina_linhas(LocacaoPagina, locacao, proximo_id)
+
+    async def exportar_por_cliente_id(self, cliente_id: int, formato: str):
+        logger.info("Exportando locações do cliente ID %s em %s", cliente_id, formato)
+        linhas = await locacao_repository_async.stream_por_cliente_id(self.db, cliente_id)
+        return serializar_async(linhas, list(linhas.keys()), formato)
+
+    async def exportar_por_filme_id(self, filme_id: int, formato: str):
+        logger.info("Exportando histórico do filme ID %s em %s", filme_id, formato)
+        linhas = await locacao_repository_async.stream_por_filme_id(self.db, filme_id)
+        return serializar_async(linhas, list(linhas.keys()), formato)
+
+    async def renovar_data_devolucao(self, id_locacao: int, nova_data: date) -> Locacao:
+        if not nova_data:
+            logger.warning("Tentativa de renovar data de devolução com valor nulo.")
+            raise HTTPException(status_code=400, detail="A nova data de devolução não pode ser nula.")
+
+        self.validator.validar_data_devolucao(nova_data)
+        async with transacao_async(self.db):
+            locacao = await self.buscar_por_id(id_locacao)
+            logger.info("Renovando data de devolução da locação %s para %s", id_locacao, nova_data)
+            if LocacaoService._esta_atrasada(locacao):
+                await locacao_atrasada_repository_async.remover(self.db, id_locacao) #A nova data já foi validada: deixou de estar em atraso.
+            locacao.data_devolucao = nova_data
+            locacao = await locacao_repository_async.save(self.db, locacao)
+        return locacao
+
+    async def calcular_multa(self, id_locacao: int) -> float:
+        logger.info("Calculando multa da locação %s", id_locacao)
+        locacao = await self.buscar_por_id(id_locacao)
+
+        if locacao.devolvido:
+            logger.info("Locação %s já devolvida. Multa = 0", id_locacao)
+            metricas.registrar_multa("devolvida")
+            return 0.0
+
+        hoje = datetime.today().date()
+        if locacao.data_devolucao >= hoje:
+            logger.info("Locação %s ainda dentro do prazo. Sem multa.", id_locacao)
+            metricas.registrar_multa("no_prazo")
+            return 0.0
+
+        dias_atraso = (hoje - locacao.data_devolucao).days
+        multa_por_dia = config.MULTA_POR_DIA
+        logger.warning("Locação %s em atraso (%s dias). Multa: R$ %.2f", id_locacao, dias_atraso, multa_por_dia)
+        multa = dias_atraso * multa_por_dia
+        metricas.registrar_multa("atrasada", multa)
+        return multa
+
+    ##Multas de todas as locações em aberto e vencidas (a mesma conta do calcular_multa), calculadas
+    ##pelo banco numa consulta só: o faturamento não precisa chamar o /multa locação por locação.
+    async def multas_em_atraso(self, id_cliente: int | None = None, limit: int = LIMITE_PADRAO, after: str | None = None) -> MultaPagina:
+        logger.info("Calculando multas em atraso: cliente=%s", id_cliente)
+        hoje = datetime.today().date()
+        multas, proximo_id = await locacao_repository_async.get_multas(
+            self.db, hoje, config.MULTA_POR_DIA, id_cliente, limit, decodificar_cursor_id(after)
+        )
+        return montar_pagina_linhas(MultaPagina, multas, proximo_id)
+
+    async def multas_por_cliente(self, limit: int = LIMITE_PADRAO, after: str | None = None) -> MultaClientePagina:
+        logger.info("Calculando multas em atraso por cliente")
+        hoje = datetime.today().date()
+        totais, proximo_id = await locacao_repository_async.get_multas_por_cliente(
+            self.db, hoje, config.MULTA_POR_DIA, limit, decodificar_cursor_id(after)
+        )
+        return montar_pagina_linhas(MultaClientePagina, totais, proximo_id)
+
+    async def exportar_multas_por_cliente(self, formato: str):
+        logger.info("Exportando multas em atraso por cliente em %s", formato)
+        hoje = datetime.today().date()
+        linhas = await locacao_repository_async.stream_multas_por_cliente(self.db, hoje, config.MULTA_POR_DIA)
+        return serializar_async(linhas, list(linhas.keys()), formato)
+
+    ##Locações em atraso lidas da tabela locacao_atrasada (ver app/models/locacao_atrasada.py),
+    ##que só tem as atrasadas: a página custa o mesmo com 1 mil ou 10 milhões de locações.
+    async def buscar_atrasadas(self, id_cliente: int | None = None, limit: int = LIMITE_PADRAO, after: str | None = None) -> LocacaoAtrasadaPagina:
+        logger.info("Buscando locações em atraso: cliente=%s", id_cliente)
+        hoje = datetime.today().date()
+        atrasadas, proximo_id = await locacao_atrasada_repository_async.get_atrasadas(
+            self.db, hoje, id_cliente, limit, decodificar_cursor_id(after)
+        )
+        return montar_pagina_linhas(LocacaoAtrasadaPagina, atrasadas, proximo_id)
+
+    async def virar_dia_atrasadas(self) -> tuple[int, int]:
+        #Job diário (python -m app.atrasadas): entram as que venceram, saem as que se regularizaram.
+        hoje = datetime.today().date()
+        async with transacao_async(self.db):
+            entraram, sairam = await locacao_atrasada_repository_async.virar_dia(self.db, hoje)
+        logger.info("Virada do dia %s das locações em atraso: %s entraram, %s saíram", hoje, entraram, sairam)
+        return entraram, sairam
+
+    async def alugar_filme(self, id_cliente: int, id_filme: int, quantidade: int, data_devolucao: date) -> Locacao:
+        logger.info("Processando aluguel: cliente=%s, filme=%s, quantidade=%s", id_cliente, id_filme, quantidade)
+        if quantidade <= 0:
+            logger.warning("Quantidade inválida para locação.")
+            raise HTTPException(status_code=400, detail="Estoque insuficiente.")
+
+        locacao = Locacao(
+            id_cliente = id_cliente,
+            id_filme = id_filme,
+            quantidade = quantidade,
+            data_locacao = datetime.today().date(),
+            data_devolucao = data_devolucao,
+            devolvido = False
+        )
+        locacao = await self._registrar_locacao(locacao)
+        logger.info("Locação realizada: cliente=%s, filme=%s, quantidade=%s", id_cliente, id_filme, quantidade)
+        return locacao
+
+    async def alugar_lote(self, id_cliente: int, data_devolucao: date, itens: list) -> AluguelLoteResponse:
+        ## Mesmo fluxo set-based do LocacaoService.alugar_lote.
+        logger.info("Processando aluguel em lote: cliente=%s, itens=%s", id_cliente, len(itens))
+        self.validator.validar_data_devolucao(data_devolucao)
+        hoje = datetime.today().date()
+        ids_filme = [item.id_filme for item in itens]
+
+        async with transacao_async(self.db):
+            cliente = await buscar_cliente_async(self.db, id_cliente) #Só confere se existe, serve a versão do cache.
+            if not cliente:
+                logger.warning("Cliente %s não encontrado.", id_cliente)
+                raise HTTPException(status_code=404, detail="Cliente não encontrado.")
+
+            estoques = await filmes_repository_async.get_estoques(self.db, ids_filme)
+            em_aberto = await locacao_repository_async.get_filmes_em_aberto(self.db, id_cliente, ids_filme, hoje)
+            erros = self.validator.validar_lote(itens, estoques, em_aberto)
+
+            quantidades = {item.id_filme: item.quantidade for posicao, item in enumerate(itens) if posicao not in erros}
+            restantes = await filmes_repository_async.decrementar_estoques(self.db, quantidades) if quantidades else {}
+            for posicao, item in enumerate(itens):
+                if posicao not in erros and item.id_filme not in restantes:
+                    erros[posicao] = "Estoque insuficiente para essa locação."
+                    metricas.ESTOQUE_INSUFICIENTE.labels("lote").inc()
+
+            linhas = [{
+                "id_cliente": id_cliente, "id_filme": item.id_filme, "quantidade": item.quantidade,
+                "data_locacao": hoje, "data_devolucao": data_devolucao, "devolvido": False
+            } for posicao, item in enumerate(itens) if posicao not in erros]
+            ids_locacao = await locacao_repository_async.inserir_em_lote(self.db, linhas) if linhas else {}
+
+        logger.info("Aluguel em lote do cliente %s: %s de %s itens alugados", id_cliente, len(linhas), len(itens))
+        await invalidar_filmes_async(*(linha["id_filme"] for linha in linhas))
+        atualizar_disponibilidade(restantes)
+        metricas.LOCACOES_CRIADAS.inc(len(linhas))
+        return LocacaoService._resultado_lote(id_cliente, itens, erros, ids_locacao)
+
+    ##Devolução: um UPDATE condicional marca devolvido e repõe o estoque (ver locacao_repository.devolver).
+    ##Devolver duas vezes não repõe duas vezes: a segunda não acha a locação em aberto.
+    async def devolver(self, id_locacao: int) -> DevolucaoResponse:
+        logger.info("Processando devolução da locação %s", id_locacao)
+        hoje = datetime.today().date()
+        async with transacao_async(self.db):
+            devolvidas, estoques = await locacao_repository_async.devolver(self.db, [id_locacao])
+            if not devolvidas:
+                await self.buscar_por_id(id_locacao) #404 se não existe.
+                logger.warning("Locação %s já devolvida.", id_locacao)
+                raise HTTPException(status_code=400, detail="Locação já devolvida.")
+            await self._tirar_das_atrasadas(devolvidas, hoje)
+        devolvida = devolvidas[0]
+        await invalidar_filmes_async(devolvida.id_filme)
+        atualizar_disponibilidade(estoques)
+        logger.info("Locação %s devolvida: filme=%s, estoque=%s", id_locacao, devolvida.id_filme, estoques[devolvida.id_filme])
+        return DevolucaoResponse(
+            id_locacao=id_locacao, id_filme=devolvida.id_filme, quantidade=devolvida.quantidade,
+            estoque=estoques[devolvida.id_filme], multa=LocacaoService._multa(devolvida.data_devolucao, hoje)
+        )
+
+    async def devolver_lote(self, ids_locacao: list[int]) -> DevolucaoLoteResponse:
+        ## Várias locações no mesmo UPDATE (e uma reposição por filme). As recusadas não derrubam as
+        ## outras: cada locação volta com sucesso/erro, como no /alugar/lote.
+        logger.info("Processando devolução em lote: %s locações", len(ids_locacao))
+        hoje = datetime.today().date()
+        async with transacao_async(self.db):
+            devolvidas, estoques = await locacao_repository_async.devolver(self.db, list(dict.fromkeys(ids_locacao)))
+            por_id = {devolvida.id_locacao: devolvida for devolvida in devolvidas}
+            recusadas = [id_locacao for id_locacao in ids_locacao if id_locacao not in por_id]
+            existentes = await locacao_repository_async.get_ids_existentes(self.db, recusadas) if recusadas else set()
+            erros = self.validator.validar_devolucao_lote(ids_locacao, set(por_id), existentes)
+            await self._tirar_das_atrasadas(devolvidas, hoje)
+
+        logger.info("Devolução em lote: %s de %s locações devolvidas", len(devolvidas), len(ids_locacao))
+        await invalidar_filmes_async(*estoques)
+        atualizar_disponibilidade(estoques)
+        return LocacaoService._resultado_devolucao_lote(ids_locacao, erros, por_id, hoje)
+
+    async def _tirar_das_atrasadas(self, devolvidas: list, hoje: date):
+        atrasadas = [devolvida.id_locacao for devolvida in devolvidas if devolvida.data_devolucao < hoje]
+        if atrasadas:
+            await locacao_atrasada_repository_async.remover(self.db, *atrasadas)
+
+    async def deletar(self, id_locacao: int):
+        logger.info("Deletando locação ID: %s", id_locacao)
+        async with transacao_async(self.db):
+            locacao = await self.buscar_por_id(id_locacao)
+            if LocacaoService._esta_atrasada(locacao):
+                await locacao_atrasada_repository_async.remover(self.db, id_locacao) #O ON DELETE CASCADE não vale no SQLite sem PRAGMA.
+            await locacao_repository_async.delete(self.db, locacao)
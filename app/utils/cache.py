@@ -0,0 +1,264 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional, Type, TypeVar
+
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+
+from app import config
+from app.utils.logger import logger
+
+##Cache de leitura (read-through) das buscas por ID de filme e cliente.
+##O valor guardado é o JSON do schema de resposta (FilmeResponse/ClienteResponse), nunca o objeto
+##do ORM: assim o mesmo formato serve pro backend em memória e pro Redis, e ninguém altera
+##por engano uma entidade que veio do cache. As escritas chamam invalidar() depois do commit.
+
+Schema = TypeVar("Schema", bound=BaseModel)
+
+
+class CacheMemoria:
+    ##Backend em processo: LRU (OrderedDict) com TTL por entrada. Cada worker tem o seu.
+    bloqueante = False #Só memória: pode ser chamado direto do event loop.
+    def __init__(self, maximo: int, ttl: float, relogio: Callable[[], float] = time.monotonic):
+        self.maximo = maximo
+        self.ttl = ttl
+        self._relogio = relogio
+        self._lock = threading.Lock()
+        self._dados: "OrderedDict[str, tuple[float, str]]" = OrderedDict()
+
+    def get(self, chave: str) -> Optional[str]:
+        with self._lock:
+            item = self._dados.get(chave)
+            if item is None:
+                return None
+            expira_em, valor = item
+            if expira_em <= self._relogio():
+                del self._dados[chave]
+                return None
+            self._dados.move_to_end(chave) #Usado agora, vai pro fim da fila do LRU.
+            return valor
+
+    def set(self, chave: str, valor: str):
+        with self._lock:
+            self._dados[chave] = (self._relogio() + self.ttl, valor)
+            self._dados.move_to_end(chave)
+            while len(self._dados) > self.maximo:
+                self._dados.popitem(last=False) #Descarta o menos usado.
+
+    def delete(self, *chaves: str):
+        with self._lock:
+            for chave in chaves:
+                self._dados.pop(chave, None)
+
+    def limpar(self):
+        with self._lock:
+            self._dados.clear()
+
+
+class CacheRedis:
+    ##Backend compartilhado entre workers/instâncias. Recebe qualquer cliente que fale o protocolo
+    ##do redis-py (get, set com ex, delete, scan_iter): o redis.Redis de verdade ou o RedisFalso.
+    bloqueante = True #Cada chamada é uma ida e volta na rede: no modo async vai pra threadpool.
+    def __init__(self, cliente, ttl: int, prefixo: str = "locadora:"):
+        self.cliente = cliente
+        self.ttl = ttl
+        self.prefixo = prefixo
+
+    def get(self, chave: str) -> Optional[str]:
+        valor = self.cliente.get(self.prefixo + chave)
+        if isinstance(valor, bytes):
+            valor = valor.decode("utf-8")
+        return valor
+
+    def set(self, chave: str, valor: str):
+        self.cliente.set(self.prefixo + chave, valor, ex=self.ttl)
+
+    def delete(self, *chaves: str):
+        if chaves:
+            self.cliente.delete(*(self.prefixo + chave for chave in chaves))
+
+    def limpar(self):
+        #Só as chaves da locadora, o Redis pode ser compartilhado com outras aplicações.
+        chaves = list(self.cliente.scan_iter(match=self.prefixo + "*"))
+        if chaves:
+            self.cliente.delete(*chaves)
+
+
+class RedisFalso:
+    ##Substituto local do redis.Redis pros testes e pra desenvolvimento sem servidor Redis.
+    ##Implementa só os comandos que o CacheRedis usa, com expiração em segundos como no Redis.
+    def __init__(self, relogio: Callable[[], float] = time.monotonic):
+        self._relogio = relogio
+        self._lock = threading.Lock()
+        self._dados: dict[str, tuple[Optional[float], bytes]] = {}
+
+    def get(self, chave: str) -> Optional[bytes]:
+        with self._lock:
+            item = self._dados.get(chave)
+            if item is None:
+                return None
+            expira_em, valor = item
+            if expira_em is not None and expira_em <= self._relogio():
+                del self._dados[chave]
+                return None
+            return valor
+
+    def set(self, chave: str, valor, ex: Optional[int] = None):
+        if isinstance(valor, str):
+            valor = valor.encode("utf-8")
+        with self._lock:
+            self._dados[chave] = (self._relogio() + ex if ex else None, valor)
+        return True
+
+    def delete(self, *chaves: str) -> int:
+        with self._lock:
+            return sum(self._dados.pop(chave, None) is not None for chave in chaves)
+
+    def scan_iter(self, match: str = "*"):
+        prefixo = match.rstrip("*")
+        with self._lock:
+            chaves = [chave for chave in self._dados if chave.startswith(prefixo)]
+        return iter(chaves)
+
+
+class CacheDesligado:
+    ##CACHE_BACKEND=desligado: toda busca vai pro banco, mas os contadores continuam funcionando.
+    bloqueante = False
+    def get(self, chave: str) -> Optional[str]:
+        return None
+
+    def set(self, chave: str, valor: str):
+        pass
+
+    def delete(self, *chaves: str):
+        pass
+
+    def limpar(self):
+        pass
+
+
+class EstatisticasCache:
+    ##Contadores de acerto/falta/invalidação, expostos em GET /internal/cache.
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.zerar()
+
+    def zerar(self):
+        with self._lock:
+            self.acertos = 0
+            self.faltas = 0
+            self.invalidacoes = 0
+            self.erros = 0
+
+    def registrar(self, campo: str, quantidade: int = 1):
+        with self._lock:
+            setattr(self, campo, getattr(self, campo) + quantidade)
+
+    def resumo(self) -> dict:
+        with self._lock:
+            total = self.acertos + self.faltas
+            return {
+                "acertos": self.acertos,
+                "faltas": self.faltas,
+                "invalidacoes": self.invalidacoes,
+                "erros": self.erros,
+                "taxa_acerto": round(self.acertos / total, 4) if total else 0.0,
+            }
+
+
+class CacheLeitura:
+    def __init__(self, backend, nome: str):
+        self.backend = backend
+        self.nome = nome
+        self.estatisticas = EstatisticasCache()
+
+    def _ler(self, chave: str, schema: Type[Schema]) -> Optional[Schema]:
+        #Se o backend cair (Redis fora do ar), a busca segue direto pro banco em vez de derrubar o request.
+        try:
+            valor = self.backend.get(chave)
+        except Exception as erro:
+            self.estatisticas.registrar("erros")
+            logger.warning("Falha ao ler do cache (%s): %s", chave, erro)
+            return None
+        if valor is None:
+            self.estatisticas.registrar("faltas")
+            return None
+        self.estatisticas.registrar("acertos")
+        return schema.model_validate_json(valor)
+
+    def _gravar(self, chave: str, resposta: Optional[BaseModel]):
+        #Não guarda "não encontrado": um 404 seguido de um POST não pode ficar preso no cache.
+        if resposta is None:
+            return
+        try:
+            self.backend.set(chave, resposta.model_dump_json())
+        except Exception as erro:
+            self.estatisticas.registrar("erros")
+            logger.warning("Falha ao gravar no cache (%s): %s", chave, erro)
+
+    def buscar(self, chave: str, schema: Type[Schema], carregar: Callable[[], Optional[Schema]]) -> Optional[Schema]:
+        resposta = self._ler(chave, schema)
+        if resposta is None:
+            resposta = carregar()
+            self._gravar(chave, resposta)
+        return resposta
+
+    async def _sem_bloquear(self, funcao: Callable, *args):
+        ##Os backends são síncronos. O Redis espera a rede (ou o timeout, se estiver fora do ar):
+        ##chamado direto, pararia o event loop e todos os requests async junto. A memória é chamada direto.
+        if getattr(self.backend, "bloqueante", True): #Backend desconhecido: na dúvida, trata como rede.
+            return await run_in_threadpool(funcao, *args)
+        return funcao(*args)
+
+    async def buscar_async(self, chave: str, schema: Type[Schema], carregar: Callable[[], Awaitable[Optional[Schema]]]) -> Optional[Schema]:
+        resposta = await self._sem_bloquear(self._ler, chave, schema)
+        if resposta is None:
+            resposta = await carregar()
+            await self._sem_bloquear(self._gravar, chave, resposta)
+        return resposta
+
+    def invalidar(self, *chaves: str):
+        ##Chamado depois do commit. Se fosse antes, um request concorrente poderia recarregar a
+        ##versão antiga entre o delete e o commit e ela ficaria no cache até o TTL vencer.
+        if not chaves:
+            return
+        try:
+            self.backend.delete(*chaves)
+        except Exception as erro:
+            self.estatisticas.registrar("erros")
+            logger.warning("Falha ao invalidar o cache (%s): %s", ', '.join(chaves), erro)
+            return
+        self.estatisticas.registrar("invalidacoes", len(chaves))
+
+    async def invalidar_async(self, *chaves: str):
+        await self._sem_bloquear(self.invalidar, *chaves)
+
+    def limpar(self):
+        self.backend.limpar()
+        self.estatisticas.zerar()
+
+    def resumo(self) -> dict:
+        return {"backend": self.nome, "ttl": config.CACHE_TTL, **self.estatisticas.resumo()}
+
+
+def chave_filme(id_filme: int) -> str:
+    return f"filme:{id_filme}"
+
+
+def chave_cliente(id_cliente: int) -> str:
+    return f"cliente:{id_cliente}"
+
+
+def criar_backend(nome: str):
+    if nome == "memoria":
+        return CacheMemoria(config.CACHE_MAXIMO, config.CACHE_TTL)
+    if nome == "redis":
+        import redis #Dependência opcional, só é exigida com CACHE_BACKEND=redis.
+        return CacheRedis(redis.Redis.from_url(config.REDIS_URL), config.CACHE_TTL)
+    if nome == "desligado":
+        return CacheDesligado()
+    raise ValueError(f"CACHE_BACKEND inválido: {nome} (use memoria, redis ou desligado)")
+
+
+cache = CacheLeitura(criar_backend(config.CACHE_BACKEND), config.CACHE_BACKEND)
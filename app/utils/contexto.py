@@ -0,0 +1,43 @@
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+##Contexto de cada request: ID, rota, latência e consultas ao banco. Fica num ContextVar, então
+##qualquer log feito durante o request (inclusive nos services, nas threads da threadpool e nos
+##greenlets do modo async) sai com esses campos (ver FiltroRequisicao em app/utils/logger.py).
+
+class Requisicao:
+    def __init__(self, request_id: str, scope: dict):
+        self.request_id = request_id
+        self.scope = scope
+        self.inicio = time.perf_counter()
+        self.consultas_db = 0
+        self.tempo_db = 0.0
+        self.formatos: dict[str, int] = {} #SQL -> vezes no request, só com SQL_INSTRUMENTACAO ligada.
+
+    @property
+    def rota(self) -> Optional[str]:
+        #O roteamento do FastAPI grava a rota encontrada no scope (scope["route"]), que é o mesmo
+        #dict que passou pelo middleware. Antes de rotear (ou num 404) ainda não tem rota.
+        rota = self.scope.get("route")
+        return getattr(rota, "path", None)
+
+    @property
+    def latencia_ms(self) -> float:
+        return round((time.perf_counter() - self.inicio) * 1000, 3)
+
+    def registrar_consulta(self, segundos: float):
+        self.consultas_db += 1
+        self.tempo_db += segundos
+
+    def campos(self) -> dict:
+        return {
+            "request_id": self.request_id,
+            "rota": self.rota,
+            "latencia_ms": self.latencia_ms,
+            "consultas_db": self.consultas_db,
+            "tempo_db_ms": round(self.tempo_db * 1000, 3),
+        }
+
+
+requisicao_atual: ContextVar[Optional[Requisicao]] = ContextVar("requisicao_atual", default=None)
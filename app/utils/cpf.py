@@ -0,0 +1,14 @@
+import re
+
+##O CPF é guardado só com os dígitos ("123.456.789-00" vira "12345678900"), assim a busca
+##é por igualdade e usa o índice único da coluna, em vez de varrer a tabela com ilike.
+
+def normalizar_cpf(cpf):
+    if cpf is None:
+        return None
+    return re.sub(r"\D", "", str(cpf))
+
+def fim_do_prefixo(prefixo: str) -> str:
+    #Limite superior exclusivo pra buscar por prefixo com intervalo (cpf >= p AND cpf < p + ":").
+    #":" vem logo depois do "9" na tabela ASCII, então pega tudo que começa com o prefixo.
+    return prefixo + ":"
@@ -0,0 +1,33 @@
+from app import config
+from app.utils.logger import logger
+
+##Instrumentação opcional do SQL (SQL_INSTRUMENTACAO=true, ver app/config.py), chamada pelos eventos
+##do SQLAlchemy em app/utils/requisicao.py. Desligada por padrão: guardar o texto de cada consulta e
+##logar parâmetros custa mais do que só contar e somar o tempo.
+##  - consulta lenta: passou de SQL_LENTA_MS, loga o SQL com os parâmetros;
+##  - N+1: o mesmo SQL (mesmo formato, parâmetros diferentes) repetido SQL_REPETICOES_N1 vezes ou
+##    mais no mesmo request, avisado no fim do request.
+
+TAMANHO_MAXIMO_PARAMETROS = 500 #executemany pode trazer milhares de linhas de parâmetros.
+
+
+def _resumir(parametros) -> str:
+    texto = repr(parametros)
+    if len(texto) > TAMANHO_MAXIMO_PARAMETROS:
+        return texto[:TAMANHO_MAXIMO_PARAMETROS] + "..."
+    return texto
+
+
+def inspecionar_consulta(requisicao, statement: str, parametros, segundos: float):
+    milissegundos = segundos * 1000
+    if milissegundos >= config.SQL_LENTA_MS:
+        logger.warning("Consulta lenta (%.1f ms): %s | parâmetros: %s", milissegundos, statement, _resumir(parametros))
+    if requisicao is not None:
+        #O SQL que chega aqui já vem com placeholders, então o próprio texto é o formato da consulta.
+        requisicao.formatos[statement] = requisicao.formatos.get(statement, 0) + 1
+
+
+def avisar_repeticoes(requisicao):
+    for statement, vezes in requisicao.formatos.items():
+        if vezes >= config.SQL_REPETICOES_N1:
+            logger.warning("Possível N+1: mesma consulta %s vezes no request: %s", vezes, statement)
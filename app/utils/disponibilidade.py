@@ -0,0 +1,97 @@
+import threading
+import time
+from typing import Callable, Iterable, Optional
+
+##Índice de disponibilidade do catálogo: {id_filme: estoque} inteiro em memória, pro
+##GET /filmes/disponibilidade responder centenas de filmes sem ir no banco.
+##- Carregado na subida da app (ou no primeiro uso, quando a app roda sem lifespan) e
+##  recarregado de tempos em tempos (DISPONIBILIDADE_RECONCILIAR_S), ver app/services/disponibilidade.py.
+##- As escritas de estoque (aluguel, devolução, alterar_estoque, cadastro e exclusão de filme)
+##  atualizam o índice depois do commit, com o estoque que o próprio UPDATE devolveu.
+##Cada worker tem o seu índice: o que outro worker alterou aparece aqui na próxima reconciliação.
+
+_REMOVIDO = None #Marca de filme excluído durante uma recarga.
+MAXIMO_IDS = 500 #Filmes por chamada do GET /filmes/disponibilidade.
+
+
+class IndiceDisponibilidade:
+    def __init__(self, relogio: Callable[[], float] = time.time):
+        self._relogio = relogio
+        self._lock = threading.Lock()
+        self._estoques: dict[int, int] = {}
+        self._durante_recarga: Optional[dict[int, Optional[int]]] = None
+        self.carregado_em: Optional[float] = None
+        self.recargas = 0
+        self.divergencias = 0 #Filmes que a última reconciliação achou diferentes do banco.
+
+    @property
+    def carregado(self) -> bool:
+        return self.carregado_em is not None
+
+    def iniciar_recarga(self):
+        ##A leitura do banco leva tempo: o que as escritas mudarem enquanto isso fica anotado e
+        ##é aplicado por cima da foto do banco, senão a recarga voltaria um estoque já velho.
+        with self._lock:
+            self._durante_recarga = {}
+
+    def concluir_recarga(self, estoques: dict[int, int]):
+        with self._lock:
+            novos = dict(estoques)
+            for id_filme, estoque in (self._durante_recarga or {}).items():
+                if estoque is _REMOVIDO:
+                    novos.pop(id_filme, None)
+                else:
+                    novos[id_filme] = estoque
+            if self.carregado:
+                mudaram = sum(self._estoques.get(id_filme) != estoque for id_filme, estoque in novos.items())
+                self.divergencias = mudaram + len(self._estoques.keys() - novos.keys())
+            self._estoques = novos
+            self._durante_recarga = None
+            self.carregado_em = self._relogio()
+            self.recargas += 1
+
+    def cancelar_recarga(self):
+        #A leitura do banco falhou: continua valendo o que já estava no índice.
+        with self._lock:
+            self._durante_recarga = None
+
+    def atualizar(self, estoques: dict[int, int]):
+        #Chamado depois do commit, como a invalidação do cache de leitura.
+        if not estoques:
+            return
+        with self._lock:
+            self._estoques.update(estoques)
+            if self._durante_recarga is not None:
+                self._durante_recarga.update(estoques)
+
+    def remover(self, *ids_filme: int):
+        with self._lock:
+            for id_filme in ids_filme:
+                self._estoques.pop(id_filme, None)
+                if self._durante_recarga is not None:
+                    self._durante_recarga[id_filme] = _REMOVIDO
+
+    def consultar(self, ids_filme: Iterable[int]) -> dict[int, Optional[int]]:
+        #None = filme que o índice não conhece (não existe, ou foi criado em outro worker depois da última recarga).
+        with self._lock:
+            return {id_filme: self._estoques.get(id_filme) for id_filme in ids_filme}
+
+    def resumo(self) -> dict:
+        with self._lock:
+            return {
+                "filmes": len(self._estoques),
+                "carregado_em": self.carregado_em,
+                "recargas": self.recargas,
+                "divergencias": self.divergencias,
+            }
+
+    def limpar(self):
+        with self._lock:
+            self._estoques = {}
+            self._durante_recarga = None
+            self.carregado_em = None
+            self.recargas = 0
+            self.divergencias = 0
+
+
+indice_disponibilidade = IndiceDisponibilidade()
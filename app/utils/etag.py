@@ -0,0 +1,42 @@
+from fastapi import HTTPException, Response, status
+
+##Requisições condicionais: o ETag de filmes e clientes é a coluna versao da linha (ver models).
+##If-None-Match no GET responde 304 sem corpo quando o cliente já tem a versão atual;
+##If-Match nos PUT recusa com 412 a alteração feita em cima de uma versão velha.
+
+def gerar_etag(versao: int) -> str:
+    return f'"{versao}"'
+
+
+def etag_confere(cabecalho: str | None, versao: int, comparacao_fraca: bool = True) -> bool:
+    #O cabeçalho pode trazer vários ETags separados por vírgula, ou "*" (qualquer versão).
+    #If-None-Match usa comparação fraca (W/"3" vale como "3"); If-Match exige a forte.
+    if not cabecalho:
+        return False
+    esperado = gerar_etag(versao)
+    for etag in (parte.strip() for parte in cabecalho.split(",")):
+        if etag == "*":
+            return True
+        if comparacao_fraca and etag.startswith("W/"):
+            etag = etag[2:]
+        if etag == esperado:
+            return True
+    return False
+
+
+def exigir_versao(if_match: str | None, versao: int):
+    #Chamado pelo service com a entidade já carregada. Sem If-Match, a alteração segue normal.
+    if if_match is not None and not etag_confere(if_match, versao, comparacao_fraca=False):
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="O registro foi alterado desde a última leitura (If-Match não confere)."
+        )
+
+
+def definir_etag(response: Response, versao: int | None):
+    if versao is not None:
+        response.headers["ETag"] = gerar_etag(versao)
+
+
+def nao_modificado(versao: int) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": gerar_etag(versao)})
@@ -0,0 +1,76 @@
+import csv
+import io
+import json
+from datetime import date
+
+from fastapi.responses import StreamingResponse
+
+##Exportação em streaming: as linhas vêm do banco aos poucos (yield_per, cursor do lado do servidor)
+##e vão sendo escritas na resposta em blocos de LINHAS_POR_BLOCO, então a memória não cresce
+##com o tamanho do histórico. Trabalha com as tuplas do SELECT, sem montar objeto ORM nem schema.
+
+LINHAS_POR_BLOCO = 500
+FORMATOS = ("ndjson", "csv")
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+def _valor_json(valor):
+    return valor.isoformat() if isinstance(valor, date) else valor
+
+def blocos_ndjson(linhas, campos: list[str]):
+    bloco = []
+    for linha in linhas:
+        bloco.append(json.dumps({campo: _valor_json(valor) for campo, valor in zip(campos, linha)}))
+        if len(bloco) == LINHAS_POR_BLOCO:
+            yield "\n".join(bloco) + "\n"
+            bloco = []
+    if bloco:
+        yield "\n".join(bloco) + "\n"
+
+def blocos_csv(linhas, campos: list[str]):
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    escritor.writerow(campos)
+    for numero, linha in enumerate(linhas, start=1):
+        escritor.writerow(linha)
+        if numero % LINHAS_POR_BLOCO == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+async def blocos_ndjson_async(linhas, campos: list[str]):
+    bloco = []
+    async for linha in linhas:
+        bloco.append(json.dumps({campo: _valor_json(valor) for campo, valor in zip(campos, linha)}))
+        if len(bloco) == LINHAS_POR_BLOCO:
+            yield "\n".join(bloco) + "\n"
+            bloco = []
+    if bloco:
+        yield "\n".join(bloco) + "\n"
+
+async def blocos_csv_async(linhas, campos: list[str]):
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    escritor.writerow(campos)
+    numero = 0
+    async for linha in linhas:
+        numero += 1
+        escritor.writerow(linha)
+        if numero % LINHAS_POR_BLOCO == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+def serializar(linhas, campos: list[str], formato: str):
+    return blocos_csv(linhas, campos) if formato == "csv" else blocos_ndjson(linhas, campos)
+
+def serializar_async(linhas, campos: list[str], formato: str):
+    return blocos_csv_async(linhas, campos) if formato == "csv" else blocos_ndjson_async(linhas, campos)
+
+def resposta_exportacao(blocos, formato: str, nome_arquivo: str) -> StreamingResponse:
+    return StreamingResponse(
+        blocos,
+        media_type=MEDIA_TYPES[formato],
+        headers={"Content-Disposition": f'attachment; filename="{nome_arquivo}.{formato}"'}
+    )
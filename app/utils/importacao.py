@@ -0,0 +1,79 @@
+import codecs
+import csv
+import json
+from itertools import islice
+
+import anyio
+
+from fastapi import HTTPException
+
+##Leitura dos arquivos de importação (CSV com cabeçalho ou NDJSON, um objeto JSON por linha)
+##linha a linha, sem carregar o arquivo inteiro na memória. Cada registro sai como
+##(número da linha, dict com os campos, erro de leitura ou None).
+
+FORMATOS = ("csv", "ndjson")
+
+def ler_registros(linhas, formato: str):
+    if formato == "csv":
+        return _ler_csv(linhas)
+    if formato == "ndjson":
+        return _ler_ndjson(linhas)
+    raise HTTPException(status_code=400, detail=f"Formato de importação inválido, use um de: {', '.join(FORMATOS)}.")
+
+def _ler_csv(linhas):
+    leitor = csv.DictReader(linhas)
+    for registro in leitor:
+        #line_num é a linha física do arquivo (o cabeçalho é a 1).
+        if None in registro or None in registro.values():
+            yield leitor.line_num, None, "Quantidade de colunas diferente do cabeçalho."
+            continue
+        yield leitor.line_num, registro, None
+
+def _ler_ndjson(linhas):
+    for numero, linha in enumerate(linhas, start=1):
+        if not linha.strip():
+            continue
+        try:
+            registro = json.loads(linha)
+        except ValueError:
+            yield numero, None, "JSON inválido."
+            continue
+        if not isinstance(registro, dict):
+            yield numero, None, "Cada linha deve ser um objeto JSON."
+            continue
+        yield numero, registro, None
+
+def em_lotes(registros, tamanho: int):
+    #Agrupa o iterador em listas de até `tamanho` itens, sem ler além do lote atual.
+    registros = iter(registros)
+    while lote := list(islice(registros, tamanho)):
+        yield lote
+
+def linhas_de_pedacos(pedacos):
+    ##Transforma pedaços de bytes (cortados em qualquer lugar, como chegam no corpo da requisição)
+    ##em linhas de texto, decodificando UTF-8 aos poucos.
+    decodificador = codecs.getincrementaldecoder("utf-8-sig")()
+    resto = ""
+    for pedaco in pedacos:
+        resto += decodificador.decode(pedaco)
+        *linhas, resto = resto.split("\n")
+        for linha in linhas:
+            yield linha + "\n"
+    resto += decodificador.decode(b"", final=True)
+    if resto:
+        yield resto
+
+def iterar_no_worker(pedacos_async):
+    ##Consome um iterador async (o request.stream()) de dentro de uma thread do run_in_threadpool,
+    ##pedindo um pedaço por vez pro event loop. Assim a importação inteira roda síncrona na thread
+    ##(Session normal) e o corpo continua sendo lido aos poucos, sem ir todo pra memória.
+    pedacos_async = pedacos_async.__aiter__()
+
+    async def proximo():
+        return await pedacos_async.__anext__()
+
+    while True:
+        try:
+            yield anyio.from_thread.run(proximo)
+        except StopAsyncIteration:
+            return
@@ -1,6 +1,14 @@
+import atexit
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+import orjson
+
+from app import config
+from app.utils.contexto import requisicao_atual
 
 #Criar pasta de logs.
 LOGS_DIR = "logs"
@@ -9,21 +17,67 @@ os.makedirs(LOGS_DIR, exist_ok=True)
 #Nome do arquivo de log.
 LOG_FILE = os.path.join(LOGS_DIR, "app.log")
 
-#Criação do logger
+#Criação do logger, nível vindo do ambiente (LOG_LEVEL, ver app/config.py).
 logger = logging.getLogger("locadora")
-logger.setLevel(logging.DEBUG)
+logger.setLevel(config.LOG_LEVEL)
+
+#Campos extras aceitos no log (logger.info(..., extra={...})) que vão pro JSON.
+CAMPOS_EXTRAS = ("metodo", "caminho", "status")
+
+
+class FiltroRequisicao(logging.Filter):
+    ##Roda na thread de quem loga (antes de ir pra fila), onde o ContextVar do request está
+    ##visível: copia pro registro o ID, a rota, a latência e as consultas ao banco até agora.
+    def filter(self, record):
+        requisicao = requisicao_atual.get()
+        if requisicao is not None:
+            record.requisicao = requisicao.campos()
+        return True
+
+
+class FormatterJSON(logging.Formatter):
+    ##Um objeto JSON por linha: fácil de filtrar por request_id/rota no agregador de logs.
+    ##Traceback de exceção já chega dentro da mensagem (o QueueHandler formata antes de enfileirar).
+    def format(self, record):
+        linha = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "nivel": record.levelname,
+            "logger": record.name,
+            "mensagem": record.getMessage(),
+        }
+        linha.update(getattr(record, "requisicao", {}))
+        for campo in CAMPOS_EXTRAS:
+            if hasattr(record, campo):
+                linha[campo] = getattr(record, campo)
+        return orjson.dumps(linha, default=str).decode()
+
 
 #Formato do log
-formatter = logging.Formatter(
-    "%(asctime)s - %(levelname)s - %(name)s - %(message)s"
-)
+formatter = FormatterJSON()
 
 #Exibir no terminal
 console_handler = logging.StreamHandler()
 console_handler.setFormatter(formatter)
-logger.addHandler(console_handler)
 
 #File Handler com rotação (até 5 arquivos de 1mb cada)
 file_handler = RotatingFileHandler(LOG_FILE, maxBytes=1_000_000, backupCount=5)
 file_handler.setFormatter(formatter)
-logger.addHandler(file_handler)
\ No newline at end of file
+
+##O logger só coloca o registro numa fila (QueueHandler); quem escreve no terminal e no arquivo,
+##e checa a rotação, é a thread do QueueListener. Assim o request não espera I/O de log.
+fila_logs = queue.SimpleQueue()
+queue_handler = QueueHandler(fila_logs)
+queue_handler.addFilter(FiltroRequisicao())
+logger.addHandler(queue_handler)
+
+listener = QueueListener(fila_logs, console_handler, file_handler, respect_handler_level=True)
+listener.start()
+
+def parar_logs():
+    #O stop() esvazia a fila antes de encerrar a thread: nenhum log fica pra trás.
+    #No Python 3.11 chamar stop() com o listener já parado estoura, daí a checagem.
+    if listener._thread is not None:
+        listener.stop()
+
+
+atexit.register(parar_logs)
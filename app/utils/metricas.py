@@ -0,0 +1,63 @@
+from prometheus_client import Counter, Gauge, Histogram
+
+##Métricas no formato do Prometheus, expostas em GET /metrics (ver app/routes/metricas_routes.py).
+##Cada observação é uma soma num contador em memória (com lock), então dá pra deixar ligado em
+##produção. Os rótulos usam o template da rota (/filmes/{id_filme}), nunca o caminho com o ID,
+##senão cada filme viraria uma série nova.
+
+ROTA_DESCONHECIDA = "desconhecida" #404 e afins: caminho que não bateu com nenhuma rota.
+
+#HTTP
+DURACAO_REQUEST = Histogram(
+    "locadora_http_request_duracao_segundos", "Latência dos requests por rota",
+    ["metodo", "rota", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+REQUESTS_EM_ANDAMENTO = Gauge(
+    "locadora_http_requests_em_andamento", "Requests sendo atendidos agora", ["metodo"],
+)
+
+#Banco
+DURACAO_CONSULTA = Histogram(
+    "locadora_db_consulta_duracao_segundos", "Latência de cada consulta ao banco", ["operacao"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1),
+)
+CONSULTAS_POR_REQUEST = Histogram(
+    "locadora_db_consultas_por_request", "Quantas consultas ao banco cada request fez", ["rota"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+
+#Negócio
+LOCACOES_CRIADAS = Counter("locadora_locacoes_criadas_total", "Locações gravadas (unitárias e de lote)")
+ESTOQUE_INSUFICIENTE = Counter(
+    "locadora_estoque_insuficiente_total", "Locações recusadas por falta de estoque", ["origem"],
+)
+MULTAS_CALCULADAS = Counter(
+    "locadora_multas_calculadas_total", "Cálculos de multa por resultado", ["resultado"],
+)
+MULTAS_VALOR = Counter("locadora_multas_valor_reais_total", "Soma das multas calculadas, em reais")
+
+
+def operacao_consulta(context) -> str:
+    #O ExecutionContext do SQLAlchemy já sabe o tipo do comando, sem precisar olhar o SQL.
+    if context is None:
+        return "outra"
+    if context.isinsert:
+        return "insert"
+    if context.isupdate:
+        return "update"
+    if context.isdelete:
+        return "delete"
+    return "select"
+
+
+def observar_request(metodo: str, rota: str | None, status: int, segundos: float, consultas_db: int):
+    rota = rota or ROTA_DESCONHECIDA
+    DURACAO_REQUEST.labels(metodo, rota, str(status)).observe(segundos)
+    CONSULTAS_POR_REQUEST.labels(rota).observe(consultas_db)
+
+
+def registrar_multa(resultado: str, valor: float = 0.0):
+    MULTAS_CALCULADAS.labels(resultado).inc()
+    if valor:
+        MULTAS_VALOR.inc(valor)
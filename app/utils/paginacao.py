@@ -0,0 +1,70 @@
+import base64
+import binascii
+import json
+
+from fastapi import HTTPException
+from fastapi.responses import ORJSONResponse
+
+##Paginação por keyset (cursor): em vez de OFFSET, cada página continua a partir do último
+##id entregue (WHERE id > :after ORDER BY id LIMIT n), então a página 1000 custa o mesmo que a 1.
+
+LIMITE_PADRAO = 50
+LIMITE_MAXIMO = 200
+
+def codificar_cursor(*valores) -> str:
+    #Cursor opaco pro cliente: só precisa devolver ele no parâmetro after.
+    return base64.urlsafe_b64encode(json.dumps(list(valores)).encode()).decode().rstrip("=")
+
+def decodificar_cursor(cursor: str | None) -> list | None:
+    if not cursor:
+        return None
+    try:
+        valores = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=400, detail="Cursor de paginação inválido.")
+    if not isinstance(valores, list) or not valores:
+        raise HTTPException(status_code=400, detail="Cursor de paginação inválido.")
+    return valores
+
+def decodificar_cursor_id(cursor: str | None, tipo: type = int):
+    #tipo é o tipo da chave do keyset (int pros ids, str quando pagina pelo cpf).
+    valores = decodificar_cursor(cursor)
+    if valores is None:
+        return None
+    if len(valores) != 1 or not isinstance(valores[0], tipo):
+        raise HTTPException(status_code=400, detail="Cursor de paginação inválido.")
+    return valores[0]
+
+def aplicar_keyset(consulta, coluna_id, limit: int, after_id: int | None):
+    ##Serve tanto pra db.query() quanto pra select() (modo async).
+    ##Busca 1 a mais que o limit só pra saber se existe próxima página.
+    if after_id is not None:
+        consulta = consulta.filter(coluna_id > after_id)
+    return consulta.order_by(coluna_id).limit(limit + 1)
+
+def fatiar_pagina(itens, coluna_id, limit: int) -> tuple[list, int | None]:
+    itens = list(itens)
+    if len(itens) <= limit:
+        return itens, None #última página
+    itens = itens[:limit]
+    return itens, getattr(itens[-1], coluna_id.key)
+
+def paginar(consulta, coluna_id, limit: int, after_id: int | None) -> tuple[list, int | None]:
+    #Retorna (itens da página, id pro próximo cursor ou None).
+    return fatiar_pagina(aplicar_keyset(consulta, coluna_id, limit, after_id).all(), coluna_id, limit)
+
+def montar_pagina(classe_pagina, itens: list, proximo_id: int | None):
+    #classe_pagina é o schema de resposta (FilmePagina, ClientePagina, LocacaoPagina).
+    next_cursor = codificar_cursor(proximo_id) if proximo_id is not None else None
+    return classe_pagina(itens=itens, next_cursor=next_cursor)
+
+##Caminho rápido das listas que já vêm do banco como linhas (Row) com as colunas do schema de
+##resposta (ver COLUNAS_RESPOSTA nos repositories): model_construct monta a página sem validar de novo
+##item por item, e resposta_pagina manda direto pro orjson, sem o response_model revalidar tudo
+##e sem o jsonable_encoder. Em listas grandes a serialização era a maior parte do tempo do request.
+def montar_pagina_linhas(classe_pagina, linhas: list, proximo_id: int | None):
+    next_cursor = codificar_cursor(proximo_id) if proximo_id is not None else None
+    return classe_pagina.model_construct(itens=linhas, next_cursor=next_cursor)
+
+def resposta_pagina(pagina) -> ORJSONResponse:
+    return ORJSONResponse({"itens": [linha._asdict() for linha in pagina.itens], "next_cursor": pagina.next_cursor})
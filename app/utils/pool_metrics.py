@@ -0,0 +1,77 @@
+import threading
+import time
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+
+class EstatisticasEspera:
+    ##Acumula quanto tempo os requests ficaram esperando uma conexão livre no pool.
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.espera_total = 0.0
+        self.espera_maxima = 0.0
+
+    def registrar(self, segundos: float, timeout: bool = False):
+        with self._lock:
+            if timeout:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.espera_total += segundos
+            self.espera_maxima = max(self.espera_maxima, segundos)
+
+    def resumo(self) -> dict:
+        with self._lock:
+            total = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "espera_total_ms": round(self.espera_total * 1000, 3),
+                "espera_media_ms": round(self.espera_total * 1000 / total, 3) if total else 0.0,
+                "espera_maxima_ms": round(self.espera_maxima * 1000, 3),
+            }
+
+
+class _PoolMonitoradoMixin:
+    ##_do_get é onde o QueuePool bloqueia esperando uma conexão, então o tempo dele é o tempo de fila.
+    @property
+    def estatisticas(self) -> EstatisticasEspera:
+        if "_estatisticas" not in self.__dict__:
+            self._estatisticas = EstatisticasEspera()
+        return self._estatisticas
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            conexao = super()._do_get()
+        except PoolTimeoutError:
+            self.estatisticas.registrar(time.perf_counter() - inicio, timeout=True)
+            raise
+        self.estatisticas.registrar(time.perf_counter() - inicio)
+        return conexao
+
+
+class QueuePoolMonitorado(_PoolMonitoradoMixin, QueuePool):
+    pass
+
+
+class AsyncAdaptedQueuePoolMonitorado(_PoolMonitoradoMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def status_pool(pool) -> dict:
+    ##checkedout = em uso, checkedin = ociosas, overflow negativo = vagas do pool ainda não abertas.
+    status = {
+        "tamanho": pool.size(),
+        "em_uso": pool.checkedout(),
+        "ociosas": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": pool._max_overflow,
+        "timeout": pool.timeout(),
+    }
+    if isinstance(pool, _PoolMonitoradoMixin):
+        status.update(pool.estatisticas.resumo())
+    return status
@@ -0,0 +1,101 @@
+import time
+import uuid
+from typing import Optional
+
+from sqlalchemy import event
+
+from app import config
+from app.utils.contexto import Requisicao, requisicao_atual
+from app.utils.logger import logger
+from app.utils import metricas
+from app.utils.detector_consultas import inspecionar_consulta, avisar_repeticoes
+
+##Middleware que abre o contexto de cada request (ver app/utils/contexto.py) e eventos do
+##SQLAlchemy que somam nele as consultas ao banco. Os dois também alimentam as métricas do
+##Prometheus (ver app/utils/metricas.py).
+
+CABECALHO_ID = "x-request-id"
+TAMANHO_MAXIMO_ID = 128
+
+
+def _id_recebido(scope: dict) -> Optional[str]:
+    #Aproveita o X-Request-ID de quem chamou (proxy, outro serviço) pra ligar os logs das duas pontas.
+    for nome, valor in scope.get("headers", ()):
+        if nome == CABECALHO_ID.encode():
+            valor = valor.decode("latin-1").strip()
+            return valor[:TAMANHO_MAXIMO_ID] or None
+    return None
+
+
+class MiddlewareRequisicao:
+    ##Middleware ASGI puro (sem BaseHTTPMiddleware): não cria task extra por request e enxerga o fim
+    ##de verdade da resposta, inclusive das exportações em streaming, que consultam o banco enquanto
+    ##mandam o corpo. Devolve o ID no cabeçalho X-Request-ID e loga uma linha por request.
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        requisicao = Requisicao(_id_recebido(scope) or uuid.uuid4().hex, scope)
+        token = requisicao_atual.set(requisicao)
+        em_andamento = metricas.REQUESTS_EM_ANDAMENTO.labels(scope["method"])
+        em_andamento.inc()
+        status = 500
+        finalizado = False
+
+        async def enviar(mensagem):
+            nonlocal status, finalizado
+            if mensagem["type"] == "http.response.start":
+                status = mensagem["status"]
+                mensagem["headers"] = [*mensagem.get("headers", []), (CABECALHO_ID.encode(), requisicao.request_id.encode("latin-1"))]
+            await send(mensagem)
+            if mensagem["type"] == "http.response.body" and not mensagem.get("more_body", False):
+                finalizado = True
+                self._registrar(scope, status, requisicao)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            if not finalizado:
+                #Exceção ou cliente que caiu no meio da resposta: loga mesmo assim.
+                self._registrar(scope, status, requisicao)
+            em_andamento.dec()
+            requisicao_atual.reset(token)
+
+    @staticmethod
+    def _registrar(scope: dict, status: int, requisicao: Requisicao):
+        metricas.observar_request(scope["method"], requisicao.rota, status,
+                                  time.perf_counter() - requisicao.inicio, requisicao.consultas_db)
+        if config.SQL_INSTRUMENTACAO:
+            avisar_repeticoes(requisicao)
+        logger.info("%s %s %s", scope["method"], scope["path"], status,
+                    extra={"metodo": scope["method"], "caminho": scope["path"], "status": status})
+
+
+def registrar_consultas(alvo):
+    ##Conta as consultas e o tempo no banco do request atual e observa o histograma de consultas.
+    ##alvo é uma Engine ou a própria classe Engine (vale pra todas, inclusive as dos testes e dos
+    ##benchmarks). Fora de request só o histograma é alimentado.
+    @event.listens_for(alvo, "before_cursor_execute")
+    def _antes(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("inicio_consultas", []).append(time.perf_counter())
+
+    @event.listens_for(alvo, "after_cursor_execute")
+    def _depois(conn, cursor, statement, parameters, context, executemany):
+        segundos = time.perf_counter() - conn.info["inicio_consultas"].pop()
+        metricas.DURACAO_CONSULTA.labels(metricas.operacao_consulta(context)).observe(segundos)
+        requisicao = requisicao_atual.get()
+        if requisicao is not None:
+            requisicao.registrar_consulta(segundos)
+        if config.SQL_INSTRUMENTACAO:
+            inspecionar_consulta(requisicao, statement, parameters, segundos)
+
+    @event.listens_for(alvo, "handle_error")
+    def _erro(contexto):
+        #A consulta falhou, o after_cursor_execute não vai rodar: descarta o início dela.
+        inicios = contexto.connection.info.get("inicio_consultas") if contexto.connection is not None else None
+        if inicios:
+            inicios.pop()
@@ -0,0 +1,26 @@
+from sqlalchemy import Integer
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+##Expressões SQL que mudam de um banco pro outro, compiladas conforme o dialeto da conexão.
+
+class dias_entre(FunctionElement):
+    ##Dias inteiros de inicio até fim (fim - inicio), pra colunas/valores do tipo date.
+    ##Uso: dias_entre(Locacao.data_devolucao, hoje)
+    type = Integer()
+    name = "dias_entre"
+    inherit_cache = True
+
+
+@compiles(dias_entre)
+def _dias_entre_padrao(elemento, compiler, **kw):
+    #PostgreSQL (e o padrão SQL): date - date já é um inteiro de dias.
+    inicio, fim = elemento.clauses
+    return f"({compiler.process(fim, **kw)} - {compiler.process(inicio, **kw)})"
+
+
+@compiles(dias_entre, "sqlite")
+def _dias_entre_sqlite(elemento, compiler, **kw):
+    #SQLite guarda date como texto 'AAAA-MM-DD': a diferença sai do julianday.
+    inicio, fim = elemento.clauses
+    return f"CAST(julianday({compiler.process(fim, **kw)}) - julianday({compiler.process(inicio, **kw)}) AS INTEGER)"
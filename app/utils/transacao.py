@@ -0,0 +1,44 @@
+from contextlib import contextmanager, asynccontextmanager
+
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
+
+##Unidade de trabalho: os repositories só fazem add/flush (o flush já traz o id gerado),
+##e o service abre um bloco `with transacao(self.db):` por operação. Sai do bloco sem erro,
+##um commit só; qualquer exceção (inclusive HTTPException de validator) faz rollback de tudo.
+##Como as sessions usam expire_on_commit=False, os objetos continuam carregados depois do
+##commit e não precisa de db.refresh() (que era mais um SELECT por escrita).
+##StaleDataError é o UPDATE versionado (version_id_col) que não achou a versão lida:
+##outra requisição alterou a linha no meio tempo, e isso vira um 409 pro cliente buscar de novo.
+
+def _conflito_de_versao() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="O registro foi alterado por outra requisição. Busque de novo e repita a alteração."
+    )
+
+@contextmanager
+def transacao(db: Session):
+    try:
+        yield db
+        db.commit()
+    except StaleDataError:
+        db.rollback()
+        raise _conflito_de_versao()
+    except Exception:
+        db.rollback()
+        raise
+
+@asynccontextmanager
+async def transacao_async(db: AsyncSession):
+    try:
+        yield db
+        await db.commit()
+    except StaleDataError:
+        await db.rollback()
+        raise _conflito_de_versao()
+    except Exception:
+        await db.rollback()
+        raise
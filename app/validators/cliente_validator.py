@@ -1,5 +1,5 @@
 from fastapi import HTTPException
-from app.repositories import cliente_repository
+from app.repositories import cliente_repository, locacao_repository
 from app.models.cliente import Cliente
 
 class ClienteValidator:
@@ -21,8 +21,13 @@ class ClienteValidator:
             raise HTTPException(status_code=400, detail="Telefone já cadastrado, cliente existe no sistema.")
 
 
+    def validar_sem_locacoes(self, id_cliente: int):
+        if locacao_repository.existe_por_cliente(self.db, id_cliente):
+            raise HTTPException(status_code=409, detail="Cliente possui locações registradas e não pode ser excluído.")
+
+
     def _cpf_ja_usado_por_outro(self, cliente: Cliente) -> bool:
-        existente = cliente_repository.get_by_cpf_ignore_case(self.db, cliente.cpf)
+        existente = cliente_repository.get_by_cpf(self.db, cliente.cpf)
         return existente is not None and existente.id != cliente.id
 
     def _email_ja_usado_por_outro(self, cliente: Cliente) -> bool:
@@ -0,0 +1,41 @@
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.repositories import cliente_repository_async, locacao_repository_async
+from app.models.cliente import Cliente
+
+##Mesmas regras do ClienteValidator, mas consultando o banco com a AsyncSession.
+class ClienteValidatorAsync:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def validar_cliente(self, cliente: Cliente):
+        if await self._cpf_ja_usado_por_outro(cliente):
+            raise HTTPException(status_code=400, detail="CPF já cadsatrado, cliente existe no sistema.")
+
+
+    async def validar_email(self, cliente: Cliente):
+        if await self._email_ja_usado_por_outro(cliente):
+            raise HTTPException(status_code=400, detail="Email já cadastrado, cliente existe no sistema.")
+
+
+    async def validar_telefone(self, cliente: Cliente):
+        if await self._telefone_ja_usado_por_outro(cliente):
+            raise HTTPException(status_code=400, detail="Telefone já cadastrado, cliente existe no sistema.")
+
+
+    async def validar_sem_locacoes(self, id_cliente: int):
+        if await locacao_repository_async.existe_por_cliente(self.db, id_cliente):
+            raise HTTPException(status_code=409, detail="Cliente possui locações registradas e não pode ser excluído.")
+
+
+    async def _cpf_ja_usado_por_outro(self, cliente: Cliente) -> bool:
+        existente = await cliente_repository_async.get_by_cpf(self.db, cliente.cpf)
+        return existente is not None and existente.id != cliente.id
+
+    async def _email_ja_usado_por_outro(self, cliente: Cliente) -> bool:
+        existente = await cliente_repository_async.get_by_email(self.db, cliente.email)
+        return existente is not None and existente.id != cliente.id
+
+    async def _telefone_ja_usado_por_outro(self, cliente: Cliente) -> bool:
+        existente = await cliente_repository_async.get_by_telefone(self.db, cliente.telefone)
+        return existente is not None and existente.id != cliente.id
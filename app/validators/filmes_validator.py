@@ -2,7 +2,7 @@ from datetime import date
 from os.path import exists
 
 from fastapi import HTTPException
-from app.repositories import filmes_repository
+from app.repositories import filmes_repository, locacao_repository
 from app.models.filmes import Filmes
 from sqlalchemy.orm import Session
 
@@ -26,6 +26,10 @@ class FilmeValidator:
         if existente and existente.id_filme != id_atual:
             raise HTTPException(status_code=400, detail="Já existe um filme cadastrado com esse nome.")
 
+    def validar_sem_locacoes(self, id_filme: int):
+        if locacao_repository.existe_por_filme(self.db, id_filme):
+            raise HTTPException(status_code=409, detail="Filme possui locações registradas e não pode ser excluído.")
+
     def validar_tudo(self, filme: Filmes):
         self.validar_duplicidade_nome(filme.nome, filme.id_filme)
         self.validar_estoque(filme.estoque)
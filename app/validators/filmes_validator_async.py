@@ -0,0 +1,25 @@
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.repositories import filmes_repository_async, locacao_repository_async
+from app.models.filmes import Filmes
+from app.validators.filmes_validator import FilmeValidator
+
+##Reaproveita as regras que não vão no banco (estoque, data) do FilmeValidator,
+##só as que consultam o banco viram async.
+class FilmeValidatorAsync(FilmeValidator):
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def validar_duplicidade_nome(self, nome: str, id_atual: int | None):
+        existente = await filmes_repository_async.get_by_nome_ignore_case(self.db, nome.strip()) # strip evita problemas com espaços em branco.
+        if existente and existente.id_filme != id_atual:
+            raise HTTPException(status_code=400, detail="Já existe um filme cadastrado com esse nome.")
+
+    async def validar_sem_locacoes(self, id_filme: int):
+        if await locacao_repository_async.existe_por_filme(self.db, id_filme):
+            raise HTTPException(status_code=409, detail="Filme possui locações registradas e não pode ser excluído.")
+
+    async def validar_tudo(self, filme: Filmes):
+        await self.validar_duplicidade_nome(filme.nome, filme.id_filme)
+        self.validar_estoque(filme.estoque)
+        self.validar_data_lancamento(filme.data_lancamento)
@@ -3,6 +3,7 @@ from fastapi import HTTPException
 from sqlalchemy.orm import Session
 from app.models.locacao import Locacao
 from app.models.filmes import Filmes
+from app.utils import metricas
 
 class LocacaoValidator:
     def __init__(self, db: Session):
@@ -34,22 +35,60 @@ class LocacaoValidator:
             raise HTTPException(status_code=400, detail="Já existe uma locação semelhante em aberto.")
 
 
-    def validar_estoque(self, locacao: Locacao):
-        filme = locacao.filme
-        if not filme:
+    def validar_reserva_estoque(self, id_filme: int, estoque_restante: int | None):
+        ## Chamado depois do filmes_repository.decrementar_estoque: None quer dizer que o UPDATE
+        ## não pegou nenhuma linha, aí só falta descobrir se o filme não existe ou se faltou estoque.
+        if estoque_restante is not None:
+            return
+        if not self.db.query(Filmes.id_filme).filter(Filmes.id_filme == id_filme).first():
             raise HTTPException(
                 status_code=404,
                 detail="Filme não encontrado."
             )
-        if filme.estoque < locacao.quantidade:
-            raise HTTPException(
-                status_code=400,
-                detail="Estoque insuficiente para essa locação."
-            )
+        metricas.ESTOQUE_INSUFICIENTE.labels("unitaria").inc()
+        raise HTTPException(
+            status_code=400,
+            detail="Estoque insuficiente para essa locação."
+        )
+
+    def validar_lote(self, itens: list, estoques: dict[int, int], filmes_em_aberto: set[int]) -> dict[int, str]:
+        ## Regras do /alugar/lote item a item, em cima do que já veio do banco em consultas únicas
+        ## (estoques = {id_filme: estoque}, filmes_em_aberto = filmes que o cliente já tem em aberto hoje).
+        ## Em vez de levantar HTTPException no primeiro erro, devolve {posição do item: motivo},
+        ## pra resposta dizer o que aconteceu com cada item.
+        erros = {}
+        vistos = set()
+        for posicao, item in enumerate(itens):
+            if item.id_filme in vistos:
+                erros[posicao] = "Filme repetido no lote."
+            elif item.id_filme not in estoques:
+                erros[posicao] = "Filme não encontrado."
+            elif item.id_filme in filmes_em_aberto:
+                erros[posicao] = "Já existe uma locação semelhante em aberto."
+            elif estoques[item.id_filme] < item.quantidade:
+                erros[posicao] = "Estoque insuficiente para essa locação."
+                metricas.ESTOQUE_INSUFICIENTE.labels("lote").inc()
+            vistos.add(item.id_filme)
+        return erros
+
+    def validar_devolucao_lote(self, ids_locacao: list[int], devolvidas: set[int], existentes: set[int]) -> dict[int, str]:
+        ## Mesmo esquema do validar_lote pro /devolver/lote: o UPDATE condicional já devolveu o que dava
+        ## (devolvidas), e existentes diz quais das que sobraram existem no banco.
+        erros = {}
+        vistos = set()
+        for posicao, id_locacao in enumerate(ids_locacao):
+            if id_locacao in vistos:
+                erros[posicao] = "Locação repetida no lote."
+            elif id_locacao in existentes:
+                erros[posicao] = "Locação já devolvida."
+            elif id_locacao not in devolvidas:
+                erros[posicao] = "Locação não encontrada."
+            vistos.add(id_locacao)
+        return erros
 
     def validar_tudo(self, locacao: Locacao):
         self.validar_data_locacao(locacao.data_locacao)
         self.validar_data_devolucao(locacao.data_devolucao)
         self.validar_quantidade(locacao.quantidade)
         self.validar_duplicidade(locacao)
-        self.validar_estoque(locacao)
\ No newline at end of file
+        #O estoque não é conferido aqui, a baixa atômica é que decide (ver validar_reserva_estoque).
\ No newline at end of file
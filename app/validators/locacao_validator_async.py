@@ -0,0 +1,45 @@
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.locacao import Locacao
+from app.models.filmes import Filmes
+from app.utils import metricas
+from app.validators.locacao_validator import LocacaoValidator
+
+##Reaproveita as regras de data e quantidade do LocacaoValidator,
+##só a duplicidade (que consulta o banco) vira async.
+class LocacaoValidatorAsync(LocacaoValidator):
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def validar_duplicidade(self, locacao: Locacao):
+        result = await self.db.execute(select(Locacao).filter(
+            Locacao.id_cliente == locacao.id_cliente,
+            Locacao.id_filme == locacao.id_filme,
+            Locacao.data_locacao == locacao.data_locacao,
+            Locacao.devolvido == False
+        ))
+
+        if result.scalars().first():
+            raise HTTPException(status_code=400, detail="Já existe uma locação semelhante em aberto.")
+
+    async def validar_reserva_estoque(self, id_filme: int, estoque_restante: int | None):
+        if estoque_restante is not None:
+            return
+        result = await self.db.execute(select(Filmes.id_filme).filter(Filmes.id_filme == id_filme))
+        if not result.first():
+            raise HTTPException(
+                status_code=404,
+                detail="Filme não encontrado."
+            )
+        metricas.ESTOQUE_INSUFICIENTE.labels("unitaria").inc()
+        raise HTTPException(
+            status_code=400,
+            detail="Estoque insuficiente para essa locação."
+        )
+
+    async def validar_tudo(self, locacao: Locacao):
+        self.validar_data_locacao(locacao.data_locacao)
+        self.validar_data_devolucao(locacao.data_devolucao)
+        self.validar_quantidade(locacao.quantidade)
+        await self.validar_duplicidade(locacao)
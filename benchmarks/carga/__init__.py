@@ -0,0 +1,3 @@
+##Teste de carga da API dentro do processo: gera a base (dados.py), dispara requests concorrentes
+##com o httpx direto no app ASGI, sem rede nem servidor (driver.py), e resume, grava e compara os
+##resultados com uma baseline (resultados.py). Ver __main__.py pro uso.
@@ -0,0 +1,102 @@
+import itertools
+import random
+from datetime import date, timedelta
+
+from sqlalchemy import insert
+
+from app.database import Base
+from app.models import Cliente, Filmes, Locacao
+
+##Gerador da base do teste de carga: N clientes, M filmes e K locações. A popularidade segue uma
+##distribuição de Zipf (poucos filmes concentram a maior parte das locações, como numa locadora de
+##verdade), então históricos e cache são exercitados com a mesma assimetria de produção.
+##A mesma semente gera a mesma base e o mesmo sorteio, pra comparar execuções (o popular() consome
+##o sorteio da Populacao que recebe, então o driver usa uma Populacao nova com a mesma semente).
+
+PALAVRAS = ["Amor", "Guerra", "Noite", "Cidade", "Sombra", "Estrela", "Fogo", "Mar", "Tempo", "Segredo", "Caminho", "Sonho"]
+COMPLEMENTOS = ["Perdido", "Final", "Eterno", "Proibido", "Silencioso", "Vermelho", "Oculto", "Selvagem"]
+GENEROS = ["Drama", "Comédia", "Ação", "Terror", "Ficção científica", "Romance", "Animação", "Documentário"]
+
+
+class Zipf:
+    ##Sorteia IDs com peso 1/rank^s. Os ranks são embaralhados pra o filme mais popular não ser
+    ##sempre o de ID 1 (que também é o primeiro do índice).
+    def __init__(self, ids: list[int], s: float, rng: random.Random):
+        self.ids = list(ids)
+        rng.shuffle(self.ids)
+        self.acumulados = list(itertools.accumulate(1 / rank ** s for rank in range(1, len(self.ids) + 1)))
+        self.rng = rng
+
+    def sortear(self, quantidade: int = 1) -> list[int]:
+        return self.rng.choices(self.ids, cum_weights=self.acumulados, k=quantidade)
+
+    def um(self) -> int:
+        return self.sortear()[0]
+
+
+class Populacao:
+    ##Tamanho da base e as distribuições usadas tanto pra gerar as locações quanto pelo driver.
+    def __init__(self, clientes: int, filmes: int, locacoes: int, zipf_s: float = 1.1, semente: int = 42):
+        self.clientes = clientes
+        self.filmes = filmes
+        self.locacoes = locacoes
+        self.semente = semente
+        self.rng = random.Random(semente)
+        self.zipf_filmes = Zipf(range(1, filmes + 1), zipf_s, self.rng)
+        self.zipf_clientes = Zipf(range(1, clientes + 1), zipf_s * 0.7, self.rng) #Clientes fiéis, cauda mais longa.
+
+    def filme(self) -> int:
+        return self.zipf_filmes.um()
+
+    def cliente(self) -> int:
+        return self.zipf_clientes.um()
+
+    def cliente_qualquer(self) -> int:
+        return self.rng.randint(1, self.clientes)
+
+    def palavra(self) -> str:
+        return self.rng.choice(PALAVRAS)
+
+
+def nome_filme(id_filme: int) -> str:
+    return f"{PALAVRAS[id_filme % len(PALAVRAS)]} {COMPLEMENTOS[id_filme % len(COMPLEMENTOS)]} {id_filme}"
+
+
+def _em_lotes(linhas, tamanho: int):
+    iterador = iter(linhas)
+    while lote := list(itertools.islice(iterador, tamanho)):
+        yield lote
+
+
+def popular(engine, populacao: Populacao, lote: int = 20_000):
+    print(f"Populando: {populacao.clientes} clientes, {populacao.filmes} filmes, {populacao.locacoes} locações...")
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    hoje = date.today()
+    rng = random.Random(populacao.semente + 1)
+
+    clientes = ({
+        "id": i, "nome": f"Cliente {i}", "data_nascimento": date(1960, 1, 1) + timedelta(days=i % 15000),
+        "cpf": f"{i:011d}", "telefone": f"9{i:08d}", "email": f"cliente{i}@email.com", "endereco": f"Rua {i}, 100"
+    } for i in range(1, populacao.clientes + 1))
+    #Estoque grande: o teste mede latência, não quer ver o aluguel recusado por falta de cópia.
+    filmes = ({
+        "id_filme": i, "nome": nome_filme(i), "data_lancamento": date(1970, 1, 1) + timedelta(days=(i * 37) % 19000),
+        "diretor": f"Diretor {i % 500}", "genero": GENEROS[i % len(GENEROS)], "estoque": 1_000_000
+    } for i in range(1, populacao.filmes + 1))
+
+    def locacoes():
+        for id_filme, id_cliente in zip(populacao.zipf_filmes.sortear(populacao.locacoes),
+                                        populacao.zipf_clientes.sortear(populacao.locacoes)):
+            data_locacao = hoje - timedelta(days=rng.randint(1, 730))
+            data_devolucao = data_locacao + timedelta(days=7)
+            yield {
+                "id_cliente": id_cliente, "id_filme": id_filme, "data_locacao": data_locacao,
+                "data_devolucao": data_devolucao, "devolvido": data_devolucao < hoje or rng.random() < 0.5,
+                "quantidade": 1
+            }
+
+    with engine.begin() as conn:
+        for modelo, linhas in ((Cliente, clientes), (Filmes, filmes), (Locacao, locacoes())):
+            for parte in _em_lotes(linhas, lote):
+                conn.execute(insert(modelo), parte)
@@ -0,0 +1,74 @@
+import asyncio
+import random
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Callable, NamedTuple
+
+import httpx
+
+from benchmarks.carga.dados import Populacao
+
+##Driver de carga assíncrono: várias tarefas mandando requests ao app ASGI pelo httpx.ASGITransport,
+##no mesmo processo. Mede a pilha toda do FastAPI (roteamento, validação, service, banco,
+##serialização) sem ruído de rede. Cada tarefa sorteia o próximo endpoint pelo peso do cenário.
+
+
+class Cenario(NamedTuple):
+    nome: str #Template da rota, é a chave dos resultados.
+    peso: int
+    montar: Callable[[Populacao], tuple[str, str, dict | None]] #-> (método, caminho, corpo JSON)
+
+
+def _alugar(populacao: Populacao):
+    #Cliente uniforme (e não Zipf) pra não cair a toda hora na regra de locação duplicada no dia.
+    return "POST", "/locacao/alugar", {
+        "id_cliente": populacao.cliente_qualquer(), "id_filme": populacao.filme(), "quantidade": 1,
+        "data_devolucao": str(date.today() + timedelta(days=7)),
+    }
+
+
+CENARIOS = [
+    Cenario("GET /filmes/{id_filme}", 35, lambda p: ("GET", f"/filmes/{p.filme()}", None)),
+    Cenario("GET /filmes/nome/{nome}", 20, lambda p: ("GET", f"/filmes/nome/{p.palavra()}", None)),
+    Cenario("GET /clientes/{id}", 15, lambda p: ("GET", f"/clientes/{p.cliente()}", None)),
+    Cenario("GET /locacao/{idFilme}/historico", 15, lambda p: ("GET", f"/locacao/{p.filme()}/historico", None)),
+    Cenario("POST /locacao/alugar", 15, _alugar),
+]
+
+
+class Medicoes:
+    def __init__(self):
+        self.latencias_ms: dict[str, list[float]] = defaultdict(list)
+        self.status: dict[str, dict[int, int]] = defaultdict(lambda: defaultdict(int))
+
+    def registrar(self, nome: str, milissegundos: float, status: int):
+        self.latencias_ms[nome].append(milissegundos)
+        self.status[nome][status] += 1
+
+
+async def _trabalhador(cliente: httpx.AsyncClient, populacao: Populacao, cenarios: list[Cenario],
+                       rng: random.Random, fim_aquecimento: float, fim: float, medicoes: Medicoes):
+    pesos = [cenario.peso for cenario in cenarios]
+    while (agora := time.perf_counter()) < fim:
+        cenario = rng.choices(cenarios, weights=pesos)[0]
+        metodo, caminho, corpo = cenario.montar(populacao)
+        inicio = time.perf_counter()
+        resposta = await cliente.request(metodo, caminho, json=corpo)
+        if agora >= fim_aquecimento: #Durante o aquecimento (cache frio, pool vazio) não conta.
+            medicoes.registrar(cenario.nome, (time.perf_counter() - inicio) * 1000, resposta.status_code)
+
+
+async def rodar_carga(app, populacao: Populacao, concorrencia: int, duracao: float, aquecimento: float,
+                      cenarios: list[Cenario] = CENARIOS) -> Medicoes:
+    medicoes = Medicoes()
+    transporte = httpx.ASGITransport(app=app)
+    inicio = time.perf_counter()
+    fim_aquecimento, fim = inicio + aquecimento, inicio + aquecimento + duracao
+    async with httpx.AsyncClient(transport=transporte, base_url="http://carga") as cliente:
+        await asyncio.gather(*(
+            _trabalhador(cliente, populacao, cenarios, random.Random(populacao.semente + 100 + i),
+                         fim_aquecimento, fim, medicoes)
+            for i in range(concorrencia)
+        ))
+    return medicoes
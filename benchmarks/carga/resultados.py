@@ -0,0 +1,79 @@
+import json
+import math
+from datetime import datetime, timezone
+
+##Resumo das medições (percentis e vazão por endpoint), gravação em JSON e comparação com uma
+##baseline gravada antes. Regressão = latência p50/p95 pior ou vazão menor além da tolerância.
+
+METRICAS_LATENCIA = ("p50_ms", "p95_ms")
+
+
+def percentil(ordenados: list[float], p: float) -> float:
+    #Interpolação linear entre os vizinhos (o mesmo método padrão do numpy).
+    if not ordenados:
+        return 0.0
+    posicao = (len(ordenados) - 1) * p / 100
+    baixo, alto = math.floor(posicao), math.ceil(posicao)
+    return ordenados[baixo] + (ordenados[alto] - ordenados[baixo]) * (posicao - baixo)
+
+
+def resumir(latencias_ms: list[float], status: dict[int, int], duracao: float) -> dict:
+    ordenados = sorted(latencias_ms)
+    return {
+        "requisicoes": len(ordenados),
+        "recusadas_4xx": sum(n for codigo, n in status.items() if 400 <= codigo < 500),
+        "erros_5xx": sum(n for codigo, n in status.items() if codigo >= 500),
+        "rps": round(len(ordenados) / duracao, 2) if duracao else 0.0,
+        "media_ms": round(sum(ordenados) / len(ordenados), 3) if ordenados else 0.0,
+        "p50_ms": round(percentil(ordenados, 50), 3),
+        "p95_ms": round(percentil(ordenados, 95), 3),
+        "p99_ms": round(percentil(ordenados, 99), 3),
+        "max_ms": round(ordenados[-1], 3) if ordenados else 0.0,
+    }
+
+
+def montar_resultado(endpoints: dict[str, dict], parametros: dict) -> dict:
+    return {
+        "gerado_em": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "parametros": parametros,
+        "endpoints": endpoints,
+    }
+
+
+def salvar(resultado: dict, caminho: str):
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        json.dump(resultado, arquivo, ensure_ascii=False, indent=2)
+
+
+def carregar(caminho: str) -> dict:
+    with open(caminho, encoding="utf-8") as arquivo:
+        return json.load(arquivo)
+
+
+def comparar(atual: dict, baseline: dict, tolerancia: float) -> list[str]:
+    ##Devolve uma linha por regressão encontrada (lista vazia = nada piorou além da tolerância).
+    ##Endpoints que só existem de um lado são ignorados.
+    regressoes = []
+    for nome, base in baseline["endpoints"].items():
+        medido = atual["endpoints"].get(nome)
+        if medido is None:
+            continue
+        for metrica in METRICAS_LATENCIA:
+            if base[metrica] and medido[metrica] > base[metrica] * (1 + tolerancia):
+                regressoes.append(f"{nome}: {metrica} {base[metrica]:.2f} -> {medido[metrica]:.2f}")
+        if base["rps"] and medido["rps"] < base["rps"] * (1 - tolerancia):
+            regressoes.append(f"{nome}: rps {base['rps']:.1f} -> {medido['rps']:.1f}")
+        if medido["erros_5xx"] > base["erros_5xx"]:
+            regressoes.append(f"{nome}: erros_5xx {base['erros_5xx']} -> {medido['erros_5xx']}")
+    return regressoes
+
+
+def imprimir(resultado: dict, baseline: dict | None = None):
+    print(f"{'endpoint':<36} {'reqs':>7} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'4xx':>5} {'5xx':>5}")
+    for nome, medido in resultado["endpoints"].items():
+        linha = (f"{nome:<36} {medido['requisicoes']:>7} {medido['rps']:>8.1f} {medido['p50_ms']:>8.2f} "
+                 f"{medido['p95_ms']:>8.2f} {medido['p99_ms']:>8.2f} {medido['recusadas_4xx']:>5} {medido['erros_5xx']:>5}")
+        base = (baseline or {}).get("endpoints", {}).get(nome)
+        if base and base["p95_ms"]:
+            linha += f"   p95 {(medido['p95_ms'] / base['p95_ms'] - 1) * 100:+.1f}% vs baseline"
+        print(linha)
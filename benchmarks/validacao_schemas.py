@@ -0,0 +1,140 @@
+import argparse
+import statistics
+import time
+from datetime import date
+from types import SimpleNamespace
+from typing import Optional
+
+from pydantic import v1
+
+from app.schemas.cliente_create import ClienteCreate
+from app.schemas.cliente_response import ClienteResponse
+from app.schemas.filmes_create import FilmeCreate
+from app.schemas.filmes_response import FilmeResponse
+from app.schemas.locacao_create import LocacaoCreate
+from app.schemas.locacao_response import LocacaoResponse
+from app.utils.cpf import normalizar_cpf
+
+##Micro-benchmark da validação dos schemas: o trabalho de CPU que cada request paga no Pydantic.
+##  entrada:   corpo do POST (dict) -> XxxCreate
+##  resposta:  objeto do ORM -> XxxResponse (from_attributes) -> JSON
+##A coluna "v1" usa cópias dos schemas como eram antes da migração, escritas com o pydantic.v1
+##que vem junto do Pydantic 2, então as duas versões rodam no mesmo processo e nos mesmos dados.
+##
+##Uso:  python -m benchmarks.validacao_schemas --repeticoes 20000
+
+#Schemas da v1 (constr, validator pre=True, orm_mode), só pra comparação.
+class ClienteCreateV1(v1.BaseModel):
+    nome: v1.constr(min_length=3, max_length=100)
+    data_nascimento: date
+    cpf: v1.constr(regex=r'^\d{11}$')
+    telefone: v1.constr(min_length=8, max_length=15)
+    email: v1.EmailStr
+    endereco: v1.constr(min_length=5, max_length=100)
+
+    @v1.validator("cpf", pre=True)
+    def cpf_so_digitos(cls, cpf):
+        return normalizar_cpf(cpf)
+
+
+class ClienteResponseV1(ClienteCreateV1):
+    id: int
+    versao: Optional[int] = None
+
+    class Config:
+        orm_mode = True
+
+
+class FilmeCreateV1(v1.BaseModel):
+    nome: v1.constr(min_length=1, max_length=100)
+    data_lancamento: date
+    diretor: v1.constr(min_length=3, max_length=100)
+    genero: v1.constr(min_length=3, max_length=50)
+    estoque: v1.conint(ge=0)
+
+
+class FilmeResponseV1(FilmeCreateV1):
+    id_filme: int
+    versao: Optional[int] = None
+
+    class Config:
+        orm_mode = True
+
+
+class LocacaoCreateV1(v1.BaseModel):
+    id_cliente: v1.conint(ge=1, le=999999)
+    id_filme: v1.conint(ge=1, le=999999)
+    data_locacao: date
+    data_devolucao: date
+    quantidade: v1.conint(ge=1)
+    devolvido: bool
+
+
+class LocacaoResponseV1(v1.BaseModel):
+    id_locacao: int
+    id_cliente: int
+    id_filme: int
+    data_locacao: date
+    data_devolucao: date
+    devolvido: bool
+    quantidade: int
+
+    class Config:
+        orm_mode = True
+
+
+#Corpos como chegam no request (datas em texto, CPF formatado) e entidades como saem do ORM.
+CLIENTE = {"nome": "Bruce Wayne", "data_nascimento": "1980-02-19", "cpf": "123.456.789-00",
+           "telefone": "21999999999", "email": "bruce@wayne.com", "endereco": "Mansão Wayne, 1007"}
+FILME = {"nome": "Batman Begins", "data_lancamento": "2005-06-15", "diretor": "Christopher Nolan",
+         "genero": "Ação", "estoque": 10}
+LOCACAO = {"id_cliente": 1, "id_filme": 1, "data_locacao": "2025-08-01", "data_devolucao": "2025-08-08",
+           "quantidade": 1, "devolvido": False}
+
+CLIENTE_ORM = SimpleNamespace(id=1, versao=1, nome="Bruce Wayne", data_nascimento=date(1980, 2, 19),
+                              cpf="12345678900", telefone="21999999999", email="bruce@wayne.com",
+                              endereco="Mansão Wayne, 1007")
+FILME_ORM = SimpleNamespace(id_filme=1, versao=1, nome="Batman Begins", data_lancamento=date(2005, 6, 15),
+                            diretor="Christopher Nolan", genero="Ação", estoque=10)
+LOCACAO_ORM = SimpleNamespace(id_locacao=1, id_cliente=1, id_filme=1, data_locacao=date(2025, 8, 1),
+                              data_devolucao=date(2025, 8, 8), devolvido=False, quantidade=1)
+
+def casos():
+    ##Cada caso: nome, função v1, função v2. As duas fazem o mesmo trabalho.
+    return [
+        ("ClienteCreate", lambda: ClienteCreateV1(**CLIENTE), lambda: ClienteCreate(**CLIENTE)),
+        ("FilmeCreate", lambda: FilmeCreateV1(**FILME), lambda: FilmeCreate(**FILME)),
+        ("LocacaoCreate", lambda: LocacaoCreateV1(**LOCACAO), lambda: LocacaoCreate(**LOCACAO)),
+        ("ClienteResponse", lambda: ClienteResponseV1.from_orm(CLIENTE_ORM).json(),
+         lambda: ClienteResponse.model_validate(CLIENTE_ORM).model_dump_json()),
+        ("FilmeResponse", lambda: FilmeResponseV1.from_orm(FILME_ORM).json(),
+         lambda: FilmeResponse.model_validate(FILME_ORM).model_dump_json()),
+        ("LocacaoResponse", lambda: LocacaoResponseV1.from_orm(LOCACAO_ORM).json(),
+         lambda: LocacaoResponse.model_validate(LOCACAO_ORM).model_dump_json()),
+    ]
+
+def medir(funcao, repeticoes: int, rodadas: int = 5) -> float:
+    #Mediana de algumas rodadas, em microssegundos por chamada.
+    tempos = []
+    for _ in range(rodadas):
+        inicio = time.perf_counter()
+        for _ in range(repeticoes):
+            funcao()
+        tempos.append((time.perf_counter() - inicio) / repeticoes * 1_000_000)
+    return statistics.median(tempos)
+
+def main():
+    parser = argparse.ArgumentParser(description="Validação dos schemas: Pydantic v1 x v2.")
+    parser.add_argument("--repeticoes", type=int, default=20_000)
+    args = parser.parse_args()
+
+    print(f"mediana de 5 rodadas de {args.repeticoes} chamadas, µs por chamada\n")
+    print(f"{'schema':<18} {'v1':>8} {'v2':>8} {'economia':>10} {'ganho':>7}")
+    for nome, funcao_v1, funcao_v2 in casos():
+        #As duas versões têm que aceitar os mesmos dados, senão a comparação não vale.
+        funcao_v1(), funcao_v2()
+        antes, depois = medir(funcao_v1, args.repeticoes), medir(funcao_v2, args.repeticoes)
+        print(f"{nome:<18} {antes:>8.2f} {depois:>8.2f} {antes - depois:>8.2f}µs {antes / depois:>6.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.utils.cache import cache
+
+##Os testes de rota recriam o banco a cada teste e os IDs se repetem, então o cache de leitura
+##também começa vazio (e com os contadores zerados) em todo teste.
+@pytest.fixture(autouse=True)
+def limpar_cache():
+    cache.limpar()
+    yield
+    cache.limpar()
+
+##Orçamento de consultas: falha o teste se o trecho fizer mais consultas ao banco do que o máximo.
+##Pega qualquer Engine (inclusive a dos testes) e a thread do TestClient, e lista o SQL na falha.
+##Uso:
+##    with orcamento_consultas(3):
+##        client.get("/filmes/1")
+@pytest.fixture
+def orcamento_consultas():
+    @contextmanager
+    def orcamento(maximo: int):
+        consultas = []
+
+        def contar(conn, cursor, statement, parameters, context, executemany):
+            consultas.append(statement)
+
+        event.listen(Engine, "after_cursor_execute", contar)
+        try:
+            yield consultas
+        finally:
+            event.remove(Engine, "after_cursor_execute", contar)
+        if len(consultas) > maximo:
+            pytest.fail(f"{len(consultas)} consultas, orçamento de {maximo}:\n" + "\n".join(consultas))
+    return orcamento
@@ -0,0 +1,250 @@
+import asyncio
+import logging
+from datetime import date, timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+from app.database import Base, get_async_db
+from app.models.locacao import Locacao
+from app.routes import async_router
+from app.services.locacao_service_async import LocacaoServiceAsync
+from app.utils.disponibilidade import indice_disponibilidade
+
+#Loggings pra acompanhar as respostas.
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+##CONFIG do banco de dados pros testes do modo async (aiosqlite).
+##O engine síncrono só cria/derruba as tabelas no mesmo arquivo.
+engine = create_engine("sqlite:///./test_async.db", connect_args={"check_same_thread": False})
+##NullPool pq o TestClient abre um event loop novo por request e a conexão não pode ser reaproveitada entre loops.
+async_engine = create_async_engine("sqlite+aiosqlite:///./test_async.db", poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+async def override_get_async_db():
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
+#App só com os endpoints async, pra não depender da variável LOCADORA_ASYNC.
+app = FastAPI()
+app.include_router(async_router)
+app.dependency_overrides[get_async_db] = override_get_async_db
+client = TestClient(app)
+
+@pytest.fixture(autouse=True)
+def clean_db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield
+
+def criar_cliente():
+    return client.post("/clientes/salvar", json={
+        "nome": "Peter",
+        "data_nascimento": "2001-08-10",
+        "cpf": "12312312312",
+        "telefone": "988887777",
+        "email": "peter@email.com",
+        "endereco": "Queens, New York"
+    }).json()
+
+def criar_filme(estoque=3):
+    return client.post("/filmes/salvar", json={
+        "nome": "Spider-Man",
+        "data_lancamento": "2002-05-03",
+        "diretor": "Sam Raimi",
+        "genero": "Super-Herói",
+        "estoque": estoque
+    }).json()
+
+#Testes de integração das rotas async.
+def test_salvar_e_buscar_cliente_async():
+    logger.info("Iniciando teste: test_salvar_e_buscar_cliente_async")
+    novo = criar_cliente()
+    response = client.get(f"/clientes/{novo['id']}")
+    logger.info(f"GET /clientes/{novo['id']} retornou status {response.status_code}")
+    assert response.status_code == 200
+    assert response.json()["nome"] == "Peter"
+
+    response = client.put(f"/clientes/{novo['id']}/novoEmail", json={"email": "parker@email.com"})
+    assert response.status_code == 200
+    assert response.json()["email"] == "parker@email.com"
+    logger.info("Teste test_salvar_e_buscar_cliente_async finalizado com sucesso")
+
+def test_buscar_filme_por_nome_async():
+    logger.info("Iniciando teste: test_buscar_filme_por_nome_async")
+    criar_filme()
+    response = client.get("/filmes/nome/spider")
+    logger.info(f"GET /filmes/nome/spider retornou status {response.status_code}")
+    assert response.status_code == 200
+    assert response.json()["itens"][0]["nome"] == "Spider-Man"
+    logger.info("Teste test_buscar_filme_por_nome_async finalizado com sucesso")
+
+def test_alugar_filme_async():
+    logger.info("Iniciando teste: test_alugar_filme_async")
+    cliente = criar_cliente()
+    filme = criar_filme(estoque=2)
+    response = client.post("/locacao/alugar", json={
+        "id_cliente": cliente["id"],
+        "id_filme": filme["id"],
+        "quantidade": 2,
+        "data_devolucao": str(date.today() + timedelta(days=7))
+    })
+    logger.info(f"POST /locacao/alugar retornou status {response.status_code}")
+    assert response.status_code == 200
+    assert response.json()["id_filme"] == filme["id"]
+    assert client.get(f"/filmes/{filme['id']}").json()["estoque"] == 0
+
+    historico = client.get(f"/locacao/{filme['id']}/historico")
+    assert historico.status_code == 200
+    assert len(historico.json()["itens"]) == 1
+    logger.info("Teste test_alugar_filme_async finalizado com sucesso")
+
+def test_alugar_filme_sem_estoque_async():
+    logger.info("Iniciando teste: test_alugar_filme_sem_estoque_async")
+    cliente = criar_cliente()
+    filme = criar_filme(estoque=1)
+    response = client.post("/locacao/alugar", json={
+        "id_cliente": cliente["id"],
+        "id_filme": filme["id"],
+        "quantidade": 2,
+        "data_devolucao": str(date.today() + timedelta(days=7))
+    })
+    logger.info(f"POST /locacao/alugar retornou status {response.status_code}")
+    assert response.status_code == 400
+    logger.info("Teste test_alugar_filme_sem_estoque_async finalizado com sucesso")
+
+def test_alugar_lote_async():
+    logger.info("Iniciando teste: test_alugar_lote_async")
+    cliente = criar_cliente()
+    filme = criar_filme(estoque=2)
+    response = client.post("/locacao/alugar/lote", json={
+        "id_cliente": cliente["id"],
+        "data_devolucao": str(date.today() + timedelta(days=7)),
+        "itens": [{"id_filme": filme["id"], "quantidade": 2}, {"id_filme": 999999, "quantidade": 1}]
+    })
+    logger.info(f"POST /locacao/alugar/lote retornou status {response.status_code}")
+    assert response.status_code == 200
+    assert [item["sucesso"] for item in response.json()["itens"]] == [True, False]
+    assert client.get(f"/filmes/{filme['id']}").json()["estoque"] == 0
+    logger.info("Teste test_alugar_lote_async finalizado com sucesso")
+
+def test_exportar_locacoes_cliente_async():
+    logger.info("Iniciando teste: test_exportar_locacoes_cliente_async")
+    cliente = criar_cliente()
+    filme = criar_filme(estoque=2)
+    client.post("/locacao/alugar", json={
+        "id_cliente": cliente["id"], "id_filme": filme["id"], "quantidade": 1,
+        "data_devolucao": str(date.today() + timedelta(days=7))
+    })
+    response = client.get(f"/locacao/{cliente['id']}/locacoes/exportar", params={"formato": "csv"})
+    logger.info(f"GET /locacao/{cliente['id']}/locacoes/exportar retornou status {response.status_code}")
+    assert response.status_code == 200
+    linhas = response.text.splitlines()
+    assert len(linhas) == 2
+    assert linhas[1].startswith(f"1,{cliente['id']},{filme['id']},")
+    logger.info("Teste test_exportar_locacoes_cliente_async finalizado com sucesso")
+
+def test_multas_em_atraso_async():
+    logger.info("Iniciando teste: test_multas_em_atraso_async")
+    cliente = criar_cliente()
+    filme = criar_filme()
+    with Session(engine) as db: #Devolução no passado não passa pela API.
+        db.add(Locacao(id_cliente=cliente["id"], id_filme=filme["id"], quantidade=1, devolvido=False,
+                       data_locacao=date.today() - timedelta(days=10), data_devolucao=date.today() - timedelta(days=4)))
+        db.commit()
+    response = client.get("/locacao/multas", params={"id_cliente": cliente["id"]})
+    logger.info(f"GET /locacao/multas retornou status {response.status_code}")
+    assert response.status_code == 200
+    assert [(item["dias_atraso"], item["multa"]) for item in response.json()["itens"]] == [(4, 28.0)]
+    totais = client.get("/locacao/multas/clientes").json()["itens"]
+    assert totais == [{"id_cliente": cliente["id"], "locacoes_atrasadas": 1, "dias_atraso": 4, "multa_total": 28.0}]
+    logger.info("Teste test_multas_em_atraso_async finalizado com sucesso")
+
+def test_locacoes_atrasadas_async():
+    logger.info("Iniciando teste: test_locacoes_atrasadas_async")
+    cliente = criar_cliente()
+    filme = criar_filme()
+    with Session(engine) as db: #Devolução no passado não passa pela API.
+        locacao = Locacao(id_cliente=cliente["id"], id_filme=filme["id"], quantidade=1, devolvido=False,
+                          data_locacao=date.today() - timedelta(days=10), data_devolucao=date.today() - timedelta(days=4))
+        db.add(locacao)
+        db.commit()
+        id_locacao = locacao.id_locacao
+
+    async def virar_dia():
+        async with TestingAsyncSessionLocal() as db:
+            return await LocacaoServiceAsync(db).virar_dia_atrasadas()
+
+    assert asyncio.run(virar_dia()) == (1, 0)
+    response = client.get("/locacao/atrasadas")
+    logger.info(f"GET /locacao/atrasadas retornou status {response.status_code}")
+    assert [(item["id_locacao"], item["dias_atraso"]) for item in response.json()["itens"]] == [(id_locacao, 4)]
+    client.put(f"/locacao/{id_locacao}/renovarLocacao", json={"data_devolucao": str(date.today() + timedelta(days=7))})
+    assert client.get("/locacao/atrasadas").json()["itens"] == []
+    logger.info("Teste test_locacoes_atrasadas_async finalizado com sucesso")
+
+def test_devolver_locacao_async():
+    logger.info("Iniciando teste: test_devolver_locacao_async")
+    cliente = criar_cliente()
+    filme = criar_filme(estoque=2)
+    locacao = client.post("/locacao/alugar", json={
+        "id_cliente": cliente["id"], "id_filme": filme["id"], "quantidade": 2,
+        "data_devolucao": str(date.today() + timedelta(days=7))
+    }).json()
+    response = client.post(f"/locacao/{locacao['id_locacao']}/devolver")
+    logger.info(f"POST /locacao/{locacao['id_locacao']}/devolver retornou status {response.status_code}")
+    assert response.status_code == 200
+    assert response.json()["estoque"] == 2
+    assert client.post(f"/locacao/{locacao['id_locacao']}/devolver").status_code == 400
+
+    lote = client.post("/locacao/devolver/lote", json={"ids_locacao": [locacao["id_locacao"], 999999]}).json()
+    assert [item["erro"] for item in lote["itens"]] == ["Locação já devolvida.", "Locação não encontrada."]
+    assert client.get(f"/filmes/{filme['id']}").json()["estoque"] == 2
+    logger.info("Teste test_devolver_locacao_async finalizado com sucesso")
+
+def test_disponibilidade_async():
+    logger.info("Iniciando teste: test_disponibilidade_async")
+    indice_disponibilidade.limpar() #Global da app: pode ter sobrado de outro teste.
+    cliente = criar_cliente()
+    filme = criar_filme(estoque=2)
+    response = client.get("/filmes/disponibilidade", params={"ids": f"{filme['id']},999999"})
+    logger.info(f"GET /filmes/disponibilidade retornou status {response.status_code}")
+    assert response.status_code == 200
+    assert response.json() == {"itens": [{"id_filme": filme["id"], "estoque": 2, "disponivel": True}], "nao_encontrados": [999999]}
+
+    client.post("/locacao/alugar", json={
+        "id_cliente": cliente["id"], "id_filme": filme["id"], "quantidade": 2,
+        "data_devolucao": str(date.today() + timedelta(days=7))
+    })
+    item = client.get("/filmes/disponibilidade", params={"ids": str(filme["id"])}).json()["itens"][0]
+    assert (item["estoque"], item["disponivel"]) == (0, False)
+    indice_disponibilidade.limpar()
+    logger.info("Teste test_disponibilidade_async finalizado com sucesso")
+
+def test_nao_exclui_cliente_nem_filme_com_locacao_async():
+    logger.info("Iniciando teste: test_nao_exclui_cliente_nem_filme_com_locacao_async")
+    cliente = criar_cliente()
+    filme = criar_filme()
+    client.post("/locacao/alugar", json={
+        "id_cliente": cliente["id"], "id_filme": filme["id"], "quantidade": 1,
+        "data_devolucao": str(date.today() + timedelta(days=7))
+    })
+    response = client.delete(f"/filmes/{filme['id']}/deletar")
+    logger.info(f"DELETE /filmes/{filme['id']}/deletar retornou status {response.status_code}")
+    assert response.status_code == 409
+    assert client.delete(f"/clientes/{cliente['id']}/deletar").status_code == 409
+    assert client.get(f"/filmes/{filme['id']}").status_code == 200
+    logger.info("Teste test_nao_exclui_cliente_nem_filme_com_locacao_async finalizado com sucesso")
+
+def test_deletar_filme_async():
+    logger.info("Iniciando teste: test_deletar_filme_async")
+    filme = criar_filme()
+    response = client.delete(f"/filmes/{filme['id']}/deletar")
+    assert response.status_code == 204
+    assert client.get(f"/filmes/{filme['id']}").status_code == 404
+    logger.info("Teste test_deletar_filme_async finalizado com sucesso")
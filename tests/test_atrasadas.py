@@ -0,0 +1,119 @@
+import logging
+from datetime import date, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+from app.database import Base, get_db
+from app.main import app
+from app.models.cliente import Cliente
+from app.models.filmes import Filmes
+from app.models.locacao import Locacao
+from app.services.locacao_service import LocacaoService
+
+#Loggings pra acompanhar as respostas.
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine) #igual ao SessionLocal da app
+
+Base.metadata.create_all(bind=engine)
+
+def override_get_db():
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+app.dependency_overrides[get_db] = override_get_db
+client = TestClient(app)
+
+##Pra limpar o banco de dados conforme os testes ocorrerem..
+@pytest.fixture(autouse=True)
+def clean_db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield
+
+def criar_locacoes():
+    #Três locações do mesmo cliente: atrasada 5 dias, atrasada 2 dias e no prazo, mais uma atrasada
+    #já devolvida. Vão direto pro banco porque a API não aceita devolução no passado.
+    hoje = date.today()
+    db = TestingSessionLocal()
+    cliente = Cliente(nome="Arthur Curry", data_nascimento=date(1986, 1, 29), cpf="44455566677",
+                      telefone="11955556666", email="arthur@atlantida.com", endereco="Farol de Amnesty Bay, 1")
+    filme = Filmes(nome="Aquaman", data_lancamento=date(2018, 12, 13), diretor="James Wan",
+                   genero="Super-Heróis", estoque=10)
+    db.add_all([cliente, filme])
+    db.flush()
+    locacoes = [Locacao(id_cliente=cliente.id, id_filme=filme.id_filme, quantidade=1, devolvido=devolvido,
+                        data_locacao=hoje - timedelta(days=10), data_devolucao=hoje - timedelta(days=dias_atraso))
+                for dias_atraso, devolvido in ((5, False), (2, False), (-3, False), (4, True))]
+    db.add_all(locacoes)
+    db.commit()
+    ids = cliente.id, [locacao.id_locacao for locacao in locacoes]
+    db.close()
+    return ids
+
+def virar_dia():
+    with TestingSessionLocal() as db:
+        return LocacaoService(db).virar_dia_atrasadas()
+
+def ids_atrasadas(**params):
+    response = client.get("/locacao/atrasadas", params=params)
+    assert response.status_code == 200
+    return [item["id_locacao"] for item in response.json()["itens"]]
+
+#Testes da tabela de locações em atraso.
+def test_virada_do_dia_carrega_as_atrasadas():
+    logger.info("Iniciando teste: test_virada_do_dia_carrega_as_atrasadas")
+    id_cliente, ids = criar_locacoes()
+    assert ids_atrasadas() == [] #Ainda não rodou a virada.
+
+    assert virar_dia() == (2, 0)
+    response = client.get("/locacao/atrasadas", params={"id_cliente": id_cliente})
+    logger.info(f"GET /locacao/atrasadas retornou status {response.status_code}")
+    itens = response.json()["itens"]
+    assert [(item["id_locacao"], item["dias_atraso"]) for item in itens] == [(ids[0], 5), (ids[1], 2)]
+    assert virar_dia() == (0, 0) #Rodar de novo no mesmo dia não muda nada.
+    logger.info("Teste test_virada_do_dia_carrega_as_atrasadas finalizado com sucesso")
+
+def test_atrasadas_paginadas():
+    logger.info("Iniciando teste: test_atrasadas_paginadas")
+    _, ids = criar_locacoes()
+    virar_dia()
+    primeira = client.get("/locacao/atrasadas", params={"limit": 1}).json()
+    segunda = client.get("/locacao/atrasadas", params={"limit": 1, "after": primeira["next_cursor"]}).json()
+    assert [item["id_locacao"] for item in primeira["itens"] + segunda["itens"]] == ids[:2]
+    assert segunda["next_cursor"] is None
+    logger.info("Teste test_atrasadas_paginadas finalizado com sucesso")
+
+def test_renovar_e_deletar_tiram_da_lista_na_hora():
+    logger.info("Iniciando teste: test_renovar_e_deletar_tiram_da_lista_na_hora")
+    _, ids = criar_locacoes()
+    virar_dia()
+
+    response = client.put(f"/locacao/{ids[0]}/renovarLocacao", json={"data_devolucao": str(date.today() + timedelta(days=7))})
+    logger.info(f"PUT /locacao/{ids[0]}/renovarLocacao retornou status {response.status_code}")
+    assert response.status_code == 200
+    assert ids_atrasadas() == [ids[1]]
+
+    assert client.delete(f"/locacao/{ids[1]}/deletar").status_code == 204
+    assert ids_atrasadas() == []
+    assert virar_dia() == (0, 0) #A manutenção nas escritas já deixou tudo certo.
+    logger.info("Teste test_renovar_e_deletar_tiram_da_lista_na_hora finalizado com sucesso")
+
+def test_virada_do_dia_confere_o_que_mudou_por_fora():
+    logger.info("Iniciando teste: test_virada_do_dia_confere_o_que_mudou_por_fora")
+    _, ids = criar_locacoes()
+    virar_dia()
+    with TestingSessionLocal() as db: #Devolução gravada direto no banco, sem passar pelo service.
+        db.execute(update(Locacao).where(Locacao.id_locacao == ids[0]).values(devolvido=True))
+        db.commit()
+    assert virar_dia() == (0, 1)
+    assert ids_atrasadas() == [ids[1]]
+    logger.info("Teste test_virada_do_dia_confere_o_que_mudou_por_fora finalizado com sucesso")
@@ -0,0 +1,80 @@
+import logging
+from collections import namedtuple
+from datetime import date
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+from app.models import Filmes
+from app.repositories import busca_repository
+from app.utils.paginacao import decodificar_cursor
+
+#Loggings pra acompanhar as respostas.
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+Linha = namedtuple("Linha", ["filme", "relevancia"])
+
+def filme_fake(id_filme, nome):
+    return Filmes(id_filme=id_filme, nome=nome, data_lancamento=date(2000, 1, 1), diretor="Diretor", genero="Drama", estoque=1)
+
+def db_postgres(mocker, linhas):
+    db_mock = mocker.MagicMock()
+    db_mock.get_bind.return_value.dialect.name = "postgresql"
+    db_mock.execute.return_value.all.return_value = linhas
+    return db_mock
+
+def sql_executado(db_mock):
+    consulta = db_mock.execute.call_args[0][0]
+    return str(consulta.compile(dialect=postgresql.psycopg2.dialect()))
+
+def test_busca_postgres_usa_trigramas_e_relevancia(mocker):
+    logger.info("Iniciando teste: test_busca_postgres_usa_trigramas_e_relevancia")
+    linhas = [Linha(filme_fake(3, "Matrix"), 1.0), Linha(filme_fake(1, "Matrix Reloaded"), 0.5), Linha(filme_fake(2, "Animatrix"), 0.5)]
+    db_mock = db_postgres(mocker, linhas)
+
+    filmes, next_cursor = busca_repository.buscar_filmes(db_mock, "nome", "matrix", limit=2)
+
+    sql = sql_executado(db_mock)
+    logger.info(f"SQL gerado: {sql}")
+    assert "similarity(filmes.nome" in sql
+    assert "filmes.nome %% " in sql #operador de trigramas do pg_trgm
+    assert "ORDER BY similarity(filmes.nome, %(similarity_1)s) DESC, filmes.id_filme" in sql
+    assert [f.id_filme for f in filmes] == [3, 1]
+    assert decodificar_cursor(next_cursor) == [0.5, 1]
+    logger.info("Teste test_busca_postgres_usa_trigramas_e_relevancia finalizado com sucesso")
+
+def test_busca_postgres_continua_do_cursor(mocker):
+    logger.info("Iniciando teste: test_busca_postgres_continua_do_cursor")
+    db_mock = db_postgres(mocker, [Linha(filme_fake(2, "Animatrix"), 0.5)])
+    primeira_cursor = busca_repository.codificar_cursor(0.5, 1)
+
+    filmes, next_cursor = busca_repository.buscar_filmes(db_mock, "diretor", "wachowski", limit=2, after=primeira_cursor)
+
+    sql = sql_executado(db_mock)
+    assert "similarity(filmes.diretor" in sql
+    assert "filmes.id_filme >" in sql
+    assert [f.id_filme for f in filmes] == [2]
+    assert next_cursor is None
+    logger.info("Teste test_busca_postgres_continua_do_cursor finalizado com sucesso")
+
+def test_busca_postgres_cursor_invalido(mocker):
+    logger.info("Iniciando teste: test_busca_postgres_cursor_invalido")
+    db_mock = db_postgres(mocker, [])
+    with pytest.raises(HTTPException) as erro:
+        busca_repository.buscar_clientes_por_nome(db_mock, "ana", after=busca_repository.codificar_cursor(7))
+    assert erro.value.status_code == 400
+    logger.info("Teste test_busca_postgres_cursor_invalido finalizado com sucesso")
+
+def test_busca_sqlite_cai_no_ilike(mocker):
+    logger.info("Iniciando teste: test_busca_sqlite_cai_no_ilike")
+    db_mock = mocker.MagicMock()
+    db_mock.get_bind.return_value.dialect.name = "sqlite"
+    fallback = mocker.patch.object(busca_repository.filmes_repository, "get_by_genero_contendo", return_value=([filme_fake(5, "Up")], 5))
+
+    filmes, next_cursor = busca_repository.buscar_filmes(db_mock, "genero", "anim", limit=1)
+
+    fallback.assert_called_once_with(db_mock, "anim", 1, None)
+    assert decodificar_cursor(next_cursor) == [5]
+    db_mock.execute.assert_not_called()
+    logger.info("Teste test_busca_sqlite_cai_no_ilike finalizado com sucesso")
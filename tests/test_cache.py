@@ -0,0 +1,136 @@
+import asyncio
+import logging
+import threading
+
+from app.schemas.filmes_response import FilmeResponse
+from app.utils.cache import CacheMemoria, CacheRedis, RedisFalso, CacheLeitura
+
+#Loggings pra acompanhar as respostas.
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+class RelogioFalso:
+    def __init__(self):
+        self.agora = 0.0
+
+    def __call__(self):
+        return self.agora
+
+def filme_resposta(id_filme=1, estoque=3):
+    return FilmeResponse(id_filme=id_filme, nome="Oppenheimer", data_lancamento="2023-07-20",
+                         diretor="Christopher Nolan", genero="Drama", estoque=estoque)
+
+#Testes do cache de leitura.
+def test_cache_memoria_descarta_o_menos_usado_e_expira():
+    logger.info("Iniciando teste: test_cache_memoria_descarta_o_menos_usado_e_expira")
+    relogio = RelogioFalso()
+    backend = CacheMemoria(maximo=2, ttl=10, relogio=relogio)
+
+    backend.set("a", "1")
+    backend.set("b", "2")
+    backend.get("a") #"a" foi usado por último, então quem sai é o "b".
+    backend.set("c", "3")
+    assert backend.get("b") is None
+    assert backend.get("a") == "1"
+
+    relogio.agora = 11
+    assert backend.get("a") is None
+    assert backend.get("c") is None
+    logger.info("Teste test_cache_memoria_descarta_o_menos_usado_e_expira finalizado com sucesso")
+
+def test_cache_redis_com_redis_falso():
+    logger.info("Iniciando teste: test_cache_redis_com_redis_falso")
+    relogio = RelogioFalso()
+    redis = RedisFalso(relogio=relogio)
+    redis.set("outra_app:chave", "fica")
+    backend = CacheRedis(redis, ttl=5)
+
+    backend.set("filme:1", "{}")
+    assert backend.get("filme:1") == "{}"
+    assert redis.get("locadora:filme:1") == b"{}"
+
+    backend.delete("filme:1")
+    assert backend.get("filme:1") is None
+
+    backend.set("filme:2", "{}")
+    relogio.agora = 6
+    assert backend.get("filme:2") is None
+
+    backend.set("filme:3", "{}")
+    backend.limpar()
+    assert backend.get("filme:3") is None
+    assert redis.get("outra_app:chave") == b"fica" #limpar só mexe nas chaves da locadora.
+    logger.info("Teste test_cache_redis_com_redis_falso finalizado com sucesso")
+
+def test_cache_leitura_conta_acertos_faltas_e_invalidacoes():
+    logger.info("Iniciando teste: test_cache_leitura_conta_acertos_faltas_e_invalidacoes")
+    cache = CacheLeitura(CacheRedis(RedisFalso(), ttl=60), "redis")
+    carregamentos = []
+
+    def carregar():
+        carregamentos.append(1)
+        return filme_resposta()
+
+    primeira = cache.buscar("filme:1", FilmeResponse, carregar)
+    segunda = cache.buscar("filme:1", FilmeResponse, carregar)
+    assert primeira == segunda
+    assert len(carregamentos) == 1
+
+    cache.invalidar("filme:1")
+    cache.buscar("filme:1", FilmeResponse, carregar)
+    assert len(carregamentos) == 2
+
+    resumo = cache.resumo()
+    logger.info(f"Resumo do cache: {resumo}")
+    assert (resumo["acertos"], resumo["faltas"], resumo["invalidacoes"]) == (1, 2, 1)
+    logger.info("Teste test_cache_leitura_conta_acertos_faltas_e_invalidacoes finalizado com sucesso")
+
+def test_cache_leitura_nao_guarda_nao_encontrado_e_sobrevive_a_falha():
+    logger.info("Iniciando teste: test_cache_leitura_nao_guarda_nao_encontrado_e_sobrevive_a_falha")
+    cache = CacheLeitura(CacheMemoria(maximo=10, ttl=60), "memoria")
+    assert cache.buscar("filme:9", FilmeResponse, lambda: None) is None
+    assert cache.buscar("filme:9", FilmeResponse, lambda: filme_resposta(9)).id_filme == 9
+
+    class BackendFora:
+        def get(self, chave):
+            raise ConnectionError("redis fora do ar")
+        set = delete = get
+
+    cache = CacheLeitura(BackendFora(), "redis")
+    assert cache.buscar("filme:1", FilmeResponse, filme_resposta).id_filme == 1
+    assert cache.resumo()["erros"] == 2 #Leitura e gravação falharam, mas o request foi atendido.
+    logger.info("Teste test_cache_leitura_nao_guarda_nao_encontrado_e_sobrevive_a_falha finalizado com sucesso")
+
+def test_cache_async_nao_chama_o_redis_no_event_loop():
+    logger.info("Iniciando teste: test_cache_async_nao_chama_o_redis_no_event_loop")
+    threads = []
+
+    class RedisQueRegistraAThread(RedisFalso):
+        def get(self, chave):
+            threads.append(threading.get_ident())
+            return super().get(chave)
+
+        def set(self, chave, valor, ex=None):
+            threads.append(threading.get_ident())
+            return super().set(chave, valor, ex)
+
+        def delete(self, *chaves):
+            threads.append(threading.get_ident())
+            return super().delete(*chaves)
+
+    cache = CacheLeitura(CacheRedis(RedisQueRegistraAThread(), ttl=60), "redis")
+
+    async def carregar():
+        return filme_resposta()
+
+    async def usar_o_cache():
+        #O loop tem que continuar livre enquanto o Redis responde.
+        assert (await cache.buscar_async("filme:1", FilmeResponse, carregar)).id_filme == 1
+        await cache.invalidar_async("filme:1")
+        return threading.get_ident()
+
+    thread_do_loop = asyncio.run(usar_o_cache())
+    assert len(threads) == 3 #get, set e delete.
+    assert thread_do_loop not in threads
+    assert cache.resumo()["invalidacoes"] == 1
+    logger.info("Teste test_cache_async_nao_chama_o_redis_no_event_loop finalizado com sucesso")
@@ -13,7 +13,7 @@ logger = logging.getLogger(__name__)
 ##CONFIG do banco de dados pros testes.
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
 engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine) #igual ao SessionLocal da app
 
 #Tabelas criadas pros testes.
 Base.metadata.create_all(bind=engine)
@@ -80,7 +80,7 @@ def test_buscar_cliente_por_nome():
     response = client.get("/clientes/nome/Mayra")
     logger.info(f"GET /clientes/nome/Mayra retornou status {response.status_code}")
     assert response.status_code == 200
-    assert any(c["nome"] == "Mayra" for c in response.json())
+    assert any(c["nome"] == "Mayra" for c in response.json()["itens"])
     logger.info("Teste test_buscar_cliente_por_nome finalizado com sucesso")
 
 def test_buscar_cliente_por_cpf():
@@ -99,6 +99,53 @@ def test_buscar_cliente_por_cpf():
     assert response.json()["cpf"] == "99999999999"
     logger.info("Teste test_buscar_cliente_por_cpf finalizado com sucesso")
 
+def test_buscar_cliente_por_cpf_formatado():
+    logger.info("Iniciando teste: test_buscar_cliente_por_cpf_formatado")
+    client.post("/clientes/salvar", json={
+        "nome": "Clark",
+        "data_nascimento": "1978-06-18",
+        "cpf": "123.456.789-00",
+        "telefone": "987654321",
+        "email": "clark@email.com",
+        "endereco": "Smallville, fazenda Kent"
+    })
+    #Salvo só com dígitos, e um pedaço do CPF não pode achar ninguém.
+    response = client.get("/clientes/cpf/12345678900")
+    logger.info(f"GET /clientes/cpf/12345678900 retornou status {response.status_code}")
+    assert response.status_code == 200
+    assert response.json()["cpf"] == "12345678900"
+    assert client.get("/clientes/cpf/4567").status_code == 404
+    logger.info("Teste test_buscar_cliente_por_cpf_formatado finalizado com sucesso")
+
+def test_buscar_cliente_por_prefixo_cpf_paginado():
+    logger.info("Iniciando teste: test_buscar_cliente_por_prefixo_cpf_paginado")
+    for i in range(3):
+        client.post("/clientes/salvar", json={
+            "nome": f"Diana {i}",
+            "data_nascimento": "1985-03-22",
+            "cpf": f"4440000000{i}",
+            "telefone": f"55500000{i}",
+            "email": f"diana{i}@email.com",
+            "endereco": "Themyscira, ilha"
+        })
+    client.post("/clientes/salvar", json={
+        "nome": "Outro",
+        "data_nascimento": "1985-03-22",
+        "cpf": "44500000000",
+        "telefone": "555000009",
+        "email": "outro@email.com",
+        "endereco": "Themyscira, ilha"
+    })
+    primeira = client.get("/clientes/cpf/prefixo/444", params={"limit": 2})
+    logger.info(f"GET /clientes/cpf/prefixo/444 retornou status {primeira.status_code}")
+    assert primeira.status_code == 200
+    assert [c["cpf"] for c in primeira.json()["itens"]] == ["44400000000", "44400000001"]
+    segunda = client.get("/clientes/cpf/prefixo/444", params={"limit": 2, "after": primeira.json()["next_cursor"]})
+    assert [c["cpf"] for c in segunda.json()["itens"]] == ["44400000002"]
+    assert segunda.json()["next_cursor"] is None
+    assert client.get("/clientes/cpf/prefixo/44a").status_code == 422
+    logger.info("Teste test_buscar_cliente_por_prefixo_cpf_paginado finalizado com sucesso")
+
 def test_atualizar_cliente():
     logger.info("Iniciando teste: test_atualizar_cliente")
     novo = client.post("/clientes/salvar", json={
@@ -118,6 +165,30 @@ def test_atualizar_cliente():
     assert response.json()["nome"] == "Clark Kent"
     logger.info("Teste test_atualizar_cliente finalizado com sucesso")
 
+def test_atualizar_cliente_com_etag():
+    logger.info("Iniciando teste: test_atualizar_cliente_com_etag")
+    novo = client.post("/clientes/salvar", json={
+        "nome": "Bruce",
+        "data_nascimento": "1972-02-19",
+        "cpf": "55544433322",
+        "telefone": "911112222",
+        "email": "bruce@email.com",
+        "endereco": "Gotham City"
+    }).json()
+    etag = client.get(f"/clientes/{novo['id']}").headers["ETag"]
+    assert client.get(f"/clientes/{novo['id']}", headers={"If-None-Match": etag}).status_code == 304
+
+    response = client.put(f"/clientes/{novo['id']}", json={"nome": "Bruce Wayne"}, headers={"If-Match": etag})
+    logger.info(f"PUT /clientes/{novo['id']} com If-Match retornou status {response.status_code}")
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+    #Segundo PUT com o mesmo ETag: alguém já alterou, então 412 e nada muda.
+    response = client.put(f"/clientes/{novo['id']}", json={"nome": "Batman"}, headers={"If-Match": etag})
+    assert response.status_code == 412
+    assert client.get(f"/clientes/{novo['id']}", headers={"If-None-Match": etag}).json()["nome"] == "Bruce Wayne"
+    logger.info("Teste test_atualizar_cliente_com_etag finalizado com sucesso")
+
 def test_alterar_telefone():
     logger.info("Iniciando teste: test_alterar_telefone")
     novo = client.post("/clientes/salvar", json={
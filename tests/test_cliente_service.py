@@ -29,9 +29,10 @@ def test_salvar_cliente(mocker):
     db_mock.add = mocker.MagicMock()
     db_mock.commit = mocker.MagicMock()
 
-    def refresh_side_effect(obj):
-        obj.id = 1
-    db_mock.refresh = mocker.MagicMock(side_effect=refresh_side_effect)
+    def flush_side_effect():
+        #O flush é que manda o INSERT e preenche o id gerado pelo banco.
+        db_mock.add.call_args.args[0].id = 1
+    db_mock.flush = mocker.MagicMock(side_effect=flush_side_effect)
 
     service = ClienteService(db_mock)
 
@@ -50,8 +51,9 @@ def test_salvar_cliente(mocker):
     assert response.id == 1
     assert response.nome == "Junior"
     db_mock.add.assert_called_once()
+    db_mock.flush.assert_called_once()
     db_mock.commit.assert_called_once()
-    db_mock.refresh.assert_called_once()
+    db_mock.refresh.assert_not_called() #expire_on_commit=False: sem SELECT depois do commit.
     logger.info("Teste test_salvar_cliente finalizado com sucesso")
 
 def test_buscar_por_id_cliente_existente(mocker):
@@ -117,7 +119,7 @@ def test_alterar_email_sucesso(mocker):
     logger.info(f"Email atualizado para: {result.email}")
     assert result.email == novo_email
     db_mock.commit.assert_called_once()
-    db_mock.refresh.assert_called_once_with(cliente)
+    db_mock.refresh.assert_not_called() #expire_on_commit=False: sem SELECT depois do commit.
     logger.info("Teste test_alterar_email_sucesso finalizado com sucesso")
 
 def test_alterar_telefone_sucesso(mocker):
@@ -144,7 +146,7 @@ def test_alterar_telefone_sucesso(mocker):
     logger.info(f"Telefone atualizado para: {result.telefone}")
     assert result.telefone == novo_telefone
     db_mock.commit.assert_called_once()
-    db_mock.refresh.assert_called_once_with(cliente)
+    db_mock.refresh.assert_not_called() #expire_on_commit=False: sem SELECT depois do commit.
     logger.info("Teste test_alterar_telefone_sucesso finalizado com sucesso")
 
 def test_alterar_endereco_sucesso(mocker):
@@ -168,7 +170,7 @@ def test_alterar_endereco_sucesso(mocker):
     logger.info(f"Endereço atualizado para: {result.endereco}")
     assert result.endereco == novo_endereco
     db_mock.commit.assert_called_once()
-    db_mock.refresh.assert_called_once_with(cliente)
+    db_mock.refresh.assert_not_called() #expire_on_commit=False: sem SELECT depois do commit.
     logger.info("Teste test_alterar_endereco_sucesso finalizado com sucesso")
 
 def test_atualizar_cliente_sucesso(mocker):
@@ -202,7 +204,7 @@ def test_atualizar_cliente_sucesso(mocker):
     assert result.email == "atualizado@email.com"
     assert result.endereco == "Rua Atualizada"
     db_mock.commit.assert_called_once()
-    db_mock.refresh.assert_called_once_with(cliente)
+    db_mock.refresh.assert_not_called() #expire_on_commit=False: sem SELECT depois do commit.
     logger.info("Teste test_atualizar_cliente_sucesso finalizado com sucesso")
 
 def test_deletar_cliente_sucesso(mocker):
@@ -218,6 +220,7 @@ def test_deletar_cliente_sucesso(mocker):
 
     db_mock.delete = mocker.MagicMock()
     db_mock.commit = mocker.MagicMock()
+    db_mock.scalar.return_value = False #Sem locações.
 
     service = ClienteService(db_mock)
     result = service.deletar(1)
@@ -227,3 +230,19 @@ def test_deletar_cliente_sucesso(mocker):
     db_mock.commit.assert_called_once()
     assert result is None
     logger.info("Teste test_deletar_cliente_sucesso finalizado com sucesso")
+
+def test_deletar_cliente_com_locacoes(mocker):
+    logger.info("Iniciando teste: test_deletar_cliente_com_locacoes")
+    db_mock = mocker.MagicMock()
+    db_mock.query.return_value.filter.return_value.first.return_value = cliente_fake()
+    db_mock.scalar.return_value = True #Tem locação: a FK é RESTRICT.
+
+    service = ClienteService(db_mock)
+    with pytest.raises(HTTPException) as exc:
+        service.deletar(1)
+
+    logger.info(f"Erro retornado: {exc.value.detail}")
+    assert exc.value.status_code == 409
+    db_mock.delete.assert_not_called()
+    db_mock.commit.assert_not_called()
+    logger.info("Teste test_deletar_cliente_com_locacoes finalizado com sucesso")
@@ -0,0 +1,124 @@
+import logging
+from datetime import date, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app import config
+from app.database import Base, get_db
+from app.main import app
+from app.models.cliente import Cliente
+from app.models.filmes import Filmes
+from app.utils.contexto import Requisicao
+from app.utils.detector_consultas import inspecionar_consulta, avisar_repeticoes
+
+#Loggings pra acompanhar as respostas.
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine) #igual ao SessionLocal da app
+
+Base.metadata.create_all(bind=engine)
+
+def override_get_db():
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+app.dependency_overrides[get_db] = override_get_db
+client = TestClient(app)
+
+##Pra limpar o banco de dados conforme os testes ocorrerem..
+@pytest.fixture(autouse=True)
+def clean_db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield
+
+def criar_cliente_e_filmes(*estoques):
+    db = TestingSessionLocal()
+    cliente = Cliente(nome="Diana Prince", data_nascimento=date(1984, 3, 22), cpf="32132132132",
+                      telefone="11977776666", email="diana@themyscira.com", endereco="Ilha de Themyscira, 1")
+    filmes = [Filmes(nome=f"Mulher-Maravilha {i}", data_lancamento=date(2017, 6, 1), diretor="Patty Jenkins",
+                     genero="Super-Heróis", estoque=estoque) for i, estoque in enumerate(estoques, start=1)]
+    db.add_all([cliente, *filmes])
+    db.commit()
+    ids = cliente.id, [filme.id_filme for filme in filmes]
+    db.close()
+    return ids
+
+#Orçamento de consultas por endpoint: se uma mudança aumentar, o teste mostra o SQL a mais.
+def test_orcamento_alugar_filme(orcamento_consultas):
+    logger.info("Iniciando teste: test_orcamento_alugar_filme")
+    id_cliente, (id_filme,) = criar_cliente_e_filmes(3)
+    #Cliente (cache), duplicidade, baixa de estoque e INSERT.
+    with orcamento_consultas(4):
+        response = client.post("/locacao/alugar", json={"id_cliente": id_cliente, "id_filme": id_filme, "quantidade": 1,
+                                                        "data_devolucao": str(date.today() + timedelta(days=7))})
+    logger.info(f"POST /locacao/alugar retornou status {response.status_code}")
+    assert response.status_code == 200
+    logger.info("Teste test_orcamento_alugar_filme finalizado com sucesso")
+
+def test_orcamento_alugar_lote_nao_cresce_com_os_itens(orcamento_consultas):
+    logger.info("Iniciando teste: test_orcamento_alugar_lote_nao_cresce_com_os_itens")
+    id_cliente, ids_filme = criar_cliente_e_filmes(3, 3, 3, 3, 3)
+    #Cliente, estoques, em aberto, UPDATE com CASE e INSERT: o mesmo pra 1 ou 5 itens.
+    with orcamento_consultas(5):
+        response = client.post("/locacao/alugar/lote", json={
+            "id_cliente": id_cliente,
+            "data_devolucao": str(date.today() + timedelta(days=7)),
+            "itens": [{"id_filme": id_filme, "quantidade": 1} for id_filme in ids_filme]
+        })
+    assert all(item["sucesso"] for item in response.json()["itens"])
+    logger.info("Teste test_orcamento_alugar_lote_nao_cresce_com_os_itens finalizado com sucesso")
+
+def test_orcamento_buscar_filme_em_cache(orcamento_consultas):
+    logger.info("Iniciando teste: test_orcamento_buscar_filme_em_cache")
+    _, (id_filme,) = criar_cliente_e_filmes(1)
+    with orcamento_consultas(1):
+        client.get(f"/filmes/{id_filme}")
+    with orcamento_consultas(0): #Segunda vez vem do cache.
+        client.get(f"/filmes/{id_filme}")
+    logger.info("Teste test_orcamento_buscar_filme_em_cache finalizado com sucesso")
+
+def test_orcamento_estourado_lista_as_consultas(orcamento_consultas):
+    logger.info("Iniciando teste: test_orcamento_estourado_lista_as_consultas")
+    _, (id_filme,) = criar_cliente_e_filmes(1)
+    with pytest.raises(pytest.fail.Exception, match="1 consultas, orçamento de 0:\nSELECT"):
+        with orcamento_consultas(0):
+            client.get(f"/filmes/{id_filme}")
+    logger.info("Teste test_orcamento_estourado_lista_as_consultas finalizado com sucesso")
+
+#Detector de consultas lentas e N+1.
+def test_consulta_lenta_logada_com_parametros(monkeypatch, caplog):
+    logger.info("Iniciando teste: test_consulta_lenta_logada_com_parametros")
+    _, (id_filme,) = criar_cliente_e_filmes(1)
+    monkeypatch.setattr(config, "SQL_INSTRUMENTACAO", True)
+    monkeypatch.setattr(config, "SQL_LENTA_MS", 0) #Qualquer consulta conta como lenta.
+
+    with caplog.at_level(logging.WARNING, logger="locadora"):
+        client.get(f"/filmes/{id_filme}")
+    lentas = [r.getMessage() for r in caplog.records if r.getMessage().startswith("Consulta lenta")]
+    assert len(lentas) == 1
+    assert "FROM filmes" in lentas[0] and f"parâmetros: ({id_filme}," in lentas[0]
+    logger.info("Teste test_consulta_lenta_logada_com_parametros finalizado com sucesso")
+
+def test_mesma_consulta_repetida_no_request_vira_aviso_de_n_mais_1(monkeypatch, caplog):
+    logger.info("Iniciando teste: test_mesma_consulta_repetida_no_request_vira_aviso_de_n_mais_1")
+    monkeypatch.setattr(config, "SQL_LENTA_MS", 1000)
+    monkeypatch.setattr(config, "SQL_REPETICOES_N1", 3)
+    requisicao = Requisicao("teste", {})
+    for id_filme in (1, 2, 3):
+        inspecionar_consulta(requisicao, "SELECT * FROM filmes WHERE id_filme = ?", (id_filme,), 0.001)
+    inspecionar_consulta(requisicao, "SELECT * FROM cliente WHERE id = ?", (1,), 0.001)
+
+    with caplog.at_level(logging.WARNING, logger="locadora"):
+        avisar_repeticoes(requisicao)
+    avisos = [r.getMessage() for r in caplog.records if r.name == "locadora"]
+    assert avisos == ["Possível N+1: mesma consulta 3 vezes no request: SELECT * FROM filmes WHERE id_filme = ?"]
+    logger.info("Teste test_mesma_consulta_repetida_no_request_vira_aviso_de_n_mais_1 finalizado com sucesso")
@@ -0,0 +1,135 @@
+import logging
+from datetime import date, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.database import Base, get_db
+from app.main import app
+from app.models.cliente import Cliente
+from app.models.filmes import Filmes
+from app.models.locacao import Locacao
+from app.services.locacao_service import LocacaoService
+
+#Loggings pra acompanhar as respostas.
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine) #igual ao SessionLocal da app
+
+Base.metadata.create_all(bind=engine)
+
+def override_get_db():
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+app.dependency_overrides[get_db] = override_get_db
+client = TestClient(app)
+
+##Pra limpar o banco de dados conforme os testes ocorrerem..
+@pytest.fixture(autouse=True)
+def clean_db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield
+
+def criar_cliente_e_filmes(*estoques):
+    db = TestingSessionLocal()
+    cliente = Cliente(nome="Barry Allen", data_nascimento=date(1989, 3, 14), cpf="77788899900",
+                      telefone="11922223333", email="barry@ccpd.com", endereco="Central City, 42")
+    filmes = [Filmes(nome=f"The Flash {i}", data_lancamento=date(2023, 6, 15), diretor="Andy Muschietti",
+                     genero="Super-Heróis", estoque=estoque) for i, estoque in enumerate(estoques, start=1)]
+    db.add_all([cliente, *filmes])
+    db.commit()
+    ids = cliente.id, [filme.id_filme for filme in filmes]
+    db.close()
+    return ids
+
+def alugar(id_cliente, id_filme, quantidade=1):
+    response = client.post("/locacao/alugar", json={"id_cliente": id_cliente, "id_filme": id_filme, "quantidade": quantidade,
+                                                    "data_devolucao": str(date.today() + timedelta(days=7))})
+    assert response.status_code == 200
+    return response.json()["id_locacao"]
+
+def estoque(id_filme):
+    return client.get(f"/filmes/{id_filme}").json()["estoque"]
+
+#Testes da devolução.
+def test_devolver_repoe_o_estoque_uma_vez_so():
+    logger.info("Iniciando teste: test_devolver_repoe_o_estoque_uma_vez_so")
+    id_cliente, (id_filme,) = criar_cliente_e_filmes(3)
+    id_locacao = alugar(id_cliente, id_filme, quantidade=2)
+    assert estoque(id_filme) == 1
+
+    response = client.post(f"/locacao/{id_locacao}/devolver")
+    logger.info(f"POST /locacao/{id_locacao}/devolver retornou status {response.status_code}")
+    assert response.status_code == 200
+    assert response.json() == {"id_locacao": id_locacao, "id_filme": id_filme, "quantidade": 2, "estoque": 3, "multa": 0.0}
+    assert estoque(id_filme) == 3
+
+    segunda = client.post(f"/locacao/{id_locacao}/devolver")
+    assert segunda.status_code == 400
+    assert segunda.json()["detail"] == "Locação já devolvida."
+    assert estoque(id_filme) == 3 #Não repôs de novo.
+    logger.info("Teste test_devolver_repoe_o_estoque_uma_vez_so finalizado com sucesso")
+
+def test_devolver_locacao_inexistente():
+    logger.info("Iniciando teste: test_devolver_locacao_inexistente")
+    response = client.post("/locacao/999999/devolver")
+    logger.info(f"POST /locacao/999999/devolver retornou status {response.status_code}")
+    assert response.status_code == 404
+    logger.info("Teste test_devolver_locacao_inexistente finalizado com sucesso")
+
+def test_devolver_atrasada_cobra_multa_e_sai_das_atrasadas():
+    logger.info("Iniciando teste: test_devolver_atrasada_cobra_multa_e_sai_das_atrasadas")
+    id_cliente, (id_filme,) = criar_cliente_e_filmes(0)
+    with TestingSessionLocal() as db: #Devolução no passado não passa pela API.
+        locacao = Locacao(id_cliente=id_cliente, id_filme=id_filme, quantidade=1, devolvido=False,
+                          data_locacao=date.today() - timedelta(days=10), data_devolucao=date.today() - timedelta(days=3))
+        db.add(locacao)
+        db.commit()
+        LocacaoService(db).virar_dia_atrasadas()
+    assert len(client.get("/locacao/atrasadas").json()["itens"]) == 1
+
+    response = client.post(f"/locacao/{locacao.id_locacao}/devolver")
+    assert response.json()["multa"] == 21.0
+    assert response.json()["estoque"] == 1
+    assert client.get("/locacao/atrasadas").json()["itens"] == []
+    logger.info("Teste test_devolver_atrasada_cobra_multa_e_sai_das_atrasadas finalizado com sucesso")
+
+def test_devolver_lote_com_resultado_por_locacao():
+    logger.info("Iniciando teste: test_devolver_lote_com_resultado_por_locacao")
+    id_cliente, (filme_a, filme_b) = criar_cliente_e_filmes(2, 2)
+    id_a = alugar(id_cliente, filme_a, quantidade=2)
+    id_b = alugar(id_cliente, filme_b)
+    client.post(f"/locacao/{id_b}/devolver")
+    id_b2 = alugar(id_cliente, filme_b) #Mesmo filme de novo: a anterior já foi devolvida.
+
+    response = client.post("/locacao/devolver/lote", json={"ids_locacao": [id_a, id_b, 999999, id_b2, id_a]})
+    logger.info(f"POST /locacao/devolver/lote retornou status {response.status_code}")
+    assert response.status_code == 200
+    assert [(item["sucesso"], item["erro"]) for item in response.json()["itens"]] == [
+        (True, None),
+        (False, "Locação já devolvida."),
+        (False, "Locação não encontrada."),
+        (True, None),
+        (False, "Locação repetida no lote."),
+    ]
+    assert (estoque(filme_a), estoque(filme_b)) == (2, 2)
+    logger.info("Teste test_devolver_lote_com_resultado_por_locacao finalizado com sucesso")
+
+def test_orcamento_devolver_lote_nao_cresce_com_os_itens(orcamento_consultas):
+    logger.info("Iniciando teste: test_orcamento_devolver_lote_nao_cresce_com_os_itens")
+    id_cliente, ids_filme = criar_cliente_e_filmes(1, 1, 1, 1, 1)
+    ids_locacao = [alugar(id_cliente, id_filme) for id_filme in ids_filme]
+    #UPDATE das locações e UPDATE dos estoques (no PostgreSQL os dois viram uma CTE só).
+    with orcamento_consultas(2):
+        response = client.post("/locacao/devolver/lote", json={"ids_locacao": ids_locacao})
+    assert all(item["sucesso"] for item in response.json()["itens"])
+    logger.info("Teste test_orcamento_devolver_lote_nao_cresce_com_os_itens finalizado com sucesso")
@@ -0,0 +1,171 @@
+import asyncio
+import logging
+from datetime import date, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+from app import config
+from app.database import Base, get_db
+from app.main import app, lifespan
+from app.models.cliente import Cliente
+from app.models.filmes import Filmes
+from app.services import disponibilidade
+from app.utils.disponibilidade import IndiceDisponibilidade, indice_disponibilidade, MAXIMO_IDS
+
+#Loggings pra acompanhar as respostas.
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine) #igual ao SessionLocal da app
+
+Base.metadata.create_all(bind=engine)
+
+def override_get_db():
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+app.dependency_overrides[get_db] = override_get_db
+client = TestClient(app)
+
+##Pra limpar o banco de dados conforme os testes ocorrerem..
+##O índice é global da app: sem limpar, um teste leria o estoque que sobrou do anterior.
+@pytest.fixture(autouse=True)
+def clean_db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    indice_disponibilidade.limpar()
+    yield
+    indice_disponibilidade.limpar()
+
+def criar_cliente_e_filmes(*estoques):
+    db = TestingSessionLocal()
+    cliente = Cliente(nome="Diana Prince", data_nascimento=date(1984, 3, 22), cpf="33344455566",
+                      telefone="11944445555", email="diana@themyscira.com", endereco="Themyscira, 1")
+    filmes = [Filmes(nome=f"Mulher-Maravilha {i}", data_lancamento=date(2017, 6, 1), diretor="Patty Jenkins",
+                     genero="Super-Heróis", estoque=estoque) for i, estoque in enumerate(estoques, start=1)]
+    db.add_all([cliente, *filmes])
+    db.commit()
+    ids = cliente.id, [filme.id_filme for filme in filmes]
+    db.close()
+    return ids
+
+def consultar(*ids_filme):
+    response = client.get("/filmes/disponibilidade", params={"ids": ",".join(map(str, ids_filme))})
+    assert response.status_code == 200
+    return response.json()
+
+def estoques(*ids_filme):
+    return {item["id_filme"]: item["estoque"] for item in consultar(*ids_filme)["itens"]}
+
+#Testes do índice de disponibilidade.
+def test_disponibilidade_responde_sem_ir_ao_banco(orcamento_consultas):
+    logger.info("Iniciando teste: test_disponibilidade_responde_sem_ir_ao_banco")
+    _, (id_batman, id_coringa) = criar_cliente_e_filmes(3, 0)
+
+    primeira = consultar(id_coringa, id_batman, 999999) #A primeira carrega o índice (app sem lifespan).
+    logger.info(f"GET /filmes/disponibilidade retornou {primeira}")
+    assert primeira == {
+        "itens": [{"id_filme": id_coringa, "estoque": 0, "disponivel": False},
+                  {"id_filme": id_batman, "estoque": 3, "disponivel": True}],
+        "nao_encontrados": [999999],
+    }
+    with orcamento_consultas(0):
+        segunda = consultar(id_batman, id_coringa, id_batman) #Repetido volta uma vez só.
+    assert segunda == {"itens": primeira["itens"][::-1], "nao_encontrados": []}
+    logger.info("Teste test_disponibilidade_responde_sem_ir_ao_banco finalizado com sucesso")
+
+def test_disponibilidade_valida_os_ids():
+    logger.info("Iniciando teste: test_disponibilidade_valida_os_ids")
+    assert client.get("/filmes/disponibilidade", params={"ids": "1,abc"}).status_code == 422
+    response = client.get("/filmes/disponibilidade", params={"ids": ",".join(map(str, range(1, MAXIMO_IDS + 2)))})
+    logger.info(f"GET /filmes/disponibilidade com {MAXIMO_IDS + 1} ids retornou status {response.status_code}")
+    assert response.status_code == 400
+    logger.info("Teste test_disponibilidade_valida_os_ids finalizado com sucesso")
+
+def test_escritas_de_estoque_atualizam_o_indice():
+    logger.info("Iniciando teste: test_escritas_de_estoque_atualizam_o_indice")
+    id_cliente, (id_filme, id_outro) = criar_cliente_e_filmes(5, 2)
+    assert estoques(id_filme, id_outro) == {id_filme: 5, id_outro: 2}
+
+    locacao = client.post("/locacao/alugar", json={"id_cliente": id_cliente, "id_filme": id_filme, "quantidade": 2,
+                                                   "data_devolucao": str(date.today() + timedelta(days=7))}).json()
+    assert estoques(id_filme) == {id_filme: 3}
+    client.post("/locacao/alugar/lote", json={"id_cliente": id_cliente, "data_devolucao": str(date.today() + timedelta(days=7)),
+                                              "itens": [{"id_filme": id_outro, "quantidade": 1}]})
+    assert estoques(id_outro) == {id_outro: 1}
+    client.post(f"/locacao/{locacao['id_locacao']}/devolver")
+    assert estoques(id_filme) == {id_filme: 5}
+
+    client.put(f"/filmes/{id_filme}/novoEstoque", json={"estoque": 8})
+    assert estoques(id_filme) == {id_filme: 8}
+    novo = client.post("/filmes/salvar", json={"nome": "Liga da Justiça", "data_lancamento": "2017-11-16",
+                                               "diretor": "Zack Snyder", "genero": "Super-Heróis", "estoque": 4}).json()
+    assert estoques(novo["id"]) == {novo["id"]: 4}
+    client.delete(f"/filmes/{novo['id']}/deletar")
+    assert consultar(novo["id"])["nao_encontrados"] == [novo["id"]]
+    logger.info("Teste test_escritas_de_estoque_atualizam_o_indice finalizado com sucesso")
+
+def test_reconciliacao_corrige_o_que_mudou_fora_da_api():
+    logger.info("Iniciando teste: test_reconciliacao_corrige_o_que_mudou_fora_da_api")
+    _, (id_filme, id_outro) = criar_cliente_e_filmes(5, 2)
+    assert estoques(id_filme, id_outro) == {id_filme: 5, id_outro: 2}
+
+    with TestingSessionLocal() as db: #Ex.: outro worker, importação em lote, SQL na mão.
+        db.execute(update(Filmes).where(Filmes.id_filme == id_filme).values(estoque=1))
+        db.commit()
+        assert estoques(id_filme) == {id_filme: 5} #Ainda não reconciliou.
+        disponibilidade.recarregar_disponibilidade(db)
+
+    assert estoques(id_filme, id_outro) == {id_filme: 1, id_outro: 2}
+    status = client.get("/internal/disponibilidade").json()
+    logger.info(f"GET /internal/disponibilidade retornou {status}")
+    assert (status["filmes"], status["recargas"], status["divergencias"]) == (2, 2, 1)
+    logger.info("Teste test_reconciliacao_corrige_o_que_mudou_fora_da_api finalizado com sucesso")
+
+def test_escrita_durante_a_recarga_nao_e_perdida():
+    logger.info("Iniciando teste: test_escrita_durante_a_recarga_nao_e_perdida")
+    indice = IndiceDisponibilidade(relogio=lambda: 0.0)
+    indice.iniciar_recarga()
+    foto_do_banco = {1: 5, 2: 3, 3: 7} #Lida antes das escritas abaixo.
+    indice.atualizar({1: 4})
+    indice.remover(3)
+    indice.concluir_recarga(foto_do_banco)
+    assert indice.consultar([1, 2, 3]) == {1: 4, 2: 3, 3: None}
+    assert indice.resumo() == {"filmes": 2, "carregado_em": 0.0, "recargas": 1, "divergencias": 0}
+    logger.info("Teste test_escrita_durante_a_recarga_nao_e_perdida finalizado com sucesso")
+
+def test_indice_carregado_na_subida_da_app(monkeypatch):
+    logger.info("Iniciando teste: test_indice_carregado_na_subida_da_app")
+    _, (id_filme,) = criar_cliente_e_filmes(6)
+    monkeypatch.setattr(disponibilidade, "SessionLocal", TestingSessionLocal)
+    monkeypatch.setattr(config, "ASYNC_MODE", False)
+    monkeypatch.setattr(config, "DISPONIBILIDADE_RECONCILIAR_S", 0)
+
+    with TestClient(app) as cliente_com_lifespan:
+        status = cliente_com_lifespan.get("/internal/disponibilidade").json()
+        logger.info(f"GET /internal/disponibilidade depois da subida retornou {status}")
+        assert (status["filmes"], status["recargas"]) == (1, 1)
+    assert estoques(id_filme) == {id_filme: 6}
+    logger.info("Teste test_indice_carregado_na_subida_da_app finalizado com sucesso")
+
+def test_reconciliacao_para_junto_com_a_app(monkeypatch):
+    logger.info("Iniciando teste: test_reconciliacao_para_junto_com_a_app")
+    monkeypatch.setattr(disponibilidade, "SessionLocal", TestingSessionLocal)
+    monkeypatch.setattr(config, "ASYNC_MODE", False)
+    monkeypatch.setattr(config, "DISPONIBILIDADE_RECONCILIAR_S", 0.01)
+
+    async def subir_e_parar():
+        async with lifespan(app):
+            await asyncio.sleep(0.05) #Dá tempo de rodar algumas reconciliações.
+        return [tarefa for tarefa in asyncio.all_tasks() if tarefa is not asyncio.current_task()]
+
+    assert asyncio.run(subir_e_parar()) == [] #Nenhuma tarefa pendente depois da parada.
+    assert indice_disponibilidade.recargas >= 2
+    logger.info("Teste test_reconciliacao_para_junto_com_a_app finalizado com sucesso")
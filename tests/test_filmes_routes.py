@@ -1,10 +1,14 @@
 import logging
 import pytest
+from fastapi import HTTPException
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from app.database import Base, get_db
 from app.main import app
+from app.services.filmes_service import FilmeService
+from app.models.filmes import Filmes
+from app.utils.transacao import transacao
 
 #Loggings pra acompanhar as respostas.
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -12,7 +16,7 @@ logger = logging.getLogger(__name__)
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
 engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine) #igual ao SessionLocal da app
 
 Base.metadata.create_all(bind=engine)
 
@@ -75,7 +79,7 @@ def test_buscar_filme_por_nome():
     response = client.get("/filmes/nome/Beauty")
     logger.info(f"GET /filmes/nome/Beauty retornou status {response.status_code}")
     assert response.status_code == 200
-    assert any(c["nome"] == "Beauty and the Beast" for c in response.json())
+    assert any(c["nome"] == "Beauty and the Beast" for c in response.json()["itens"])
     logger.info("Teste test_buscar_filme_por_nome finalizado com sucesso")
 
 def test_buscar_por_data_lancamento():
@@ -104,7 +108,7 @@ def test_buscar_por_diretor():
     response = client.get("/filmes/diretor/Robert")
     logger.info(f"GET /filmes/diretor/Robert retornou status {response.status_code}")
     assert response.status_code == 200
-    assert any(c["diretor"] == "Robert Zemeckis" for c in response.json())
+    assert any(c["diretor"] == "Robert Zemeckis" for c in response.json()["itens"])
     logger.info("Teste test_buscar_por_diretor finalizado com sucesso")
 
 def test_buscar_por_genero():
@@ -119,7 +123,7 @@ def test_buscar_por_genero():
     response = client.get("/filmes/genero/suspense")
     logger.info(f"GET /filmes/genero/suspense retornou status {response.status_code}")
     assert response.status_code == 200
-    assert any(c["genero"] == "Suspense" for c in response.json())
+    assert any(c["genero"] == "Suspense" for c in response.json()["itens"])
     logger.info("Teste test_buscar_por_genero finalizado com sucesso")
 
 def test_alterar_estoque():
@@ -183,3 +187,152 @@ def test_deletar_filme():
     logger.info(f"GET /filmes/{filme['id']} após exclusão retornou status {check.status_code}")
     assert check.status_code == 404
     logger.info("Teste test_deletar_filme finalizado com sucesso")
+
+def test_buscar_filme_por_nome_paginado():
+    logger.info("Iniciando teste: test_buscar_filme_por_nome_paginado")
+    for nome in ["Toy Story", "Toy Story 2", "Toy Story 3"]:
+        client.post("/filmes/salvar", json={
+            "nome": nome,
+            "data_lancamento": "2010-06-18",
+            "diretor": "Lee Unkrich",
+            "genero": "Animação",
+            "estoque": 3
+        })
+    primeira = client.get("/filmes/nome/Toy", params={"limit": 2}).json()
+    logger.info(f"Primeira página: {primeira}")
+    assert [f["nome"] for f in primeira["itens"]] == ["Toy Story", "Toy Story 2"]
+    assert primeira["next_cursor"]
+
+    segunda = client.get("/filmes/nome/Toy", params={"limit": 2, "after": primeira["next_cursor"]}).json()
+    logger.info(f"Segunda página: {segunda}")
+    assert [f["nome"] for f in segunda["itens"]] == ["Toy Story 3"]
+    assert segunda["next_cursor"] is None
+
+    invalido = client.get("/filmes/nome/Toy", params={"after": "nao-e-cursor"})
+    assert invalido.status_code == 400
+    logger.info("Teste test_buscar_filme_por_nome_paginado finalizado com sucesso")
+
+def test_buscar_filme_por_id_usa_cache_e_invalida_na_escrita():
+    logger.info("Iniciando teste: test_buscar_filme_por_id_usa_cache_e_invalida_na_escrita")
+    filme = client.post("/filmes/salvar", json={
+        "nome": "Superman",
+        "data_lancamento": "2025-07-10",
+        "diretor": "James Gunn",
+        "genero": "Super-Heróis",
+        "estoque": 3
+    }).json()
+
+    client.get(f"/filmes/{filme['id']}")
+    response = client.get(f"/filmes/{filme['id']}")
+    assert response.status_code == 200
+    status = client.get("/internal/cache").json()
+    logger.info(f"GET /internal/cache retornou {status}")
+    assert status["faltas"] == 1
+    assert status["acertos"] == 1
+
+    #Depois do PUT a próxima leitura tem que ir no banco e trazer o estoque novo.
+    client.put(f"/filmes/{filme['id']}/novoEstoque", json={"estoque": 9})
+    response = client.get(f"/filmes/{filme['id']}")
+    assert response.json()["estoque"] == 9
+    status = client.get("/internal/cache").json()
+    assert status["invalidacoes"] == 1
+    assert status["faltas"] == 2
+    logger.info("Teste test_buscar_filme_por_id_usa_cache_e_invalida_na_escrita finalizado com sucesso")
+
+def test_buscar_filme_com_etag_e_if_none_match():
+    logger.info("Iniciando teste: test_buscar_filme_com_etag_e_if_none_match")
+    filme = client.post("/filmes/salvar", json={
+        "nome": "Duna",
+        "data_lancamento": "2021-10-21",
+        "diretor": "Denis Villeneuve",
+        "genero": "Ficção",
+        "estoque": 2
+    }).json()
+
+    response = client.get(f"/filmes/{filme['id']}")
+    etag = response.headers["ETag"]
+    assert etag == '"1"'
+    assert response.json()["versao"] == 1
+
+    response = client.get(f"/filmes/{filme['id']}", headers={"If-None-Match": etag})
+    logger.info(f"GET /filmes/{filme['id']} com If-None-Match retornou status {response.status_code}")
+    assert response.status_code == 304
+    assert response.content == b""
+
+    #Alteração de estoque gera versão nova, então o ETag antigo não vale mais.
+    client.put(f"/filmes/{filme['id']}/novoEstoque", json={"estoque": 5})
+    response = client.get(f"/filmes/{filme['id']}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] == '"2"'
+    logger.info("Teste test_buscar_filme_com_etag_e_if_none_match finalizado com sucesso")
+
+def test_alterar_filme_com_if_match():
+    logger.info("Iniciando teste: test_alterar_filme_com_if_match")
+    filme = client.post("/filmes/salvar", json={
+        "nome": "Interestelar",
+        "data_lancamento": "2014-11-06",
+        "diretor": "Christopher Nolan",
+        "genero": "Ficção",
+        "estoque": 2
+    }).json()
+
+    response = client.put(f"/filmes/{filme['id']}/novoNomeFilme", json={"nome": "Interstellar"}, headers={"If-Match": '"1"'})
+    assert response.status_code == 200
+    assert response.headers["ETag"] == '"2"'
+
+    #Quem ainda tem a versão 1 não pode sobrescrever a alteração de cima.
+    response = client.put(f"/filmes/{filme['id']}/novoEstoque", json={"estoque": 9}, headers={"If-Match": '"1"'})
+    logger.info(f"PUT com If-Match velho retornou status {response.status_code}")
+    assert response.status_code == 412
+    assert client.get(f"/filmes/{filme['id']}").json()["estoque"] == 2
+    logger.info("Teste test_alterar_filme_com_if_match finalizado com sucesso")
+
+def test_alteracao_concorrente_do_filme_retorna_conflito():
+    logger.info("Iniciando teste: test_alteracao_concorrente_do_filme_retorna_conflito")
+    filme = client.post("/filmes/salvar", json={
+        "nome": "Tenet",
+        "data_lancamento": "2020-10-29",
+        "diretor": "Christopher Nolan",
+        "genero": "Ação",
+        "estoque": 2
+    }).json()
+
+    #Duas sessões leem a versão 1; a primeira grava, a segunda tem que levar 409 em vez de sobrescrever.
+    db_a, db_b = TestingSessionLocal(), TestingSessionLocal()
+    try:
+        filme_a = db_a.get(Filmes, filme["id"])
+        FilmeService(db_b).alterar_estoque(filme["id"], 7)
+        filme_a.estoque = 1
+        with pytest.raises(HTTPException) as erro:
+            with transacao(db_a):
+                db_a.flush()
+        assert erro.value.status_code == 409
+    finally:
+        db_a.close()
+        db_b.close()
+    assert client.get(f"/filmes/{filme['id']}").json()["estoque"] == 7
+    logger.info("Teste test_alteracao_concorrente_do_filme_retorna_conflito finalizado com sucesso")
+
+def test_buscar_por_data_lancamento_caminho_rapido_paginado():
+    logger.info("Iniciando teste: test_buscar_por_data_lancamento_caminho_rapido_paginado")
+    for nome in ("Filme A", "Filme B", "Filme C"):
+        client.post("/filmes/salvar", json={
+            "nome": nome,
+            "data_lancamento": "2010-07-16",
+            "diretor": "Diretor",
+            "genero": "Drama",
+            "estoque": 1
+        })
+
+    #Linhas vão direto pro orjson: o formato tem que continuar igual ao do FilmeResponse.
+    primeira = client.get("/filmes/dataLancamento/2010-07-16", params={"limit": 2})
+    logger.info(f"GET /filmes/dataLancamento/2010-07-16 retornou status {primeira.status_code}")
+    assert primeira.status_code == 200
+    assert primeira.headers["content-type"] == "application/json"
+    item = primeira.json()["itens"][0]
+    assert item == {"id_filme": item["id_filme"], "nome": "Filme A", "data_lancamento": "2010-07-16",
+                    "diretor": "Diretor", "genero": "Drama", "estoque": 1, "versao": 1}
+    segunda = client.get("/filmes/dataLancamento/2010-07-16", params={"limit": 2, "after": primeira.json()["next_cursor"]})
+    assert [f["nome"] for f in segunda.json()["itens"]] == ["Filme C"]
+    assert segunda.json()["next_cursor"] is None
+    logger.info("Teste test_buscar_por_data_lancamento_caminho_rapido_paginado finalizado com sucesso")
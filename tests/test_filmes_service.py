@@ -28,9 +28,10 @@ def test_salvar_filme(mocker):
     db_mock.add = mocker.MagicMock()
     db_mock.commit = mocker.MagicMock()
 
-    def refresh_side_effect(obj):
-        obj.id_filme = 2
-    db_mock.refresh = mocker.MagicMock(side_effect=refresh_side_effect)
+    def flush_side_effect():
+        #O flush é que manda o INSERT e preenche o id gerado pelo banco.
+        db_mock.add.call_args.args[0].id_filme = 2
+    db_mock.flush = mocker.MagicMock(side_effect=flush_side_effect)
 
     service = FilmeService(db_mock)
 
@@ -50,8 +51,9 @@ def test_salvar_filme(mocker):
     assert response.id_filme == 2
     assert response.nome == "Fantastic Four"
     db_mock.add.assert_called_once()
+    db_mock.flush.assert_called_once()
     db_mock.commit.assert_called_once()
-    db_mock.refresh.assert_called_once()
+    db_mock.refresh.assert_not_called() #expire_on_commit=False: sem SELECT depois do commit.
     logger.info("Teste test_salvar_filme finalizado com sucesso")
 
 def test_buscar_por_id_filme_existente(mocker):
@@ -85,13 +87,13 @@ def test_buscar_por_nome_sucesso(mocker):
     filter_mock = mocker.MagicMock()
     db_mock.query.return_value = query_mock
     query_mock.filter.return_value = filter_mock
-    filter_mock.all.return_value = [filme] ##Retorna lista,não o first
+    filter_mock.order_by.return_value.limit.return_value.all.return_value = [filme] ##Retorna lista paginada (order_by + limit),não o first
 
     service = FilmeService(db_mock)
     result = service.buscar_por_nome("The Batman")
 
     logger.info(f"Resultado: {result}")
-    assert result[0].nome == "The Batman"
+    assert result.itens[0].nome == "The Batman"
     logger.info("Teste test_buscar_por_nome_sucesso finalizado com sucesso")
 
 def test_buscar_por_data_lancamento_sucesso(mocker):
@@ -104,13 +106,13 @@ def test_buscar_por_data_lancamento_sucesso(mocker):
     filter_mock = mocker.MagicMock()
     db_mock.query.return_value = query_mock
     query_mock.filter.return_value = filter_mock
-    filter_mock.all.return_value = [filme] ##Retorna lista,não o first
+    filter_mock.order_by.return_value.limit.return_value.all.return_value = [filme] ##Retorna lista paginada (order_by + limit),não o first
 
     service = FilmeService(db_mock)
     result = service.buscar_por_data_lancamento(date(2021, 4, 10))
 
     logger.info(f"Resultado: {result}")
-    assert result[0].data_lancamento == date(2021, 4, 10)
+    assert result.itens[0].data_lancamento == date(2021, 4, 10)
     logger.info("Teste test_buscar_por_data_lancamento_sucesso finalizado com sucesso")
 
 def test_buscar_por_diretor_sucesso(mocker):
@@ -123,13 +125,13 @@ def test_buscar_por_diretor_sucesso(mocker):
     filter_mock = mocker.MagicMock()
     db_mock.query.return_value = query_mock
     query_mock.filter.return_value = filter_mock
-    filter_mock.all.return_value = [filme] ##Retorna lista,não o first
+    filter_mock.order_by.return_value.limit.return_value.all.return_value = [filme] ##Retorna lista paginada (order_by + limit),não o first
 
     service = FilmeService(db_mock)
     result = service.buscar_por_diretor("Matt Reeves")
 
     logger.info(f"Resultado: {result}")
-    assert  result[0].diretor == "Matt Reeves"
+    assert  result.itens[0].diretor == "Matt Reeves"
     logger.info("Teste test_buscar_por_diretor_sucesso finalizado com sucesso")
 
 def test_buscar_por_genero_sucesso(mocker):
@@ -142,13 +144,13 @@ def test_buscar_por_genero_sucesso(mocker):
     filter_mock = mocker.MagicMock()
     db_mock.query.return_value = query_mock
     query_mock.filter.return_value = filter_mock
-    filter_mock.all.return_value = [filme] ##Retorna lista,não o first
+    filter_mock.order_by.return_value.limit.return_value.all.return_value = [filme] ##Retorna lista paginada (order_by + limit),não o first
 
     service = FilmeService(db_mock)
     result = service.buscar_por_genero("Super-Herói")
 
     logger.info(f"Resultado: {result}")
-    assert  result[0].genero == "Super-Herói"
+    assert  result.itens[0].genero == "Super-Herói"
     logger.info("Teste test_buscar_por_genero_sucesso finalizado com sucesso")
 
 def test_buscar_por_estoque_sucesso(mocker):
@@ -161,13 +163,13 @@ def test_buscar_por_estoque_sucesso(mocker):
     filter_mock = mocker.MagicMock()
     db_mock.query.return_value = query_mock
     query_mock.filter.return_value = filter_mock
-    filter_mock.all.return_value = [filme] ##Retorna lista,não o first
+    filter_mock.order_by.return_value.limit.return_value.all.return_value = [filme] ##Retorna lista paginada (order_by + limit),não o first
 
     service = FilmeService(db_mock)
     result = service.buscar_por_estoque(3)
 
     logger.info(f"Resultado: {result}")
-    assert  result[0].estoque == 3
+    assert  result.itens[0].estoque == 3
     logger.info("Teste test_buscar_por_estoque_sucesso finalizado com sucesso")
 
 def test_alterar_estoque_sucesso(mocker):
@@ -194,7 +196,7 @@ def test_alterar_estoque_sucesso(mocker):
     logger.info(f"Estoque atualizado para: {result.estoque}")
     assert result.estoque == novo_estoque
     db_mock.commit.assert_called_once()
-    db_mock.refresh.assert_called_once_with(filme)
+    db_mock.refresh.assert_not_called() #expire_on_commit=False: sem SELECT depois do commit.
     logger.info("Teste test_alterar_estoque_sucesso finalizado com sucesso")
 
 def test_alterar_data_lancamento_sucesso(mocker):
@@ -221,7 +223,7 @@ def test_alterar_data_lancamento_sucesso(mocker):
     logger.info(f"Data de lançamento atualizada para: {result.data_lancamento}")
     assert result.data_lancamento == nova_data
     db_mock.commit.assert_called_once()
-    db_mock.refresh.assert_called_once_with(filme)
+    db_mock.refresh.assert_not_called() #expire_on_commit=False: sem SELECT depois do commit.
     logger.info("Teste test_alterar_data_lancamento_sucesso finalizado com sucesso")
 
 def test_alterar_nome_sucesso(mocker):
@@ -248,7 +250,7 @@ def test_alterar_nome_sucesso(mocker):
     logger.info(f"Nome atualizado para: {result.nome}")
     assert result.nome == novo_nome
     db_mock.commit.assert_called_once()
-    db_mock.refresh.assert_called_once_with(filme)
+    db_mock.refresh.assert_not_called() #expire_on_commit=False: sem SELECT depois do commit.
     logger.info("Teste test_alterar_nome_sucesso finalizado com sucesso")
 
 def test_deletar_filme_sucesso(mocker):
@@ -265,6 +267,7 @@ def test_deletar_filme_sucesso(mocker):
 
     db_mock.delete = mocker.MagicMock()
     db_mock.commit = mocker.MagicMock()
+    db_mock.scalar.return_value = False #Sem locações.
 
     service = FilmeService(db_mock)
     result = service.deletar(1)
@@ -275,5 +278,18 @@ def test_deletar_filme_sucesso(mocker):
     assert result is None
     logger.info("Teste test_deletar_filme_sucesso finalizado com sucesso")
 
+def test_deletar_filme_com_locacoes(mocker):
+    logger.info("Iniciando teste: test_deletar_filme_com_locacoes")
+    db_mock = mocker.MagicMock()
+    db_mock.query.return_value.filter.return_value.first.return_value = filme_fake()
+    db_mock.scalar.return_value = True #Tem locação: a FK é RESTRICT.
 
-
+    service = FilmeService(db_mock)
+    with pytest.raises(HTTPException) as exc:
+        service.deletar(1)
+
+    logger.info(f"Erro retornado: {exc.value.detail}")
+    assert exc.value.status_code == 409
+    db_mock.delete.assert_not_called()
+    db_mock.commit.assert_not_called()
+    logger.info("Teste test_deletar_filme_com_locacoes finalizado com sucesso")
@@ -0,0 +1,131 @@
+import json
+import logging
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.orm import sessionmaker
+from app.database import Base, get_db
+from app.main import app
+from app.models.cliente import Cliente
+from app.models.filmes import Filmes
+from app.repositories import filmes_repository
+from app.services.importacao_service import ImportacaoService
+
+#Loggings pra acompanhar as respostas.
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+##CONFIG do banco de dados pros testes.
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine) #igual ao SessionLocal da app
+
+Base.metadata.create_all(bind=engine)
+
+def override_get_db():
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+app.dependency_overrides[get_db] = override_get_db
+client = TestClient(app)
+
+##Limpar o banco de dados antes de cada teste.
+@pytest.fixture(autouse=True)
+def clean_db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield
+
+def contar(modelo):
+    with TestingSessionLocal() as db:
+        return db.scalar(select(func.count()).select_from(modelo))
+
+#Testes de integração da importação em lote.
+def test_importar_filmes_csv():
+    logger.info("Iniciando teste: test_importar_filmes_csv")
+    client.post("/filmes/salvar", json={
+        "nome": "Alien", "data_lancamento": "1979-05-25", "diretor": "Ridley Scott", "genero": "Terror", "estoque": 2
+    })
+    csv = (
+        "nome,data_lancamento,diretor,genero,estoque\n"
+        "Blade Runner,1982-06-25,Ridley Scott,Ficção científica,3\n"
+        "alien,1979-05-25,Ridley Scott,Terror,1\n"                      #já cadastrado (sem diferenciar maiúsculas)
+        "Gladiador,2000-05-05,Ridley Scott,Ação,0\n"                   #estoque 0
+        "\"Thelma, Louise\",1991-05-24,Ridley Scott,Drama,2\n"
+        "Blade Runner,1982-06-25,Ridley Scott,Ficção científica,3\n"    #repetido no próprio arquivo
+        "Prometheus,data-errada,Ridley Scott,Ficção científica,1\n"
+    )
+    response = client.post("/importacao/filmes?formato=csv", content=csv.encode())
+    logger.info(f"POST /importacao/filmes retornou status {response.status_code}")
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["lidas"], data["importadas"], data["rejeitadas"]) == (6, 2, 4)
+    assert [erro["linha"] for erro in data["erros"]] == [3, 4, 6, 7]
+    assert data["erros"][0]["erro"] == "Já existe um filme cadastrado com esse nome."
+    assert data["erros"][3]["erro"].startswith("data_lancamento")
+    assert contar(Filmes) == 3
+    logger.info("Teste test_importar_filmes_csv finalizado com sucesso")
+
+def test_importar_clientes_ndjson():
+    logger.info("Iniciando teste: test_importar_clientes_ndjson")
+    linhas = [
+        {"nome": "Tony", "data_nascimento": "1970-05-29", "cpf": "111.111.111-11", "telefone": "911111111", "email": "tony@email.com", "endereco": "Malibu Point, 10880"},
+        {"nome": "Steve", "data_nascimento": "1918-07-04", "cpf": "11111111111", "telefone": "922222222", "email": "steve@email.com", "endereco": "Brooklyn, NY"},
+        {"nome": "Bruce", "data_nascimento": "1969-12-18", "cpf": "22222222222", "telefone": "933333333", "email": "nao-e-email", "endereco": "Dayton, Ohio"},
+    ]
+    corpo = "\n".join(json.dumps(linha) for linha in linhas) + "\n{quebrado\n"
+    response = client.post("/importacao/clientes?formato=ndjson", content=corpo.encode())
+    logger.info(f"POST /importacao/clientes retornou status {response.status_code}")
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["lidas"], data["importadas"], data["rejeitadas"]) == (4, 1, 3)
+    assert {erro["linha"]: erro["erro"] for erro in data["erros"]}[4] == "JSON inválido."
+    assert client.get("/clientes/cpf/11111111111").json()["nome"] == "Tony"
+    logger.info("Teste test_importar_clientes_ndjson finalizado com sucesso")
+
+def test_importar_em_varios_lotes():
+    logger.info("Iniciando teste: test_importar_em_varios_lotes")
+    progresso = []
+    linhas = ["nome,data_lancamento,diretor,genero,estoque\n"] + [
+        f"Filme {i % 4},2001-01-01,Diretor,Drama,1\n" for i in range(7) #Filme 0..3 e depois repetidos
+    ]
+    with TestingSessionLocal() as db:
+        resultado = ImportacaoService(db).importar_filmes(iter(linhas), "csv", tamanho_lote=2,
+                                                          ao_fim_do_lote=lambda r: progresso.append(r.importadas))
+    assert resultado.lotes == 4
+    assert progresso == [2, 4, 4, 4] #repetidos em lotes seguintes batem no que já foi gravado
+    assert resultado.rejeitadas == 3
+    assert contar(Filmes) == 4
+    logger.info("Teste test_importar_em_varios_lotes finalizado com sucesso")
+
+def test_importar_formato_invalido():
+    logger.info("Iniciando teste: test_importar_formato_invalido")
+    response = client.post("/importacao/filmes?formato=xml", content=b"<filmes/>")
+    assert response.status_code == 422
+    assert contar(Cliente) == 0
+    logger.info("Teste test_importar_formato_invalido finalizado com sucesso")
+
+def test_checagem_de_duplicidade_usa_indice():
+    logger.info("Iniciando teste: test_checagem_de_duplicidade_usa_indice")
+    #A checagem roda a cada lote: sem o índice em lower(nome), cada lote varreria a tabela filmes inteira.
+    consultas = []
+
+    def guardar(conn, cursor, statement, parameters, context, executemany):
+        consultas.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", guardar)
+    try:
+        with TestingSessionLocal() as db:
+            assert filmes_repository.get_nomes_existentes(db, ["Duna", "Alien"]) == set()
+    finally:
+        event.remove(engine, "before_cursor_execute", guardar)
+
+    statement, parameters = consultas[-1]
+    with engine.connect() as conn:
+        plano = " | ".join(linha[-1] for linha in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters))
+    logger.info(f"Plano da checagem de duplicidade: {plano}")
+    assert "ix_filmes_nome_lower" in plano
+    logger.info("Teste test_checagem_de_duplicidade_usa_indice finalizado com sucesso")
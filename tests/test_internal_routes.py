@@ -0,0 +1,57 @@
+import logging
+import sqlite3
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from app.main import app
+from app.utils.pool_metrics import QueuePoolMonitorado, status_pool
+
+#Loggings pra acompanhar as respostas.
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+client = TestClient(app)
+
+def pool_fake(**kwargs):
+    return QueuePoolMonitorado(lambda: sqlite3.connect(":memory:", check_same_thread=False), **kwargs)
+
+#Testes das rotas internas (observabilidade).
+def test_status_pool_endpoint():
+    logger.info("Iniciando teste: test_status_pool_endpoint")
+    response = client.get("/internal/pool")
+    logger.info(f"GET /internal/pool retornou status {response.status_code}")
+    assert response.status_code == 200
+    data = response.json()
+    assert set(data) == {"sync", "async"}
+    assert {"em_uso", "ociosas", "overflow", "espera_media_ms"} <= set(data["sync"])
+    logger.info("Teste test_status_pool_endpoint finalizado com sucesso")
+
+def test_pool_monitorado_conta_conexoes_e_espera():
+    logger.info("Iniciando teste: test_pool_monitorado_conta_conexoes_e_espera")
+    pool = pool_fake(pool_size=1, max_overflow=0, timeout=2)
+
+    conexao = pool.connect()
+    assert status_pool(pool)["em_uso"] == 1
+
+    #Segunda conexão fica na fila até a primeira voltar pro pool.
+    threading.Timer(0.2, conexao.close).start()
+    segunda = pool.connect()
+    status = status_pool(pool)
+    logger.info(f"Status do pool: {status}")
+    assert status["checkouts"] == 2
+    assert status["espera_maxima_ms"] >= 150
+    segunda.close()
+    assert status_pool(pool)["ociosas"] == 1
+    logger.info("Teste test_pool_monitorado_conta_conexoes_e_espera finalizado com sucesso")
+
+def test_pool_monitorado_conta_timeout():
+    logger.info("Iniciando teste: test_pool_monitorado_conta_timeout")
+    pool = pool_fake(pool_size=1, max_overflow=0, timeout=0.1)
+    conexao = pool.connect()
+    with pytest.raises(PoolTimeoutError):
+        pool.connect()
+    assert status_pool(pool)["timeouts"] == 1
+    conexao.close()
+    logger.info("Teste test_pool_monitorado_conta_timeout finalizado com sucesso")
@@ -1,13 +1,15 @@
+import json
 import logging
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from app.database import Base, get_db
-from datetime import date
+from datetime import date, timedelta
 from app.main import app
 from app.models.cliente import Cliente
 from app.models.filmes import Filmes
+from app.models.locacao import Locacao
 
 #Loggings pra acompanhar as respostas.
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -16,7 +18,7 @@ logger = logging.getLogger(__name__)
 #Config banco de dados
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
 engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine) #igual ao SessionLocal da app
 
 Base.metadata.create_all(bind=engine)
 
@@ -107,7 +109,7 @@ def test_buscar_locacoes_cliente():
     response = client.get(f"/locacao/{CLIENTE_ID}/locacoes")
     logger.info(f"Resposta: {response.status_code} - {response.json()}")
     assert response.status_code == 200
-    data = response.json()
+    data = response.json()["itens"]
     assert isinstance(data, list)
     assert data[0]["id_cliente"] == CLIENTE_ID
 
@@ -116,7 +118,7 @@ def test_buscar_historico_filme():
     response = client.get(f"/locacao/{FILME_ID}/historico")
     logger.info(f"Resposta: {response.status_code} - {response.json()}")
     assert response.status_code == 200
-    data = response.json()
+    data = response.json()["itens"]
     assert len(data) > 0 # Confere se tem pelo menos 1 dado.
 
 def test_renovar_locacao():
@@ -156,3 +158,104 @@ def test_deletar_locacao():
     logger.info(f"Resposta DELETE: {response.status_code}")
     assert response.status_code == 204
 
+def test_alugar_ultima_copia_uma_vez_so():
+    logger.info("Iniciando teste: test_alugar_ultima_copia_uma_vez_so")
+    db = TestingSessionLocal()
+    filme = Filmes(
+        nome="Matrix Resurrections",
+        data_lancamento=date(2021, 12, 22),
+        diretor="Lana Wachowski",
+        genero="Ficção científica",
+        estoque=1
+    )
+    db.add(filme)
+    db.commit()
+    id_filme = filme.id_filme
+
+    devolucao = str(date.today() + timedelta(days=7))
+    primeira = client.post("/locacao/alugar", json={"id_cliente": CLIENTE_ID, "id_filme": id_filme, "quantidade": 1, "data_devolucao": devolucao})
+    segunda = client.post("/locacao/alugar", json={"id_cliente": CLIENTE2_ID, "id_filme": id_filme, "quantidade": 1, "data_devolucao": devolucao})
+    logger.info(f"POST /locacao/alugar retornou {primeira.status_code} e depois {segunda.status_code}")
+    assert primeira.status_code == 200
+    assert segunda.status_code == 400
+
+    db.expire_all()
+    assert db.get(Filmes, id_filme).estoque == 0 #Nunca fica negativo.
+    db.close()
+    logger.info("Teste test_alugar_ultima_copia_uma_vez_so finalizado com sucesso")
+
+def test_alugar_lote():
+    logger.info("Iniciando teste: test_alugar_lote")
+    db = TestingSessionLocal()
+    filmes = [
+        Filmes(nome="Duna", data_lancamento=date(2021, 10, 21), diretor="Denis Villeneuve", genero="Ficção científica", estoque=3),
+        Filmes(nome="Duna: Parte Dois", data_lancamento=date(2024, 2, 29), diretor="Denis Villeneuve", genero="Ficção científica", estoque=1),
+        Filmes(nome="A Chegada", data_lancamento=date(2016, 11, 24), diretor="Denis Villeneuve", genero="Ficção científica", estoque=5),
+    ]
+    db.add_all(filmes)
+    db.commit()
+    duna, duna2, chegada = (filme.id_filme for filme in filmes)
+
+    response = client.post("/locacao/alugar/lote", json={
+        "id_cliente": CLIENTE2_ID,
+        "data_devolucao": str(date.today() + timedelta(days=7)),
+        "itens": [
+            {"id_filme": duna, "quantidade": 2},
+            {"id_filme": duna2, "quantidade": 2}, #só tem 1
+            {"id_filme": 999999, "quantidade": 1},
+            {"id_filme": chegada, "quantidade": 1},
+            {"id_filme": duna, "quantidade": 1}, #repetido no lote
+        ]
+    })
+    logger.info(f"POST /locacao/alugar/lote retornou status {response.status_code}")
+    assert response.status_code == 200
+    itens = response.json()["itens"]
+    assert [item["sucesso"] for item in itens] == [True, False, False, True, False]
+    assert itens[1]["erro"] == "Estoque insuficiente para essa locação."
+    assert itens[2]["erro"] == "Filme não encontrado."
+    assert itens[4]["erro"] == "Filme repetido no lote."
+    assert itens[0]["id_locacao"] != itens[3]["id_locacao"]
+
+    db.expire_all()
+    assert [db.get(Filmes, id_filme).estoque for id_filme in (duna, duna2, chegada)] == [1, 1, 4]
+    #A baixa de estoque também muda a versão (ETag) só dos filmes alugados.
+    assert [db.get(Filmes, id_filme).versao for id_filme in (duna, duna2, chegada)] == [2, 1, 2]
+
+    #Mesmo cliente, mesmo filme, mesmo dia: agora é duplicidade.
+    de_novo = client.post("/locacao/alugar/lote", json={
+        "id_cliente": CLIENTE2_ID,
+        "data_devolucao": str(date.today() + timedelta(days=7)),
+        "itens": [{"id_filme": chegada, "quantidade": 1}]
+    })
+    assert de_novo.json()["itens"][0]["erro"] == "Já existe uma locação semelhante em aberto."
+    db.close()
+    logger.info("Teste test_alugar_lote finalizado com sucesso")
+
+def test_exportar_historico_filme():
+    logger.info("Iniciando teste: test_exportar_historico_filme")
+    db = TestingSessionLocal()
+    filme = Filmes(nome="Blade Runner 2049", data_lancamento=date(2017, 10, 5), diretor="Denis Villeneuve", genero="Ficção científica", estoque=2000)
+    db.add(filme)
+    db.commit()
+    #Mais linhas que um bloco da exportação, pra passar por mais de um pedaço do stream.
+    db.add_all([Locacao(id_cliente=CLIENTE_ID, id_filme=filme.id_filme, data_locacao=date(2024, 1, 1) + timedelta(days=i),
+                        data_devolucao=date(2024, 1, 8) + timedelta(days=i), devolvido=True, quantidade=1) for i in range(1200)])
+    db.commit()
+
+    response = client.get(f"/locacao/{filme.id_filme}/historico/exportar")
+    logger.info(f"GET /locacao/{filme.id_filme}/historico/exportar retornou status {response.status_code}")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    linhas = [json.loads(linha) for linha in response.text.splitlines()]
+    assert len(linhas) == 1200
+    assert linhas[0]["data_locacao"] == "2024-01-01"
+    assert linhas[0]["id_filme"] == filme.id_filme
+
+    response = client.get(f"/locacao/{filme.id_filme}/historico/exportar", params={"formato": "csv"})
+    assert response.headers["content-disposition"] == f'attachment; filename="historico_filme_{filme.id_filme}.csv"'
+    csv = response.text.splitlines()
+    assert csv[0] == "id_locacao,id_cliente,id_filme,data_locacao,data_devolucao,devolvido,quantidade"
+    assert len(csv) == 1201
+    db.close()
+    logger.info("Teste test_exportar_historico_filme finalizado com sucesso")
+
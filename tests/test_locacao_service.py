@@ -54,9 +54,8 @@ def test_salvar_locacao_sucesso(mocker):
 
     ##mockando todos os metodos do repositories e validator necessários pra lógica.
 
-    mocker.patch("app.services.locacao_service.cliente_repository.get_by_id", return_value=cliente)
-    mocker.patch("app.services.locacao_service.filmes_repository.get_by_id", return_value=filme)
-    mocker.patch("app.services.locacao_service.filmes_repository.save", return_value=filme)
+    mocker.patch("app.repositories.cliente_repository.get_by_id", return_value=cliente)
+    decrementar_mock = mocker.patch("app.services.locacao_service.filmes_repository.decrementar_estoque", return_value=filme.estoque - 1) #UPDATE devolve o estoque que sobrou.
     mocker.patch("app.services.locacao_service.locacao_repository.save", return_value=locacao)
     mocker.patch("app.services.locacao_service.LocacaoValidator.validar_tudo", return_value=None)
 
@@ -74,7 +73,7 @@ def test_salvar_locacao_sucesso(mocker):
 
     logger.info(f"Resultado obtido: {result}")
     assert result.id_locacao == 1
-    assert filme.estoque == 2 #Simulando a diminuição do estoque
+    decrementar_mock.assert_called_once_with(db_mock, 1, 1) #Baixa atômica: filme 1, quantidade 1.
     logger.info("Iniciando teste: test_salvar_locacao_sucesso finalizado com sucesso")
 
 def test_buscar_por_id_sucesso(mocker):
@@ -98,13 +97,14 @@ def test_buscar_por_cliente_id_sucesso(mocker):##Locações do cliente pelo ID.
     db_mock = mocker.MagicMock()
     locacoes = [locacao_fake()] #Possível lista, embora aqui não venha mais de 1.
 
-    mocker.patch("app.services.locacao_service.locacao_repository.get_by_cliente_id", return_value=locacoes)
+    mocker.patch("app.services.locacao_service.locacao_repository.get_by_cliente_id", return_value=(locacoes, None)) #(página, próximo id)
 
     service = LocacaoService(db_mock)
     result = service.buscar_por_cliente_id(1)
 
     logger.info(f"Resultado: {result}")
-    assert result[0].id_cliente == 1
+    assert result.itens[0].id_cliente == 1
+    assert result.next_cursor is None
     logger.info("Teste test_buscar_por_cliente_id_sucesso finalizado com sucesso")
 
 def test_buscar_por_filme_id_sucesso(mocker):
@@ -113,13 +113,13 @@ def test_buscar_por_filme_id_sucesso(mocker):
     db_mock = mocker.MagicMock()
     locacoes = [locacao_fake()] #Possível lista, embora aqui não venha mais de 1.
 
-    mocker.patch("app.services.locacao_service.locacao_repository.get_by_filme_id", return_value=locacoes)
+    mocker.patch("app.services.locacao_service.locacao_repository.get_by_filme_id", return_value=(locacoes, None)) #(página, próximo id)
 
     service = LocacaoService(db_mock)
     result = service.buscar_por_filme_id(1)
 
     logger.info(f"Resultado: {result}")
-    assert result[0].id_filme == 1
+    assert result.itens[0].id_filme == 1
     logger.info("Teste test_buscar_por_filme_id_sucesso finalizado com sucesso")
 
 def test_renovar_data_devolucao_sucesso(mocker):
@@ -163,9 +163,8 @@ def test_alugar_filme_sucesso(mocker):
     filme = filme_fake()
     locacao = locacao_fake()
 
-    mocker.patch("app.services.locacao_service.cliente_repository.get_by_id", return_value=cliente)
-    mocker.patch("app.services.locacao_service.filmes_repository.get_by_id", return_value=filme)
-    mocker.patch("app.services.locacao_service.filmes_repository.save", return_value=filme)
+    mocker.patch("app.repositories.cliente_repository.get_by_id", return_value=cliente)
+    decrementar_mock = mocker.patch("app.services.locacao_service.filmes_repository.decrementar_estoque", return_value=filme.estoque - 1) #UPDATE devolve o estoque que sobrou.
     mocker.patch("app.services.locacao_service.locacao_repository.save", return_value=locacao)
     mocker.patch("app.services.locacao_service.LocacaoValidator.validar_tudo", return_value=None)
 
@@ -174,9 +173,32 @@ def test_alugar_filme_sucesso(mocker):
 
     logger.info(f"Resultado: {result}")
     assert result.id_locacao == 1
-    assert filme.estoque == 2 #Simulando redução do estoque.
+    decrementar_mock.assert_called_once_with(db_mock, 1, 1) #Baixa atômica: filme 1, quantidade 1.
     logger.info("Teste test_alugar_filme_sucesso finalizado com sucesso")
 
+def test_alugar_filme_estoque_insuficiente(mocker):
+    logger.info("Iniciando teste: test_alugar_filme_estoque_insuficiente")
+
+    db_mock = mocker.MagicMock()
+    cliente = cliente_fake()
+
+    mocker.patch("app.repositories.cliente_repository.get_by_id", return_value=cliente)
+    mocker.patch("app.services.locacao_service.filmes_repository.decrementar_estoque", return_value=None) #UPDATE não pegou nenhuma linha.
+    save_mock = mocker.patch("app.services.locacao_service.locacao_repository.save")
+    mocker.patch("app.services.locacao_service.LocacaoValidator.validar_tudo", return_value=None)
+    db_mock.query.return_value.filter.return_value.first.return_value = (1,) #O filme existe.
+
+    service = LocacaoService(db_mock)
+    with pytest.raises(HTTPException) as exc:
+        service.alugar_filme(1, 1, 5, date.today())
+
+    logger.info(f"Erro retornado: {exc.value.detail}")
+    assert exc.value.status_code == 400
+    save_mock.assert_not_called()
+    db_mock.commit.assert_not_called()
+    db_mock.rollback.assert_called_once() #A transação inteira volta, nada fica pela metade.
+    logger.info("Teste test_alugar_filme_estoque_insuficiente finalizado com sucesso")
+
 def test_deletar_locacao_sucesso(mocker):
     logger.info("Iniciando teste: test_deletar_locacao_sucesso")
 
@@ -0,0 +1,55 @@
+import logging
+import threading
+
+from app.utils.logger import logger as logger_locadora, listener
+
+#Loggings pra acompanhar as respostas.
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+class HandlerCaptura(logging.Handler):
+    #Guarda a mensagem e a thread que escreveu de fato.
+    def __init__(self):
+        super().__init__()
+        self.registros = []
+
+    def emit(self, record):
+        self.registros.append((record.getMessage(), threading.get_ident()))
+
+class ContaFormatacao:
+    def __init__(self):
+        self.vezes = 0
+
+    def __str__(self):
+        self.vezes += 1
+        return "valor"
+
+#Testes do logging em fila.
+def test_log_escrito_pela_thread_do_listener():
+    logger.info("Iniciando teste: test_log_escrito_pela_thread_do_listener")
+    captura = HandlerCaptura()
+    handlers_originais = listener.handlers
+    listener.handlers = handlers_originais + (captura,)
+    try:
+        logger_locadora.warning("Filme %s não encontrado.", 42)
+        listener.stop() #Esvazia a fila antes de conferir.
+    finally:
+        listener.handlers = handlers_originais
+        listener.start()
+
+    assert captura.registros == [("Filme 42 não encontrado.", captura.registros[0][1])]
+    assert captura.registros[0][1] != threading.get_ident() #Não foi a thread do request que escreveu.
+    logger.info("Teste test_log_escrito_pela_thread_do_listener finalizado com sucesso")
+
+def test_nivel_desligado_nao_formata_a_mensagem():
+    logger.info("Iniciando teste: test_nivel_desligado_nao_formata_a_mensagem")
+    nivel_original = logger_locadora.level
+    argumento = ContaFormatacao()
+    logger_locadora.setLevel(logging.WARNING)
+    try:
+        logger_locadora.info("Buscando filme: %s", argumento)
+    finally:
+        logger_locadora.setLevel(nivel_original)
+
+    assert argumento.vezes == 0
+    logger.info("Teste test_nivel_desligado_nao_formata_a_mensagem finalizado com sucesso")
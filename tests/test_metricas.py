@@ -0,0 +1,94 @@
+import logging
+from datetime import date, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.database import Base, get_db
+from app.main import app
+from app.models.cliente import Cliente
+from app.models.filmes import Filmes
+
+#Loggings pra acompanhar as respostas.
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine) #igual ao SessionLocal da app
+
+Base.metadata.create_all(bind=engine)
+
+def override_get_db():
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+app.dependency_overrides[get_db] = override_get_db
+client = TestClient(app)
+
+##Pra limpar o banco de dados conforme os testes ocorrerem..
+@pytest.fixture(autouse=True)
+def clean_db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield
+
+def valor(nome, **rotulos):
+    #Os contadores são globais do processo: os testes comparam antes e depois.
+    return REGISTRY.get_sample_value(nome, rotulos) or 0.0
+
+def criar_cliente_e_filme(estoque):
+    db = TestingSessionLocal()
+    cliente = Cliente(nome="Clark Kent", data_nascimento=date(1985, 6, 18), cpf="12312312312",
+                      telefone="11988887777", email="clark@planeta.com", endereco="Rua de Metrópolis, 344")
+    filme = Filmes(nome="Superman", data_lancamento=date(2025, 7, 11), diretor="James Gunn",
+                   genero="Super-Heróis", estoque=estoque)
+    db.add_all([cliente, filme])
+    db.commit()
+    ids = cliente.id, filme.id_filme
+    db.close()
+    return ids
+
+#Testes do /metrics.
+def test_metricas_de_negocio_e_de_rota():
+    logger.info("Iniciando teste: test_metricas_de_negocio_e_de_rota")
+    id_cliente, id_filme = criar_cliente_e_filme(estoque=1)
+    criadas = valor("locadora_locacoes_criadas_total")
+    sem_estoque = valor("locadora_estoque_insuficiente_total", origem="unitaria")
+    buscas = valor("locadora_http_request_duracao_segundos_count", metodo="GET", rota="/filmes/{id_filme}", status="200")
+
+    devolucao = str(date.today() + timedelta(days=7))
+    aluguel = {"id_cliente": id_cliente, "id_filme": id_filme, "quantidade": 1, "data_devolucao": devolucao}
+    assert client.post("/locacao/alugar", json={**aluguel, "quantidade": 2}).status_code == 400 #Só tem 1.
+    assert client.post("/locacao/alugar", json=aluguel).status_code == 200
+    assert client.get(f"/filmes/{id_filme}").status_code == 200
+
+    assert valor("locadora_locacoes_criadas_total") == criadas + 1
+    assert valor("locadora_estoque_insuficiente_total", origem="unitaria") == sem_estoque + 1
+    #O rótulo é o template da rota, não o caminho com o ID.
+    assert valor("locadora_http_request_duracao_segundos_count", metodo="GET", rota="/filmes/{id_filme}", status="200") == buscas + 1
+
+    response = client.get("/metrics")
+    logger.info(f"GET /metrics retornou status {response.status_code}")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'locadora_db_consulta_duracao_segundos_count{operacao="update"}' in response.text
+    assert 'locadora_db_consultas_por_request_bucket{le="1.0",rota="/filmes/{id_filme}"}' in response.text
+    assert 'locadora_http_requests_em_andamento{metodo="GET"} 1.0' in response.text #O próprio GET /metrics.
+    logger.info("Teste test_metricas_de_negocio_e_de_rota finalizado com sucesso")
+
+def test_metricas_de_multa():
+    logger.info("Iniciando teste: test_metricas_de_multa")
+    id_cliente, id_filme = criar_cliente_e_filme(estoque=2)
+    no_prazo = valor("locadora_multas_calculadas_total", resultado="no_prazo")
+
+    locacao = client.post("/locacao/alugar", json={"id_cliente": id_cliente, "id_filme": id_filme, "quantidade": 1,
+                                                   "data_devolucao": str(date.today() + timedelta(days=3))}).json()
+    assert client.post(f"/locacao/{locacao['id_locacao']}/multa").json() == 0.0
+    assert valor("locadora_multas_calculadas_total", resultado="no_prazo") == no_prazo + 1
+    logger.info("Teste test_metricas_de_multa finalizado com sucesso")
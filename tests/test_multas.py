@@ -0,0 +1,140 @@
+import json
+import logging
+from datetime import date, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.dialects.postgresql import asyncpg, psycopg2
+from sqlalchemy.orm import sessionmaker
+from app import config
+from app.database import Base, get_db
+from app.main import app
+from app.models.cliente import Cliente
+from app.models.filmes import Filmes
+from app.models.locacao import Locacao
+from app.repositories.locacao_repository import consulta_multas, consulta_multas_por_cliente
+
+#Loggings pra acompanhar as respostas.
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine) #igual ao SessionLocal da app
+
+Base.metadata.create_all(bind=engine)
+
+def override_get_db():
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+app.dependency_overrides[get_db] = override_get_db
+client = TestClient(app)
+
+##Pra limpar o banco de dados conforme os testes ocorrerem..
+@pytest.fixture(autouse=True)
+def clean_db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield
+
+def criar_locacoes():
+    #Dois clientes: o primeiro com duas locações atrasadas (3 e 10 dias), uma no prazo e uma atrasada
+    #mas já devolvida; o segundo com uma atrasada de 1 dia. As locações vão direto pro banco porque a
+    #API não deixa gravar devolução no passado.
+    hoje = date.today()
+    db = TestingSessionLocal()
+    clientes = [
+        Cliente(nome="Bruce Wayne", data_nascimento=date(1980, 2, 19), cpf="11122233344",
+                telefone="11911112222", email="bruce@wayne.com", endereco="Mansão Wayne, 1007"),
+        Cliente(nome="Selina Kyle", data_nascimento=date(1986, 12, 3), cpf="55566677788",
+                telefone="11933334444", email="selina@gotham.com", endereco="Rua do East End, 12"),
+    ]
+    filme = Filmes(nome="Batman", data_lancamento=date(2022, 3, 3), diretor="Matt Reeves",
+                   genero="Super-Heróis", estoque=10)
+    db.add_all([*clientes, filme])
+    db.flush()
+
+    def locacao(cliente, dias_atraso, devolvido=False):
+        return Locacao(id_cliente=cliente.id, id_filme=filme.id_filme, quantidade=1, devolvido=devolvido,
+                       data_locacao=hoje - timedelta(days=dias_atraso + 7), data_devolucao=hoje - timedelta(days=dias_atraso))
+
+    locacoes = [locacao(clientes[0], 3), locacao(clientes[0], 10), locacao(clientes[0], -2),
+                locacao(clientes[0], 5, devolvido=True), locacao(clientes[1], 1)]
+    db.add_all(locacoes)
+    db.commit()
+    ids = [cliente.id for cliente in clientes], [locacao.id_locacao for locacao in locacoes]
+    db.close()
+    return ids
+
+#Testes das multas em lote.
+def test_multas_em_lote_batem_com_o_calculo_por_locacao():
+    logger.info("Iniciando teste: test_multas_em_lote_batem_com_o_calculo_por_locacao")
+    (id_bruce, id_selina), ids_locacao = criar_locacoes()
+
+    response = client.get("/locacao/multas")
+    logger.info(f"GET /locacao/multas retornou status {response.status_code}")
+    assert response.status_code == 200
+    pagina = response.json()
+    assert pagina["next_cursor"] is None
+    multas = {item["id_locacao"]: item for item in pagina["itens"]}
+    assert set(multas) == {ids_locacao[0], ids_locacao[1], ids_locacao[4]} #Sem a no prazo e a devolvida.
+    assert multas[ids_locacao[1]]["dias_atraso"] == 10
+    assert multas[ids_locacao[1]]["id_cliente"] == id_bruce
+    for id_locacao, item in multas.items():
+        assert item["multa"] == client.post(f"/locacao/{id_locacao}/multa").json()
+    logger.info("Teste test_multas_em_lote_batem_com_o_calculo_por_locacao finalizado com sucesso")
+
+def test_multas_filtradas_por_cliente_e_paginadas():
+    logger.info("Iniciando teste: test_multas_filtradas_por_cliente_e_paginadas")
+    (id_bruce, _), ids_locacao = criar_locacoes()
+
+    primeira = client.get("/locacao/multas", params={"id_cliente": id_bruce, "limit": 1}).json()
+    assert [item["id_locacao"] for item in primeira["itens"]] == [ids_locacao[0]]
+    segunda = client.get("/locacao/multas", params={"id_cliente": id_bruce, "limit": 1, "after": primeira["next_cursor"]}).json()
+    assert [item["id_locacao"] for item in segunda["itens"]] == [ids_locacao[1]]
+    assert segunda["next_cursor"] is None
+    logger.info("Teste test_multas_filtradas_por_cliente_e_paginadas finalizado com sucesso")
+
+def test_multas_somadas_por_cliente_com_taxa_do_ambiente(monkeypatch):
+    logger.info("Iniciando teste: test_multas_somadas_por_cliente_com_taxa_do_ambiente")
+    (id_bruce, id_selina), _ = criar_locacoes()
+    monkeypatch.setattr(config, "MULTA_POR_DIA", 2.5)
+
+    response = client.get("/locacao/multas/clientes")
+    logger.info(f"GET /locacao/multas/clientes retornou status {response.status_code}")
+    assert response.status_code == 200
+    assert response.json()["itens"] == [
+        {"id_cliente": id_bruce, "locacoes_atrasadas": 2, "dias_atraso": 13, "multa_total": 32.5},
+        {"id_cliente": id_selina, "locacoes_atrasadas": 1, "dias_atraso": 1, "multa_total": 2.5},
+    ]
+    logger.info("Teste test_multas_somadas_por_cliente_com_taxa_do_ambiente finalizado com sucesso")
+
+def test_exportar_multas_por_cliente():
+    logger.info("Iniciando teste: test_exportar_multas_por_cliente")
+    (id_bruce, id_selina), _ = criar_locacoes()
+
+    response = client.get("/locacao/multas/exportar")
+    logger.info(f"GET /locacao/multas/exportar retornou status {response.status_code}")
+    assert response.status_code == 200
+    linhas = [json.loads(linha) for linha in response.text.splitlines()]
+    assert [(linha["id_cliente"], linha["multa_total"]) for linha in linhas] == [(id_bruce, 91.0), (id_selina, 7.0)]
+
+    csv = client.get("/locacao/multas/exportar", params={"formato": "csv"})
+    assert csv.text.splitlines()[0] == "id_cliente,locacoes_atrasadas,dias_atraso,multa_total"
+    logger.info("Teste test_exportar_multas_por_cliente finalizado com sucesso")
+
+def test_consultas_de_multa_compilam_para_o_postgresql():
+    logger.info("Iniciando teste: test_consultas_de_multa_compilam_para_o_postgresql")
+    #O PostgreSQL só tem round(numeric, int): a taxa tem que ir como numeric, e a multa volta como
+    #float pra não chegar Decimal nos serializadores (orjson e json.dumps).
+    for consulta in (consulta_multas(date.today(), 7.0), consulta_multas_por_cliente(date.today(), 7.0)):
+        sql_asyncpg = str(consulta.compile(dialect=asyncpg.dialect()))
+        assert "::NUMERIC(10, 2), $3::INTEGER) AS FLOAT)" in sql_asyncpg
+        assert "::FLOAT" not in sql_asyncpg
+        assert "CAST(round(" in str(consulta.compile(dialect=psycopg2.dialect()))
+    logger.info("Teste test_consultas_de_multa_compilam_para_o_postgresql finalizado com sucesso")
@@ -0,0 +1,99 @@
+import json
+import logging
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.database import Base, get_db
+from app.main import app
+from app.utils.logger import FormatterJSON, listener
+
+#Loggings pra acompanhar as respostas.
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine) #igual ao SessionLocal da app
+
+Base.metadata.create_all(bind=engine)
+
+def override_get_db():
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+app.dependency_overrides[get_db] = override_get_db
+client = TestClient(app)
+
+class HandlerCaptura(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.setFormatter(FormatterJSON())
+        self.linhas = []
+
+    def emit(self, record):
+        self.linhas.append(json.loads(self.format(record)))
+
+##Pra limpar o banco de dados conforme os testes ocorrerem..
+@pytest.fixture(autouse=True)
+def clean_db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield
+
+@pytest.fixture
+def captura():
+    #Pendura um handler no listener e devolve as linhas JSON já escritas pela thread de log.
+    handler = HandlerCaptura()
+    handlers_originais = listener.handlers
+    listener.handlers = handlers_originais + (handler,)
+    yield handler
+    listener.handlers = handlers_originais
+
+def esvaziar_fila():
+    listener.stop()
+    listener.start()
+
+#Testes do contexto do request nos logs.
+def test_logs_do_request_saem_em_json_com_id_rota_e_consultas(captura):
+    logger.info("Iniciando teste: test_logs_do_request_saem_em_json_com_id_rota_e_consultas")
+    filme = client.post("/filmes/salvar", json={
+        "nome": "Superman",
+        "data_lancamento": "2025-07-11",
+        "diretor": "James Gunn",
+        "genero": "Super-Heróis",
+        "estoque": 3
+    }).json()
+
+    response = client.get(f"/filmes/{filme['id']}", headers={"X-Request-ID": "req-123"})
+    esvaziar_fila()
+    logger.info(f"GET /filmes/{filme['id']} retornou status {response.status_code}")
+    assert response.status_code == 200
+    assert response.headers["X-Request-ID"] == "req-123"
+
+    linhas = [linha for linha in captura.linhas if linha.get("request_id") == "req-123"]
+    assert any(linha["mensagem"].startswith("Buscando filme") for linha in linhas) #Log do service.
+    final = linhas[-1]
+    assert final["rota"] == "/filmes/{id_filme}"
+    assert final["status"] == 200
+    assert final["consultas_db"] >= 1
+    assert final["tempo_db_ms"] > 0
+    assert final["latencia_ms"] >= final["tempo_db_ms"]
+    logger.info("Teste test_logs_do_request_saem_em_json_com_id_rota_e_consultas finalizado com sucesso")
+
+def test_request_sem_id_recebe_um_gerado(captura):
+    logger.info("Iniciando teste: test_request_sem_id_recebe_um_gerado")
+    primeira = client.get("/rota-que-nao-existe")
+    segunda = client.get("/rota-que-nao-existe")
+    esvaziar_fila()
+    assert primeira.status_code == 404
+    assert primeira.headers["X-Request-ID"] != segunda.headers["X-Request-ID"]
+
+    final = [linha for linha in captura.linhas if linha.get("request_id") == primeira.headers["X-Request-ID"]][-1]
+    assert final["rota"] is None
+    assert final["consultas_db"] == 0
+    logger.info("Teste test_request_sem_id_recebe_um_gerado finalizado com sucesso")